@@ -12,6 +12,7 @@ from ic.doc import ProductDoc
 from ic.session import ProjectStore, Project
 from ic.soul.engine import Engine
 from ic.soul.context import Context
+from ic.soul.journal import ContextJournal
 from ic.ui.console import Console
 from ic.ui.cli_io import CLIUserIO
 from ic.ui.prompt import Prompt
@@ -148,14 +149,18 @@ class App:
         self.engine = self._create_engine(workspace)
 
         # Load existing context if resuming
+        self.journal = ContextJournal(self.store.journal_path(self.project.id))
         if resume_project:
-            ctx_path = self.store.context_path(self.project.id)
-            self.engine.context = Context.load(
-                ctx_path, system_prompt=self.engine.agent_config.system_prompt
-            )
-            # Restore engine state (cost, usage, snapshots)
-            state_path = self.store.project_dir(self.project.id) / "engine_state.json"
-            self.engine.load_state(state_path)
+            if not self.engine.load_journal(self.journal):
+                # Projects saved before the journal existed: load the legacy
+                # files once; the next save writes them into the journal.
+                ctx_path = self.store.context_path(self.project.id)
+                self.engine.context = Context.load(
+                    ctx_path, system_prompt=self.engine.agent_config.system_prompt
+                )
+                # Restore engine state (cost, usage, snapshots)
+                state_path = self.store.project_dir(self.project.id) / "engine_state.json"
+                self.engine.load_state(state_path)
             self.console.print_info(f"Resumed project: {self.project.id}")
 
         model_name = self.config.get_model(self.engine.agent_config.model).model
@@ -190,11 +195,8 @@ class App:
                 if result.usage:
                     self.console.print_usage(result.usage)
 
-                # Save context and engine state
-                ctx_path = self.store.context_path(self.project.id)
-                self.engine.context.save(ctx_path)
-                state_path = self.store.project_dir(self.project.id) / "engine_state.json"
-                self.engine.save_state(state_path)
+                # Append this turn's context and engine state to the journal
+                self.engine.save_journal(self.journal)
                 self.store.update_timestamp(self.project)
 
             except KeyboardInterrupt:
@@ -211,6 +213,8 @@ class App:
                     self.console.end_streaming()
                 self.console.print_error(str(e))
 
+        self.engine.save_journal(self.journal, durable=True)
+        self.journal.close()
         self.console.print_info("Goodbye.")
 
     def _handle_command(self, cmd: str) -> bool:
@@ -0,0 +1,35 @@
+"""Offline engine benchmarks against a scripted OpenAI-compatible stub."""
+
+from ic.bench.runner import (
+    BenchResult,
+    compare_to_baseline,
+    engine_driver,
+    load_baseline,
+    run_bench,
+    save_baseline,
+    stub_config,
+)
+from ic.bench.stub import (
+    StubLLMServer,
+    StubScenario,
+    StubStep,
+    StubToolCall,
+    builtin_scenarios,
+    spawn_stub_process,
+)
+
+__all__ = [
+    "BenchResult",
+    "StubLLMServer",
+    "StubScenario",
+    "StubStep",
+    "StubToolCall",
+    "builtin_scenarios",
+    "compare_to_baseline",
+    "engine_driver",
+    "load_baseline",
+    "run_bench",
+    "save_baseline",
+    "spawn_stub_process",
+    "stub_config",
+]
@@ -0,0 +1,109 @@
+"""CLI: ``python -m ic.bench --scenario parallel --sessions 8``."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable
+
+from ic.bench.runner import (
+    SessionDriver,
+    compare_to_baseline,
+    engine_driver,
+    load_baseline,
+    run_bench,
+    save_baseline,
+)
+from ic.bench.stub import StubLLMServer, builtin_scenarios, spawn_stub_process
+
+
+def build_parser(prog: str = "python -m ic.bench") -> argparse.ArgumentParser:
+    scenarios = builtin_scenarios()
+    parser = argparse.ArgumentParser(prog=prog, description="Offline engine benchmark")
+    parser.add_argument("--scenario", choices=sorted(scenarios), default="parallel")
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent sessions")
+    parser.add_argument("--turns", type=int, default=1, help="Turns per session")
+    parser.add_argument("--token-rate", type=float, default=0.0,
+                        help="Stub tokens/sec per stream (0 = unthrottled)")
+    parser.add_argument("--first-token-delay", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall-seconds", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--disconnect-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--in-process", action="store_true",
+                        help="Run the stub in a thread (its CPU then counts against the engine)")
+    parser.add_argument("--baseline", type=Path, help="Baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Write this run into --baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed fractional regression per metric")
+    parser.add_argument("--timings", action=argparse.BooleanOptionalAction, default=None,
+                        help="Compare timings/RSS too (default: only if the baseline "
+                             "was recorded on this host)")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON only")
+    return parser
+
+
+def main(
+    argv: list[str] | None = None,
+    make_driver: Callable[[str], SessionDriver] = engine_driver,
+    prog: str = "python -m ic.bench",
+) -> int:
+    args = build_parser(prog).parse_args(argv)
+    scenario = replace(
+        builtin_scenarios()[args.scenario],
+        token_rate=args.token_rate,
+        first_token_delay=args.first_token_delay,
+        stall_rate=args.stall_rate,
+        stall_seconds=args.stall_seconds,
+        error_rate=args.error_rate,
+        disconnect_rate=args.disconnect_rate,
+        seed=args.seed,
+    )
+
+    server = process = None
+    if args.in_process:
+        server = StubLLMServer(scenario)
+        base_url = server.start()
+    else:
+        process, base_url = spawn_stub_process(scenario)
+    try:
+        result = asyncio.run(run_bench(
+            make_driver(base_url),
+            scenario=scenario.name,
+            sessions=args.sessions,
+            turns=args.turns,
+        ))
+    finally:
+        if server is not None:
+            server.stop()
+        if process is not None:
+            process.terminate()
+            process.join(timeout=5)
+
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=2))
+    else:
+        for key, value in result.to_dict().items():
+            print(f"{key:>18}  {value}")
+
+    if args.baseline and args.update_baseline:
+        save_baseline(args.baseline, result)
+        return 0
+    if args.baseline:
+        regressions = compare_to_baseline(
+            result, load_baseline(args.baseline), args.tolerance, timings=args.timings,
+        )
+        if regressions:
+            print("REGRESSIONS:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""Drive N concurrent engine sessions against the stub and collect metrics.
+
+Metrics per run:
+
+- ``turns_per_sec``     completed top-level turns / wall time
+- ``step_p50_ms`` / ``step_p99_ms``   latency of ``Engine._step`` (one LLM
+  call plus its tool execution), including sub-agent steps
+- ``cpu_us_per_token``  process CPU time / completion tokens received
+- ``peak_rss_mb``       peak resident set size of this process
+
+Results can be compared against a JSON baseline (``{scenario: metrics}``)
+so regressions fail CI-style runs.  Only machine-independent counts
+(steps, completion tokens, errors) are compared by default; timings and
+RSS are compared only against a baseline recorded on the same host (or
+when explicitly requested).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from ic.config import AgentConfig, Config, ModelConfig
+from ic.soul.engine import Engine
+
+logger = logging.getLogger("ic.bench")
+
+BENCH_MODEL = "stub"
+
+DEFAULT_TOOLS = [
+    "ic.tools.file:ReadFile",
+    "ic.tools.file:WriteFile",
+    "ic.tools.file:EditFile",
+    "ic.tools.think:Think",
+    "ic.tools.subagent:CreateSubAgent",
+    "ic.tools.subagent:CreateParallelSubAgents",
+]
+
+# Direction of "better" for each compared metric.
+_HIGHER_IS_BETTER = {"turns_per_sec"}
+# Host-dependent: only compared against a baseline from the same host.
+_TIMED = ("turns_per_sec", "step_p50_ms", "step_p99_ms", "cpu_us_per_token", "peak_rss_mb")
+# Deterministic for a given scenario and seed: any drift beyond tolerance is flagged.
+_COUNTED = ("steps", "completion_tokens")
+
+# A driver runs one session, yielding once per completed turn, so a session
+# that fails part-way still reports the turns it finished.
+SessionDriver = Callable[[int, Path, list[str]], AsyncIterator[None]]
+
+
+def host_id() -> str:
+    """Stable, non-identifying label for the machine a result was taken on."""
+    digest = hashlib.sha1(f"{platform.node()}|{platform.machine()}".encode()).hexdigest()[:8]
+    return f"{platform.machine()}-{os.cpu_count()}cpu-{digest}"
+
+
+@dataclass
+class BenchResult:
+    """Aggregated metrics for one benchmark run."""
+
+    scenario: str
+    sessions: int
+    turns: int = 0
+    errors: int = 0
+    wall_seconds: float = 0.0
+    turns_per_sec: float = 0.0
+    steps: int = 0
+    step_p50_ms: float = 0.0
+    step_p99_ms: float = 0.0
+    completion_tokens: int = 0
+    cpu_seconds: float = 0.0
+    cpu_us_per_token: float = 0.0
+    peak_rss_mb: float = 0.0
+    session_turns: list[int] = field(default_factory=list)
+    error_types: dict[str, int] = field(default_factory=dict)
+    host: str = field(default_factory=host_id)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {k: round(v, 3) if isinstance(v, float) else v for k, v in asdict(self).items()}
+
+
+@dataclass
+class _Recorder:
+    step_seconds: list[float] = field(default_factory=list)
+    completion_tokens: int = 0
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS of this process (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+@contextmanager
+def _instrument(recorder: _Recorder) -> Iterator[None]:
+    """Time every ``Engine._step``, sub-agent engines included."""
+    original = Engine._step
+
+    async def _timed_step(self: Engine) -> dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            result = await original(self)
+        finally:
+            # Failed steps are timed too; they are often the slow ones.
+            recorder.step_seconds.append(time.perf_counter() - start)
+        recorder.completion_tokens += int(result.get("usage", {}).get("completion_tokens", 0) or 0)
+        return result
+
+    Engine._step = _timed_step  # type: ignore[method-assign]
+    try:
+        yield
+    finally:
+        Engine._step = original  # type: ignore[method-assign]
+
+
+def stub_config(base_url: str, timeout: float = 60.0) -> Config:
+    """Agent config with a single model pointing at the stub server."""
+    cfg = Config()
+    cfg.models = {
+        BENCH_MODEL: ModelConfig(
+            name=BENCH_MODEL, api_key="bench", base_url=base_url, timeout=timeout,
+        ),
+    }
+    cfg.default_model = BENCH_MODEL
+    cfg._auto_select_pointers()
+    return cfg
+
+
+def engine_driver(base_url: str, tools: list[str] | None = None) -> SessionDriver:
+    """Driver that runs a bare :class:`Engine` per session."""
+    config = stub_config(base_url)
+
+    async def _run(index: int, workspace: Path, prompts: list[str]) -> AsyncIterator[None]:
+        agent_cfg = AgentConfig(
+            name=f"bench-{index}",
+            system_prompt="You are a benchmark agent.",
+            model=BENCH_MODEL,
+            tools=list(tools or DEFAULT_TOOLS),
+            max_turns=20,
+        )
+        engine = Engine(config=config, agent_config=agent_cfg, workspace=str(workspace))
+        engine.setup()
+        for prompt in prompts:
+            await engine.run_turn(prompt)
+            yield
+
+    return _run
+
+
+async def run_bench(
+    driver: SessionDriver,
+    *,
+    scenario: str,
+    sessions: int = 4,
+    turns: int = 1,
+    workdir: Path | None = None,
+) -> BenchResult:
+    """Run ``sessions`` concurrent sessions of ``turns`` turns each."""
+    recorder = _Recorder()
+    result = BenchResult(scenario=scenario, sessions=sessions)
+    with tempfile.TemporaryDirectory(prefix="ic-bench-") as tmp:
+        root = Path(workdir or tmp)
+
+        completed = [0] * sessions
+
+        async def _session(i: int) -> None:
+            ws = root / f"session-{i}"
+            ws.mkdir(parents=True, exist_ok=True)
+            prompts = [f"Session {i} turn {t}: continue with the next step." for t in range(turns)]
+            async for _ in driver(i, ws, prompts):
+                completed[i] += 1
+
+        with _instrument(recorder):
+            cpu_start = time.process_time()
+            wall_start = time.perf_counter()
+            outcomes = await asyncio.gather(
+                *(_session(i) for i in range(sessions)), return_exceptions=True,
+            )
+            result.wall_seconds = time.perf_counter() - wall_start
+            result.cpu_seconds = time.process_time() - cpu_start
+
+    for i, outcome in enumerate(outcomes):
+        if isinstance(outcome, BaseException):
+            result.errors += 1
+            name = type(outcome).__name__
+            result.error_types[name] = result.error_types.get(name, 0) + 1
+            logger.warning(
+                "bench session %d failed after %d/%d turns: %s: %s",
+                i, completed[i], turns, name, outcome,
+            )
+    result.session_turns = completed
+    result.turns = sum(completed)
+    result.turns_per_sec = result.turns / result.wall_seconds if result.wall_seconds else 0.0
+    result.steps = len(recorder.step_seconds)
+    result.step_p50_ms = percentile(recorder.step_seconds, 50) * 1000
+    result.step_p99_ms = percentile(recorder.step_seconds, 99) * 1000
+    result.completion_tokens = recorder.completion_tokens
+    if recorder.completion_tokens:
+        result.cpu_us_per_token = result.cpu_seconds / recorder.completion_tokens * 1e6
+    result.peak_rss_mb = peak_rss_mb()
+    return result
+
+
+# ── Baselines ─────────────────────────────────────────────────
+
+
+def load_baseline(path: Path) -> dict[str, dict[str, Any]]:
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baseline(path: Path, result: BenchResult) -> None:
+    baseline = load_baseline(path)
+    baseline[result.scenario] = result.to_dict()
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+def compare_to_baseline(
+    result: BenchResult,
+    baseline: dict[str, dict[str, Any]],
+    tolerance: float = 0.25,
+    timings: bool | None = None,
+) -> list[str]:
+    """Return human-readable regressions beyond ``tolerance`` (fractional).
+
+    ``timings=None`` compares timings and RSS only when the baseline was
+    recorded on this host; ``True``/``False`` force it on or off.
+    """
+    reference = baseline.get(result.scenario)
+    if not reference or reference.get("sessions") != result.sessions:
+        return []  # nothing comparable recorded
+    current = result.to_dict()
+    if timings is None:
+        timings = reference.get("host") == result.host
+    regressions: list[str] = []
+    for metric in _COUNTED:
+        old = reference.get(metric)
+        new = current.get(metric)
+        if old and new is not None and abs(new - old) > old * tolerance:
+            regressions.append(f"{metric}: {old} -> {new}")
+    for metric in _TIMED if timings else ():
+        old = reference.get(metric)
+        new = current.get(metric)
+        if not old or new is None:
+            continue
+        if metric in _HIGHER_IS_BETTER:
+            worse = new < old * (1 - tolerance)
+        else:
+            worse = new > old * (1 + tolerance)
+        if worse:
+            regressions.append(f"{metric}: {old} -> {new}")
+    if result.errors > int(reference.get("errors", 0)):
+        regressions.append(f"errors: {reference.get('errors', 0)} -> {result.errors}")
+    return regressions
@@ -0,0 +1,430 @@
+"""Scripted OpenAI-compatible streaming server for offline benchmarks.
+
+Serves ``POST /v1/chat/completions`` with ``stream=true`` in the same SSE
+chunk format as OpenAI, so ``LLMProvider`` runs its real parsing path.
+Replies are driven by a :class:`StubScenario` instead of a model:
+
+- the step index is the number of assistant messages since the last user
+  message, so a multi-step agent turn walks through ``main`` in order;
+- requests whose system prompt is the sub-agent prompt walk ``sub``;
+- tokens are paced at ``token_rate`` per second in ``chunk_tokens`` chunks;
+- ``stall_rate`` / ``error_rate`` / ``disconnect_rate`` inject pauses,
+  HTTP 500s and dropped streams from a seeded RNG.
+
+The server is a bare asyncio HTTP/1.1 implementation (keep-alive, chunked
+transfer) so it needs nothing beyond the standard library.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+SUB_AGENT_MARKER = "You are a focused sub-agent"
+
+# Neutral filler: none of these trip the engine's generation-intent heuristics.
+_WORDS = (
+    "the", "layout", "uses", "a", "calm", "palette", "with", "soft", "cards",
+    "and", "clear", "type", "for", "each", "section", "on", "small", "screens",
+    "so", "users", "can", "scan", "content", "quickly", "while", "spacing",
+    "stays", "even", "across", "views",
+)
+
+
+@dataclass
+class StubToolCall:
+    """One scripted tool call.
+
+    String values in ``arguments`` may contain ``{uid}``, replaced by a short
+    hash of the conversation's first user message so concurrent sub-agents
+    write distinct files.  ``content_tokens`` fills ``arguments[content_key]``
+    with that many tokens of generated HTML.
+    """
+
+    name: str
+    arguments: dict[str, Any] = field(default_factory=dict)
+    content_tokens: int = 0
+    content_key: str = "content"
+
+
+@dataclass
+class StubStep:
+    """One scripted assistant response: text, tool calls, or both."""
+
+    text: str = ""
+    text_tokens: int = 0
+    tool_calls: list[StubToolCall] = field(default_factory=list)
+
+
+@dataclass
+class StubScenario:
+    """Everything the stub needs to answer requests deterministically."""
+
+    name: str = "custom"
+    main: list[StubStep] = field(default_factory=lambda: [StubStep(text_tokens=200)])
+    sub: list[StubStep] = field(default_factory=lambda: [StubStep(text_tokens=40)])
+    token_rate: float = 0.0  # tokens/sec per stream; 0 = as fast as possible
+    chunk_tokens: int = 4
+    first_token_delay: float = 0.0
+    stall_rate: float = 0.0
+    stall_seconds: float = 0.5
+    error_rate: float = 0.0
+    disconnect_rate: float = 0.0
+    seed: int = 0
+
+
+# ── Built-in scenarios ────────────────────────────────────────
+
+
+def builtin_scenarios() -> dict[str, StubScenario]:
+    """Named scenarios used by ``python -m ic.bench``."""
+    return {
+        "chat": StubScenario(
+            name="chat",
+            main=[StubStep(text_tokens=300)],
+        ),
+        "tools": StubScenario(
+            name="tools",
+            main=[
+                StubStep(
+                    text_tokens=20,
+                    tool_calls=[StubToolCall(
+                        "write_file", {"file_path": "index.html"}, content_tokens=1200,
+                    )],
+                ),
+                StubStep(tool_calls=[StubToolCall("read_file", {"file_path": "index.html"})]),
+                StubStep(text_tokens=120),
+            ],
+        ),
+        "parallel": StubScenario(
+            name="parallel",
+            main=[
+                StubStep(
+                    text_tokens=20,
+                    tool_calls=[StubToolCall(
+                        "create_parallel_sub_agents",
+                        {"tasks": [{"task": f"Page {i}: product list", "max_turns": 4}
+                                   for i in range(4)]},
+                    )],
+                ),
+                StubStep(text_tokens=80),
+            ],
+            sub=[
+                StubStep(tool_calls=[StubToolCall(
+                    "write_file", {"file_path": "pages/{uid}.html"}, content_tokens=800,
+                )]),
+                StubStep(text_tokens=40),
+            ],
+        ),
+    }
+
+
+# ── Response synthesis ────────────────────────────────────────
+
+
+def _filler(n_tokens: int, offset: int = 0) -> str:
+    return " ".join(_WORDS[(offset + i) % len(_WORDS)] for i in range(n_tokens))
+
+
+def _html(n_tokens: int) -> str:
+    body = _filler(max(0, n_tokens - 20))
+    return (
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Page</title></head>"
+        f"<body><main><p>{body}</p></main></body></html>\n"
+    )
+
+
+def _split_tokens(text: str, chunk_tokens: int) -> list[str]:
+    """Split text into stream chunks of roughly ``chunk_tokens`` tokens (~4 chars each)."""
+    size = max(1, chunk_tokens * 4)
+    return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+
+def _select_step(scenario: StubScenario, messages: list[dict[str, Any]]) -> tuple[StubStep, str]:
+    system = messages[0].get("content") if messages and messages[0].get("role") == "system" else ""
+    if isinstance(system, list):
+        system = " ".join(b.get("text", "") for b in system if isinstance(b, dict))
+    script = scenario.sub if SUB_AGENT_MARKER in (system or "") else scenario.main
+
+    last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=-1)
+    index = sum(1 for m in messages[last_user + 1:] if m.get("role") == "assistant")
+    first_user = next((m for m in messages if m.get("role") == "user"), {})
+    uid = hashlib.sha1(str(first_user.get("content", "")).encode()).hexdigest()[:8]
+    if index >= len(script):
+        return StubStep(text_tokens=8), uid
+    return script[index], uid
+
+
+def _render_arguments(call: StubToolCall, uid: str) -> str:
+    def _sub(value: Any) -> Any:
+        if isinstance(value, str):
+            return value.replace("{uid}", uid)
+        if isinstance(value, list):
+            return [_sub(v) for v in value]
+        if isinstance(value, dict):
+            return {k: _sub(v) for k, v in value.items()}
+        return value
+
+    args = _sub(call.arguments)
+    if call.content_tokens:
+        args[call.content_key] = _html(call.content_tokens)
+    return json.dumps(args)
+
+
+# ── Server ────────────────────────────────────────────────────
+
+
+class StubLLMServer:
+    """Asyncio HTTP server answering chat completions from a scenario."""
+
+    def __init__(self, scenario: StubScenario, host: str = "127.0.0.1", port: int = 0):
+        self.scenario = scenario
+        self.host = host
+        self.port = port
+        self.stats = {
+            "requests": 0,
+            "completion_tokens": 0,
+            "stalls": 0,
+            "errors": 0,
+            "disconnects": 0,
+        }
+        self._rng = random.Random(scenario.seed)
+        self._server: asyncio.AbstractServer | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def serve(self) -> None:
+        """Bind and serve until cancelled."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start(self) -> str:
+        """Serve from a daemon thread; returns the ``/v1`` base URL."""
+        ready = threading.Event()
+
+        def _run() -> None:
+            self._loop = asyncio.new_event_loop()
+            task = self._loop.create_task(self.serve())
+            self._loop.call_soon(ready.set)
+            try:
+                self._loop.run_until_complete(task)
+            except asyncio.CancelledError:
+                pass
+            finally:
+                pending = asyncio.all_tasks(self._loop)
+                if pending:
+                    self._loop.run_until_complete(
+                        asyncio.gather(*pending, return_exceptions=True)
+                    )
+                self._loop.close()
+
+        self._thread = threading.Thread(target=_run, name="stub-llm", daemon=True)
+        self._thread.start()
+        ready.wait()
+        while self._server is None or not self._server.sockets:
+            time.sleep(0.005)
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._loop is None or self._server is None:
+            return
+
+        def _close() -> None:
+            self._server.close()
+            for task in asyncio.all_tasks(self._loop):
+                task.cancel()
+
+        self._loop.call_soon_threadsafe(_close)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    # ── HTTP plumbing ─────────────────────────────────────────
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers: dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", "0") or 0))
+                keep_open = await self._dispatch(method, path, body, writer)
+                if not keep_open:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            pass  # server shutting down; end the handler quietly
+        finally:
+            writer.close()
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode()
+        reason = {200: "OK", 404: "Not Found", 500: "Internal Server Error"}.get(status, "Error")
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+        )
+        await writer.drain()
+
+    async def _dispatch(
+        self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter,
+    ) -> bool:
+        if method != "POST" or not path.rstrip("/").endswith("/chat/completions"):
+            await self._send_json(writer, 404, {"error": {"message": "not found"}})
+            return True
+
+        self.stats["requests"] += 1
+        scenario = self.scenario
+        if scenario.error_rate and self._rng.random() < scenario.error_rate:
+            self.stats["errors"] += 1
+            await self._send_json(
+                writer, 500, {"error": {"message": "injected failure", "type": "server_error"}},
+            )
+            return True
+
+        request = json.loads(body or b"{}")
+        step, uid = _select_step(scenario, request.get("messages", []))
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\nTransfer-Encoding: chunked\r\n\r\n"
+        )
+        completed = await self._stream(writer, request, step, uid)
+        if completed:
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        return completed
+
+    # ── Streaming ─────────────────────────────────────────────
+
+    async def _stream(
+        self, writer: asyncio.StreamWriter, request: dict, step: StubStep, uid: str,
+    ) -> bool:
+        scenario = self.scenario
+        chunk_id = f"chatcmpl-{uid}-{self.stats['requests']}"
+        model = request.get("model", "stub")
+        tokens = 0
+
+        def _event(delta: dict, finish: str | None = None, usage: dict | None = None) -> bytes:
+            payload: dict[str, Any] = {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }
+            if usage is not None:
+                payload["usage"] = usage
+            data = f"data: {json.dumps(payload)}\n\n".encode()
+            return f"{len(data):x}\r\n".encode() + data + b"\r\n"
+
+        pieces: list[tuple[dict, int]] = []
+        text = step.text or _filler(step.text_tokens)
+        if text:
+            pieces.extend(({"content": part}, scenario.chunk_tokens)
+                          for part in _split_tokens(text, scenario.chunk_tokens))
+        for index, call in enumerate(step.tool_calls):
+            pieces.append(({"tool_calls": [{
+                "index": index,
+                "id": f"call_{uid}_{self.stats['requests']}_{index}",
+                "type": "function",
+                "function": {"name": call.name, "arguments": ""},
+            }]}, 1))
+            for part in _split_tokens(_render_arguments(call, uid), scenario.chunk_tokens):
+                pieces.append(({"tool_calls": [{
+                    "index": index, "function": {"arguments": part},
+                }]}, scenario.chunk_tokens))
+
+        disconnect_at = -1
+        if scenario.disconnect_rate and self._rng.random() < scenario.disconnect_rate:
+            disconnect_at = self._rng.randrange(len(pieces)) if pieces else 0
+        stall_at = -1
+        if scenario.stall_rate and self._rng.random() < scenario.stall_rate:
+            stall_at = self._rng.randrange(len(pieces)) if pieces else 0
+
+        writer.write(_event({"role": "assistant", "content": ""}))
+        await writer.drain()
+        if scenario.first_token_delay:
+            await asyncio.sleep(scenario.first_token_delay)
+
+        for i, (delta, n) in enumerate(pieces):
+            if i == disconnect_at:
+                self.stats["disconnects"] += 1
+                self.stats["completion_tokens"] += tokens
+                return False
+            if i == stall_at:
+                self.stats["stalls"] += 1
+                await asyncio.sleep(scenario.stall_seconds)
+            writer.write(_event(delta))
+            await writer.drain()
+            tokens += n
+            if scenario.token_rate:
+                await asyncio.sleep(n / scenario.token_rate)
+
+        prompt_tokens = len(json.dumps(request.get("messages", []))) // 4
+        writer.write(_event(
+            {},
+            finish="tool_calls" if step.tool_calls else "stop",
+            usage={
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": tokens,
+                "total_tokens": prompt_tokens + tokens,
+            },
+        ))
+        writer.write(_done_chunk())
+        await writer.drain()
+        self.stats["completion_tokens"] += tokens
+        return True
+
+
+def _done_chunk() -> bytes:
+    data = b"data: [DONE]\n\n"
+    return f"{len(data):x}\r\n".encode() + data + b"\r\n"
+
+
+# ── Out-of-process serving ────────────────────────────────────
+
+
+def _serve_in_child(scenario: StubScenario, port_queue: Any) -> None:
+    async def _main() -> None:
+        server = StubLLMServer(scenario)
+        task = asyncio.create_task(server.serve())
+        while server._server is None or not server._server.sockets:
+            await asyncio.sleep(0.005)
+        port_queue.put(server.port)
+        await task
+
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
+
+
+def spawn_stub_process(scenario: StubScenario) -> tuple[multiprocessing.Process, str]:
+    """Run the stub in a separate process so its CPU time stays out of the measurement."""
+    ctx = multiprocessing.get_context("spawn")
+    port_queue = ctx.Queue()
+    process = ctx.Process(target=_serve_in_child, args=(scenario, port_queue), daemon=True)
+    process.start()
+    port = port_queue.get(timeout=30)
+    return process, f"http://127.0.0.1:{port}/v1"
@@ -32,7 +32,8 @@ class ProjectStore:
     Each project lives at:
         {base_dir}/projects/{project_id}/
         ├── meta.json        # project metadata
-        ├── context.jsonl    # conversation history
+        ├── session.journal  # append-only conversation + engine state
+        ├── context.jsonl    # legacy conversation history (read on resume)
         └── workspace/       # generated code
     """
 
@@ -82,6 +83,9 @@ class ProjectStore:
     def context_path(self, project_id: str) -> Path:
         return self.base_dir / project_id / "context.jsonl"
 
+    def journal_path(self, project_id: str) -> Path:
+        return self.base_dir / project_id / "session.journal"
+
     def update_timestamp(self, project: Project):
         project.updated_at = datetime.now().isoformat()
         self._save_meta(project)
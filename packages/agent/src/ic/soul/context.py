@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import copy
 import json
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -150,16 +149,19 @@ class Context:
 
     # ── Branching / Undo ──────────────────────────────────────
 
+    # Messages are never edited in place (see compact_web), so snapshots can
+    # share them; only the list itself is copied.
+
     def _take_snapshot(self, label: str = "") -> _Snapshot:
         return _Snapshot(
-            messages=copy.deepcopy(self.messages),
+            messages=list(self.messages),
             token_estimate=self._token_estimate,
             cacheable_count=self._cacheable_count,
             label=label,
         )
 
     def _restore_snapshot(self, snap: _Snapshot):
-        self.messages = copy.deepcopy(snap.messages)
+        self.messages = list(snap.messages)
         self._token_estimate = snap.token_estimate
         self._cacheable_count = snap.cacheable_count
 
@@ -325,14 +327,20 @@ class Context:
         old_count = len(self.messages)
 
         # Step 1: De-duplicate HTML in tool results (replace >2K char HTML with placeholder)
-        for m in self.messages:
+        # Replace rather than mutate: snapshots and the journal share messages.
+        for i, m in enumerate(self.messages):
             if m.role == "tool" and isinstance(m.content, str) and len(m.content) > 2000:
                 # Check if it looks like HTML
                 if "<html" in m.content.lower() or "<!doctype" in m.content.lower():
                     import re
                     title_match = re.search(r"<title>(.*?)</title>", m.content, re.IGNORECASE)
                     title = title_match.group(1) if title_match else "untitled"
-                    m.content = f"[HTML: {title}, {len(m.content)} chars]"
+                    self.messages[i] = Message(
+                        role=m.role,
+                        content=f"[HTML: {title}, {len(m.content)} chars]",
+                        tool_call_id=m.tool_call_id,
+                        name=m.name,
+                    )
 
         # Step 2: Split messages into first/middle/recent
         first = self.messages[:keep_first]
@@ -17,6 +17,7 @@ from ic.llm.provider import LLMProvider, Message, create_provider
 from ic.llm.stream import StreamEvent, StreamEventType, StreamHandler
 from ic.soul.context import Context
 from ic.soul.context_injector import ContextInjector, ContextConfig
+from ic.soul.journal import ContextJournal
 from ic.soul.toolset import Toolset
 from ic.ui.io import UserIO
 from ic.log import LLMCallLogger, log_tool_execution, log_turn
@@ -1231,13 +1232,7 @@ class Engine:
 
         state = {
             "version": 1,
-            "cost_tracker": {
-                "prompt_tokens": self._cost_tracker.prompt_tokens,
-                "completion_tokens": self._cost_tracker.completion_tokens,
-                "total_cost_usd": self._cost_tracker.total_cost_usd,
-                "model": self._cost_tracker.model,
-            },
-            "total_usage": dict(self._total_usage),
+            **self._export_counters(),
             "snapshots": [_serialize_snapshot(s) for s in self.context._snapshots],
             "branches": {
                 name: _serialize_snapshot(s)
@@ -1261,18 +1256,7 @@ class Engine:
         if state.get("version") != 1:
             return
 
-        # Restore cost tracker
-        ct = state.get("cost_tracker", {})
-        self._cost_tracker.prompt_tokens = ct.get("prompt_tokens", 0)
-        self._cost_tracker.completion_tokens = ct.get("completion_tokens", 0)
-        self._cost_tracker.total_cost_usd = ct.get("total_cost_usd", 0.0)
-        if ct.get("model"):
-            self._cost_tracker.model = ct["model"]
-
-        # Restore total usage
-        tu = state.get("total_usage", {})
-        self._total_usage["prompt_tokens"] = tu.get("prompt_tokens", 0)
-        self._total_usage["completion_tokens"] = tu.get("completion_tokens", 0)
+        self._restore_counters(state)
 
         def _deserialize_snapshot(data: dict) -> _Snapshot:
             msgs = [Message(**m) for m in data.get("messages", [])]
@@ -1291,3 +1275,45 @@ class Engine:
             name: _deserialize_snapshot(s)
             for name, s in state.get("branches", {}).items()
         }
+
+    def save_journal(self, journal: ContextJournal, durable: bool = False) -> int:
+        """Append this turn's context changes and counters to a journal.
+
+        Unlike save_state, cost is proportional to what changed since the
+        previous save. Returns the number of bytes written.
+        """
+        return journal.save(self.context, state=self._export_counters(), durable=durable)
+
+    def load_journal(self, journal: ContextJournal) -> bool:
+        """Restore context and counters from a journal. Returns False if absent."""
+        loaded = journal.load(system_prompt=self.agent_config.system_prompt)
+        if loaded is None:
+            return False
+        self.context, state = loaded
+        self._restore_counters(state)
+        return True
+
+    def _export_counters(self) -> dict[str, Any]:
+        return {
+            "cost_tracker": {
+                "prompt_tokens": self._cost_tracker.prompt_tokens,
+                "completion_tokens": self._cost_tracker.completion_tokens,
+                "total_cost_usd": self._cost_tracker.total_cost_usd,
+                "model": self._cost_tracker.model,
+            },
+            "total_usage": dict(self._total_usage),
+        }
+
+    def _restore_counters(self, state: dict[str, Any]):
+        # Restore cost tracker
+        ct = state.get("cost_tracker", {})
+        self._cost_tracker.prompt_tokens = ct.get("prompt_tokens", 0)
+        self._cost_tracker.completion_tokens = ct.get("completion_tokens", 0)
+        self._cost_tracker.total_cost_usd = ct.get("total_cost_usd", 0.0)
+        if ct.get("model"):
+            self._cost_tracker.model = ct["model"]
+
+        # Restore total usage
+        tu = state.get("total_usage", {})
+        self._total_usage["prompt_tokens"] = tu.get("prompt_tokens", 0)
+        self._total_usage["completion_tokens"] = tu.get("completion_tokens", 0)
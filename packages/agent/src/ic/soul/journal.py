@@ -0,0 +1,445 @@
+"""Append-only session journal for Context and Engine state.
+
+``Context.save`` / ``Engine.save_state`` rewrite the whole conversation on
+every turn.  The journal instead appends only what changed since the last
+save, so save cost is O(new messages).  Each line is one JSON record:
+
+    {"t":"msg","seq":7,"m":{...}}                 define message #7
+    {"t":"body","seq":9,"c":"..."}                large tool-result body for #9
+    {"t":"msg","seq":9,"m":{...},"body":1234}     message whose content lives at byte 1234
+    {"t":"extend","seqs":[[7,9]],...}             append messages to the live list
+    {"t":"layout","seqs":[[0,1],[5,9]],...}       live list rewritten (compaction, undo)
+    {"t":"push","snap":{...}}                     checkpoint pushed on the undo stack
+    {"t":"stack","snaps":[...]}                   undo stack rewritten
+    {"t":"branch","name":"v1","snap":{...}}       named branch saved
+    {"t":"unbranch","name":"v1"}                  named branch removed
+    {"t":"state","data":{...}}                    engine counters (cost, usage)
+
+Loading replays records up to the last complete line, so a crash mid-write
+lands on the last complete record.  Large tool-result bodies are not parsed
+on load; they are paged in the first time their ``content`` is read.  When
+enough of the file is garbage (dropped by compaction or undo), it is
+rewritten into a fresh base containing only the reachable records.
+
+Messages are treated as immutable once journaled: Context replaces a
+message rather than editing it in place.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from ic.llm.provider import Message
+from ic.soul.context import Context, _Snapshot
+
+# Tool results larger than this (chars) are stored as separate body records
+# and paged in lazily on load.
+LAZY_BODY_THRESHOLD = 16 * 1024
+
+_BODY_PREFIX = b'{"t":"body"'
+
+
+class _PagedMessage(Message):
+    """Message whose content is read from the journal on first access."""
+
+    def __init__(self, source: tuple[str, int], **kwargs: Any):
+        super().__init__(**kwargs)
+        self._source = source
+        self._loaded = False
+
+    @property  # type: ignore[override]
+    def content(self) -> Any:
+        if not self._loaded:
+            self._value = _read_body(*self._source)
+            self._loaded = True
+        return self._value
+
+    @content.setter
+    def content(self, value: Any) -> None:
+        self._value = value
+        self._loaded = True
+
+    @property
+    def is_paged_in(self) -> bool:
+        return self._loaded
+
+
+def _read_body(path: str, offset: int) -> str:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        record = json.loads(f.readline())
+    return record["c"]
+
+
+def _dumps(record: dict[str, Any]) -> bytes:
+    return (
+        json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str) + "\n"
+    ).encode("utf-8")
+
+
+def _to_ranges(seqs: list[int]) -> list[list[int]]:
+    """Run-length encode a seq list: [3,4,5,9] -> [[3,5],[9,9]]."""
+    ranges: list[list[int]] = []
+    for s in seqs:
+        if ranges and ranges[-1][1] == s - 1:
+            ranges[-1][1] = s
+        else:
+            ranges.append([s, s])
+    return ranges
+
+
+def _from_ranges(ranges: list[list[int]]) -> list[int]:
+    seqs: list[int] = []
+    for start, end in ranges:
+        seqs.extend(range(start, end + 1))
+    return seqs
+
+
+class ContextJournal:
+    """Append-only persistence for a Context plus engine counters.
+
+    Usage::
+
+        journal = ContextJournal(project_dir / "session.journal")
+        loaded = journal.load(system_prompt)      # None if no journal yet
+        ...
+        journal.save(context, state={"cost_tracker": {...}})
+        journal.close()
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        fsync_interval: float = 1.0,
+        compact_min_bytes: int = 4 * 1024 * 1024,
+        lazy_threshold: int = LAZY_BODY_THRESHOLD,
+    ):
+        self.path = Path(path)
+        self.fsync_interval = fsync_interval
+        self.compact_min_bytes = compact_min_bytes
+        self.lazy_threshold = lazy_threshold
+
+        self._fh: Any = None
+        self._size = self.path.stat().st_size if self.path.exists() else 0
+        self._base_size = 0
+        self._last_fsync = 0.0
+        self._next_seq = 0
+        # Journaled messages keyed by seq; id(msg) -> seq for the same objects.
+        # Holding the objects keeps ids stable until the next compaction.
+        self._by_seq: dict[int, Message] = {}
+        self._seq_of: dict[int, int] = {}
+        self._rec_bytes: dict[int, int] = {}
+        # What the journal currently says the context looks like.
+        self._live: list[Message] = []
+        self._stack: list[_Snapshot] = []
+        self._branches: dict[str, _Snapshot] = {}
+        self._state: dict[str, Any] = {}
+
+    # ── Loading ───────────────────────────────────────────────
+
+    def load(self, system_prompt: str = "") -> tuple[Context, dict[str, Any]] | None:
+        """Replay the journal. Returns (context, engine_state) or None if absent."""
+        if not self.path.exists():
+            return None
+
+        path_str = str(self.path)
+        live: list[int] = []
+        tokens = 0
+        cacheable = 0
+        stack: list[dict[str, Any]] = []
+        branches: dict[str, dict[str, Any]] = {}
+        state: dict[str, Any] = {}
+        good_end = 0
+
+        with open(self.path, "rb") as f:
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break  # EOF or torn final write
+                if line.startswith(_BODY_PREFIX):
+                    # Body records are only parsed when paged in.
+                    good_end = f.tell()
+                    continue
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                kind = rec.get("t")
+                if kind == "msg":
+                    seq = rec["seq"]
+                    if "body" in rec:
+                        msg: Message = _PagedMessage((path_str, rec["body"]), **rec["m"])
+                    else:
+                        msg = Message(**rec["m"])
+                    self._by_seq[seq] = msg
+                    self._seq_of[id(msg)] = seq
+                    self._rec_bytes[seq] = f.tell() - offset
+                    self._next_seq = max(self._next_seq, seq + 1)
+                elif kind == "body":
+                    pass
+                elif kind == "extend":
+                    live.extend(_from_ranges(rec["seqs"]))
+                    tokens, cacheable = rec["tokens"], rec["cacheable"]
+                elif kind == "layout":
+                    live = _from_ranges(rec["seqs"])
+                    tokens, cacheable = rec["tokens"], rec["cacheable"]
+                elif kind == "push":
+                    stack.append(rec["snap"])
+                elif kind == "stack":
+                    stack = list(rec["snaps"])
+                elif kind == "branch":
+                    branches[rec["name"]] = rec["snap"]
+                elif kind == "unbranch":
+                    branches.pop(rec["name"], None)
+                elif kind == "state":
+                    state = rec["data"]
+                good_end = f.tell()
+
+        # Drop any torn tail so the next append starts on a record boundary.
+        if good_end < self.path.stat().st_size:
+            with open(self.path, "r+b") as f:
+                f.truncate(good_end)
+
+        ctx = Context(system_prompt=system_prompt)
+        ctx.messages = [self._by_seq[s] for s in live]
+        ctx._token_estimate = tokens
+        ctx._cacheable_count = cacheable
+        ctx._snapshots = [self._decode_snapshot(s) for s in stack]
+        ctx._branches = {name: self._decode_snapshot(s) for name, s in branches.items()}
+
+        self._live = list(ctx.messages)
+        self._stack = list(ctx._snapshots)
+        self._branches = dict(ctx._branches)
+        self._state = state
+        self._size = self._base_size = good_end
+        return ctx, state
+
+    # ── Saving ────────────────────────────────────────────────
+
+    def save(
+        self,
+        context: Context,
+        state: dict[str, Any] | None = None,
+        *,
+        durable: bool = False,
+    ) -> int:
+        """Append everything that changed since the last save.
+
+        Returns the number of bytes written.  fsync is batched to at most
+        once per ``fsync_interval`` unless ``durable`` is set.
+        """
+        out: list[bytes] = []
+
+        # Live message list: fast path is a pure append.
+        msgs = context.messages
+        n = len(self._live)
+        is_extension = len(msgs) >= n and all(
+            msgs[i] is self._live[i] for i in range(n)
+        )
+        if is_extension:
+            new = msgs[n:]
+            if new:
+                seqs = [self._journal_message(m, out) for m in new]
+                out.append(_dumps({
+                    "t": "extend",
+                    "seqs": _to_ranges(seqs),
+                    "tokens": context._token_estimate,
+                    "cacheable": context._cacheable_count,
+                }))
+        else:
+            seqs = [self._journal_message(m, out) for m in msgs]
+            out.append(_dumps({
+                "t": "layout",
+                "seqs": _to_ranges(seqs),
+                "tokens": context._token_estimate,
+                "cacheable": context._cacheable_count,
+            }))
+        self._live = list(msgs)
+
+        # Undo stack: pushes are the common case.
+        stack = context._snapshots
+        k = len(self._stack)
+        if len(stack) >= k and all(stack[i] is self._stack[i] for i in range(k)):
+            for snap in stack[k:]:
+                out.append(_dumps({"t": "push", "snap": self._encode_snapshot(snap, out)}))
+        else:
+            snaps = [self._encode_snapshot(s, out) for s in stack]
+            out.append(_dumps({"t": "stack", "snaps": snaps}))
+        self._stack = list(stack)
+
+        # Named branches.
+        for name, snap in context._branches.items():
+            if self._branches.get(name) is not snap:
+                out.append(_dumps({
+                    "t": "branch", "name": name, "snap": self._encode_snapshot(snap, out),
+                }))
+        for name in self._branches.keys() - context._branches.keys():
+            out.append(_dumps({"t": "unbranch", "name": name}))
+        self._branches = dict(context._branches)
+
+        if state is not None and state != self._state:
+            out.append(_dumps({"t": "state", "data": state}))
+            self._state = json.loads(json.dumps(state, default=str))
+
+        written = self._write(out, durable=durable)
+        if self._size >= max(self.compact_min_bytes, 2 * self._base_size):
+            self._maybe_compact(context)
+        return written
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._fh.close()
+            self._fh = None
+
+    def _journal_message(self, msg: Message, out: list[bytes]) -> int:
+        seq = self._seq_of.get(id(msg))
+        if seq is not None and self._by_seq.get(seq) is msg:
+            return seq
+        seq = self._next_seq
+        self._next_seq += 1
+        record: dict[str, Any] = {"t": "msg", "seq": seq}
+        data = msg.to_dict()
+        body = b""
+        if (
+            msg.role == "tool"
+            and isinstance(msg.content, str)
+            and len(msg.content) > self.lazy_threshold
+        ):
+            # Body first, so a torn write never leaves a dangling reference.
+            body = _dumps({"t": "body", "seq": seq, "c": data.pop("content")})
+            record["body"] = self._size + sum(len(b) for b in out)
+            out.append(body)
+        record["m"] = data
+        line = _dumps(record)
+        out.append(line)
+        self._by_seq[seq] = msg
+        self._seq_of[id(msg)] = seq
+        self._rec_bytes[seq] = len(line) + len(body)
+        return seq
+
+    def _encode_snapshot(self, snap: _Snapshot, out: list[bytes]) -> dict[str, Any]:
+        seqs = [self._journal_message(m, out) for m in snap.messages]
+        return {
+            "label": snap.label,
+            "seqs": _to_ranges(seqs),
+            "tokens": snap.token_estimate,
+            "cacheable": snap.cacheable_count,
+        }
+
+    def _decode_snapshot(self, data: dict[str, Any]) -> _Snapshot:
+        return _Snapshot(
+            messages=[self._by_seq[s] for s in _from_ranges(data["seqs"])],
+            token_estimate=data.get("tokens", 0),
+            cacheable_count=data.get("cacheable", 0),
+            label=data.get("label", ""),
+        )
+
+    def _write(self, chunks: list[bytes], *, durable: bool) -> int:
+        if not chunks:
+            return 0
+        if self._fh is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path, "ab")
+            self._size = self._fh.tell()
+        data = b"".join(chunks)
+        self._fh.write(data)
+        self._fh.flush()
+        self._size += len(data)
+        now = time.monotonic()
+        if durable or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._fh.fileno())
+            self._last_fsync = now
+        return len(data)
+
+    # ── Compaction ────────────────────────────────────────────
+
+    def _maybe_compact(self, context: Context) -> None:
+        reachable: set[int] = {self._seq_of[id(m)] for m in context.messages}
+        for snap in [*context._snapshots, *context._branches.values()]:
+            reachable.update(self._seq_of[id(m)] for m in snap.messages)
+        garbage = sum(b for s, b in self._rec_bytes.items() if s not in reachable)
+        if garbage * 2 < self._size:
+            # Mostly live data; wait for the file to double again.
+            self._base_size = self._size
+            return
+        self.compact(context)
+
+    def compact(self, context: Context) -> None:
+        """Rewrite the journal as a fresh base holding only reachable records."""
+        self.close()
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        # Remember which messages were still lazy; rewriting reads their
+        # bodies from the old file before it is replaced.
+        paged = [
+            m for m in self._by_seq.values()
+            if isinstance(m, _PagedMessage) and not m.is_paged_in
+        ]
+
+        self._by_seq.clear()
+        self._seq_of.clear()
+        self._rec_bytes.clear()
+        self._next_seq = 0
+        self._live, self._stack, self._branches = [], [], {}
+        state, self._state = self._state, {}
+        self._size = 0
+
+        out: list[bytes] = []
+        seqs = [self._journal_message(m, out) for m in context.messages]
+        out.append(_dumps({
+            "t": "layout",
+            "seqs": _to_ranges(seqs),
+            "tokens": context._token_estimate,
+            "cacheable": context._cacheable_count,
+        }))
+        snaps = [self._encode_snapshot(s, out) for s in context._snapshots]
+        out.append(_dumps({"t": "stack", "snaps": snaps}))
+        for name, snap in context._branches.items():
+            out.append(_dumps({
+                "t": "branch", "name": name, "snap": self._encode_snapshot(snap, out),
+            }))
+        if state:
+            out.append(_dumps({"t": "state", "data": state}))
+
+        data = b"".join(out)
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+        # Re-point still-lazy messages at their new body offsets.
+        offsets = _body_offsets(self.path)
+        path_str = str(self.path)
+        for m in paged:
+            seq = self._seq_of.get(id(m))
+            if seq in offsets:
+                m._source = (path_str, offsets[seq])
+                m._value = None
+                m._loaded = False
+        self._live = list(context.messages)
+        self._stack = list(context._snapshots)
+        self._branches = dict(context._branches)
+        self._state = state
+        self._size = self._base_size = len(data)
+
+
+def _body_offsets(path: Path) -> dict[int, int]:
+    """Map seq -> byte offset of every body record in a journal file."""
+    offsets: dict[int, int] = {}
+    with open(path, "rb") as f:
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            if line.startswith(_BODY_PREFIX):
+                offsets[json.loads(line)["seq"]] = offset
+    return offsets
@@ -75,7 +75,10 @@ class Shell(BaseTool):
         ),
         ToolParam(
             name="task_action",
-            description="Action on background tasks: list, stop, get_output",
+            description=(
+                "Action on background tasks: list, stop, get_output "
+                "(returns only output produced since the last get_output)"
+            ),
             required=False,
         ),
         ToolParam(
@@ -93,6 +96,8 @@ class Shell(BaseTool):
         super().__init__()
         self._workspace = workspace
         self._task_manager: BackgroundTaskManager | None = None
+        # Per-task cursor so get_output returns only new lines
+        self._read_cursors: dict[str, int] = {}
         # Callback invoked before executing a command.
         # Receives the command string. Return False to block execution.
         # In web app: can show a confirmation dialog.
@@ -190,9 +195,16 @@ class Shell(BaseTool):
                 if not task:
                     yield ToolCompleteEvent(output=f"Task {task_id} not found.")
                 else:
-                    yield ToolCompleteEvent(
-                        output=f"Task {task_id} ({task.status.value}):\n{task.get_output_text()}"
-                    )
+                    # Only return output the agent has not seen yet.
+                    chunk = task.read_output(self._read_cursors.get(task_id, 0))
+                    self._read_cursors[task_id] = chunk.cursor
+                    header = f"Task {task_id} ({task.status.value})"
+                    if chunk.dropped:
+                        header += f", {chunk.dropped} earlier lines dropped"
+                    if task.log_path:
+                        header += f", full log: {task.log_path}"
+                    body = "\n".join(chunk.lines) if chunk.lines else "(no new output)"
+                    yield ToolCompleteEvent(output=f"{header}:\n{body}")
 
         else:
             yield ToolCompleteEvent(output=f"Unknown task_action: {action}")
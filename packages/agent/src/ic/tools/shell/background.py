@@ -8,9 +8,11 @@ from __future__ import annotations
 
 import asyncio
 import uuid
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from itertools import islice
 from pathlib import Path
 from typing import Any, Callable
 
@@ -23,6 +25,124 @@ class TaskStatus(Enum):
     FAILED = "failed"
 
 
+@dataclass
+class OutputChunk:
+    """Result of an incremental read from an OutputRingBuffer."""
+    lines: list[str]
+    cursor: int  # pass back as `since` to get only newer lines
+    dropped: int = 0  # lines evicted before they could be read
+
+
+class OutputRingBuffer:
+    """Byte-bounded ring buffer of output lines with O(1) append.
+
+    Every line gets an absolute sequence number, so readers keep a cursor
+    and only receive lines they have not seen, even after older lines have
+    been evicted.  Optionally every line is also spilled to a rotating log
+    file so the full output survives eviction.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024,
+        spill_path: Path | None = None,
+        spill_max_bytes: int = 8 * 1024 * 1024,
+        spill_backups: int = 2,
+    ):
+        self.max_bytes = max_bytes
+        self.spill_path = spill_path
+        self.spill_max_bytes = spill_max_bytes
+        self.spill_backups = spill_backups
+        self._lines: deque[str] = deque()
+        self._bytes = 0
+        self._first_seq = 0
+        self._spill_file: Any = None
+        self._spill_size = 0
+
+    def append(self, line: str):
+        if self.spill_path is not None:
+            self._spill(line)
+        size = len(line.encode("utf-8", errors="replace"))
+        if size > self.max_bytes:
+            # A single giant (minified) line keeps only its tail.
+            line = "...[truncated]" + line[-(self.max_bytes // 4):]
+            size = len(line.encode("utf-8", errors="replace"))
+        self._lines.append(line)
+        self._bytes += size
+        while self._bytes > self.max_bytes and len(self._lines) > 1:
+            old = self._lines.popleft()
+            self._bytes -= len(old.encode("utf-8", errors="replace"))
+            self._first_seq += 1
+
+    def read(self, since: int | None = None) -> OutputChunk:
+        """Lines with sequence number >= since (all retained lines if None)."""
+        end = self._first_seq + len(self._lines)
+        if since is None or since <= self._first_seq:
+            dropped = 0 if since is None else self._first_seq - since
+            return OutputChunk(lines=list(self._lines), cursor=end, dropped=dropped)
+        if since >= end:
+            return OutputChunk(lines=[], cursor=end)
+        return OutputChunk(
+            lines=list(islice(self._lines, since - self._first_seq, None)), cursor=end,
+        )
+
+    def tail(self, n: int) -> list[str]:
+        if n <= 0:
+            return []
+        start = max(0, len(self._lines) - n)
+        return list(islice(self._lines, start, None))
+
+    def text(self) -> str:
+        return "\n".join(self._lines)
+
+    @property
+    def total_lines(self) -> int:
+        """Lines ever appended, including evicted ones."""
+        return self._first_seq + len(self._lines)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def close(self):
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def _spill(self, line: str):
+        data = (line + "\n").encode("utf-8", errors="replace")
+        try:
+            if self._spill_file is None:
+                self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+                self._spill_file = open(self.spill_path, "ab")
+                self._spill_size = self._spill_file.tell()
+            if self._spill_size + len(data) > self.spill_max_bytes and self._spill_size:
+                self._rotate()
+            self._spill_file.write(data)
+            self._spill_file.flush()
+            self._spill_size += len(data)
+        except OSError:
+            # Logging is best-effort; the in-memory buffer still works.
+            self.spill_path = None
+            self.close()
+
+    def _rotate(self):
+        self._spill_file.close()
+        for i in range(self.spill_backups - 1, 0, -1):
+            src = self.spill_path.with_name(f"{self.spill_path.name}.{i}")
+            if src.exists():
+                src.replace(self.spill_path.with_name(f"{self.spill_path.name}.{i + 1}"))
+        if self.spill_backups > 0:
+            self.spill_path.replace(self.spill_path.with_name(f"{self.spill_path.name}.1"))
+        else:
+            self.spill_path.unlink(missing_ok=True)
+        self._spill_file = open(self.spill_path, "ab")
+        self._spill_size = 0
+
+
 @dataclass
 class BackgroundTask:
     """A background shell task."""
@@ -33,27 +153,31 @@ class BackgroundTask:
     pid: int | None = None
     exit_code: int | None = None
     created_at: datetime = field(default_factory=datetime.now)
-    output_buffer: list[str] = field(default_factory=list)
-    max_buffer_lines: int = 1000
+    max_buffer_bytes: int = 256 * 1024
+    log_path: Path | None = None  # spill full output to this rotating file
+    output: OutputRingBuffer = field(init=False)
 
     # Async process reference
     proc: asyncio.subprocess.Process | None = None
 
+    def __post_init__(self):
+        self.output = OutputRingBuffer(self.max_buffer_bytes, spill_path=self.log_path)
+
     def add_output(self, line: str):
-        """Add output line to buffer (with truncation)."""
-        self.output_buffer.append(line)
-        if len(self.output_buffer) > self.max_buffer_lines:
-            self.output_buffer = self.output_buffer[-self.max_buffer_lines:]
+        """Add output line to the ring buffer (O(1), byte-bounded)."""
+        self.output.append(line)
 
     def get_output(self, since: int | None = None) -> list[str]:
-        """Get output lines, optionally after a specific index."""
-        if since is None:
-            return self.output_buffer.copy()
-        return self.output_buffer[since:]
+        """Get output lines, optionally from an absolute line cursor."""
+        return self.output.read(since).lines
+
+    def read_output(self, since: int | None = None) -> OutputChunk:
+        """Incremental read: lines from `since` plus the cursor for the next read."""
+        return self.output.read(since)
 
     def get_output_text(self) -> str:
-        """Get all output as a single string."""
-        return "\n".join(self.output_buffer)
+        """Get all buffered output as a single string."""
+        return self.output.text()
 
 
 class BackgroundTaskManager:
@@ -64,7 +188,9 @@ class BackgroundTaskManager:
     This enables commands like `npm run dev` that produce continuous output.
     """
 
-    def __init__(self):
+    def __init__(self, log_dir: Path | None = None):
+        # When set, each task's full output is also kept in {log_dir}/{id}.log
+        self.log_dir = log_dir
         self._tasks: dict[str, BackgroundTask] = {}
         self._output_tasks: dict[str, asyncio.Task] = {}
         # Lifecycle callbacks (set by orchestrator to emit events)
@@ -84,6 +210,7 @@ class BackgroundTaskManager:
             id=task_id,
             command=command,
             workspace=workspace,
+            log_path=self.log_dir / f"{task_id}.log" if self.log_dir else None,
         )
 
         # Create output reader task
@@ -154,6 +281,7 @@ class BackgroundTaskManager:
                     pass
         finally:
             task.proc = None
+            task.output.close()
 
     def stop(self, task_id: str) -> bool:
         """Stop a running task. Returns True if successful."""
@@ -1,6 +1,7 @@
 """Web tools package."""
 
-from ic.tools.web.search import WebSearch
+from ic.tools.web.cache import CacheStats, HttpCache, get_default_cache
+from ic.tools.web.search import SearchCache, WebSearch
 from ic.tools.web.fetch import WebFetch
 
-__all__ = ["WebSearch", "WebFetch"]
+__all__ = ["WebSearch", "WebFetch", "HttpCache", "CacheStats", "get_default_cache", "SearchCache"]
@@ -0,0 +1,435 @@
+"""Shared HTTP response cache for the web tools.
+
+Every WebFetch instance (main agent and sub-agents alike) goes through one
+process-wide cache and one pooled ``httpx.AsyncClient`` per event loop.
+
+Entries live on disk as three files keyed by ``sha256(url)``:
+
+    <key>.json   metadata (status, validators, freshness, last use)
+    <key>.body   raw response bytes
+    <key>.txt    extracted text, so a hit skips extraction entirely
+
+Freshness follows ``Cache-Control`` (``max-age``, ``no-cache``,
+``no-store``), ``Expires`` and a Last-Modified heuristic, less the
+response's ``Age``.  Stale entries
+with an ``ETag`` or ``Last-Modified`` are revalidated with a conditional
+request; a 304 refreshes the entry without re-downloading or re-extracting.
+Total size on disk is bounded by an LRU over body + text bytes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+DEFAULT_CACHE_DIR = Path.home() / ".ic" / "cache" / "web"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Heuristic freshness for responses with Last-Modified but no explicit
+# lifetime (RFC 9111 §4.2.2), capped at one day.
+_HEURISTIC_FRACTION = 0.1
+_HEURISTIC_MAX_SECONDS = 86400.0
+
+_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+
+@dataclass
+class CacheEntry:
+    """Metadata for one cached URL."""
+
+    url: str
+    status: int
+    stored_at: float
+    fresh_for: float = 0.0
+    etag: str | None = None
+    last_modified: str | None = None
+    must_revalidate: bool = False
+    size: int = 0
+    last_used: float = 0.0
+    # Freshness-relevant response headers, merged with each 304 (RFC 9111 §4.3.4).
+    headers: dict[str, str] = field(default_factory=dict)
+
+    def is_fresh(self, now: float) -> bool:
+        return not self.must_revalidate and now - self.stored_at < self.fresh_for
+
+    @property
+    def has_validators(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+
+@dataclass
+class CacheStats:
+    """Hit-rate counters for the cache."""
+
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.revalidated + self.misses
+        return (self.hits + self.revalidated) / total if total else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "hit_rate": round(self.hit_rate, 3)}
+
+
+@dataclass
+class CachedResponse:
+    """Result of a cached fetch."""
+
+    url: str
+    status: int
+    text: str
+    source: str  # "hit", "revalidated" or "network"
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+def _parse_cache_control(value: str) -> dict[str, str | None]:
+    directives: dict[str, str | None] = {}
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, arg = part.partition("=")
+        directives[name.strip().lower()] = arg.strip().strip('"') or None
+    return directives
+
+
+def _http_date(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+# Headers kept with an entry so a bare 304 can be merged over them.  ``Date``
+# and ``Age`` describe a single response and always come from the latest one.
+_STORED_HEADERS = ("cache-control", "expires", "last-modified", "etag")
+_MERGED_HEADERS = _STORED_HEADERS + ("date", "age")
+
+
+def _current_age(headers: httpx.Headers, now: float) -> float:
+    """Age of the response when received (RFC 9111 §4.2.3, without transit delay)."""
+    try:
+        age_value = max(0.0, float(headers.get("age", "0")))
+    except ValueError:
+        age_value = 0.0
+    date = _http_date(headers.get("date"))
+    apparent_age = max(0.0, now - date) if date is not None else 0.0
+    return max(age_value, apparent_age)
+
+
+def _lifetime(headers: httpx.Headers, cc: dict[str, str | None], now: float) -> float:
+    for directive in ("s-maxage", "max-age"):
+        raw = cc.get(directive)
+        if raw is not None:
+            try:
+                return max(0.0, float(raw))
+            except ValueError:
+                break
+    expires = _http_date(headers.get("expires"))
+    if expires is not None:
+        date = _http_date(headers.get("date")) or now
+        return max(0.0, expires - date)
+    last_modified = _http_date(headers.get("last-modified"))
+    if last_modified is not None:
+        age = max(0.0, now - last_modified)
+        return min(age * _HEURISTIC_FRACTION, _HEURISTIC_MAX_SECONDS)
+    return 0.0
+
+
+def freshness(headers: httpx.Headers, now: float) -> tuple[float, bool, bool]:
+    """Return (fresh_for_seconds, must_revalidate, storable) for a response.
+
+    ``fresh_for`` is the remaining lifetime: the freshness lifetime minus the
+    response's current age (``Age`` / ``Date``).
+    """
+    cc = _parse_cache_control(headers.get("cache-control", ""))
+    if "no-store" in cc:
+        return 0.0, True, False
+    if "no-cache" in cc:
+        return 0.0, True, True
+    remaining = _lifetime(headers, cc, now) - _current_age(headers, now)
+    return max(0.0, remaining), False, True
+
+
+def merge_headers(stored: dict[str, str], fresh: httpx.Headers) -> httpx.Headers:
+    """Update stored headers with those of a 304 (RFC 9111 §4.3.4)."""
+    merged = dict(stored)
+    for name in _MERGED_HEADERS:
+        if name in fresh:
+            merged[name] = fresh[name]
+    return httpx.Headers(merged)
+
+
+def _stored_headers(headers: httpx.Headers) -> dict[str, str]:
+    return {name: headers[name] for name in _STORED_HEADERS if name in headers}
+
+
+def _atomic_write(path: Path, data: bytes) -> Path:
+    """Write ``data`` next to ``path``; returns the temp file to ``os.replace`` later."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    with os.fdopen(fd, "wb") as handle:
+        handle.write(data)
+    return Path(tmp)
+
+
+class HttpCache:
+    """Disk-backed, size-bounded LRU cache of fetched pages."""
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._index: OrderedDict[str, CacheEntry] | None = None
+        self._total = 0
+
+    # ── Index ─────────────────────────────────────────────────
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str) -> tuple[Path, Path, Path]:
+        base = self.cache_dir / key
+        return base.with_suffix(".json"), base.with_suffix(".body"), base.with_suffix(".txt")
+
+    def _ensure_index(self) -> OrderedDict[str, CacheEntry]:
+        if self._index is not None:
+            return self._index
+        entries: list[tuple[str, CacheEntry]] = []
+        if self.cache_dir.exists():
+            for meta_path in self.cache_dir.glob("*.json"):
+                try:
+                    entry = CacheEntry(**json.loads(meta_path.read_text()))
+                except (OSError, ValueError, TypeError):
+                    continue
+                entries.append((meta_path.stem, entry))
+        entries.sort(key=lambda kv: kv[1].last_used)
+        self._index = OrderedDict(entries)
+        self._total = sum(e.size for e in self._index.values())
+        return self._index
+
+    def get(self, url: str) -> CacheEntry | None:
+        with self._lock:
+            index = self._ensure_index()
+            entry = index.get(self.key_for(url))
+            if entry is not None:
+                index.move_to_end(self.key_for(url))
+            return entry
+
+    def read_text(self, url: str) -> str | None:
+        _, _, text_path = self._paths(self.key_for(url))
+        try:
+            return text_path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def read_body(self, url: str) -> bytes | None:
+        _, body_path, _ = self._paths(self.key_for(url))
+        try:
+            return body_path.read_bytes()
+        except OSError:
+            return None
+
+    # ── Mutation ──────────────────────────────────────────────
+
+    def store(self, entry: CacheEntry, body: bytes, text: str) -> None:
+        """Write an entry (blocking; call via ``asyncio.to_thread`` from async code).
+
+        Payloads go to temp files first; the renames and the index update
+        happen in one critical section so eviction never sees a half-written
+        entry or deletes the files of one being stored.
+        """
+        key = self.key_for(entry.url)
+        paths = self._paths(key)
+        encoded = text.encode("utf-8")
+        entry.size = len(body) + len(encoded)
+        entry.last_used = time.time()
+        if entry.size > self.max_bytes:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        payloads = (json.dumps(asdict(entry)).encode(), body, encoded)
+        temps = [_atomic_write(path, data) for path, data in zip(paths, payloads)]
+        with self._lock:
+            # Body and text first, metadata last: a visible .json always has its payload.
+            for tmp, path in zip(temps[1:] + temps[:1], paths[1:] + paths[:1]):
+                os.replace(tmp, path)
+            index = self._ensure_index()
+            old = index.pop(key, None)
+            if old is not None:
+                self._total -= old.size
+            index[key] = entry
+            self._total += entry.size
+            self.stats.stores += 1
+            self._evict_locked()
+
+    def touch(self, entry: CacheEntry) -> None:
+        """Persist refreshed metadata after a hit or a 304 (blocking)."""
+        entry.last_used = time.time()
+        meta_path, _, _ = self._paths(self.key_for(entry.url))
+        try:
+            tmp = _atomic_write(meta_path, json.dumps(asdict(entry)).encode())
+            with self._lock:
+                if self._index is not None and self.key_for(entry.url) not in self._index:
+                    tmp.unlink(missing_ok=True)  # evicted meanwhile; don't resurrect it
+                    return
+                os.replace(tmp, meta_path)
+        except OSError:
+            pass
+
+    def _evict_locked(self) -> None:
+        assert self._index is not None
+        while self._total > self.max_bytes and self._index:
+            key, entry = self._index.popitem(last=False)
+            self._total -= entry.size
+            self.stats.evictions += 1
+            for path in self._paths(key):
+                path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            index = self._ensure_index()
+            for key in list(index):
+                for path in self._paths(key):
+                    path.unlink(missing_ok=True)
+            index.clear()
+            self._total = 0
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            self._ensure_index()
+            return self._total
+
+    # ── Fetching ──────────────────────────────────────────────
+
+    async def fetch(
+        self,
+        url: str,
+        extract: Any,
+        *,
+        client: httpx.AsyncClient | None = None,
+        timeout: float = 30.0,
+    ) -> CachedResponse:
+        """GET ``url`` through the cache; ``extract(html) -> str`` runs on misses only.
+
+        Raises ``httpx.HTTPStatusError`` for non-2xx responses, like
+        ``raise_for_status``.
+        """
+        client = client or get_client()
+        now = time.time()
+        entry = await asyncio.to_thread(self.get, url)
+        cached_text = await asyncio.to_thread(self.read_text, url) if entry is not None else None
+        if entry is not None and cached_text is None:
+            entry = None  # metadata without payload; refetch
+
+        if entry is not None and entry.is_fresh(now):
+            self.stats.hits += 1
+            await asyncio.to_thread(self.touch, entry)
+            return CachedResponse(url=url, status=entry.status, text=cached_text, source="hit")
+
+        headers = {"User-Agent": _USER_AGENT}
+        if entry is not None and entry.has_validators:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        response = await client.get(url, headers=headers, timeout=timeout)
+
+        if response.status_code == 304 and entry is not None:
+            merged = merge_headers(entry.headers, response.headers)
+            fresh_for, must_revalidate, _ = freshness(merged, now)
+            entry.stored_at = now
+            entry.fresh_for = fresh_for
+            entry.must_revalidate = must_revalidate
+            entry.etag = merged.get("etag", entry.etag)
+            entry.last_modified = merged.get("last-modified", entry.last_modified)
+            entry.headers = _stored_headers(merged)
+            self.stats.revalidated += 1
+            await asyncio.to_thread(self.touch, entry)
+            return CachedResponse(
+                url=url, status=entry.status, text=cached_text, source="revalidated",
+            )
+
+        response.raise_for_status()
+        self.stats.misses += 1
+        text = await asyncio.to_thread(extract, response.text)
+
+        fresh_for, must_revalidate, storable = freshness(response.headers, now)
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if storable and (fresh_for > 0 or etag or last_modified):
+            await asyncio.to_thread(
+                self.store,
+                CacheEntry(
+                    url=url,
+                    status=response.status_code,
+                    stored_at=now,
+                    fresh_for=fresh_for,
+                    etag=etag,
+                    last_modified=last_modified,
+                    must_revalidate=must_revalidate,
+                    headers=_stored_headers(response.headers),
+                ),
+                response.content,
+                text,
+            )
+        return CachedResponse(
+            url=url,
+            status=response.status_code,
+            text=text,
+            source="network",
+            headers=dict(response.headers),
+        )
+
+
+# ── Shared instances ──────────────────────────────────────────
+
+_default_cache: HttpCache | None = None
+_default_cache_lock = threading.Lock()
+_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_default_cache() -> HttpCache:
+    """Process-wide cache shared by every WebFetch instance."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = HttpCache()
+        return _default_cache
+
+
+def get_client() -> httpx.AsyncClient:
+    """Pooled keep-alive client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+        _clients[loop] = client
+    return client
@@ -14,6 +14,7 @@ from ic.tools.base import (
     ToolCompleteEvent,
     ToolProgressEvent,
 )
+from ic.tools.web.cache import HttpCache, get_default_cache
 
 
 class WebFetch(BaseTool):
@@ -40,9 +41,10 @@ class WebFetch(BaseTool):
         ),
     ]
 
-    def __init__(self, timeout: float = 30.0):
+    def __init__(self, timeout: float = 30.0, cache: HttpCache | None = None):
         super().__init__()
         self._timeout = timeout
+        self._cache = cache
 
     async def execute(self, **kwargs: Any) -> ToolResult:
         """Execute (simple interface)."""
@@ -68,24 +70,18 @@ class WebFetch(BaseTool):
         await self._emit_progress(f"Fetching: {url[:60]}...", 20)
 
         try:
-            async with httpx.AsyncClient(timeout=self._timeout, follow_redirects=True) as client:
-                response = await client.get(
-                    url,
-                    headers={
-                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-                    }
-                )
-                response.raise_for_status()
+            cache = self._cache or get_default_cache()
+            response = await cache.fetch(url, self._extract_text, timeout=self._timeout)
 
-                await self._emit_progress("Extracting content...", 60)
+            if response.source != "network":
+                await self._emit_progress(f"Using cached copy ({response.source})", 60)
 
-                # Extract and clean content
-                content = self._extract_main_content(response.text, max_length)
+            content = self._truncate(response.text, max_length)
 
-                await self._emit_progress("Done.", 100)
-                yield ToolCompleteEvent(
-                    output=f"Content from {url}:\n\n{content}"
-                )
+            await self._emit_progress("Done.", 100)
+            yield ToolCompleteEvent(
+                output=f"Content from {url}:\n\n{content}"
+            )
 
         except httpx.HTTPStatusError as e:
             yield ToolCompleteEvent(output=f"HTTP error {e.response.status_code}: {url}")
@@ -95,7 +91,18 @@ class WebFetch(BaseTool):
             yield ToolCompleteEvent(output=f"Error fetching {url}: {e}")
 
     def _extract_main_content(self, html: str, max_length: int) -> str:
-        """Extract readable content from HTML."""
+        """Extract readable content from HTML, truncated to max_length."""
+        return self._truncate(self._extract_text(html), max_length)
+
+    @staticmethod
+    def _truncate(content: str, max_length: int) -> str:
+        if len(content) > max_length:
+            content = content[:max_length] + "...[truncated]"
+        return content
+
+    @staticmethod
+    def _extract_text(html: str) -> str:
+        """Extract readable content from HTML (untruncated, cached per URL)."""
         # Remove script and style elements
         html = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL | re.IGNORECASE)
         html = re.sub(r'<style[^>]*>.*?</style>', '', html, flags=re.DOTALL | re.IGNORECASE)
@@ -144,9 +151,4 @@ class WebFetch(BaseTool):
 
         # Join and truncate
         content = " ".join(extracted_parts)
-        content = re.sub(r'\s+', ' ', content).strip()
-
-        if len(content) > max_length:
-            content = content[:max_length] + "...[truncated]"
-
-        return content
+        return re.sub(r'\s+', ' ', content).strip()
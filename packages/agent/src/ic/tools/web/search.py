@@ -3,9 +3,14 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any
-
-import httpx
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable
 
 from ic.tools.base import (
     BaseTool,
@@ -14,6 +19,167 @@ from ic.tools.base import (
     ToolCompleteEvent,
     ToolProgressEvent,
 )
+from ic.tools.web.cache import DEFAULT_CACHE_DIR, get_client
+
+DUCKDUCKGO_HTML_URL = "https://html.duckduckgo.com/html/"
+
+# Results are fetched (and cached) up to this many; callers slice.
+_FETCH_LIMIT = 30
+
+# Where the default cache persists; WEB_SEARCH_CACHE_PATH overrides, "off" disables.
+DEFAULT_SEARCH_CACHE_PATH = DEFAULT_CACHE_DIR.parent / "search.json"
+
+
+def normalize_query(query: str) -> str:
+    """Cache key for a query: case-folded, whitespace-collapsed."""
+    return " ".join(query.casefold().split())
+
+
+class SearchCache:
+    """TTL cache of search results with single-flight request coalescing.
+
+    Concurrent lookups for the same normalized query share one in-flight
+    request.  Empty result lists are not cached.  With ``persist_path`` set,
+    entries are also written to a JSON file so they survive restarts.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 600.0,
+        max_entries: int = 256,
+        persist_path: Path | None = None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: OrderedDict[str, tuple[float, list[dict]]] = OrderedDict()
+        self._inflight: dict[str, tuple[asyncio.AbstractEventLoop, asyncio.Task]] = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._load()
+
+    def get(self, key: str) -> list[dict] | None:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            stored_at, results = item
+            if time.time() - stored_at >= self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return results
+
+    def put(self, key: str, results: list[dict]) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get_or_fetch(
+        self, key: str, fetch: Callable[[], Awaitable[list[dict]]]
+    ) -> list[dict]:
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight[0] is loop:
+            self.coalesced += 1
+            return await asyncio.shield(inflight[1])
+
+        # The fetch runs as its own task so cancelling whichever caller
+        # started it does not cancel the request the others are waiting on.
+        self.misses += 1
+        task = loop.create_task(self._fetch_and_store(key, fetch))
+        self._inflight[key] = (loop, task)
+        task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    async def _fetch_and_store(
+        self, key: str, fetch: Callable[[], Awaitable[list[dict]]]
+    ) -> list[dict]:
+        results = await fetch()
+        # An empty page usually means throttling; don't pin it for the TTL.
+        if results:
+            self.put(key, results)
+            if self.persist_path:
+                await asyncio.to_thread(self._save)
+        return results
+
+    def _finish(self, key: str, task: asyncio.Future) -> None:
+        if self._inflight.get(key, (None, None))[1] is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark it retrieved when nobody waits
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "entries": len(self._entries),
+            "hit_rate": round((self.hits + self.coalesced) / total, 3) if total else 0.0,
+        }
+
+    def _load(self) -> None:
+        if not self.persist_path or not self.persist_path.exists():
+            return
+        try:
+            data = json.loads(self.persist_path.read_text())
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, (stored_at, results) in sorted(data.items(), key=lambda kv: kv[1][0]):
+            if now - stored_at < self.ttl:
+                self._entries[key] = (stored_at, results)
+
+    def _save(self) -> None:
+        # Runs in a worker thread; _save_lock keeps snapshots landing in order.
+        with self._save_lock:
+            with self._lock:
+                data = {k: [t, r] for k, (t, r) in self._entries.items()}
+            try:
+                self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(
+                    dir=self.persist_path.parent,
+                    prefix=f".{self.persist_path.name}.",
+                    suffix=".tmp",
+                )
+            except OSError:
+                return  # persistence is best-effort; the in-memory cache still works
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                    json.dump(data, handle, ensure_ascii=False)
+                os.replace(tmp, self.persist_path)
+            except OSError:
+                Path(tmp).unlink(missing_ok=True)
+
+
+_default_search_cache: SearchCache | None = None
+
+
+def get_default_search_cache() -> SearchCache:
+    """Process-wide search cache shared by every WebSearch instance."""
+    global _default_search_cache
+    if _default_search_cache is None:
+        _default_search_cache = SearchCache(persist_path=_default_persist_path())
+    return _default_search_cache
+
+
+def _default_persist_path() -> Path | None:
+    raw = os.environ.get("WEB_SEARCH_CACHE_PATH", "").strip()
+    if raw.lower() in {"off", "none", "0", "false"}:
+        return None
+    return Path(raw).expanduser() if raw else DEFAULT_SEARCH_CACHE_PATH
 
 
 class WebSearch(BaseTool):
@@ -40,9 +206,16 @@ class WebSearch(BaseTool):
         ),
     ]
 
-    def __init__(self, timeout: float = 15.0):
+    def __init__(
+        self,
+        timeout: float = 15.0,
+        cache: SearchCache | None = None,
+        endpoint: str = DUCKDUCKGO_HTML_URL,
+    ):
         super().__init__()
         self._timeout = timeout
+        self._cache = cache
+        self._endpoint = endpoint
 
     async def execute(self, **kwargs: Any) -> ToolResult:
         """Execute (simple interface)."""
@@ -63,7 +236,12 @@ class WebSearch(BaseTool):
         await self._emit_progress(f"Searching: {query[:50]}...", 20)
 
         try:
-            results = await self._duckduckgo_search(query, max_results)
+            cache = self._cache or get_default_search_cache()
+            results = await cache.get_or_fetch(
+                normalize_query(query),
+                lambda: self._duckduckgo_search(query, _FETCH_LIMIT),
+            )
+            results = results[:max_results]
 
             await self._emit_progress(f"Found {len(results)} results", 80)
 
@@ -92,7 +270,7 @@ class WebSearch(BaseTool):
         self, query: str, max_results: int = 10
     ) -> list[dict]:
         """Search using DuckDuckGo HTML version (no API key needed)."""
-        url = "https://html.duckduckgo.com/html/"
+        url = self._endpoint
         params = {
             "q": query,
             "kl": "wt-wt",  # No location filter
@@ -102,55 +280,55 @@ class WebSearch(BaseTool):
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         }
 
-        async with httpx.AsyncClient(timeout=self._timeout) as client:
-            response = await client.get(url, params=params, headers=headers, follow_redirects=True)
-            response.raise_for_status()
+        client = get_client()
+        response = await client.get(url, params=params, headers=headers, timeout=self._timeout)
+        response.raise_for_status()
 
-            # Parse HTML results
-            from html.parser import HTMLParser
+        # Parse HTML results
+        from html.parser import HTMLParser
 
-            class DuckDuckGoParser(HTMLParser):
-                def __init__(self):
-                    super().__init__()
-                    self.results = []
+        class DuckDuckGoParser(HTMLParser):
+            def __init__(self):
+                super().__init__()
+                self.results = []
+                self.in_result = False
+                self.in_title = False
+                self.in_snippet = False
+                self.current = {}
+
+            def handle_starttag(self, tag, attrs):
+                attrs_dict = dict(attrs)
+                class_name = attrs_dict.get("class", "")
+
+                if tag == "div" and "result" in class_name:
+                    self.in_result = True
+                    self.current = {}
+
+                elif self.in_result:
+                    if tag == "a" and "result__a" in class_name:
+                        self.current["url"] = attrs_dict.get("href", "")
+                        self.in_title = True
+
+                    elif tag == "a" and class_name == "result__a":
+                        self.in_snippet = True
+
+            def handle_endtag(self, tag):
+                if tag == "div" and self.in_result:
+                    if self.current.get("url"):
+                        self.results.append(self.current)
                     self.in_result = False
+                    self.current = {}
+                elif tag == "a":
                     self.in_title = False
                     self.in_snippet = False
-                    self.current = {}
 
-                def handle_starttag(self, tag, attrs):
-                    attrs_dict = dict(attrs)
-                    class_name = attrs_dict.get("class", "")
-
-                    if tag == "div" and "result" in class_name:
-                        self.in_result = True
-                        self.current = {}
-
-                    elif self.in_result:
-                        if tag == "a" and "result__a" in class_name:
-                            self.current["url"] = attrs_dict.get("href", "")
-                            self.in_title = True
-
-                        elif tag == "a" and class_name == "result__a":
-                            self.in_snippet = True
-
-                def handle_endtag(self, tag):
-                    if tag == "div" and self.in_result:
-                        if self.current.get("url"):
-                            self.results.append(self.current)
-                        self.in_result = False
-                        self.current = {}
-                    elif tag == "a":
-                        self.in_title = False
-                        self.in_snippet = False
-
-                def handle_data(self, data):
-                    if self.in_title:
-                        self.current["title"] = self.current.get("title", "") + data
-                    elif self.in_snippet:
-                        self.current["snippet"] = self.current.get("snippet", "") + data
-
-            parser = DuckDuckGoParser()
-            parser.feed(response.text)
-
-            return parser.results[:max_results]
+            def handle_data(self, data):
+                if self.in_title:
+                    self.current["title"] = self.current.get("title", "") + data
+                elif self.in_snippet:
+                    self.current["snippet"] = self.current.get("snippet", "") + data
+
+        parser = DuckDuckGoParser()
+        parser.feed(response.text)
+
+        return parser.results[:max_results]
@@ -0,0 +1,84 @@
+"""Tests for the byte-bounded background task output buffer."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+
+from ic.tools.shell import Shell
+from ic.tools.shell.background import BackgroundTask, BackgroundTaskManager, OutputRingBuffer
+
+
+class TestOutputRingBuffer:
+    def test_bounded_by_bytes(self):
+        buf = OutputRingBuffer(max_bytes=100)
+        for i in range(50):
+            buf.append(f"line-{i:03d}")  # 8 bytes each
+        assert buf.nbytes <= 100
+        assert buf.total_lines == 50
+        assert buf.tail(1) == ["line-049"]
+
+    def test_giant_line_is_clipped(self):
+        buf = OutputRingBuffer(max_bytes=1000)
+        buf.append("x" * 100_000)
+        assert buf.nbytes <= 1000
+        assert buf.tail(1)[0].startswith("...[truncated]")
+
+    def test_cursor_reads_only_new_lines(self):
+        buf = OutputRingBuffer()
+        buf.append("a")
+        buf.append("b")
+        first = buf.read(0)
+        assert first.lines == ["a", "b"]
+        buf.append("c")
+        second = buf.read(first.cursor)
+        assert second.lines == ["c"]
+        assert buf.read(second.cursor).lines == []
+
+    def test_cursor_reports_dropped_lines(self):
+        buf = OutputRingBuffer(max_bytes=10)
+        for i in range(10):
+            buf.append(f"{i:04d}")
+        chunk = buf.read(0)
+        assert chunk.dropped == 8
+        assert chunk.lines == ["0008", "0009"]
+        assert chunk.cursor == 10
+
+    def test_spill_rotates(self, tmp_path):
+        log = tmp_path / "task.log"
+        buf = OutputRingBuffer(max_bytes=50, spill_path=log, spill_max_bytes=200, spill_backups=1)
+        for i in range(100):
+            buf.append(f"line {i:03d}")
+        buf.close()
+        assert log.exists()
+        assert (tmp_path / "task.log.1").exists()
+        assert log.stat().st_size <= 200
+        assert log.read_text().splitlines()[-1] == "line 099"
+
+
+class TestBackgroundTaskOutput:
+    def test_task_keeps_list_api(self):
+        task = BackgroundTask(id="t1", command="echo", workspace=None)
+        task.add_output("hello")
+        task.add_output("world")
+        assert task.get_output() == ["hello", "world"]
+        assert task.get_output(1) == ["world"]
+        assert task.get_output_text() == "hello\nworld"
+
+    def test_shell_get_output_is_incremental(self, tmp_path):
+        async def _run():
+            manager = BackgroundTaskManager(log_dir=tmp_path)
+            shell = Shell(workspace=tmp_path)
+            shell._task_manager = manager
+            cmd = f'{sys.executable} -c "print(1); print(2)"'
+            task = await manager.start(cmd, tmp_path)
+            await manager._output_tasks[task.id]
+
+            first = await shell.execute(task_action="get_output", task_id=task.id)
+            second = await shell.execute(task_action="get_output", task_id=task.id)
+            return task, first.output, second.output
+
+        task, first, second = asyncio.run(_run())
+        assert first.rstrip().endswith("1\n2")
+        assert "(no new output)" in second
+        assert (tmp_path / f"{task.id}.log").read_text() == "1\n2\n"
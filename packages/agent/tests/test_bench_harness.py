@@ -0,0 +1,132 @@
+"""Tests for the offline benchmark harness (scripted stub + runner)."""
+
+from __future__ import annotations
+
+from dataclasses import replace
+
+import httpx
+import pytest
+
+from ic.bench import (
+    BenchResult,
+    StubLLMServer,
+    StubScenario,
+    builtin_scenarios,
+    compare_to_baseline,
+    engine_driver,
+    run_bench,
+)
+from ic.bench.runner import percentile
+
+
+@pytest.fixture
+def stub():
+    servers: list[StubLLMServer] = []
+
+    def _start(scenario: StubScenario) -> StubLLMServer:
+        server = StubLLMServer(scenario)
+        server.start()
+        servers.append(server)
+        return server
+
+    yield _start
+    for server in servers:
+        server.stop()
+
+
+async def test_parallel_scenario_drives_sub_agents(stub, tmp_path):
+    server = stub(builtin_scenarios()["parallel"])
+
+    result = await run_bench(
+        engine_driver(server.base_url), scenario="parallel", sessions=2, workdir=tmp_path,
+    )
+
+    # Per session: 2 main steps + 4 sub-agents x 2 steps.
+    assert result.errors == 0
+    assert result.turns == 2
+    assert result.steps == 20
+    assert result.completion_tokens == server.stats["completion_tokens"]
+    assert len(list((tmp_path / "session-0" / "pages").glob("*.html"))) == 4
+    assert result.step_p99_ms >= result.step_p50_ms > 0
+    assert result.peak_rss_mb > 0
+
+
+async def test_tool_script_writes_and_reads(stub, tmp_path):
+    server = stub(builtin_scenarios()["tools"])
+
+    result = await run_bench(
+        engine_driver(server.base_url), scenario="tools", sessions=1, turns=2, workdir=tmp_path,
+    )
+
+    assert result.turns == 2
+    assert result.steps == 6
+    assert (tmp_path / "session-0" / "index.html").read_text().startswith("<!DOCTYPE html>")
+
+
+async def test_error_injection_returns_500(stub):
+    server = stub(replace(builtin_scenarios()["chat"], error_rate=1.0))
+
+    async with httpx.AsyncClient() as client:
+        response = await client.post(
+            f"{server.base_url}/chat/completions",
+            json={"model": "stub", "messages": [{"role": "user", "content": "hi"}]},
+        )
+
+    assert response.status_code == 500
+    assert server.stats["errors"] == 1
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 99) == 0.0
+
+
+def test_baseline_comparison_flags_regressions():
+    baseline = {
+        "chat": BenchResult(
+            scenario="chat", sessions=4, turns_per_sec=10.0, step_p99_ms=100.0,
+        ).to_dict(),
+    }
+    steady = BenchResult(scenario="chat", sessions=4, turns_per_sec=9.0, step_p99_ms=110.0)
+    slower = BenchResult(scenario="chat", sessions=4, turns_per_sec=5.0, step_p99_ms=300.0)
+    other_size = BenchResult(scenario="chat", sessions=8, turns_per_sec=1.0)
+
+    assert compare_to_baseline(steady, baseline) == []
+    regressions = compare_to_baseline(slower, baseline)
+    assert any(r.startswith("turns_per_sec") for r in regressions)
+    assert any(r.startswith("step_p99_ms") for r in regressions)
+    assert compare_to_baseline(other_size, baseline) == []
+
+
+def test_baseline_from_other_host_compares_counts_only():
+    baseline = {
+        "chat": BenchResult(
+            scenario="chat", sessions=4, steps=4, completion_tokens=1000,
+            turns_per_sec=100.0, host="elsewhere",
+        ).to_dict(),
+    }
+    slow_here = BenchResult(
+        scenario="chat", sessions=4, steps=4, completion_tokens=1000, turns_per_sec=1.0,
+    )
+    more_work = BenchResult(scenario="chat", sessions=4, steps=8, completion_tokens=1000)
+
+    assert compare_to_baseline(slow_here, baseline) == []
+    assert compare_to_baseline(slow_here, baseline, timings=True)
+    assert compare_to_baseline(more_work, baseline) == ["steps: 4 -> 8"]
+
+
+async def test_failed_session_keeps_completed_turns(tmp_path):
+    async def flaky(index, workspace, prompts):
+        for turn, _ in enumerate(prompts):
+            if index == 1 and turn == 2:
+                raise ConnectionError("stub went away")
+            yield
+
+    result = await run_bench(flaky, scenario="chat", sessions=2, turns=3, workdir=tmp_path)
+
+    assert result.session_turns == [3, 2]
+    assert result.turns == 5
+    assert result.errors == 1
+    assert result.error_types == {"ConnectionError": 1}
@@ -0,0 +1,165 @@
+"""Tests for the append-only context journal (ic.soul.journal)."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from ic.config import AgentConfig, Config, ModelConfig
+from ic.soul.context import Context
+from ic.soul.engine import Engine
+from ic.soul.journal import ContextJournal, _PagedMessage
+
+
+def _make_engine() -> Engine:
+    cfg = Config()
+    cfg.models = {"test": ModelConfig(name="test", api_key="fake")}
+    cfg.default_model = "test"
+    cfg._auto_select_pointers()
+    agent_cfg = AgentConfig(name="main", system_prompt="sys", model="test", tools=[])
+    engine = Engine(config=cfg, agent_config=agent_cfg)
+    engine.context = Context(system_prompt="sys")
+    return engine
+
+
+def _reload(path: Path) -> Context:
+    loaded = ContextJournal(path).load(system_prompt="sys")
+    assert loaded is not None
+    return loaded[0]
+
+
+def _contents(ctx: Context) -> list:
+    return [m.content for m in ctx.messages]
+
+
+class TestContextJournal:
+    def test_roundtrip(self, tmp_path):
+        path = tmp_path / "session.journal"
+        ctx = Context(system_prompt="sys")
+        ctx.add_user("hello")
+        ctx.add_assistant("hi", tool_calls=[{"id": "c1", "function": {"name": "x"}}])
+        ctx.add_tool_result("c1", "ok")
+        journal = ContextJournal(path)
+        journal.save(ctx)
+        journal.close()
+
+        restored = _reload(path)
+        assert _contents(restored) == ["hello", "hi", "ok"]
+        assert restored.messages[1].tool_calls[0]["id"] == "c1"
+        assert restored.token_estimate == ctx.token_estimate
+
+    def test_save_is_append_only(self, tmp_path):
+        path = tmp_path / "session.journal"
+        ctx = Context()
+        journal = ContextJournal(path)
+        ctx.add_user("x" * 5000)
+        first = journal.save(ctx)
+        ctx.add_assistant("short")
+        second = journal.save(ctx)
+        # Only the new message is written, not the 5 KB one again.
+        assert second < 500 < first
+        assert journal.save(ctx) == 0
+        journal.close()
+        assert path.stat().st_size == first + second
+
+    def test_compaction_and_undo_are_recorded(self, tmp_path):
+        path = tmp_path / "session.journal"
+        ctx = Context()
+        journal = ContextJournal(path)
+        for i in range(8):
+            ctx.checkpoint(f"turn-{i}")
+            ctx.add_user(f"u{i}")
+            ctx.add_assistant(f"a{i}")
+            journal.save(ctx)
+        ctx.compact(keep_recent=4)
+        ctx.fork("after-compact")
+        journal.save(ctx)
+        ctx.undo()
+        journal.save(ctx)
+        journal.close()
+
+        restored = _reload(path)
+        assert _contents(restored) == _contents(ctx)
+        assert len(restored._snapshots) == len(ctx._snapshots)
+        assert restored.switch_branch("after-compact")
+        assert len(restored.messages) == 7
+
+    def test_torn_tail_recovers_last_complete_record(self, tmp_path):
+        path = tmp_path / "session.journal"
+        ctx = Context()
+        journal = ContextJournal(path)
+        ctx.add_user("kept")
+        journal.save(ctx)
+        journal.close()
+        with open(path, "ab") as f:
+            f.write(b'{"t":"msg","seq":1,"m":{"role":"user","con')
+
+        restored = _reload(path)
+        assert _contents(restored) == ["kept"]
+        # The torn tail is gone, so appending continues cleanly.
+        journal = ContextJournal(path)
+        ctx2, _ = journal.load()
+        ctx2.add_user("next")
+        journal.save(ctx2)
+        journal.close()
+        assert _contents(_reload(path)) == ["kept", "next"]
+
+    def test_large_tool_results_are_paged_lazily(self, tmp_path):
+        path = tmp_path / "session.journal"
+        ctx = Context()
+        ctx.add_user("build it")
+        big = "<html>" + "x" * 40_000 + "</html>"
+        ctx.add_tool_result("c1", big)
+        journal = ContextJournal(path)
+        journal.save(ctx)
+        journal.close()
+
+        restored = _reload(path)
+        tool_msg = restored.messages[1]
+        assert isinstance(tool_msg, _PagedMessage)
+        assert not tool_msg.is_paged_in
+        assert tool_msg.tool_call_id == "c1"
+        assert tool_msg.content == big
+        assert tool_msg.is_paged_in
+
+    def test_rewrites_base_when_mostly_garbage(self, tmp_path):
+        path = tmp_path / "session.journal"
+        ctx = Context()
+        journal = ContextJournal(path, compact_min_bytes=20_000)
+        ctx.add_tool_result("keep", "k" * 20_000)
+        journal.save(ctx)
+        written = 0
+        for i in range(30):
+            ctx.add_user("y" * 10_000)
+            written += journal.save(ctx)
+            ctx.rollback(1)
+            written += journal.save(ctx)
+        journal.close()
+
+        # Rolled-back messages were dropped when the base was rewritten.
+        assert path.stat().st_size < written / 2
+        restored = _reload(path)
+        assert len(restored.messages) == 1
+        assert restored.messages[0].content == "k" * 20_000
+
+
+class TestEngineJournal:
+    def test_engine_counters_roundtrip(self, tmp_path):
+        path = tmp_path / "session.journal"
+        engine = _make_engine()
+        engine._cost_tracker.prompt_tokens = 1200
+        engine._total_usage = {"prompt_tokens": 1200, "completion_tokens": 300}
+        engine.context.add_user("hello")
+        journal = ContextJournal(path)
+        engine.save_journal(journal)
+        journal.close()
+
+        engine2 = _make_engine()
+        assert engine2.load_journal(ContextJournal(path)) is True
+        assert engine2._cost_tracker.prompt_tokens == 1200
+        assert engine2._total_usage["completion_tokens"] == 300
+        assert engine2.context.system_prompt == "sys"
+        assert _contents(engine2.context) == ["hello"]
+
+    def test_load_missing_journal(self, tmp_path):
+        engine = _make_engine()
+        assert engine.load_journal(ContextJournal(tmp_path / "none.journal")) is False
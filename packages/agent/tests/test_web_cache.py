@@ -0,0 +1,166 @@
+"""Tests for the shared WebFetch HTTP cache against a local HTTP server."""
+
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from ic.tools.web.cache import HttpCache, freshness
+from ic.tools.web.fetch import WebFetch
+
+PAGE = "<html><body><main><p>Installation guide for the widget library.</p></main></body></html>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):  # noqa: N802
+        server = self.server
+        server.requests.append(dict(self.headers))
+        route = server.routes.get(self.path)
+        if route is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        etag = route.get("etag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            if not route.get("bare_304"):
+                self.send_header("Cache-Control", route.get("cache_control", ""))
+            self.end_headers()
+            return
+        body = route["body"].encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        if route.get("cache_control"):
+            self.send_header("Cache-Control", route["cache_control"])
+        if route.get("age"):
+            self.send_header("Age", route["age"])
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.routes = {}
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class _CountingFetch(WebFetch):
+    extractions = 0
+
+    @staticmethod
+    def _extract_text(html: str) -> str:
+        _CountingFetch.extractions += 1
+        return WebFetch._extract_text(html)
+
+
+async def test_fresh_hit_skips_network_and_extraction(http_server, tmp_path):
+    http_server.routes["/docs"] = {"body": PAGE, "cache_control": "max-age=300"}
+    cache = HttpCache(tmp_path)
+    tool = _CountingFetch(cache=cache)
+    _CountingFetch.extractions = 0
+
+    first = await tool.execute(url=f"{http_server.base_url}/docs")
+    second = await tool.execute(url=f"{http_server.base_url}/docs")
+
+    assert "Installation guide" in first.output
+    assert second.output == first.output
+    assert len(http_server.requests) == 1
+    assert _CountingFetch.extractions == 1
+    assert cache.stats.hits == 1 and cache.stats.misses == 1
+    assert cache.stats.hit_rate == 0.5
+
+
+async def test_stale_entry_revalidates_with_etag(http_server, tmp_path):
+    http_server.routes["/api"] = {"body": PAGE, "etag": '"v1"', "cache_control": "no-cache"}
+    cache = HttpCache(tmp_path)
+    tool = _CountingFetch(cache=cache)
+    _CountingFetch.extractions = 0
+
+    await tool.execute(url=f"{http_server.base_url}/api")
+    result = await tool.execute(url=f"{http_server.base_url}/api")
+
+    assert "Installation guide" in result.output
+    assert http_server.requests[1].get("If-None-Match") == '"v1"'
+    assert cache.stats.revalidated == 1
+    assert _CountingFetch.extractions == 1
+
+
+async def test_bare_304_keeps_stored_freshness(http_server, tmp_path):
+    # Served already 300s old: stale on arrival despite max-age=300.
+    http_server.routes["/old"] = {
+        "body": PAGE, "etag": '"v1"', "cache_control": "max-age=300", "age": "300",
+        "bare_304": True,
+    }
+    cache = HttpCache(tmp_path)
+    tool = WebFetch(cache=cache)
+
+    for _ in range(3):
+        await tool.execute(url=f"{http_server.base_url}/old")
+
+    # miss, then a 304 without Cache-Control that renews max-age=300, then a hit.
+    assert len(http_server.requests) == 2
+    assert cache.stats.revalidated == 1
+    assert cache.stats.hits == 1
+
+
+async def test_cache_persists_across_instances(http_server, tmp_path):
+    http_server.routes["/p"] = {"body": PAGE, "cache_control": "max-age=300"}
+    await WebFetch(cache=HttpCache(tmp_path)).execute(url=f"{http_server.base_url}/p")
+
+    fresh = HttpCache(tmp_path)
+    result = await WebFetch(cache=fresh).execute(url=f"{http_server.base_url}/p")
+
+    assert "Installation guide" in result.output
+    assert len(http_server.requests) == 1
+    assert fresh.stats.hits == 1
+
+
+async def test_lru_evicts_by_size(http_server, tmp_path):
+    for name in ("a", "b", "c"):
+        http_server.routes[f"/{name}"] = {"body": PAGE, "cache_control": "max-age=300"}
+    cache = HttpCache(tmp_path, max_bytes=400)
+    tool = WebFetch(cache=cache)
+
+    for name in ("a", "b", "c"):
+        await tool.execute(url=f"{http_server.base_url}/{name}")
+
+    assert cache.stats.evictions >= 1
+    assert cache.total_bytes <= 400
+    assert cache.get(f"{http_server.base_url}/a") is None
+    assert cache.get(f"{http_server.base_url}/c") is not None
+
+
+async def test_no_store_and_errors_are_not_cached(http_server, tmp_path):
+    http_server.routes["/secret"] = {"body": PAGE, "cache_control": "no-store"}
+    cache = HttpCache(tmp_path)
+    tool = WebFetch(cache=cache)
+
+    await tool.execute(url=f"{http_server.base_url}/secret")
+    missing = await tool.execute(url=f"{http_server.base_url}/missing")
+
+    assert "HTTP error 404" in missing.output
+    assert cache.stats.stores == 0
+
+
+def test_freshness_rules():
+    assert freshness(httpx.Headers({"cache-control": "max-age=60"}), 0)[0] == 60
+    assert freshness(httpx.Headers({"cache-control": "no-store"}), 0)[2] is False
+    assert freshness(httpx.Headers({"cache-control": "no-cache"}), 0)[1] is True
+    assert freshness(httpx.Headers({"cache-control": "max-age=60", "age": "45"}), 0)[0] == 15
@@ -0,0 +1,179 @@
+"""Tests for WebSearch result caching and request coalescing."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from ic.tools.web.search import SearchCache, WebSearch, normalize_query
+
+
+def _results_page(query: str) -> str:
+    items = "".join(
+        f'<div class="result"><a class="result__a" href="https://example.com/{i}">'
+        f"{query} result {i}</a></div>"
+        for i in range(12)
+    )
+    return f"<html><body>{items}</body></html>"
+
+
+class _FakeDuckDuckGo(BaseHTTPRequestHandler):
+    def do_GET(self):  # noqa: N802
+        query = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+        self.server.queries.append(query)
+        time.sleep(self.server.delay)
+        body = _results_page(query).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def search_backend():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeDuckDuckGo)
+    server.queries = []
+    server.delay = 0.0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.endpoint = f"http://127.0.0.1:{server.server_address[1]}/html/"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_normalize_query():
+    assert normalize_query("  React   Hooks ") == normalize_query("react hooks")
+
+
+async def test_repeat_queries_hit_cache(search_backend):
+    cache = SearchCache(ttl=60)
+    tool = WebSearch(cache=cache, endpoint=search_backend.endpoint)
+
+    first = await tool.execute(query="tailwind grid", max_results=3)
+    second = await tool.execute(query="Tailwind  Grid", max_results=5)
+
+    assert "tailwind grid result 0" in first.output
+    assert "5. " in second.output
+    assert len(search_backend.queries) == 1
+    assert cache.stats["hits"] == 1
+
+
+async def test_concurrent_identical_queries_share_one_request(search_backend):
+    search_backend.delay = 0.2
+    cache = SearchCache(ttl=60)
+    tools = [WebSearch(cache=cache, endpoint=search_backend.endpoint) for _ in range(5)]
+
+    outputs = await asyncio.gather(*(t.execute(query="vite ssr") for t in tools))
+
+    assert len(search_backend.queries) == 1
+    assert cache.stats["coalesced"] == 4
+    assert len({o.output for o in outputs}) == 1
+
+
+async def test_expired_entries_refetch(search_backend):
+    cache = SearchCache(ttl=0.05)
+    tool = WebSearch(cache=cache, endpoint=search_backend.endpoint)
+
+    await tool.execute(query="mobile nav")
+    await asyncio.sleep(0.1)
+    await tool.execute(query="mobile nav")
+
+    assert len(search_backend.queries) == 2
+
+
+async def test_persistent_cache_survives_restart(search_backend, tmp_path):
+    path = tmp_path / "search.json"
+    await WebSearch(
+        cache=SearchCache(persist_path=path), endpoint=search_backend.endpoint
+    ).execute(query="pwa manifest")
+
+    restarted = SearchCache(persist_path=path)
+    result = await WebSearch(cache=restarted, endpoint=search_backend.endpoint).execute(
+        query="PWA manifest"
+    )
+
+    assert "pwa manifest result 0" in result.output
+    assert len(search_backend.queries) == 1
+    assert restarted.stats["hits"] == 1
+
+
+async def test_errors_are_not_cached():
+    cache = SearchCache(ttl=60)
+    failing = WebSearch(cache=cache, endpoint="http://127.0.0.1:9/unreachable")
+
+    result = await failing.execute(query="offline")
+
+    assert result.output.startswith("Search error")
+    assert cache.stats["entries"] == 0
+
+
+async def test_cancelling_first_caller_keeps_shared_search_alive(search_backend):
+    search_backend.delay = 0.3
+    cache = SearchCache(ttl=60)
+    leader = asyncio.create_task(
+        WebSearch(cache=cache, endpoint=search_backend.endpoint).execute(query="astro islands")
+    )
+    await asyncio.sleep(0.05)
+    follower = asyncio.create_task(
+        WebSearch(cache=cache, endpoint=search_backend.endpoint).execute(query="astro islands")
+    )
+    await asyncio.sleep(0.05)
+
+    leader.cancel()
+    result = await follower
+
+    assert leader.cancelled()
+    assert "astro islands result 0" in result.output
+    assert len(search_backend.queries) == 1
+    assert cache.get(normalize_query("astro islands")) is not None
+
+
+async def test_empty_results_are_not_cached():
+    cache = SearchCache(ttl=60)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return []
+
+    assert await cache.get_or_fetch("throttled", fetch) == []
+    assert await cache.get_or_fetch("throttled", fetch) == []
+    assert len(calls) == 2
+
+
+async def test_default_cache_persists_to_configured_path(monkeypatch, tmp_path):
+    from ic.tools.web import search
+
+    monkeypatch.setattr(search, "_default_search_cache", None)
+    monkeypatch.setenv("WEB_SEARCH_CACHE_PATH", str(tmp_path / "search.json"))
+    assert search.get_default_search_cache().persist_path == tmp_path / "search.json"
+
+    monkeypatch.setattr(search, "_default_search_cache", None)
+    monkeypatch.setenv("WEB_SEARCH_CACHE_PATH", "off")
+    assert search.get_default_search_cache().persist_path is None
+
+
+async def test_concurrent_saves_use_private_temp_files(tmp_path):
+    path = tmp_path / "search.json"
+    caches = [SearchCache(persist_path=path) for _ in range(4)]
+
+    async def fill(n: int):
+        cache = caches[n]
+        for i in range(5):
+            await cache.get_or_fetch(f"q{n}-{i}", lambda: asyncio.sleep(0, [{"url": "u"}]))
+
+    await asyncio.gather(*(fill(n) for n in range(4)))
+
+    # Each cache rewrote the whole file; whichever landed last is intact.
+    assert SearchCache(persist_path=path).stats["entries"] == 5
+    assert [p.name for p in tmp_path.iterdir()] == ["search.json"]
@@ -3,10 +3,10 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from threading import Event, Lock
+from threading import Event
 from typing import Any, AsyncGenerator, Generator, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
@@ -17,8 +17,11 @@ from ..db.database import get_database
 from ..db.models import Session as SessionModel, SessionEvent
 from ..db.utils import get_db
 from ..events.emitter import EventEmitter
+from ..events.models import build_failed_event, build_queued_event
+from ..renderer.build_scheduler import BuildPriority, get_build_scheduler
 from ..renderer.builder import BuildError, ReactSSGBuilder
 from ..renderer.html_to_react import PageHtml
+from ..renderer.releases import release_store
 from ..schemas.session_metadata import BuildInfo, BuildStatus, SessionMetadata
 from ..config import get_settings
 from ..services.build_payload import generate_node
@@ -32,6 +35,7 @@ router = APIRouter(prefix="/api/sessions", tags=["build"])
 logger = logging.getLogger(__name__)
 
 BUILD_EVENT_TYPES = {
+    "build_queued",
     "build_start",
     "build_progress",
     "build_complete",
@@ -39,39 +43,13 @@ BUILD_EVENT_TYPES = {
 }
 
 
-@dataclass
-class _BuildJob:
-    task: asyncio.Task | None
-    cancel_event: Event
-
-
-_active_builds: dict[str, _BuildJob] = {}
-_active_builds_lock = Lock()
-
-
-def _register_build(session_id: str, job: _BuildJob) -> None:
-    with _active_builds_lock:
-        _active_builds[session_id] = job
-
-
-def _clear_build(session_id: str, task: asyncio.Task | None = None) -> None:
-    with _active_builds_lock:
-        existing = _active_builds.get(session_id)
-        if existing is None:
-            return
-        if task is not None and existing.task is not task:
-            return
-        _active_builds.pop(session_id, None)
-
-
-def _get_build_job(session_id: str) -> _BuildJob | None:
-    with _active_builds_lock:
-        return _active_builds.get(session_id)
+def _session_dir(session_id: str) -> Path:
+    base = Path("~/.instant-coffee/sessions").expanduser()
+    return (base / session_id).resolve()
 
 
 def _build_log_path(session_id: str) -> Path:
-    base = Path("~/.instant-coffee/sessions").expanduser()
-    return (base / session_id / "build.log").resolve()
+    return _session_dir(session_id) / "build.log"
 
 
 def _get_db_session() -> Generator[DbSession, None, None]:
@@ -88,6 +66,7 @@ def _build_info_from_metadata(metadata: SessionMetadata) -> BuildInfo:
         pages=artifacts.get("pages") or [],
         dist_path=artifacts.get("dist_path"),
         error=artifacts.get("error"),
+        queued_at=artifacts.get("queued_at"),
         started_at=artifacts.get("started_at"),
         completed_at=artifacts.get("completed_at"),
     )
@@ -255,16 +234,46 @@ def _serialize_build_event(event: SessionEvent) -> dict[str, Any]:
     }
 
 
+# One worker keeps queue-position events in the order they were reported.
+_build_event_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="build-events")
+
+
+def _record_build_event(session_id: str, event: Any) -> None:
+    database = get_database()
+    with database.session() as db:
+        EventEmitter(session_id=session_id, event_store=EventStoreService(db)).emit(event)
+        db.commit()
+
+
+def _emit_build_event(session_id: str, event: Any) -> Future:
+    """Persist a build event without blocking the event loop."""
+    future = _build_event_writer.submit(_record_build_event, session_id, event)
+    future.add_done_callback(_log_build_event_failure)
+    return future
+
+
+def _log_build_event_failure(future: Future) -> None:
+    exc = future.exception()
+    if exc is not None:
+        logger.error("Failed to record build event", exc_info=exc)
+
+
 async def _run_build_task(
     *,
     session_id: str,
     payload: dict[str, Any],
-    started_at: datetime,
     cancel_event: Event,
 ) -> None:
     database = get_database()
     with database.session() as db:
         store = StateStoreService(db)
+        # Queued builds start later than they were requested.
+        started_at = datetime.now(timezone.utc)
+        store.update_build_info(
+            session_id,
+            BuildInfo(status=BuildStatus.BUILDING, pages=[], started_at=started_at),
+        )
+        db.commit()
         emitter = EventEmitter(session_id=session_id, event_store=EventStoreService(db))
         builder = ReactSSGBuilder(session_id, event_emitter=emitter, cancel_event=cancel_event)
         try:
@@ -338,6 +347,7 @@ async def get_build_logs(
 @router.post("/{session_id}/build", response_model=BuildInfo)
 async def trigger_build(
     session_id: str,
+    priority: BuildPriority = Query(BuildPriority.INTERACTIVE),
     db: DbSession = Depends(_get_db_session),
 ) -> BuildInfo:
     if db.get(SessionModel, session_id) is None:
@@ -348,10 +358,6 @@ async def trigger_build(
     if metadata is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    current_info = _build_info_from_metadata(metadata)
-    if current_info.status == BuildStatus.BUILDING:
-        return current_info
-
     # Check if HTML pages are available (HTML-to-React path)
     has_html_pages = bool(_fetch_pages_html(db, session_id))
 
@@ -379,38 +385,30 @@ async def trigger_build(
             if not has_html_pages:
                 raise HTTPException(status_code=400, detail="No page schemas or HTML pages available for build")
 
-    started_at = datetime.now(timezone.utc)
-    building_info = BuildInfo(status=BuildStatus.BUILDING, pages=[], started_at=started_at)
-    store.update_build_info(session_id, building_info)
-    db.commit()
+    scheduler = get_build_scheduler()
+    # Runs after the current build when one is running; repeated requests coalesce into it.
+    follows_running = scheduler.is_running(session_id)
 
-    try:
-        loop = asyncio.get_running_loop()
-        cancel_event = Event()
-        task = loop.create_task(
-            _run_build_task(
-                session_id=session_id,
-                payload=payload,
-                started_at=started_at,
-                cancel_event=cancel_event,
-            )
-        )
-        _register_build(session_id, _BuildJob(task=task, cancel_event=cancel_event))
-        task.add_done_callback(lambda finished: _clear_build(session_id, finished))
-    except RuntimeError:
-        cancel_event = Event()
-        _register_build(session_id, _BuildJob(task=None, cancel_event=cancel_event))
-        asyncio.run(
-            _run_build_task(
-                session_id=session_id,
-                payload=payload,
-                started_at=started_at,
-                cancel_event=cancel_event,
-            )
+    async def run(cancel_event: Event) -> None:
+        await _run_build_task(session_id=session_id, payload=payload, cancel_event=cancel_event)
+
+    def report_position(position: int) -> None:
+        _emit_build_event(
+            session_id,
+            build_queued_event(position=position, slots=scheduler.slots),
         )
-        _clear_build(session_id)
 
-    return building_info
+    ticket = scheduler.submit(session_id, run, priority=priority, on_position=report_position)
+    now = datetime.now(timezone.utc)
+    if ticket.task is not None:
+        info = BuildInfo(status=BuildStatus.BUILDING, pages=[], started_at=now)
+    else:
+        # Waiting for a slot (or for this session's running build): pending until dispatched.
+        info = BuildInfo(status=BuildStatus.PENDING, pages=[], queued_at=now)
+    if not follows_running:
+        store.update_build_info(session_id, info)
+        db.commit()
+    return info
 
 
 @router.delete("/{session_id}/build", response_model=BuildInfo)
@@ -421,18 +419,17 @@ async def cancel_build(
     if db.get(SessionModel, session_id) is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    job = _get_build_job(session_id)
-    if job is not None:
-        job.cancel_event.set()
-        if job.task is not None and not job.task.done():
-            job.task.cancel()
+    scheduler = get_build_scheduler()
+    was_queued = scheduler.is_queued(session_id) and not scheduler.is_running(session_id)
+    scheduler.cancel(session_id)
 
     store = StateStoreService(db)
     metadata = store.get_metadata(session_id)
     if metadata is None:
         raise HTTPException(status_code=404, detail="Session not found")
     current_info = _build_info_from_metadata(metadata)
-    if current_info.status != BuildStatus.BUILDING:
+    queued = current_info.status == BuildStatus.PENDING and current_info.queued_at is not None
+    if current_info.status != BuildStatus.BUILDING and not queued:
         return current_info
     now = datetime.now(timezone.utc)
     cancelled_info = BuildInfo(
@@ -444,9 +441,56 @@ async def cancel_build(
     )
     store.update_build_info(session_id, cancelled_info)
     db.commit()
+    if was_queued:
+        # Never started, so the builder will not report the failure.
+        await asyncio.wrap_future(
+            _emit_build_event(session_id, build_failed_event(error="Build cancelled"))
+        )
     return cancelled_info
 
 
+@router.get("/{session_id}/build/releases")
+async def list_build_releases(
+    session_id: str,
+    db: DbSession = Depends(_get_db_session),
+) -> dict:
+    if db.get(SessionModel, session_id) is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    store = release_store(_session_dir(session_id))
+    return {"releases": [release.as_dict() for release in reversed(store.releases())]}
+
+
+@router.post("/{session_id}/build/releases/{release_id}/activate", response_model=BuildInfo)
+async def activate_build_release(
+    session_id: str,
+    release_id: str,
+    db: DbSession = Depends(_get_db_session),
+) -> BuildInfo:
+    """Roll the published dist back (or forward) to a stored release."""
+    if db.get(SessionModel, session_id) is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if get_build_scheduler().is_running(session_id):
+        raise HTTPException(status_code=409, detail="A build is running for this session")
+    store = release_store(_session_dir(session_id))
+    try:
+        store.activate(release_id)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Release not found") from exc
+
+    dist_dir = store.dist_link
+    now = datetime.now(timezone.utc)
+    info = BuildInfo(
+        status=BuildStatus.SUCCESS,
+        pages=sorted(str(path.relative_to(dist_dir)) for path in dist_dir.rglob("*.html")),
+        dist_path=str(dist_dir),
+        started_at=now,
+        completed_at=now,
+    )
+    StateStoreService(db).update_build_info(session_id, info)
+    db.commit()
+    return info
+
+
 @router.get("/{session_id}/build/stream")
 async def stream_build_events(
     request: Request,
@@ -483,7 +527,7 @@ async def stream_build_events(
                     if event.type in {"build_complete", "build_failed"}:
                         done = True
             else:
-                if done:
+                if done and get_build_scheduler().position(session_id) is None:
                     break
                 now = asyncio.get_running_loop().time()
                 if now - last_keepalive >= 15:
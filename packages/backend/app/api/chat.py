@@ -16,7 +16,7 @@ from ..engine.orchestrator import EngineOrchestrator
 from ..schemas.orchestrator_response import OrchestratorResponse
 from ..config import get_settings
 from ..db.models import Session as SessionModel
-from ..db.utils import get_db
+from ..db.utils import get_db, run_write
 from ..db.database import get_database
 from ..events.emitter import EventEmitter
 from ..events.models import InterviewAnswerEvent, workflow_event
@@ -118,7 +118,7 @@ async def _run_orchestrator_stream(
                 and final_message.startswith("Engine error:")
             )
             if final_message and not is_engine_error:
-                MessageService(orchestrator.db).add_message(
+                MessageService(orchestrator.db).record_message(
                     orchestrator.session.id, "assistant", final_message,
                     thread_id=thread_id,
                 )
@@ -223,22 +223,25 @@ def _prepare_chat_run_context(
             transition=None,
         )
 
-    run_service = RunService(db)
     if resume_payload:
         resolved_payload = dict(resume_payload)
         requested_run_id = resolved_payload.get("run_id")
-        try:
+
+        def resume(run_db: DbSession):
+            run_service = RunService(run_db)
             run = run_service.resolve_resume_run(
                 session_id=session.id,
                 run_id=str(requested_run_id) if requested_run_id is not None else None,
             )
             resolved_payload["run_id"] = run.id
-            run_service.resume_run(run.id, resolved_payload)
+            return run_service.resume_run(run.id, resolved_payload)
+
+        try:
+            run = run_write(resume, session=db)
         except RunNotFoundError as exc:
             raise HTTPException(status_code=404, detail="Run not found") from exc
         except RunStateConflictError as exc:
             raise HTTPException(status_code=409, detail=str(exc)) from exc
-        db.commit()
         return _ChatRunContext(
             run_id=run.id,
             resume_payload=resolved_payload,
@@ -247,7 +250,8 @@ def _prepare_chat_run_context(
             transition="resumed",
         )
 
-    try:
+    def start(run_db: DbSession):
+        run_service = RunService(run_db)
         run = run_service.create_run(
             session_id=session.id,
             message=message,
@@ -256,14 +260,16 @@ def _prepare_chat_run_context(
             target_pages=target_pages,
             trigger_source="chat",
         )
-        run_service.start_run(run.id)
+        return run_service.start_run(run.id)
+
+    try:
+        run = run_write(start, session=db)
     except ValueError as exc:
         detail = str(exc)
         if detail == "Session not found":
             raise HTTPException(status_code=404, detail=detail) from exc
         raise HTTPException(status_code=422, detail=detail) from exc
 
-    db.commit()
     return _ChatRunContext(
         run_id=run.id,
         resume_payload=resume_payload,
@@ -369,14 +375,16 @@ def _finalize_adapter_run(
     if run_context is None or not run_context.adapter_active or not run_context.run_id:
         return
 
-    run_service = RunService(db)
     status, update_kwargs, event_type, event_payload = _resolve_adapter_run_outcome(
         final_response=final_response,
         error=error,
     )
 
     try:
-        run_service.persist_run_state(run_context.run_id, status, **update_kwargs)
+        run_write(
+            lambda run_db: RunService(run_db).persist_run_state(run_context.run_id, status, **update_kwargs),
+            session=db,
+        )
     except RunNotFoundError:
         logger.warning("Run %s disappeared before finalization", run_context.run_id)
         return
@@ -676,17 +684,16 @@ async def chat(
             style_reference_context["tokens"] = style_reference_tokens
 
     message_service = MessageService(db)
-    history_records = message_service.get_messages(session.id, thread_id=active_thread_id, limit=50)
+    history_records = message_service.recent_messages(session.id, thread_id=active_thread_id)
     history = [{"role": msg.role, "content": msg.content} for msg in history_records]
     if payload.interview is None:
         trigger_interview = len(history_records) == 0
     else:
         trigger_interview = bool(payload.interview)
-    message_service.add_message(
+    message_service.record_message(
         session.id, "user", payload.message, thread_id=active_thread_id,
         metadata={"images": image_refs, "image_intent": resolved_intent} if image_refs else None,
     )
-    db.commit()
 
     # Auto-set thread title from first user message
     thread_service.auto_title_if_empty(active_thread_id, payload.message)
@@ -890,7 +897,7 @@ async def chat(
         and assistant_message.startswith("Engine error:")
     )
     if assistant_message and not is_engine_error:
-        message_service.add_message(session.id, "assistant", assistant_message, thread_id=active_thread_id)
+        message_service.record_message(session.id, "assistant", assistant_message, thread_id=active_thread_id)
 
     _finalize_adapter_run(
         db=db,
@@ -1029,17 +1036,16 @@ async def stream_post(
             style_reference_context["tokens"] = style_reference_tokens
 
     message_service = MessageService(db)
-    history_records = message_service.get_messages(session.id, thread_id=active_thread_id, limit=50)
+    history_records = message_service.recent_messages(session.id, thread_id=active_thread_id)
     history = [{"role": msg.role, "content": msg.content} for msg in history_records]
     if payload.interview is None:
         trigger_interview = len(history_records) == 0
     else:
         trigger_interview = bool(payload.interview)
-    message_service.add_message(
+    message_service.record_message(
         session.id, "user", payload.message, thread_id=active_thread_id,
         metadata={"images": image_refs, "image_intent": resolved_intent} if image_refs else None,
     )
-    db.commit()
 
     # Auto-set thread title from first user message
     thread_service.auto_title_if_empty(active_thread_id, payload.message)
@@ -1200,14 +1206,13 @@ async def stream(
             thread = thread_service.ensure_default_thread(session.id)
         db.commit()
         active_thread_id = thread.id
-        history_records = message_service.get_messages(session.id, thread_id=active_thread_id, limit=50)
+        history_records = message_service.recent_messages(session.id, thread_id=active_thread_id)
         history = [{"role": msg.role, "content": msg.content} for msg in history_records]
         if interview is None:
             trigger_interview = len(history_records) == 0
         else:
             trigger_interview = bool(interview)
-        message_service.add_message(session.id, "user", message, thread_id=active_thread_id)
-        db.commit()
+        message_service.record_message(session.id, "user", message, thread_id=active_thread_id)
 
         run_context = _prepare_chat_run_context(
             db=db,
@@ -1,18 +1,18 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Generator, Optional
+from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy.orm import Session as DbSession
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db.models import (
     Session as SessionModel,
     SessionEvent,
 )
-from ..db.utils import get_db
-from ..services.event_store import EventStoreService
+from ..db.utils import get_async_read_db_session
+from ..services.event_store import AsyncEventStoreService
 
 router = APIRouter(prefix="/api", tags=["events"])
 
@@ -35,11 +35,6 @@ class SessionEventsResponse(BaseModel):
     has_more: bool
 
 
-def _get_db_session() -> Generator[DbSession, None, None]:
-    with get_db() as session:
-        yield session
-
-
 def _format_timestamp(value: Optional[datetime]) -> str:
     if value is None:
         return ""
@@ -66,18 +61,18 @@ def _serialize_event(event: SessionEvent) -> SessionEventResponse:
 
 
 @router.get("/sessions/{session_id}/events", response_model=SessionEventsResponse)
-def get_session_events(
+async def get_session_events(
     session_id: str,
     since_seq: Optional[int] = Query(None, ge=0),
     limit: int = Query(1000, ge=1, le=5000),
-    db: DbSession = Depends(_get_db_session),
+    db: AsyncSession = Depends(get_async_read_db_session),
 ) -> SessionEventsResponse:
-    session = db.get(SessionModel, session_id)
+    session = await db.get(SessionModel, session_id)
     if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    service = EventStoreService(db)
-    events = service.get_events(session_id, since_seq=since_seq, limit=limit + 1)
+    service = AsyncEventStoreService(db)
+    events = await service.get_events(session_id, since_seq=since_seq, limit=limit + 1)
     has_more = len(events) > limit
     if has_more:
         events = events[:limit]
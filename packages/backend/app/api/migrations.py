@@ -4,6 +4,7 @@ from fastapi import APIRouter
 
 from ..db.data_migration_v04 import migrate_existing_sessions
 from ..db.database import get_database
+from ..db.migrations import backfill_v14_token_usage_rollups, recount_v15_session_counters
 
 router = APIRouter(prefix="/api/migrations", tags=["migrations"])
 
@@ -14,4 +15,16 @@ def migrate_v04() -> dict:
     return {"success": True, "result": result}
 
 
+@router.post("/v14/token-usage-rollups")
+def rebuild_token_usage_rollups() -> dict:
+    rollups = backfill_v14_token_usage_rollups(get_database())
+    return {"success": True, "result": {"rollups": rollups}}
+
+
+@router.post("/v15/session-counters")
+def recount_session_counters() -> dict:
+    recount_v15_session_counters(get_database())
+    return {"success": True, "result": {}}
+
+
 __all__ = ["router"]
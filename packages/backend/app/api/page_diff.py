@@ -2,21 +2,16 @@
 
 from __future__ import annotations
 
-from typing import Generator, Optional
+from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session as DbSession
 
 from ..db.models import Page, PageVersion
-from ..db.utils import get_db
+from ..db.utils import get_read_db_session
 from ..services.diff import DiffService
 
 
-def _get_db_session() -> Generator[DbSession, None, None]:
-    with get_db() as session:
-        yield session
-
-
 router = APIRouter(prefix="/api/sessions", tags=["page-diff"])
 
 
@@ -26,7 +21,7 @@ def get_page_diff(
     page_id: str,
     version_a: Optional[int] = Query(None, description="Source version (older)"),
     version_b: Optional[int] = Query(None, description="Target version (newer)"),
-    db: DbSession = Depends(_get_db_session),
+    db: DbSession = Depends(get_read_db_session),
 ):
     """Get diff between two versions of a page."""
     # Verify page belongs to session
@@ -56,7 +51,7 @@ def get_page_diff(
 def list_page_versions(
     session_id: str,
     page_id: str,
-    db: DbSession = Depends(_get_db_session),
+    db: DbSession = Depends(get_read_db_session),
 ):
     """List all versions of a page with metadata for diff selection."""
     page = db.query(Page).filter(
@@ -5,16 +5,17 @@ from typing import Generator
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import HTMLResponse
 from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session as DbSession
 
 from ..db.models import Page as PageModel, Session as SessionModel
-from ..db.utils import get_db
+from ..db.utils import get_async_read_db_session, get_db, get_read_db_session
 from ..schemas.page import (
     PagePreviewResponse,
     PageResponse,
     PageVersionResponse,
 )
-from ..services.page import PageService
+from ..services.page import AsyncPageService, PageService
 from ..services.page_version import (
     PageVersionNotFoundError,
     PageVersionReleasedError,
@@ -87,14 +88,14 @@ def _build_preview_css(product_doc) -> str | None:
 
 
 @router.get("/sessions/{session_id}/pages")
-def list_pages(
+async def list_pages(
     session_id: str,
-    db: DbSession = Depends(_get_db_session),
+    db: AsyncSession = Depends(get_async_read_db_session),
 ) -> dict:
-    if db.get(SessionModel, session_id) is None:
+    if await db.get(SessionModel, session_id) is None:
         raise HTTPException(status_code=404, detail="Session not found")
-    service = PageService(db)
-    pages = service.list_by_session(session_id)
+    service = AsyncPageService(db)
+    pages = await service.list_by_session(session_id)
     return {
         "pages": [_page_payload(record) for record in pages],
         "total": len(pages),
@@ -135,7 +136,7 @@ def get_page_versions(
 def get_page_preview(
     page_id: str,
     request: Request,
-    db: DbSession = Depends(_get_db_session),
+    db: DbSession = Depends(get_read_db_session),
 ) -> Response:
     page_service = PageService(db)
     page = page_service.get_by_id(page_id)
@@ -166,7 +167,7 @@ def get_page_preview(
 def preview_page_version(
     page_id: str,
     version_id: int,
-    db: DbSession = Depends(_get_db_session),
+    db: DbSession = Depends(get_read_db_session),
 ) -> Response:
     page_service = PageService(db)
     page = page_service.get_by_id(page_id)
@@ -1,12 +1,24 @@
 from __future__ import annotations
 
+import mimetypes
+import re
+from functools import lru_cache
 from pathlib import Path
+from typing import Any
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse, RedirectResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, RedirectResponse, Response
+
+from ..renderer.precompress import ENCODINGS, load_manifest, manifest_path
 
 router = APIRouter(tags=["preview"])
 
+# Vite names bundled assets ``assets/<name>-<hash>.<ext>``; their content never
+# changes under the same name.
+_HASHED_ASSET_RE = re.compile(r"(^|/)assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
 
 def _resolve_dist_dir(session_id: str) -> Path:
     base = Path("~/.instant-coffee/sessions").expanduser()
@@ -20,13 +32,62 @@ def _safe_resolve(dist_dir: Path, path: str) -> Path:
     return candidate
 
 
+@lru_cache(maxsize=64)
+def _cached_manifest(dist_dir: Path, mtime_ns: int) -> dict[str, dict[str, Any]]:
+    return load_manifest(dist_dir)
+
+
+def _manifest(dist_dir: Path) -> dict[str, dict[str, Any]]:
+    try:
+        mtime_ns = manifest_path(dist_dir).stat().st_mtime_ns
+    except OSError:
+        return {}
+    return _cached_manifest(dist_dir, mtime_ns)
+
+
+def _accepted_encodings(header: str | None) -> set[str]:
+    """Codings from ``Accept-Encoding`` with a non-zero q-value."""
+    accepted: set[str] = set()
+    for item in (header or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding)
+    if "*" in accepted:
+        accepted.update(ENCODINGS)
+    return accepted
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match.
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in header.split(","))
+
+
+def _cache_control(relative: str) -> str:
+    return IMMUTABLE_CACHE_CONTROL if _HASHED_ASSET_RE.search(relative) else REVALIDATE_CACHE_CONTROL
+
+
 @router.get("/preview/{session_id}")
 async def preview_index(session_id: str):
     return RedirectResponse(f"/preview/{session_id}/index.html")
 
 
 @router.get("/preview/{session_id}/{path:path}")
-async def serve_preview(session_id: str, path: str):
+async def serve_preview(session_id: str, path: str, request: Request):
     dist_dir = _resolve_dist_dir(session_id)
     if not dist_dir.exists():
         raise HTTPException(status_code=404, detail="Build output not found")
@@ -36,10 +97,40 @@ async def serve_preview(session_id: str, path: str):
     if file_path.is_dir() or not file_path.exists():
         file_path = _safe_resolve(file_path, "index.html")
 
-    if file_path.exists() and file_path.is_file():
-        return FileResponse(file_path)
-
-    raise HTTPException(status_code=404, detail="File not found")
+    if not (file_path.exists() and file_path.is_file()):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    relative = file_path.relative_to(dist_dir).as_posix()
+    entry = _manifest(dist_dir).get(relative)
+    headers = {"Cache-Control": _cache_control(relative)}
+    if entry is None:
+        # Built before manifests existed, or written after publish.
+        return FileResponse(file_path, headers=headers)
+
+    encoding = None
+    accepted = _accepted_encodings(request.headers.get("accept-encoding"))
+    for candidate in ENCODINGS:
+        if candidate in entry.get("encodings", {}) and candidate in accepted:
+            encoding = candidate
+            break
+
+    digest = str(entry.get("hash") or "")[:32]
+    etag = f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+    headers["ETag"] = etag
+    if entry.get("encodings"):
+        headers["Vary"] = "Accept-Encoding"
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding is None:
+        return FileResponse(file_path, headers=headers)
+    variant = file_path.with_name(file_path.name + ENCODINGS[encoding])
+    if not variant.is_file():
+        headers["ETag"] = f'"{digest}"'
+        return FileResponse(file_path, headers=headers)
+    headers["Content-Encoding"] = encoding
+    media_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+    return FileResponse(variant, media_type=media_type, headers=headers)
 
 
 @router.get("/share/{session_id}")
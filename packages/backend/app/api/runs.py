@@ -10,15 +10,15 @@ from typing import AsyncGenerator, Generator, Optional
 from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
 from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session as DbSession
 
 from ..config import get_settings
-from ..db.database import get_database
 from ..db.models import SessionEvent, SessionRun
-from ..db.utils import get_db
+from ..db.utils import get_async_read_db, get_async_read_db_session, get_db, is_replica_session, run_write
 from ..schemas.run import RunCreate, RunResponse, RunResumeRequest, RunStatus
-from ..services.event_store import EventStoreService
-from ..services.run import RunNotFoundError, RunService, RunStateConflictError
+from ..services.event_store import AsyncEventStoreService
+from ..services.run import AsyncRunService, RunNotFoundError, RunService, RunStateConflictError
 
 router = APIRouter(prefix="/api/runs", tags=["runs"])
 
@@ -164,18 +164,19 @@ def create_run(
     if cached is not None:
         return cached
 
-    service = RunService(db)
+    style_reference = (
+        payload.style_reference.model_dump(mode="json") if payload.style_reference is not None else None
+    )
     try:
-        run = service.create_run(
-            session_id=payload.session_id,
-            message=payload.message,
-            generate_now=payload.generate_now,
-            style_reference=(
-                payload.style_reference.model_dump(mode="json")
-                if payload.style_reference is not None
-                else None
+        run = run_write(
+            lambda run_db: RunService(run_db).create_run(
+                session_id=payload.session_id,
+                message=payload.message,
+                generate_now=payload.generate_now,
+                style_reference=style_reference,
+                target_pages=payload.target_pages,
             ),
-            target_pages=payload.target_pages,
+            session=db,
         )
     except ValueError as exc:
         detail = str(exc)
@@ -183,7 +184,6 @@ def create_run(
             raise HTTPException(status_code=404, detail=detail) from exc
         raise HTTPException(status_code=422, detail=detail) from exc
 
-    db.commit()
     response = _run_to_response(run)
     body = response.model_dump(mode="json")
     _idempotency_set(scope, key, 201, body)
@@ -215,9 +215,8 @@ def resume_run(
     if cached is not None:
         return cached
 
-    service = RunService(db)
     try:
-        run = service.resume_run(run_id, payload.resume_payload)
+        run = run_write(lambda run_db: RunService(run_db).resume_run(run_id, payload.resume_payload), session=db)
     except RunNotFoundError as exc:
         raise HTTPException(status_code=404, detail="Run not found") from exc
     except RunStateConflictError as exc:
@@ -225,7 +224,6 @@ def resume_run(
     except ValueError as exc:
         raise HTTPException(status_code=422, detail=str(exc)) from exc
 
-    db.commit()
     response = _run_to_response(run)
     body = response.model_dump(mode="json")
     _idempotency_set(scope, key, 200, body)
@@ -239,13 +237,11 @@ def cancel_run(
     db: DbSession = Depends(_get_db_session),
 ):
     _ensure_run_api_enabled()
-    service = RunService(db)
     try:
-        run, accepted = service.cancel_run(run_id)
+        run, accepted = run_write(lambda run_db: RunService(run_db).cancel_run(run_id), session=db)
     except RunNotFoundError as exc:
         raise HTTPException(status_code=404, detail="Run not found") from exc
 
-    db.commit()
     response.status_code = 202 if accepted else 200
     return _run_to_response(run)
 
@@ -256,12 +252,12 @@ async def get_run_events(
     request: Request,
     since_seq: Optional[int] = Query(None, ge=0),
     limit: int = Query(1000, ge=1, le=5000),
-    db: DbSession = Depends(_get_db_session),
+    db: AsyncSession = Depends(get_async_read_db_session),
 ):
     _ensure_run_api_enabled()
-    run_service = RunService(db)
+    run_service = AsyncRunService(db)
     try:
-        run = run_service.get_run(run_id)
+        run = await run_service.get_run(run_id)
     except RunNotFoundError as exc:
         raise HTTPException(status_code=404, detail="Run not found") from exc
 
@@ -279,8 +275,8 @@ async def get_run_events(
             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
         )
 
-    event_store = EventStoreService(db)
-    events = event_store.get_events_by_run(
+    event_store = AsyncEventStoreService(db)
+    events = await event_store.get_events_by_run(
         run.session_id,
         run_id,
         since_seq=since_seq,
@@ -302,7 +298,6 @@ async def _stream_run_events(
     session_id: str,
     since_seq: Optional[int],
 ) -> AsyncGenerator[str, None]:
-    database = get_database()
     last_seq = since_seq
     done = False
     last_keepalive = asyncio.get_running_loop().time()
@@ -311,19 +306,25 @@ async def _stream_run_events(
         if await request.is_disconnected():
             return
 
-        with database.session() as db:
-            run = db.get(SessionRun, run_id)
+        # Awaited reads keep the loop free for the other open streams.  Events
+        # are polled by seq, so a lagging replica only delays them a poll or two.
+        async with get_async_read_db(key=session_id, consistent=False) as db:
+            run = await db.get(SessionRun, run_id)
             if run is None:
-                return
-            event_store = EventStoreService(db)
-            events = event_store.get_events_by_run(
-                session_id,
-                run_id,
-                since_seq=last_seq,
-                limit=200,
-            )
-            if run.status in TERMINAL_RUN_STATES:
-                done = True
+                if not is_replica_session(db):
+                    return
+                # The replica has not replayed the run yet.
+                events = []
+            else:
+                event_store = AsyncEventStoreService(db)
+                events = await event_store.get_events_by_run(
+                    session_id,
+                    run_id,
+                    since_seq=last_seq,
+                    limit=200,
+                )
+                if run.status in TERMINAL_RUN_STATES:
+                    done = True
 
         if events:
             last_seq = events[-1].seq
@@ -7,17 +7,17 @@ from typing import Generator, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse, JSONResponse
 from pydantic import BaseModel
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session as DbSession
 
-from ..db.models import Message, PageVersion, Session as SessionModel, Thread as ThreadModel, Version
-from ..db.utils import get_db
-from ..services.message import MessageService
+from ..db.models import PageVersion, Session as SessionModel, Thread as ThreadModel, Version
+from ..db.utils import get_async_read_db_session, get_db, get_read_db_session
+from ..services.message import AsyncMessageService, MessageService
 from ..services.page import PageService
 from ..services.page_version import PageVersionService
 from ..services.product_doc import ProductDocService
 from ..services.app_data_store import get_app_data_store
-from ..services.session import SessionService
+from ..services.session import AsyncSessionService, InvalidCursor, SessionService
 from ..services.state_store import StateStoreService
 from ..services.thread import ThreadService
 from ..services.token_tracker import TokenTrackerService
@@ -90,27 +90,7 @@ def _get_page_version_by_number(
     )
 
 
-def _session_payload(
-    db: DbSession,
-    record: SessionModel,
-    *,
-    message_count: int | None = None,
-    version_count: int | None = None,
-) -> dict:
-    if message_count is None:
-        message_count = (
-            db.query(func.count(Message.id))
-            .filter(Message.session_id == record.id)
-            .scalar()
-            or 0
-        )
-    if version_count is None:
-        version_count = (
-            db.query(func.count(Version.id))
-            .filter(Version.session_id == record.id)
-            .scalar()
-            or 0
-        )
+def _session_payload(db: DbSession | AsyncSession, record: SessionModel) -> dict:
     return {
         "id": record.id,
         "title": record.title,
@@ -128,74 +108,44 @@ def _session_payload(
         "model_validator": record.model_validator,
         "model_style_refiner": record.model_style_refiner,
         "build_status": record.build_status,
-        "message_count": message_count,
-        "version_count": version_count,
+        "message_count": record.message_count or 0,
+        "version_count": record.version_count or 0,
+        "page_count": record.page_count or 0,
+        "last_activity_at": record.last_activity_at,
     }
 
 
 @router.get("")
-def list_sessions(
+async def list_sessions(
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     search: str = Query(None),
     sort: str = Query("updated_at"),
     order: str = Query("desc"),
-    db: DbSession = Depends(_get_db_session),
+    db: AsyncSession = Depends(get_async_read_db_session),
 ) -> dict:
-    from sqlalchemy import case, literal_column
-    from sqlalchemy.orm import aliased
-
-    # Build base query with subquery counts to avoid N+1
-    msg_count_sq = (
-        db.query(
-            Message.session_id,
-            func.count(Message.id).label("msg_count"),
-        )
-        .group_by(Message.session_id)
-        .subquery()
-    )
-    ver_count_sq = (
-        db.query(
-            Version.session_id,
-            func.count(Version.id).label("ver_count"),
-        )
-        .group_by(Version.session_id)
-        .subquery()
-    )
-
-    query = (
-        db.query(
-            SessionModel,
-            func.coalesce(msg_count_sq.c.msg_count, 0).label("message_count"),
-            func.coalesce(ver_count_sq.c.ver_count, 0).label("version_count"),
+    service = AsyncSessionService(db)
+    try:
+        records, next_cursor = await service.page_sessions(
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            search=search,
+            sort=sort,
+            order=order,
         )
-        .outerjoin(msg_count_sq, SessionModel.id == msg_count_sq.c.session_id)
-        .outerjoin(ver_count_sq, SessionModel.id == ver_count_sq.c.session_id)
-    )
-
-    # Search filter
-    if search:
-        query = query.filter(SessionModel.title.ilike(f"%{search}%"))
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    # Sorting
-    sort_col = getattr(SessionModel, sort, SessionModel.updated_at)
-    query = query.order_by(sort_col.desc() if order == "desc" else sort_col.asc())
-
-    total = query.count()
-    rows = query.offset(offset).limit(limit).all()
-
-    return {
-        "sessions": [
-            _session_payload(
-                db,
-                record,
-                message_count=msg_c,
-                version_count=ver_c,
-            )
-            for record, msg_c, ver_c in rows
-        ],
-        "total": total,
+    payload = {
+        "sessions": [_session_payload(db, record) for record in records],
+        "next_cursor": next_cursor,
     }
+    # The total costs a count over the filter; only the first page reports it.
+    if cursor is None:
+        payload["total"] = await service.count_sessions(search)
+    return payload
 
 
 @router.post("")
@@ -210,6 +160,35 @@ def create_session(
     return _session_payload(db, record)
 
 
+@router.get("/cost")
+def get_all_sessions_cost(
+    db: DbSession = Depends(_get_db_session),
+    limit: int = Query(50, ge=1, le=100),
+    session_ids: Optional[list[str]] = Query(None),
+) -> dict:
+    """Get cost summary for all sessions (or ``session_ids``), sorted by most recent."""
+    query = db.query(SessionModel.id, SessionModel.title, SessionModel.updated_at)
+    if session_ids:
+        query = query.filter(SessionModel.id.in_(session_ids))
+    sessions = query.order_by(SessionModel.updated_at.desc()).limit(limit).all()
+
+    summaries = TokenTrackerService(db).summarize_sessions(session.id for session in sessions)
+    results = []
+    for session in sessions:
+        total = summaries[session.id]
+        results.append({
+            "session_id": session.id,
+            "title": session.title,
+            "updated_at": session.updated_at,
+            "input_tokens": total["input_tokens"],
+            "output_tokens": total["output_tokens"],
+            "total_tokens": total["total_tokens"],
+            "cost_usd": round(total["cost_usd"], 4),
+        })
+
+    return {"sessions": results}
+
+
 @router.get("/{session_id}")
 def get_session(
     session_id: str,
@@ -250,14 +229,18 @@ def get_session_fallbacks(
 
 
 @router.get("/{session_id}/messages")
-def get_messages(
+async def get_messages(
     session_id: str,
     thread_id: Optional[str] = Query(None),
-    db: DbSession = Depends(_get_db_session),
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db_session),
 ) -> dict:
-    service = MessageService(db)
-    messages = service.get_messages(session_id, thread_id=thread_id)
+    service = AsyncMessageService(db)
+    messages = await service.get_messages(session_id, thread_id=thread_id, limit=limit, before=before)
     return {
+        # Pass back as ``before`` for the next older page.
+        "next_before": messages[0].id if len(messages) == limit else None,
         "messages": [
             {
                 "id": message.id,
@@ -352,7 +335,7 @@ def clear_session_metadata(
 def get_versions(
     session_id: str,
     include_preview_html: bool = Query(True),
-    db: DbSession = Depends(_get_db_session),
+    db: DbSession = Depends(get_read_db_session),
 ) -> dict:
     session = db.get(SessionModel, session_id)
     if session is None:
@@ -403,7 +386,7 @@ def get_versions(
 @router.get("/{session_id}/preview", response_class=HTMLResponse)
 def get_preview(
     session_id: str,
-    db: DbSession = Depends(_get_db_session),
+    db: DbSession = Depends(get_read_db_session),
 ) -> HTMLResponse:
     session = db.get(SessionModel, session_id)
     if session is None:
@@ -619,39 +602,6 @@ def get_session_cost(
     }
 
 
-@router.get("/cost")
-def get_all_sessions_cost(
-    db: DbSession = Depends(_get_db_session),
-    limit: int = Query(50, ge=1, le=100),
-) -> dict:
-    """Get cost summary for all sessions, sorted by most recent."""
-    from ..db.models import Session as SessionModel
-
-    sessions = (
-        db.query(SessionModel)
-        .order_by(SessionModel.updated_at.desc())
-        .limit(limit)
-        .all()
-    )
-
-    service = TokenTrackerService(db)
-    results = []
-
-    for session in sessions:
-        summary = service.summarize_session(session.id)
-        results.append({
-            "session_id": session.id,
-            "title": session.title,
-            "updated_at": session.updated_at,
-            "input_tokens": summary["total"]["input_tokens"],
-            "output_tokens": summary["total"]["output_tokens"],
-            "total_tokens": summary["total"]["total_tokens"],
-            "cost_usd": round(summary["total"]["cost_usd"], 4),
-        })
-
-    return {"sessions": results}
-
-
 # ── Undo / Branch endpoints ──────────────────────────────────
 
 class RollbackRequest(BaseModel):
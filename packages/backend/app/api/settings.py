@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Generator
+from typing import Generator, Optional
 
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
@@ -91,6 +91,8 @@ class CleanupRequest(BaseModel):
     max_sessions: int = 500
     max_messages_per_session: int = 1000
     dry_run: bool = True
+    chunk_size: int = 500
+    time_budget_seconds: Optional[float] = None
 
 
 @router.post("/cleanup")
@@ -105,10 +107,12 @@ def run_cleanup(
         max_sessions=payload.max_sessions,
         max_messages_per_session=payload.max_messages_per_session,
         dry_run=payload.dry_run,
+        chunk_size=payload.chunk_size,
+        time_budget_seconds=payload.time_budget_seconds,
     )
     service = CleanupService(db, policy)
     results = service.run_all()
-    return {"dry_run": payload.dry_run, "deleted": results}
+    return {"dry_run": payload.dry_run, "deleted": results, "complete": not service.budget_exhausted}
 
 
 __all__ = ["router"]
@@ -148,6 +148,37 @@ TOOL_POLICY_DEFAULT_ALLOWED_CMD_PREFIXES = [
 @dataclass
 class Settings:
     database_url: str = field(default_factory=_resolve_database_url)
+    # Per-engine pool for DATABASE_URL (the async engine gets its own of the same size).
+    db_pool_size: int = field(default_factory=lambda: _get_int("DB_POOL_SIZE", 5))
+    db_pool_max_overflow: int = field(default_factory=lambda: _get_int("DB_POOL_MAX_OVERFLOW", 10))
+    db_pool_timeout: float = field(default_factory=lambda: _get_float("DB_POOL_TIMEOUT", 30.0))
+    # Connections older than this are replaced on checkout; -1 keeps them forever.
+    db_pool_recycle: int = field(default_factory=lambda: _get_int("DB_POOL_RECYCLE", 1800))
+    # A round-trip per checkout; never applied to SQLite files.
+    db_pool_pre_ping: bool = field(default_factory=lambda: _get_bool("DB_POOL_PRE_PING", True))
+    # Sessions shared by the sub-agents of one chat turn.
+    db_turn_max_sessions: int = field(default_factory=lambda: _get_int("DB_TURN_MAX_SESSIONS", 2))
+    # Streaming replicas of DATABASE_URL for read-only endpoints (JSON list or comma-separated).
+    database_replica_urls: list[str] = field(
+        default_factory=lambda: _get_str_list("DATABASE_REPLICA_URLS", [])
+    )
+    # After a write, reads of that chat session stay on the primary this long
+    # unless a replica has already replayed past the write.
+    db_replica_sticky_seconds: float = field(
+        default_factory=lambda: _get_float("DB_REPLICA_STICKY_SECONDS", 5.0)
+    )
+    db_replica_max_lag_seconds: float = field(
+        default_factory=lambda: _get_float("DB_REPLICA_MAX_LAG_SECONDS", 10.0)
+    )
+    db_replica_check_interval_seconds: float = field(
+        default_factory=lambda: _get_float("DB_REPLICA_CHECK_INTERVAL_SECONDS", 2.0)
+    )
+    # SQLite files only: queue background writes to a single writer thread (app/db/writer.py).
+    sqlite_write_queue: bool = field(default_factory=lambda: _get_bool("SQLITE_WRITE_QUEUE", False))
+    sqlite_write_batch_size: int = field(default_factory=lambda: _get_int("SQLITE_WRITE_BATCH_SIZE", 64))
+    sqlite_write_batch_window_seconds: float = field(
+        default_factory=lambda: _get_float("SQLITE_WRITE_BATCH_WINDOW_SECONDS", 0.002)
+    )
     app_data_pg_pool_min_size: int = field(default_factory=lambda: _get_int("APP_DATA_PG_POOL_MIN_SIZE", 1))
     app_data_pg_pool_max_size: int = field(default_factory=lambda: _get_int("APP_DATA_PG_POOL_MAX_SIZE", 15))
     app_data_pg_pool_command_timeout: float = field(
@@ -226,6 +257,53 @@ class Settings:
     )
 
     migrate_v04_on_startup: bool = field(default_factory=lambda: _get_bool("MIGRATE_V04_ON_STARTUP", False))
+    html_blob_backfill_on_startup: bool = field(
+        default_factory=lambda: _get_bool("HTML_BLOB_BACKFILL_ON_STARTUP", True)
+    )
+    # Background retention cleanup; 0 disables it.
+    cleanup_interval_seconds: float = field(
+        default_factory=lambda: _get_float("CLEANUP_INTERVAL_SECONDS", 0.0)
+    )
+    cleanup_time_budget_seconds: float = field(
+        default_factory=lambda: _get_float("CLEANUP_TIME_BUDGET_SECONDS", 2.0)
+    )
+    cleanup_chunk_size: int = field(default_factory=lambda: _get_int("CLEANUP_CHUNK_SIZE", 500))
+    cleanup_pause_seconds: float = field(default_factory=lambda: _get_float("CLEANUP_PAUSE_SECONDS", 0.05))
+
+    node_modules_cache_enabled: bool = field(default_factory=lambda: _get_bool("NODE_MODULES_CACHE", True))
+    node_modules_cache_dir: str | None = field(default_factory=lambda: _get_env("NODE_MODULES_CACHE_DIR"))
+    node_modules_cache_mode: str = field(
+        default_factory=lambda: _get_env("NODE_MODULES_CACHE_MODE", "symlink") or "symlink"
+    )
+    node_modules_cache_max_entries: int = field(
+        default_factory=lambda: _get_int("NODE_MODULES_CACHE_MAX_ENTRIES", 3)
+    )
+    node_modules_cache_max_age_days: float = field(
+        default_factory=lambda: _get_float("NODE_MODULES_CACHE_MAX_AGE_DAYS", 14.0)
+    )
+    conversion_cache_enabled: bool = field(default_factory=lambda: _get_bool("CONVERSION_CACHE", True))
+    conversion_cache_dir: str | None = field(default_factory=lambda: _get_env("CONVERSION_CACHE_DIR"))
+    conversion_cache_max_entries: int = field(
+        default_factory=lambda: _get_int("CONVERSION_CACHE_MAX_ENTRIES", 2000)
+    )
+    html_to_react_concurrency: int = field(
+        default_factory=lambda: _get_int("HTML_TO_REACT_CONCURRENCY", 4)
+    )
+    build_slots: int = field(default_factory=lambda: _get_int("BUILD_SLOTS", 0))
+    build_slot_memory_mb: int = field(default_factory=lambda: _get_int("BUILD_SLOT_MEMORY_MB", 1536))
+    build_worker_enabled: bool = field(default_factory=lambda: _get_bool("BUILD_WORKER", False))
+    build_worker_max_builds: int = field(default_factory=lambda: _get_int("BUILD_WORKER_MAX_BUILDS", 50))
+    build_worker_max_rss_mb: int = field(
+        default_factory=lambda: _get_int("BUILD_WORKER_MAX_RSS_MB", 1024)
+    )
+    dist_blob_store_dir: str | None = field(default_factory=lambda: _get_env("DIST_BLOB_STORE_DIR"))
+    dist_release_retention: int = field(default_factory=lambda: _get_int("DIST_RELEASE_RETENTION", 5))
+    build_stage_timeouts: dict[str, Any] = field(
+        default_factory=lambda: _get_json(
+            "BUILD_STAGE_TIMEOUTS",
+            {"npm_install": 600, "npm_build": 300, "prerender": 180},
+        )
+    )
 
     task_timeout_seconds: float = field(default_factory=lambda: _get_float("TASK_TIMEOUT_SECONDS", 600.0))
     task_timeout_minutes: int = field(default_factory=lambda: _get_int("TASK_TIMEOUT_MINUTES", 30))
@@ -11,6 +11,7 @@ from .migrations import (
     migrate_v08_run_model,
 )
 from .models import (
+    HtmlBlob,
     Message,
     Page,
     PageVersion,
@@ -25,6 +26,7 @@ from .models import (
     SessionEventSource,
     SessionRun,
     TokenUsage,
+    TokenUsageRollup,
     VersionSource,
     Version,
 )
@@ -46,7 +48,9 @@ __all__ = [
     "Session",
     "Message",
     "Version",
+    "HtmlBlob",
     "TokenUsage",
+    "TokenUsageRollup",
     "ProductDocStatus",
     "VersionSource",
     "SessionEventSource",
@@ -0,0 +1,179 @@
+"""Load test: SSE delivery latency under concurrent reads, sync vs async DB path.
+
+A writer thread appends run events while ``--streams`` pollers follow them
+the way ``/api/runs/{id}/events`` does and ``--readers`` tasks page through
+messages and the session list.  In ``sync`` mode every read blocks the event
+loop; in ``async`` mode reads are awaited on the asyncio engine.  Reported:
+event delivery latency (write -> poller) and event-loop lag.
+
+    python -m app.db.bench --mode both --streams 50 --readers 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from ..config import update_runtime_overrides
+from ..db.database import Database, get_database, reset_database
+from ..db.migrations import init_db
+from ..db.models import Message, Session as SessionModel, SessionEvent, SessionEventSource, SessionRun
+from ..db.utils import get_async_db, get_db, transaction_scope
+from ..services.event_store import AsyncEventStoreService, EventStoreService
+from ..services.message import AsyncMessageService, MessageService
+from ..services.session import AsyncSessionService, SessionService
+
+_POLL_INTERVAL = 0.05
+_TICK = 0.01
+
+
+def _seed(database: Database, sessions: int, messages: int) -> list[tuple[str, str]]:
+    runs = []
+    with transaction_scope(database) as db:
+        for n in range(sessions):
+            session_id = uuid.uuid4().hex
+            run_id = uuid.uuid4().hex
+            db.add(SessionModel(id=session_id, title=f"bench-{n}"))
+            db.add(SessionRun(id=run_id, session_id=session_id, status="running", input_message="bench"))
+            db.add_all(
+                Message(session_id=session_id, role="user", content=f"message {m} " * 20)
+                for m in range(messages)
+            )
+            runs.append((session_id, run_id))
+    return runs
+
+
+def _write_events(
+    database: Database, runs: list[tuple[str, str]], seq: dict[str, int], rate: float, stop: threading.Event
+) -> None:
+    while not stop.wait(1.0 / rate):
+        session_id, run_id = random.choice(runs)
+        seq[session_id] += 1
+        with transaction_scope(database) as db:
+            db.add(
+                SessionEvent(
+                    session_id=session_id,
+                    run_id=run_id,
+                    seq=seq[session_id],
+                    type="bench",
+                    payload={"t": time.monotonic()},
+                    source=SessionEventSource.SESSION,
+                )
+            )
+
+
+async def _stream(
+    mode: str, session_id: str, run_id: str, last_seq: int, stop: asyncio.Event, latencies: list[float]
+) -> None:
+    while not stop.is_set():
+        if mode == "async":
+            async with get_async_db() as db:
+                events = await AsyncEventStoreService(db).get_events_by_run(session_id, run_id, since_seq=last_seq)
+        else:
+            with get_db() as db:
+                events = EventStoreService(db).get_events_by_run(session_id, run_id, since_seq=last_seq)
+        now = time.monotonic()
+        for event in events:
+            latencies.append(now - event.payload["t"])
+        if events:
+            last_seq = events[-1].seq
+        await asyncio.sleep(_POLL_INTERVAL)
+
+
+async def _read(mode: str, runs: list[tuple[str, str]], stop: asyncio.Event, count: list[int]) -> None:
+    while not stop.is_set():
+        session_id, _ = random.choice(runs)
+        if mode == "async":
+            async with get_async_db() as db:
+                await AsyncSessionService(db).page_sessions(limit=50, search="bench")
+                await AsyncMessageService(db).get_messages(session_id, limit=200)
+        else:
+            with get_db() as db:
+                SessionService(db).page_sessions(limit=50, search="bench")
+                MessageService(db).get_messages(session_id, limit=200)
+        count[0] += 1
+        await asyncio.sleep(0)
+
+
+async def _ticker(stop: asyncio.Event, lags: list[float]) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(_TICK)
+        lags.append(loop.time() - started - _TICK)
+
+
+async def _run_mode(mode: str, database: Database, runs, seq: dict[str, int], args) -> dict:
+    stop = asyncio.Event()
+    latencies: list[float] = []
+    lags: list[float] = []
+    reads = [0]
+    tasks = [asyncio.create_task(_ticker(stop, lags))]
+    # Streams start at the current tail, as a client connecting now would.
+    tasks += [
+        asyncio.create_task(_stream(mode, session_id, run_id, seq[session_id], stop, latencies))
+        for session_id, run_id in runs[: args.streams]
+    ]
+    tasks += [asyncio.create_task(_read(mode, runs, stop, reads)) for _ in range(args.readers)]
+    writer_stop = threading.Event()
+    writer = threading.Thread(
+        target=_write_events, args=(database, runs[: args.streams], seq, args.rate, writer_stop), daemon=True
+    )
+    writer.start()
+    await asyncio.sleep(args.duration)
+    stop.set()
+    writer_stop.set()
+    await asyncio.gather(*tasks)
+    writer.join()
+    await database.dispose_async()
+    return {"mode": mode, "latency": latencies, "lag": lags, "reads": reads[0]}
+
+
+def _quantiles(values: list[float]) -> str:
+    if len(values) < 2:
+        return "n/a"
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return f"p50 {cuts[49] * 1000:7.1f}ms  p95 {cuts[94] * 1000:7.1f}ms  max {max(values) * 1000:7.1f}ms"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.db.bench", description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=("sync", "async", "both"), default="both")
+    parser.add_argument("--database-url", help="defaults to a throwaway SQLite file")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=200, help="messages per session")
+    parser.add_argument("--streams", type=int, default=50, help="concurrent SSE pollers")
+    parser.add_argument("--readers", type=int, default=20, help="concurrent list/history readers")
+    parser.add_argument("--rate", type=float, default=100.0, help="events written per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per mode")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url
+    if database_url is None:
+        database_url = f"sqlite:///{Path(tempfile.mkdtemp(prefix='ic-db-bench-')) / 'bench.db'}"
+    update_runtime_overrides({"database_url": database_url})
+    reset_database()
+    database = get_database()
+    init_db(database)
+    runs = _seed(database, args.sessions, args.messages)
+    seq = {session_id: 0 for session_id, _ in runs}
+
+    modes = ("sync", "async") if args.mode == "both" else (args.mode,)
+    for mode in modes:
+        result = asyncio.run(_run_mode(mode, database, runs, seq, args))
+        print(f"{mode:>5}  reads {result['reads']:6d}")
+        print(f"       delivery  {_quantiles(result['latency'])}")
+        print(f"       loop lag  {_quantiles(result['lag'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,61 @@ from __future__ import annotations
 
 from typing import Optional
 
+from threading import Lock
+
 from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 from ..config import get_settings
+from .pool import MeteredAsyncAdaptedQueuePool, MeteredQueuePool, pool_status
+
+# Async drivers used for each sync URL scheme; see Database.async_engine.
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def _set_sqlite_pragmas(dbapi_connection, _connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL;")
+        cursor.execute("PRAGMA synchronous=NORMAL;")
+        cursor.execute("PRAGMA busy_timeout=30000;")
+    finally:
+        cursor.close()
+
+
+def async_url(url: str) -> str:
+    """``url`` with its driver swapped for the asyncio one (aiosqlite/asyncpg)."""
+    scheme, sep, rest = url.partition("://")
+    driver = _ASYNC_DRIVERS.get(scheme)
+    if not sep or driver is None:
+        raise ValueError(f"No async driver for database URL scheme {scheme!r}")
+    return f"{driver}://{rest}"
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    if not url.startswith("sqlite"):
+        return False
+    path = url.partition("://")[2]
+    return path in {"", "/"} or ":memory:" in path or "mode=memory" in path
+
+
+def _pool_options(url: str, settings, poolclass) -> dict:
+    if _is_memory_sqlite(url):
+        # One shared in-process database; SQLAlchemy's default pool keeps it alive.
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_pool_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        # A local file cannot drop a connection; pinging it is a wasted round-trip.
+        "pool_pre_ping": settings.db_pool_pre_ping and not url.startswith("sqlite"),
+    }
 
 
 class Database:
@@ -22,19 +73,11 @@ class Database:
         self.engine = create_engine(
             self.url,
             connect_args=connect_args,
-            pool_pre_ping=True,
             future=True,
+            **_pool_options(self.url, settings, MeteredQueuePool),
         )
         if resolved_url.startswith("sqlite"):
-            @event.listens_for(self.engine, "connect")
-            def _set_sqlite_pragmas(dbapi_connection, _connection_record) -> None:
-                cursor = dbapi_connection.cursor()
-                try:
-                    cursor.execute("PRAGMA journal_mode=WAL;")
-                    cursor.execute("PRAGMA synchronous=NORMAL;")
-                    cursor.execute("PRAGMA busy_timeout=30000;")
-                finally:
-                    cursor.close()
+            event.listen(self.engine, "connect", _set_sqlite_pragmas)
         self.SessionLocal = sessionmaker(
             autocommit=False,
             autoflush=False,
@@ -42,9 +85,126 @@ class Database:
             future=True,
         )
 
+        self.replicas = None
+        if settings.database_replica_urls and not _is_memory_sqlite(self.url):
+            from .replicas import ReplicaSet
+
+            self.replicas = ReplicaSet(self.engine, settings.database_replica_urls, settings)
+            self.replicas.track(self.SessionLocal)
+
+        self._async_engine = None
+        self._async_sessionmaker = None
+        self._async_lock = Lock()
+
+        self._writer = None
+        self._writer_lock = Lock()
+        self._writer_enabled = (
+            settings.sqlite_write_queue and self.url.startswith("sqlite") and not _is_memory_sqlite(self.url)
+        )
+        self._writer_options = {
+            "batch_size": settings.sqlite_write_batch_size,
+            "batch_window": settings.sqlite_write_batch_window_seconds,
+        }
+
     def session(self):
         return self.SessionLocal()
 
+    def read_session(self, key: Optional[str] = None, *, consistent: bool = True):
+        """A session for read-only work, on a replica when one may serve it.
+
+        ``key`` is the chat session id the reads are about (``None`` for reads
+        across sessions); recent writes to it keep the reads on the primary.
+        ``consistent=False`` takes any healthy replica, for cursor-style polls
+        that catch up on the next read anyway.
+        """
+        replica = self._replica_for(key, consistent)
+        return replica.session() if replica is not None else self.session()
+
+    def async_read_session(self, key: Optional[str] = None, *, consistent: bool = True):
+        replica = self._replica_for(key, consistent)
+        return replica.async_session() if replica is not None else self.async_session()
+
+    def _replica_for(self, key: Optional[str], consistent: bool):
+        if self.replicas is None:
+            return None
+        self.replicas.start()
+        return self.replicas.choose(key, consistent=consistent)
+
+    @property
+    def async_engine(self):
+        """Asyncio engine on the same database, created on first use.
+
+        Queries run on the driver's own I/O (aiosqlite's thread, asyncpg's
+        socket), so awaiting them leaves the event loop free for streams.
+        """
+        self._async_factory()
+        return self._async_engine
+
+    def async_session(self):
+        return self._async_factory()()
+
+    def _async_factory(self):
+        with self._async_lock:
+            if self._async_sessionmaker is None:
+                from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+                connect_args = {"timeout": 30} if self.url.startswith("sqlite") else {}
+                engine = create_async_engine(
+                    async_url(self.url),
+                    connect_args=connect_args,
+                    **_pool_options(self.url, get_settings(), MeteredAsyncAdaptedQueuePool),
+                )
+                if self.url.startswith("sqlite"):
+                    event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+                self._async_engine = engine
+                # Objects stay readable after commit without a lazy (blocking) refresh.
+                options = {"autoflush": False, "expire_on_commit": False}
+                if self.replicas is not None:
+                    # Async writes feed read-your-writes tracking like sync ones.
+                    options["sync_session_class"] = self.SessionLocal.class_
+                self._async_sessionmaker = async_sessionmaker(engine, **options)
+            return self._async_sessionmaker
+
+    @property
+    def writer(self):
+        """The SQLite single-writer queue, or ``None`` when it is not enabled."""
+        if not self._writer_enabled:
+            return None
+        with self._writer_lock:
+            if self._writer is None:
+                from .writer import SQLiteWriter
+
+                self._writer = SQLiteWriter(self.url, **self._writer_options)
+            return self._writer
+
+    def stop_writer(self, timeout: Optional[float] = None) -> None:
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.stop(timeout)
+
+    def pool_status(self) -> dict:
+        """Occupancy and checkout-wait metrics of the sync and (if started) async pools."""
+        status = {"sync": pool_status(self.engine.pool)}
+        if self._async_engine is not None:
+            status["async"] = pool_status(self._async_engine.pool)
+        return status
+
+    def replica_status(self) -> Optional[dict]:
+        return self.replicas.status() if self.replicas is not None else None
+
+    def stop_replicas(self, timeout: Optional[float] = None) -> None:
+        if self.replicas is not None:
+            self.replicas.stop(timeout)
+
+    async def dispose_async(self) -> None:
+        with self._async_lock:
+            engine, self._async_engine, self._async_sessionmaker = self._async_engine, None, None
+        if engine is not None:
+            await engine.dispose()
+        if self.replicas is not None:
+            await self.replicas.dispose_async()
+
 
 _database: Optional[Database] = None
 
@@ -61,4 +221,4 @@ def reset_database() -> None:
     _database = None
 
 
-__all__ = ["Database", "get_database", "reset_database"]
+__all__ = ["Database", "async_url", "get_database", "reset_database"]
@@ -0,0 +1,105 @@
+"""Compression codecs for stored page HTML.
+
+Payloads are zstd when the optional ``zstandard`` package is installed and
+zlib otherwise.  A payload may be encoded against a *base* (the previous
+version of the same page), so a small edit to a large page costs a few
+hundred bytes instead of a whole compressed copy: zstd uses the base as a
+raw-content dictionary; without it the payload is a tag-level diff against
+the base (byte ranges to copy plus inserted text), zlib-compressed.
+
+Decoding needs the same base bytes again; see ``HtmlBlob.raw``.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import zlib
+from difflib import SequenceMatcher
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None  # type: ignore[assignment]
+
+ZSTD = "zstd"
+ZSTD_DELTA = "zstd+base"
+ZLIB = "zlib"
+ZLIB_DELTA = "zlib+delta"
+CODECS = (ZSTD, ZSTD_DELTA, ZLIB, ZLIB_DELTA)
+
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 9
+# Diff granularity: up to and including each ">" or newline.
+_TOKEN_RE = re.compile(rb"[^>\n]*[>\n]|[^>\n]+$")
+
+
+class CodecUnavailable(RuntimeError):
+    pass
+
+
+def encode(data: bytes, base: bytes | None = None) -> tuple[str, bytes]:
+    """Compress ``data``, against ``base`` when given and it helps.
+
+    Returns ``(codec, payload)``; the codec says whether the base is needed
+    to decode.
+    """
+    codec, payload = _compress(data, None)
+    if base:
+        delta_codec, delta = _compress(data, base)
+        if len(delta) < len(payload):
+            return delta_codec, delta
+    return codec, payload
+
+
+def decode(codec: str, payload: bytes, base: bytes | None = None) -> bytes:
+    if codec in (ZSTD_DELTA, ZLIB_DELTA) and base is None:
+        raise ValueError(f"{codec} payload needs its base")
+    if codec in (ZSTD, ZSTD_DELTA):
+        if zstandard is None:
+            raise CodecUnavailable("zstandard is required to read zstd-compressed HTML")
+        dictionary = _zstd_dict(base) if codec == ZSTD_DELTA else None
+        return zstandard.ZstdDecompressor(dict_data=dictionary).decompress(payload)
+    if codec == ZLIB:
+        return zlib.decompress(payload)
+    if codec == ZLIB_DELTA:
+        assert base is not None
+        parts = []
+        for op in json.loads(zlib.decompress(payload)):
+            parts.append(base[op[0] : op[1]] if isinstance(op, list) else op.encode("utf-8"))
+        return b"".join(parts)
+    raise ValueError(f"Unknown HTML codec: {codec}")
+
+
+def _compress(data: bytes, base: bytes | None) -> tuple[str, bytes]:
+    if zstandard is not None:
+        dictionary = _zstd_dict(base) if base else None
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dictionary)
+        return (ZSTD_DELTA if base else ZSTD), compressor.compress(data)
+    if base:
+        return ZLIB_DELTA, zlib.compress(_diff(data, base), ZLIB_LEVEL)
+    return ZLIB, zlib.compress(data, ZLIB_LEVEL)
+
+
+def _diff(data: bytes, base: bytes) -> bytes:
+    """``data`` as JSON ops: ``[start, end]`` copies from ``base``, strings are inserted."""
+    old = _TOKEN_RE.findall(base)
+    new = _TOKEN_RE.findall(data)
+    offsets = [0]
+    for token in old:
+        offsets.append(offsets[-1] + len(token))
+    ops: list = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, old, new).get_opcodes():
+        if tag == "equal":
+            ops.append([offsets[i1], offsets[i2]])
+        elif j2 > j1:
+            # Tokens end on ASCII delimiters, so this never splits a character.
+            ops.append(b"".join(new[j1:j2]).decode("utf-8"))
+    return json.dumps(ops, separators=(",", ":")).encode("utf-8")
+
+
+def _zstd_dict(base: bytes) -> "zstandard.ZstdCompressionDict":
+    return zstandard.ZstdCompressionDict(base, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+
+
+__all__ = ["CODECS", "CodecUnavailable", "decode", "encode"]
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-from sqlalchemy import inspect, text
+import logging
+
+from sqlalchemy import delete, func, insert, inspect, select, text
 
 from .base import Base
 from .database import Database, get_database
 from .models import (
+    HtmlBlob,
     Page,
     PageVersion,
     ProductDoc,
@@ -18,16 +21,30 @@ from .models import (
     SessionEventSequence,
     SessionRun,
     Thread,
+    TokenUsage,
+    TokenUsageRollup,
+    Version,
     VersionSource,
 )
+from ..services.html_store import HtmlBlobStore
 from ..services.page_version import PageVersionService
 from ..services.product_doc import ProductDocService
 from ..services.project_snapshot import ProjectSnapshotService
+from ..services.session import SESSION_SEARCH_TABLE
+
+logger = logging.getLogger(__name__)
 
 
 def init_db(database: Database | None = None) -> None:
     db_instance = database or get_database()
     Base.metadata.create_all(bind=db_instance.engine)
+    # Before the data migrations below: they query versions and sessions
+    # through the ORM, which selects the columns added here.
+    migrate_v12_html_blobs(db_instance)
+    migrate_v13_snapshot_page_refs(db_instance)
+    # Before any writes below, so the counters see them.
+    migrate_v15_session_counters(db_instance)
+    migrate_v15_session_search(db_instance)
     migrate_v04_product_doc_pending_pages(db_instance)
     migrate_v05_version_models(db_instance)
     migrate_v06_indexes(db_instance)
@@ -38,6 +55,8 @@ def init_db(database: Database | None = None) -> None:
     migrate_v09_threads(db_instance)
     migrate_v10_project_memory(db_instance)
     migrate_v11_message_metadata(db_instance)
+    migrate_v14_token_usage_rollups(db_instance)
+    migrate_v16_message_keyset_index(db_instance)
 
 
 def migrate_v04_product_doc_pages(database: Database | None = None) -> None:
@@ -601,6 +620,416 @@ def migrate_v11_message_metadata(database: Database | None = None) -> None:
         connection.execute(text("ALTER TABLE messages ADD COLUMN metadata JSON"))
 
 
+def migrate_v12_html_blobs(database: Database | None = None) -> None:
+    """Add html_blobs and the html_hash references to versions.
+
+    Existing inline HTML stays readable; :func:`backfill_v12_html_blobs`
+    moves it into blobs in the background.
+    """
+    db_instance = database or get_database()
+    engine = db_instance.engine
+    Base.metadata.create_all(bind=engine, tables=[HtmlBlob.__table__])
+    inspector = inspect(engine)
+    tables = inspector.get_table_names()
+    for table in ("page_versions", "versions"):
+        if table not in tables:
+            continue
+        columns = {col["name"] for col in inspector.get_columns(table)}
+        if "html_hash" not in columns:
+            with engine.begin() as connection:
+                connection.execute(
+                    text(f"ALTER TABLE {table} ADD COLUMN html_hash VARCHAR(64) REFERENCES html_blobs(hash)")
+                )
+        _ensure_index(engine, table, f"idx_{table}_html_hash", ["html_hash"])
+
+
+def backfill_v12_html_blobs(database: Database | None = None, *, batch_size: int = 100) -> int:
+    """Move inline version HTML into html_blobs, one short transaction per batch.
+
+    Safe to run while serving: readers fall back to the inline column until
+    a row is moved.  Returns the number of rows moved.
+    """
+    db_instance = database or get_database()
+    moved = 0
+    for model, owner in ((PageVersion, PageVersion.page_id), (Version, Version.session_id)):
+        last_id = 0
+        while True:
+            with db_instance.session() as session:
+                rows = (
+                    session.query(model)
+                    .filter(model.id > last_id)
+                    .filter(model.html_hash.is_(None))
+                    .filter(model.html_text.isnot(None))
+                    .filter(model.html_text != "")
+                    .order_by(model.id)
+                    .limit(batch_size)
+                    .all()
+                )
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                store = HtmlBlobStore(session)
+                # Encode each version against the previous one of its page/session.
+                previous: dict[str, str] = {}
+                for row in sorted(rows, key=lambda item: (getattr(item, owner.key), item.version)):
+                    key = getattr(row, owner.key)
+                    blob = store.put(row.html_text, base_hash=previous.get(key))
+                    row.html_hash = blob.hash
+                    # versions.html is NOT NULL.
+                    row.html_text = None if model is PageVersion else ""
+                    previous[key] = blob.hash
+                try:
+                    session.commit()
+                except Exception:
+                    session.rollback()
+                    logger.warning("HTML blob backfill failed for a %s batch", model.__tablename__, exc_info=True)
+                    continue
+                moved += len(rows)
+    if moved:
+        logger.info("Moved %d inline HTML versions into html_blobs", moved)
+    return moved
+
+
+def migrate_v13_snapshot_page_refs(database: Database | None = None) -> None:
+    """Let snapshot pages reference html_blobs instead of copying HTML."""
+    db_instance = database or get_database()
+    engine = db_instance.engine
+    inspector = inspect(engine)
+    if "project_snapshot_pages" not in inspector.get_table_names():
+        return
+    columns = {col["name"] for col in inspector.get_columns("project_snapshot_pages")}
+    if "html_hash" not in columns:
+        with engine.begin() as connection:
+            connection.execute(
+                text(
+                    "ALTER TABLE project_snapshot_pages "
+                    "ADD COLUMN html_hash VARCHAR(64) REFERENCES html_blobs(hash)"
+                )
+            )
+    _ensure_index(
+        engine, "project_snapshot_pages", "idx_project_snapshot_pages_html_hash", ["html_hash"]
+    )
+
+
+def backfill_v13_snapshot_page_refs(
+    database: Database | None = None, *, batch_size: int = 100
+) -> int:
+    """Replace copied snapshot page HTML with blob references, batch by batch.
+
+    Snapshot HTML nearly always matches a page version's content, so most
+    rows end up sharing an existing blob.
+    """
+    db_instance = database or get_database()
+    moved = 0
+    last_id = 0
+    while True:
+        with db_instance.session() as session:
+            rows = (
+                session.query(ProjectSnapshotPage)
+                .filter(ProjectSnapshotPage.id > last_id)
+                .filter(ProjectSnapshotPage.html_hash.is_(None))
+                .filter(ProjectSnapshotPage.rendered_html_text.isnot(None))
+                .order_by(ProjectSnapshotPage.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+            last_id = rows[-1].id
+            store = HtmlBlobStore(session)
+            for row in rows:
+                row.html_hash = store.put(row.rendered_html_text).hash
+                row.rendered_html_text = None
+            try:
+                session.commit()
+            except Exception:
+                session.rollback()
+                logger.warning("Snapshot page backfill failed for a batch", exc_info=True)
+                continue
+            moved += len(rows)
+    if moved:
+        logger.info("Moved %d snapshot pages onto html_blobs", moved)
+    return moved
+
+
+def migrate_v14_token_usage_rollups(database: Database | None = None) -> None:
+    """Create token_usage_rollups and fill it once from existing usage."""
+    db_instance = database or get_database()
+    engine = db_instance.engine
+    Base.metadata.create_all(bind=engine, tables=[TokenUsageRollup.__table__])
+    with engine.connect() as connection:
+        has_rollups = connection.execute(select(TokenUsageRollup.id).limit(1)).first() is not None
+        has_usage = connection.execute(select(TokenUsage.id).limit(1)).first() is not None
+    if has_usage and not has_rollups:
+        backfill_v14_token_usage_rollups(db_instance)
+
+
+def backfill_v14_token_usage_rollups(database: Database | None = None) -> int:
+    """Rebuild token_usage_rollups from token_usage in one transaction.
+
+    Idempotent; returns the number of rollup rows written.
+    """
+    db_instance = database or get_database()
+    day = func.coalesce(func.date(TokenUsage.timestamp), func.current_date())
+    totals = select(
+        TokenUsage.session_id,
+        TokenUsage.agent_type,
+        TokenUsage.model,
+        day,
+        func.count(TokenUsage.id),
+        func.coalesce(func.sum(TokenUsage.input_tokens), 0),
+        func.coalesce(func.sum(TokenUsage.output_tokens), 0),
+        func.coalesce(func.sum(TokenUsage.total_tokens), 0),
+        func.coalesce(func.sum(TokenUsage.cost_usd), 0.0),
+    ).group_by(TokenUsage.session_id, TokenUsage.agent_type, TokenUsage.model, day)
+    with db_instance.engine.begin() as connection:
+        connection.execute(delete(TokenUsageRollup))
+        connection.execute(
+            insert(TokenUsageRollup).from_select(
+                [
+                    "session_id",
+                    "agent_type",
+                    "model",
+                    "day",
+                    "request_count",
+                    "input_tokens",
+                    "output_tokens",
+                    "total_tokens",
+                    "cost_usd",
+                ],
+                totals,
+            )
+        )
+        written = connection.execute(select(func.count(TokenUsageRollup.id))).scalar() or 0
+    logger.info("Rebuilt %d token usage rollups", written)
+    return int(written)
+
+
+# Child table -> counters it maintains: (parent table, fk column, counter, activity column).
+_SESSION_COUNTERS = {
+    "messages": [
+        ("sessions", "session_id", "message_count", '"timestamp"'),
+        ("threads", "thread_id", "message_count", '"timestamp"'),
+    ],
+    "versions": [("sessions", "session_id", "version_count", "created_at")],
+    "pages": [("sessions", "session_id", "page_count", None)],
+}
+
+
+def migrate_v15_session_counters(database: Database | None = None) -> None:
+    """Denormalized message/version/page counts and last activity on sessions and threads.
+
+    Triggers keep the counts in step with every insert and delete, including
+    bulk deletes, in the same transaction.  Columns added to an existing
+    database are filled by :func:`recount_v15_session_counters`.
+    """
+    db_instance = database or get_database()
+    engine = db_instance.engine
+    inspector = inspect(engine)
+    tables = inspector.get_table_names()
+    column_defs = {
+        "sessions": {
+            "message_count": "INTEGER NOT NULL DEFAULT 0",
+            "version_count": "INTEGER NOT NULL DEFAULT 0",
+            "page_count": "INTEGER NOT NULL DEFAULT 0",
+            "last_activity_at": "TIMESTAMP",
+        },
+        "threads": {
+            "message_count": "INTEGER NOT NULL DEFAULT 0",
+            "last_activity_at": "TIMESTAMP",
+        },
+    }
+    added = False
+    with engine.begin() as connection:
+        for table, definitions in column_defs.items():
+            if table not in tables:
+                continue
+            columns = {column["name"] for column in inspector.get_columns(table)}
+            for column, ddl_type in definitions.items():
+                if column not in columns:
+                    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+                    added = True
+        if engine.dialect.name == "postgresql":
+            _create_postgres_counter_triggers(connection)
+        else:
+            _create_sqlite_counter_triggers(connection)
+        if added:
+            _recount_session_counters(connection)
+    _ensure_index(engine, "sessions", "idx_sessions_updated_id", ["updated_at", "id"])
+
+
+def recount_v15_session_counters(database: Database | None = None) -> None:
+    """Recompute every session and thread counter from the child tables."""
+    db_instance = database or get_database()
+    with db_instance.engine.begin() as connection:
+        _recount_session_counters(connection)
+
+
+def _counter_statements(child: str, row: str, delta: str, *, only_fk: str | None = None) -> list[str]:
+    statements = []
+    for parent, fk, counter, activity in _SESSION_COUNTERS[child]:
+        if only_fk is not None and fk != only_fk:
+            continue
+        assignments = [f"{counter} = {counter} {delta} 1"]
+        if delta == "+" and activity:
+            assignments.append(f"last_activity_at = COALESCE({row}.{activity}, last_activity_at)")
+        statements.append(f"UPDATE {parent} SET {', '.join(assignments)} WHERE id = {row}.{fk};")
+    return statements
+
+
+def _create_sqlite_counter_triggers(connection) -> None:
+    for child, counters in _SESSION_COUNTERS.items():
+        inserted = " ".join(_counter_statements(child, "NEW", "+"))
+        deleted = " ".join(_counter_statements(child, "OLD", "-"))
+        connection.execute(
+            text(f"CREATE TRIGGER IF NOT EXISTS trg_{child}_counters_insert AFTER INSERT ON {child} BEGIN {inserted} END")
+        )
+        connection.execute(
+            text(f"CREATE TRIGGER IF NOT EXISTS trg_{child}_counters_delete AFTER DELETE ON {child} BEGIN {deleted} END")
+        )
+        for fk in {fk for _, fk, _, _ in counters}:
+            moved = " ".join(
+                _counter_statements(child, "OLD", "-", only_fk=fk) + _counter_statements(child, "NEW", "+", only_fk=fk)
+            )
+            connection.execute(
+                text(
+                    f"CREATE TRIGGER IF NOT EXISTS trg_{child}_counters_{fk} AFTER UPDATE OF {fk} ON {child} "
+                    f"WHEN OLD.{fk} IS NOT NEW.{fk} BEGIN {moved} END"
+                )
+            )
+
+
+def _create_postgres_counter_triggers(connection) -> None:
+    for child, counters in _SESSION_COUNTERS.items():
+        fks = sorted({fk for _, fk, _, _ in counters})
+        moved = " ".join(
+            f"IF OLD.{fk} IS DISTINCT FROM NEW.{fk} THEN "
+            + " ".join(_counter_statements(child, "OLD", "-", only_fk=fk) + _counter_statements(child, "NEW", "+", only_fk=fk))
+            + " END IF;"
+            for fk in fks
+        )
+        connection.execute(
+            text(
+                f"CREATE OR REPLACE FUNCTION {child}_counters() RETURNS trigger AS $$ BEGIN "
+                f"IF TG_OP = 'INSERT' THEN {' '.join(_counter_statements(child, 'NEW', '+'))} RETURN NEW; END IF; "
+                f"IF TG_OP = 'DELETE' THEN {' '.join(_counter_statements(child, 'OLD', '-'))} RETURN OLD; END IF; "
+                f"{moved} RETURN NEW; END $$ LANGUAGE plpgsql"
+            )
+        )
+        connection.execute(text(f"DROP TRIGGER IF EXISTS trg_{child}_counters ON {child}"))
+        connection.execute(
+            text(
+                f"CREATE TRIGGER trg_{child}_counters AFTER INSERT OR DELETE OR UPDATE OF {', '.join(fks)} "
+                f"ON {child} FOR EACH ROW EXECUTE FUNCTION {child}_counters()"
+            )
+        )
+
+
+def _recount_session_counters(connection) -> None:
+    connection.execute(
+        text(
+            "UPDATE sessions SET "
+            "message_count = (SELECT count(*) FROM messages WHERE messages.session_id = sessions.id), "
+            "version_count = (SELECT count(*) FROM versions WHERE versions.session_id = sessions.id), "
+            "page_count = (SELECT count(*) FROM pages WHERE pages.session_id = sessions.id), "
+            "last_activity_at = (SELECT max(at) FROM ("
+            'SELECT max(messages."timestamp") AS at FROM messages WHERE messages.session_id = sessions.id '
+            "UNION ALL SELECT max(versions.created_at) FROM versions WHERE versions.session_id = sessions.id"
+            ") AS activity)"
+        )
+    )
+    connection.execute(
+        text(
+            "UPDATE threads SET "
+            "message_count = (SELECT count(*) FROM messages WHERE messages.thread_id = threads.id), "
+            'last_activity_at = (SELECT max(messages."timestamp") FROM messages WHERE messages.thread_id = threads.id)'
+        )
+    )
+
+
+def migrate_v15_session_search(database: Database | None = None) -> None:
+    """Index session titles for substring search.
+
+    Postgres gets a pg_trgm GIN index, which serves ``ILIKE '%term%'``
+    directly.  SQLite gets a trigram FTS5 table kept in sync by triggers.
+    Either is skipped with a warning when the extension is unavailable;
+    search then falls back to a scan.
+    """
+    db_instance = database or get_database()
+    engine = db_instance.engine
+    if "sessions" not in inspect(engine).get_table_names():
+        return
+    try:
+        with engine.begin() as connection:
+            if engine.dialect.name == "postgresql":
+                connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                connection.execute(
+                    text(
+                        "CREATE INDEX IF NOT EXISTS idx_sessions_title_trgm "
+                        "ON sessions USING gin (title gin_trgm_ops)"
+                    )
+                )
+                return
+            if engine.dialect.name != "sqlite":
+                return
+            created = not inspect(connection).has_table(SESSION_SEARCH_TABLE)
+            connection.execute(
+                text(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SESSION_SEARCH_TABLE} "
+                    "USING fts5(session_id UNINDEXED, title, tokenize='trigram')"
+                )
+            )
+            # Index rows share the session's rowid: FTS5 looks rows up by rowid,
+            # while a match on the UNINDEXED session_id scans the whole table.
+            delete_trigger = connection.execute(
+                text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_sessions_search_delete'")
+            ).scalar()
+            stale = delete_trigger is not None and "OLD.rowid" not in delete_trigger
+            if stale:
+                for trigger in ("insert", "update", "delete"):
+                    connection.execute(text(f"DROP TRIGGER IF EXISTS trg_sessions_search_{trigger}"))
+                connection.execute(text(f"DELETE FROM {SESSION_SEARCH_TABLE}"))
+            connection.execute(
+                text(
+                    f"CREATE TRIGGER IF NOT EXISTS trg_sessions_search_insert AFTER INSERT ON sessions BEGIN "
+                    f"INSERT INTO {SESSION_SEARCH_TABLE} (rowid, session_id, title) "
+                    "VALUES (NEW.rowid, NEW.id, NEW.title); END"
+                )
+            )
+            connection.execute(
+                text(
+                    f"CREATE TRIGGER IF NOT EXISTS trg_sessions_search_update AFTER UPDATE OF title ON sessions BEGIN "
+                    f"UPDATE {SESSION_SEARCH_TABLE} SET title = NEW.title WHERE rowid = NEW.rowid; END"
+                )
+            )
+            connection.execute(
+                text(
+                    f"CREATE TRIGGER IF NOT EXISTS trg_sessions_search_delete AFTER DELETE ON sessions BEGIN "
+                    f"DELETE FROM {SESSION_SEARCH_TABLE} WHERE rowid = OLD.rowid; END"
+                )
+            )
+            if created or stale:
+                connection.execute(
+                    text(
+                        f"INSERT INTO {SESSION_SEARCH_TABLE} (rowid, session_id, title) "
+                        "SELECT rowid, id, title FROM sessions"
+                    )
+                )
+    except Exception:
+        logger.warning("Session title search index unavailable; falling back to LIKE", exc_info=True)
+
+
+def migrate_v16_message_keyset_index(database: Database | None = None) -> None:
+    """Index for keyset paging of a thread's messages."""
+    db_instance = database or get_database()
+    _ensure_index(
+        db_instance.engine,
+        "messages",
+        "idx_messages_session_thread_ts_id",
+        ["session_id", "thread_id", "timestamp", "id"],
+    )
+
+
 __all__ = [
     "init_db",
     "migrate_v04_product_doc_pages",
@@ -613,5 +1042,15 @@ __all__ = [
     "migrate_v09_threads",
     "migrate_v10_project_memory",
     "migrate_v11_message_metadata",
+    "migrate_v12_html_blobs",
+    "backfill_v12_html_blobs",
+    "migrate_v13_snapshot_page_refs",
+    "backfill_v13_snapshot_page_refs",
+    "migrate_v14_token_usage_rollups",
+    "backfill_v14_token_usage_rollups",
+    "migrate_v15_session_counters",
+    "recount_v15_session_counters",
+    "migrate_v15_session_search",
+    "migrate_v16_message_keyset_index",
     "downgrade_v04_product_doc_pages",
 ]
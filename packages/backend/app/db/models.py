@@ -7,6 +7,7 @@ import uuid
 from sqlalchemy import (
     Boolean,
     Column,
+    Date,
     DateTime,
     Enum as SAEnum,
     Float,
@@ -14,13 +15,15 @@ from sqlalchemy import (
     Index,
     Integer,
     JSON,
+    LargeBinary,
     String,
     Text,
     UniqueConstraint,
 )
-from sqlalchemy.orm import relationship, validates
+from sqlalchemy.orm import deferred, relationship, validates
 
 from ..utils.datetime import utcnow
+from . import html_codec
 from .base import Base
 
 
@@ -46,11 +49,21 @@ class Session(Base):
     build_status = Column(String(20), default="pending")
     build_artifacts = Column(JSON, nullable=True)
     aesthetic_scores = Column(JSON, nullable=True)
+    # Maintained by database triggers (migrate_v15_session_counters).
+    message_count = Column(Integer, nullable=False, default=0, server_default="0")
+    version_count = Column(Integer, nullable=False, default=0, server_default="0")
+    page_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_activity_at = Column(DateTime)
 
     threads = relationship("Thread", back_populates="session", cascade="all, delete-orphan")
     messages = relationship("Message", back_populates="session", cascade="all, delete-orphan")
     versions = relationship("Version", back_populates="session", cascade="all, delete-orphan")
     token_usage = relationship("TokenUsage", back_populates="session", cascade="all, delete-orphan")
+    token_usage_rollups = relationship(
+        "TokenUsageRollup",
+        back_populates="session",
+        cascade="all, delete-orphan",
+    )
     product_doc = relationship(
         "ProductDoc",
         back_populates="session",
@@ -74,6 +87,11 @@ class Session(Base):
         cascade="all, delete-orphan",
     )
 
+    __table_args__ = (
+        # Keyset pagination of the session list.
+        Index("idx_sessions_updated_id", "updated_at", "id"),
+    )
+
 
 class SessionRun(Base):
     __tablename__ = "session_runs"
@@ -132,6 +150,9 @@ class Thread(Base):
     title = Column(String, nullable=True)
     created_at = Column(DateTime, default=utcnow)
     updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
+    # Maintained by database triggers (migrate_v15_session_counters).
+    message_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_activity_at = Column(DateTime)
 
     session = relationship("Session", back_populates="threads")
     messages = relationship("Message", back_populates="thread", cascade="all, delete-orphan")
@@ -179,24 +200,81 @@ class Message(Base):
         Index("idx_messages_session_ts", "session_id", "timestamp"),
         Index("idx_messages_thread_id", "thread_id"),
         Index("idx_messages_thread_ts", "thread_id", "timestamp"),
+        Index("idx_messages_session_thread_ts_id", "session_id", "thread_id", "timestamp", "id"),
     )
 
 
-class Version(Base):
+class HtmlBlob(Base):
+    """Compressed, content-addressed page HTML; see services/html_store.py."""
+
+    __tablename__ = "html_blobs"
+
+    hash = Column(String(64), primary_key=True)
+    codec = Column(String(16), nullable=False)
+    # Set for payloads encoded against another blob (see html_codec.py).
+    base_hash = Column(String(64), ForeignKey("html_blobs.hash"))
+    depth = Column(Integer, nullable=False, default=0)
+    size = Column(Integer, nullable=False)
+    data = deferred(Column(LargeBinary, nullable=False))
+    created_at = Column(DateTime, default=utcnow)
+
+    base = relationship("HtmlBlob", remote_side=[hash])
+
+    __table_args__ = (Index("idx_html_blobs_base_hash", "base_hash"),)
+
+    def raw(self) -> bytes:
+        cached = getattr(self, "_raw", None)
+        if cached is None:
+            base = self.base.raw() if self.base_hash is not None else None
+            cached = html_codec.decode(self.codec, self.data, base)
+            self._raw = cached
+        return cached
+
+    @property
+    def text(self) -> str:
+        return self.raw().decode("utf-8")
+
+
+class _HtmlContent:
+    """``html`` backed by an :class:`HtmlBlob`, or by the legacy inline column.
+
+    Assigning ``html`` writes the inline column; services store new content
+    as blobs through ``HtmlBlobStore``.  Blobs are decompressed on first
+    access.
+    """
+
+    @property
+    def html(self) -> str | None:
+        if self.html_hash is not None and self.html_blob is not None:
+            return self.html_blob.text
+        return self.html_text
+
+    @html.setter
+    def html(self, value: str | None) -> None:
+        self.html_text = value
+        self.html_blob = None
+        self.html_hash = None
+
+
+class Version(_HtmlContent, Base):
     __tablename__ = "versions"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     session_id = Column(String, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False)
     version = Column(Integer, nullable=False)
-    html = Column(Text, nullable=False)
+    # Empty once the content lives in html_blobs.
+    html_text = Column("html", Text, nullable=False, default="")
+    html_hash = Column(String(64), ForeignKey("html_blobs.hash"))
     description = Column(String)
     created_at = Column(DateTime, default=utcnow)
 
     session = relationship("Session", back_populates="versions")
+    html_blob = relationship("HtmlBlob")
 
     __table_args__ = (
         UniqueConstraint("session_id", "version", name="uq_versions_session"),
         Index("idx_versions_session_id", "session_id"),
+        Index("idx_versions_html_hash", "html_hash"),
     )
 
 
@@ -221,6 +299,36 @@ class TokenUsage(Base):
     )
 
 
+class TokenUsageRollup(Base):
+    """Running token_usage totals per session, agent, model and UTC day.
+
+    Updated in the same transaction as each usage row, so cost reporting
+    reads a handful of rows per session instead of aggregating the log.
+    """
+
+    __tablename__ = "token_usage_rollups"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    session_id = Column(String, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False)
+    agent_type = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    day = Column(Date, nullable=False)
+    request_count = Column(Integer, nullable=False, default=0)
+    input_tokens = Column(Integer, nullable=False, default=0)
+    output_tokens = Column(Integer, nullable=False, default=0)
+    total_tokens = Column(Integer, nullable=False, default=0)
+    cost_usd = Column(Float, nullable=False, default=0.0)
+
+    session = relationship("Session", back_populates="token_usage_rollups")
+
+    __table_args__ = (
+        UniqueConstraint(
+            "session_id", "agent_type", "model", "day", name="uq_token_usage_rollups_key"
+        ),
+        Index("idx_token_usage_rollups_day", "day"),
+    )
+
+
 class ProductDocStatus(str, enum.Enum):
     DRAFT = "draft"
     CONFIRMED = "confirmed"
@@ -386,11 +494,24 @@ class ProjectSnapshotPage(Base):
     slug = Column(String(255), nullable=False)
     title = Column(String(255), nullable=False)
     order_index = Column(Integer, nullable=False)
-    rendered_html = Column(Text)
+    # Snapshots reference page content by hash; the inline column only holds
+    # HTML captured before html_blobs existed.
+    rendered_html_text = Column("rendered_html", Text)
+    html_hash = Column(String(64), ForeignKey("html_blobs.hash"))
 
     snapshot = relationship("ProjectSnapshot", back_populates="pages")
+    html_blob = relationship("HtmlBlob")
+
+    __table_args__ = (
+        Index("idx_snapshot_page", "snapshot_id", "page_id"),
+        Index("idx_project_snapshot_pages_html_hash", "html_hash"),
+    )
 
-    __table_args__ = (Index("idx_snapshot_page", "snapshot_id", "page_id"),)
+    @property
+    def rendered_html(self) -> str | None:
+        if self.html_hash is not None and self.html_blob is not None:
+            return self.html_blob.text
+        return self.rendered_html_text
 
 
 class Page(Base):
@@ -436,13 +557,15 @@ class Page(Base):
         return value
 
 
-class PageVersion(Base):
+class PageVersion(_HtmlContent, Base):
     __tablename__ = "page_versions"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     page_id = Column(String, ForeignKey("pages.id", ondelete="CASCADE"), nullable=False)
     version = Column(Integer, nullable=False)
-    html = Column(Text)
+    # Null once the content lives in html_blobs.
+    html_text = Column("html", Text)
+    html_hash = Column(String(64), ForeignKey("html_blobs.hash"))
     description = Column(String(500))
     source = Column(
         SAEnum(VersionSource, name="version_source", values_callable=_enum_values),
@@ -458,11 +581,13 @@ class PageVersion(Base):
     created_at = Column(DateTime, default=utcnow)
 
     page = relationship("Page", back_populates="versions", foreign_keys=[page_id])
+    html_blob = relationship("HtmlBlob")
 
     __table_args__ = (
         UniqueConstraint("page_id", "version", name="uq_page_versions_page_version"),
         Index("idx_page_versions_page_id", "page_id"),
         Index("idx_page_versions_page_created_at", "page_id", "created_at"),
+        Index("idx_page_versions_html_hash", "html_hash"),
     )
 
 
@@ -503,7 +628,9 @@ __all__ = [
     "Thread",
     "Message",
     "Version",
+    "HtmlBlob",
     "TokenUsage",
+    "TokenUsageRollup",
     "ProductDocStatus",
     "VersionSource",
     "SessionEventSource",
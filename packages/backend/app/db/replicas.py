@@ -0,0 +1,364 @@
+"""Read replicas for read-only endpoints, with read-your-writes routing.
+
+``DATABASE_REPLICA_URLS`` lists streaming replicas of ``DATABASE_URL``.
+Read-only handlers ask :meth:`Database.read_session` for a session keyed by
+the chat session they read.  ``ReplicaSet`` hands out a healthy replica
+unless that chat session was written within ``DB_REPLICA_STICKY_SECONDS``;
+such reads stay on the primary until the window passes or a replica has
+replayed past the write's WAL position (LSN).  A monitor thread probes each
+replica's lag and takes it out of rotation beyond
+``DB_REPLICA_MAX_LAG_SECONDS`` or when it cannot be reached.
+
+Writes never come through here: write sessions are always bound to the
+primary, which this module only observes (commit hooks on its sessions).
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import reduce
+from typing import Iterable, Optional
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import sessionmaker
+
+from .database import _pool_options, _set_sqlite_pragmas, async_url
+from .pool import MeteredAsyncAdaptedQueuePool, MeteredQueuePool, pool_status
+
+logger = logging.getLogger(__name__)
+
+# session.info key collecting the chat sessions a transaction wrote.
+_WRITTEN = "replica_written_keys"
+# Written key for changes whose chat session is unknown (bulk statements, rows
+# without a session_id); it makes every key sticky.
+ANY_SESSION = "*"
+_TRACKED_KEYS = 4096
+
+_PG_REPLAY_SQL = (
+    "SELECT CASE WHEN pg_is_in_recovery() THEN pg_last_wal_replay_lsn()"
+    " ELSE pg_current_wal_lsn() END::text,"
+    " CASE WHEN pg_is_in_recovery()"
+    " THEN EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+    " ELSE 0 END"
+)
+_PG_CURRENT_LSN_SQL = "SELECT pg_current_wal_lsn()::text"
+
+
+def parse_lsn(value: Optional[str]) -> Optional[int]:
+    """``'16/B374D848'`` -> a comparable integer (``None`` passes through)."""
+    if not value:
+        return None
+    high, _, low = value.partition("/")
+    return (int(high, 16) << 32) | int(low, 16)
+
+
+@dataclass(frozen=True)
+class _Write:
+    at: float
+    # Highest primary LSN seen after these writes committed (None if never known).
+    lsn: Optional[int]
+    # Latest of these writes whose LSN could not be read; it is sticky for the whole window.
+    blind_at: Optional[float]
+
+
+def _merge(a: _Write, b: _Write) -> _Write:
+    return _Write(
+        max(a.at, b.at),
+        max((lsn for lsn in (a.lsn, b.lsn) if lsn is not None), default=None),
+        max((at for at in (a.blind_at, b.blind_at) if at is not None), default=None),
+    )
+
+
+def _chat_session_key(obj) -> str:
+    if getattr(obj, "__tablename__", None) == "sessions":
+        return obj.id
+    return getattr(obj, "session_id", None) or ANY_SESSION
+
+
+def _collect_flushed(session, _flush_context) -> None:
+    # Still the pre-flush view here: new/dirty/deleted list what was written.
+    keys = session.info.setdefault(_WRITTEN, set())
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        keys.add(_chat_session_key(obj))
+
+
+def _collect_statement(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info.setdefault(_WRITTEN, set()).add(ANY_SESSION)
+
+
+class Replica:
+    """One replica: its engines, and the health the monitor last saw."""
+
+    def __init__(self, url: str, settings) -> None:
+        self.url = url
+        self.name = make_url(url).render_as_string(hide_password=True)
+        self._sqlite = url.startswith("sqlite")
+        self._connect_args = {"check_same_thread": False, "timeout": 30} if self._sqlite else {}
+        self._settings = settings
+        self.engine = create_engine(
+            url,
+            connect_args=self._connect_args,
+            future=True,
+            **_pool_options(url, settings, MeteredQueuePool),
+        )
+        self._watch(self.engine)
+        self._sessionmaker = sessionmaker(
+            bind=self.engine, autoflush=False, future=True, info={"replica": self.name}
+        )
+        self._async_engine = None
+        self._async_sessionmaker = None
+        self._async_lock = threading.Lock()
+
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.replay_lsn: Optional[int] = None
+        self.checked_at: Optional[float] = None
+        self.error: Optional[str] = "not checked yet"
+
+    def _watch(self, engine: Engine) -> None:
+        if self._sqlite:
+            event.listen(engine, "connect", _set_sqlite_pragmas)
+        event.listen(engine, "handle_error", self._on_error)
+
+    def _on_error(self, context) -> None:
+        # Leave rotation on a lost connection now rather than at the next probe.
+        if context.is_disconnect:
+            self.mark_down(str(context.original_exception))
+
+    def mark_down(self, reason: str) -> None:
+        if self.healthy:
+            logger.warning("Read replica %s left rotation: %s", self.name, reason)
+        self.healthy = False
+        self.error = reason
+
+    def session(self):
+        return self._sessionmaker()
+
+    def async_session(self):
+        with self._async_lock:
+            if self._async_sessionmaker is None:
+                from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+                engine = create_async_engine(
+                    async_url(self.url),
+                    connect_args={"timeout": 30} if self._sqlite else {},
+                    **_pool_options(self.url, self._settings, MeteredAsyncAdaptedQueuePool),
+                )
+                self._watch(engine.sync_engine)
+                self._async_engine = engine
+                self._async_sessionmaker = async_sessionmaker(
+                    engine, autoflush=False, expire_on_commit=False, info={"replica": self.name}
+                )
+            return self._async_sessionmaker()
+
+    def probe(self, primary_lsn: Optional[int], max_lag: float) -> None:
+        try:
+            with self.engine.connect() as connection:
+                if self.engine.dialect.name == "postgresql":
+                    replay, lag = connection.exec_driver_sql(_PG_REPLAY_SQL).one()
+                    replay_lsn = parse_lsn(replay)
+                    lag = float(lag) if lag is not None else None
+                    # An idle primary makes the replay timestamp age; the LSN says it is caught up.
+                    if replay_lsn is not None and primary_lsn is not None and replay_lsn >= primary_lsn:
+                        lag = 0.0
+                else:
+                    connection.exec_driver_sql("SELECT 1")
+                    replay_lsn, lag = None, 0.0
+        except exc.SQLAlchemyError as error:
+            self.checked_at = time.time()
+            self.mark_down(str(getattr(error, "orig", None) or error))
+            return
+        self.checked_at = time.time()
+        self.replay_lsn = replay_lsn
+        self.lag_seconds = lag
+        if lag is None or lag > max_lag:
+            self.mark_down("replay lag unknown" if lag is None else f"lag {lag:.3f}s exceeds {max_lag}s")
+            return
+        if not self.healthy:
+            logger.info("Read replica %s joined rotation (lag %.3fs)", self.name, lag)
+        self.healthy = True
+        self.error = None
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "replay_lsn": self.replay_lsn,
+            "checked_at": self.checked_at,
+            "error": self.error,
+            "pool": pool_status(self.engine.pool),
+        }
+
+    def dispose(self) -> None:
+        self.engine.dispose()
+
+    async def dispose_async(self) -> None:
+        with self._async_lock:
+            engine, self._async_engine, self._async_sessionmaker = self._async_engine, None, None
+        if engine is not None:
+            await engine.dispose()
+
+
+class ReplicaSet:
+    """Routes reads between the primary and its replicas.
+
+    Stickiness is tracked per chat session id from commits on the primary's
+    sessions (see :meth:`track`), in this process only: another worker
+    process does not see this one's writes and relies on LSN catch-up or
+    its own window.
+    """
+
+    def __init__(self, primary: Engine, urls: Iterable[str], settings) -> None:
+        self.primary = primary
+        self.replicas = [Replica(url, settings) for url in urls]
+        self.sticky_seconds = settings.db_replica_sticky_seconds
+        self.max_lag = settings.db_replica_max_lag_seconds
+        self.check_interval = max(0.1, settings.db_replica_check_interval_seconds)
+        self.primary_lsn: Optional[int] = None
+        self.routed = {"primary": 0, "replica": 0}
+        self._lock = threading.Lock()
+        self._writes: "OrderedDict[str, _Write]" = OrderedDict()
+        self._latest: Optional[_Write] = None
+        self._turn = itertools.count()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, session_factory) -> None:
+        """Record the chat sessions committed by sessions of ``session_factory``."""
+        event.listen(session_factory, "after_flush", _collect_flushed)
+        event.listen(session_factory, "do_orm_execute", _collect_statement)
+        event.listen(session_factory, "after_commit", self._after_commit)
+
+    def _after_commit(self, session) -> None:
+        keys = session.info.pop(_WRITTEN, None)
+        if keys:
+            self.note_write(keys, self._current_lsn())
+
+    def _current_lsn(self) -> Optional[int]:
+        # Only worth a round-trip if some replica could serve the key before the window ends.
+        if self.primary.dialect.name != "postgresql" or not any(r.healthy for r in self.replicas):
+            return None
+        try:
+            with self.primary.connect() as connection:
+                return parse_lsn(connection.exec_driver_sql(_PG_CURRENT_LSN_SQL).scalar())
+        except exc.SQLAlchemyError:
+            return None
+
+    def note_write(self, keys: Iterable[str], lsn: Optional[int] = None) -> None:
+        now = time.monotonic()
+        write = _Write(now, lsn, None if lsn is not None else now)
+        with self._lock:
+            self._latest = _merge(self._latest, write) if self._latest else write
+            for key in keys:
+                self._writes[key] = _merge(self._writes[key], write) if key in self._writes else write
+                self._writes.move_to_end(key)
+            while len(self._writes) > _TRACKED_KEYS:
+                _, evicted = self._writes.popitem(last=False)
+                if now - evicted.at < self.sticky_seconds:
+                    # Still sticky: fold it into the catch-all rather than forget it.
+                    held = self._writes.get(ANY_SESSION)
+                    self._writes[ANY_SESSION] = _merge(held, evicted) if held else evicted
+
+    def _required_lsn(self, key: Optional[str]) -> tuple[bool, Optional[int]]:
+        """(reads about ``key`` need the primary, LSN a replica must have replayed)."""
+        with self._lock:
+            if key is None:
+                writes = [self._latest]
+            else:
+                writes = [self._writes.get(key), self._writes.get(ANY_SESSION)]
+        writes = [write for write in writes if write is not None]
+        if not writes:
+            return False, None
+        write = reduce(_merge, writes)
+        now = time.monotonic()
+        if write.blind_at is not None and now - write.blind_at < self.sticky_seconds:
+            return True, None
+        if now - write.at < self.sticky_seconds:
+            return False, write.lsn
+        return False, None
+
+    def choose(self, key: Optional[str] = None, *, consistent: bool = True) -> Optional[Replica]:
+        """A replica for reads about chat session ``key``, or ``None`` for the primary.
+
+        ``key=None`` means reads across chat sessions, which wait for every
+        recent write.  ``consistent=False`` skips read-your-writes entirely.
+        """
+        candidates = [replica for replica in self.replicas if replica.healthy]
+        if candidates and consistent:
+            primary_only, lsn = self._required_lsn(key)
+            if primary_only:
+                candidates = []
+            elif lsn is not None:
+                candidates = [
+                    replica
+                    for replica in candidates
+                    if replica.replay_lsn is not None and replica.replay_lsn >= lsn
+                ]
+        chosen = candidates[next(self._turn) % len(candidates)] if candidates else None
+        with self._lock:
+            self.routed["replica" if chosen is not None else "primary"] += 1
+        return chosen
+
+    def check(self) -> None:
+        """Probe every replica once and update the rotation."""
+        if self.primary.dialect.name == "postgresql":
+            try:
+                with self.primary.connect() as connection:
+                    self.primary_lsn = parse_lsn(connection.exec_driver_sql(_PG_CURRENT_LSN_SQL).scalar())
+            except exc.SQLAlchemyError:
+                self.primary_lsn = None
+        for replica in self.replicas:
+            replica.probe(self.primary_lsn, self.max_lag)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._monitor, name="db-replica-monitor", daemon=True)
+                self._thread.start()
+
+    def _monitor(self) -> None:
+        while True:
+            try:
+                self.check()
+            except Exception:
+                logger.warning("Read replica check failed", exc_info=True)
+            if self._stop.wait(self.check_interval):
+                return
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join(timeout)
+        for replica in self.replicas:
+            replica.dispose()
+
+    async def dispose_async(self) -> None:
+        for replica in self.replicas:
+            await replica.dispose_async()
+
+    def status(self) -> dict:
+        with self._lock:
+            routed = dict(self.routed)
+            tracked = len(self._writes)
+        return {
+            "sticky_seconds": self.sticky_seconds,
+            "max_lag_seconds": self.max_lag,
+            "primary_lsn": self.primary_lsn,
+            "tracked_sessions": tracked,
+            "routed": routed,
+            "replicas": [replica.status() for replica in self.replicas],
+        }
+
+
+__all__ = ["ANY_SESSION", "Replica", "ReplicaSet", "parse_lsn"]
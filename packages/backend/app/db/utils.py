@@ -1,12 +1,19 @@
 from __future__ import annotations
 
-from contextlib import contextmanager
-from typing import Generator, Optional
+from contextlib import asynccontextmanager, contextmanager
+from typing import TYPE_CHECKING, AsyncGenerator, Callable, Generator, Optional, TypeVar
 
+from fastapi import Request
 from sqlalchemy.orm import Session as DbSession
 
+from ..config import get_settings
 from .database import Database, get_database
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
 
 @contextmanager
 def get_db(database: Optional[Database] = None) -> Generator[DbSession, None, None]:
@@ -32,4 +39,161 @@ def transaction_scope(database: Optional[Database] = None) -> Generator[DbSessio
         session.close()
 
 
-__all__ = ["get_db", "transaction_scope"]
+@contextmanager
+def get_read_db(
+    database: Optional[Database] = None,
+    *,
+    key: Optional[str] = None,
+    consistent: bool = True,
+) -> Generator[DbSession, None, None]:
+    """``get_db`` for read-only work; see :meth:`Database.read_session`."""
+    db_instance = database or get_database()
+    session = db_instance.read_session(key, consistent=consistent)
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def run_write(
+    unit: Callable[[DbSession], T],
+    database: Optional[Database] = None,
+    *,
+    session: Optional[DbSession] = None,
+) -> T:
+    """Run ``unit(session)`` in a committed transaction of its own.
+
+    With the SQLite write queue enabled the unit runs on the writer thread,
+    batched with other queued writes; otherwise in a ``transaction_scope``.
+
+    ``session`` is the caller's request session.  Its pending work is
+    committed first so the writer never waits on its lock; without the
+    write queue (or for a session on another database) the unit runs on it
+    instead and it is committed.
+    """
+    db_instance = database or get_database()
+    writer = db_instance.writer
+    if session is not None and (writer is None or session.get_bind() is not db_instance.engine):
+        result = unit(session)
+        session.commit()
+        return result
+    if writer is not None:
+        if session is not None:
+            session.commit()
+        return writer.run(unit)
+    with transaction_scope(db_instance) as scoped:
+        return unit(scoped)
+
+
+class TurnSessions:
+    """Sessions for one chat turn: at most ``limit``, handed out round-robin.
+
+    Sub-agents run as tasks on one event loop and every database unit they
+    run is synchronous and ends in commit or rollback, so two of them sharing
+    a session never interleave inside a transaction.  A session only holds a
+    pooled connection while such a unit runs, so a turn with many sub-agents
+    still draws at most ``limit`` connections for them.
+    """
+
+    def __init__(self, database: Optional[Database] = None, limit: Optional[int] = None) -> None:
+        self._database = database
+        self._limit = max(1, limit if limit is not None else get_settings().db_turn_max_sessions)
+        self._sessions: list[DbSession] = []
+        self._next = 0
+
+    def acquire(self) -> DbSession:
+        if len(self._sessions) < self._limit:
+            session = (self._database or get_database()).session()
+            self._sessions.append(session)
+            return session
+        session = self._sessions[self._next % len(self._sessions)]
+        self._next += 1
+        return session
+
+    def close(self) -> None:
+        for session in self._sessions:
+            try:
+                session.close()
+            except Exception:
+                pass
+        self._sessions.clear()
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+@asynccontextmanager
+async def get_async_db(database: Optional[Database] = None) -> AsyncGenerator["AsyncSession", None]:
+    db_instance = database or get_database()
+    session = db_instance.async_session()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+@asynccontextmanager
+async def async_transaction_scope(database: Optional[Database] = None) -> AsyncGenerator["AsyncSession", None]:
+    db_instance = database or get_database()
+    session = db_instance.async_session()
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+@asynccontextmanager
+async def get_async_read_db(
+    database: Optional[Database] = None,
+    *,
+    key: Optional[str] = None,
+    consistent: bool = True,
+) -> AsyncGenerator["AsyncSession", None]:
+    db_instance = database or get_database()
+    session = db_instance.async_read_session(key, consistent=consistent)
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def get_async_db_session() -> AsyncGenerator["AsyncSession", None]:
+    """FastAPI dependency: the async counterpart of each router's ``_get_db_session``."""
+    async with get_async_db() as session:
+        yield session
+
+
+def get_read_db_session(request: Request) -> Generator[DbSession, None, None]:
+    """FastAPI dependency for read-only handlers, routed by the path's ``session_id``."""
+    with get_read_db(key=request.path_params.get("session_id")) as session:
+        yield session
+
+
+async def get_async_read_db_session(request: Request) -> AsyncGenerator["AsyncSession", None]:
+    async with get_async_read_db(key=request.path_params.get("session_id")) as session:
+        yield session
+
+
+def is_replica_session(session) -> bool:
+    return "replica" in session.info
+
+
+__all__ = [
+    "TurnSessions",
+    "async_transaction_scope",
+    "get_async_db",
+    "get_async_db_session",
+    "get_async_read_db",
+    "get_async_read_db_session",
+    "get_db",
+    "get_read_db",
+    "get_read_db_session",
+    "is_replica_session",
+    "run_write",
+    "transaction_scope",
+]
@@ -0,0 +1,173 @@
+"""Single-writer queue for SQLite.
+
+SQLite admits one writer at a time; concurrent writers on separate
+connections spin in ``busy_timeout`` and eventually fail with "database is
+locked".  ``SQLiteWriter`` owns the only writing connection: callers submit
+write units (``unit(session) -> result``) and get futures back, and a
+dedicated thread runs queued units in order, several per transaction.
+Reads keep using the regular pool, which WAL lets proceed alongside.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Optional, TypeVar
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session as DbSession, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from .database import _set_sqlite_pragmas
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+_STOP = object()
+
+
+class SQLiteWriter:
+    """Runs queued write units on one thread and one connection, in submission order.
+
+    Up to ``batch_size`` units that are queued together (or arrive within
+    ``batch_window`` seconds of the first) share one transaction; each runs
+    in its own savepoint, so a failing unit is rolled back and reported on
+    its future without affecting the rest.  A unit that rolls back the whole
+    transaction instead fails alone too: the units before it in the batch are
+    run again in a fresh transaction, so units must be safe to re-run after
+    a rollback.  Futures resolve after commit.
+    """
+
+    def __init__(self, url: str, *, batch_size: int = 64, batch_window: float = 0.002) -> None:
+        self.url = url
+        self.batch_size = max(1, batch_size)
+        self.batch_window = max(0.0, batch_window)
+        self.engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False, "timeout": 30},
+            poolclass=StaticPool,
+        )
+        event.listen(self.engine, "connect", _writer_connect)
+        event.listen(self.engine, "begin", _begin_immediate)
+        self._sessionmaker = sessionmaker(bind=self.engine, autoflush=False, expire_on_commit=False)
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._session: Optional[DbSession] = None
+        self.batches = 0
+        self.units = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="sqlite-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Finish everything already queued, then stop the thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+        self.engine.dispose()
+
+    def submit(self, unit: Callable[[DbSession], T]) -> "Future[T]":
+        future: "Future[T]" = Future()
+        if threading.current_thread() is self._worker:
+            # A unit that writes again (e.g. emits an event) joins its own transaction.
+            try:
+                with self._session.begin_nested():
+                    future.set_result(unit(self._session))
+            except BaseException as exc:
+                future.set_exception(exc)
+            return future
+        self.start()
+        self._queue.put((unit, future))
+        return future
+
+    def run(self, unit: Callable[[DbSession], T], timeout: Optional[float] = None) -> T:
+        """``submit`` and wait for the committed result."""
+        return self.submit(unit).result(timeout)
+
+    def _loop(self) -> None:
+        self._worker = threading.current_thread()
+        while True:
+            item = self._queue.get()
+            stopping = item is _STOP
+            batch = [] if stopping else [item]
+            while len(batch) < self.batch_size:
+                try:
+                    if self.batch_window:
+                        item = self._queue.get(timeout=self.batch_window)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    continue
+                batch.append(item)
+            if batch:
+                self._run_batch(batch)
+            if stopping and self._queue.empty():
+                return
+
+    def _run_batch(self, batch: list) -> None:
+        session = self._sessionmaker()
+        self._session = session
+        pending = deque(item for item in batch if item[1].set_running_or_notify_cancel())
+        done: list[tuple[Callable, Future, Any]] = []
+        try:
+            session.begin()
+            root = session.get_transaction()
+            while pending:
+                unit, future = pending.popleft()
+                try:
+                    with session.begin_nested():
+                        result = unit(session)
+                except BaseException as exc:
+                    future.set_exception(exc)
+                    if session.get_transaction() is not root:
+                        # The unit rolled back the whole transaction, not just its
+                        # savepoint: run the units it took with it again in a fresh one.
+                        pending.extendleft((earlier, waiter) for earlier, waiter, _ in reversed(done))
+                        done = []
+                        session.rollback()
+                        session.begin()
+                        root = session.get_transaction()
+                    continue
+                done.append((unit, future, result))
+            session.commit()
+        except BaseException as exc:
+            logger.warning("SQLite write batch failed", exc_info=True)
+            session.rollback()
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        finally:
+            self._session = None
+            session.close()
+        self.batches += 1
+        self.units += len(done)
+        for _, future, result in done:
+            future.set_result(result)
+
+
+def _writer_connect(dbapi_connection, connection_record) -> None:
+    # Let SQLAlchemy (not the sqlite3 module) issue BEGIN so savepoints nest properly.
+    dbapi_connection.isolation_level = None
+    _set_sqlite_pragmas(dbapi_connection, connection_record)
+
+
+def _begin_immediate(connection) -> None:
+    # Take the write lock up front instead of upgrading a read lock mid-batch.
+    connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+__all__ = ["SQLiteWriter"]
@@ -0,0 +1,74 @@
+"""Benchmark driver that runs ``EngineOrchestrator`` sessions against the stub.
+
+Reuses the offline harness from ``ic.bench`` but goes through the full web
+path: DB-backed write/edit tools, the EventBridge, deferred persistence and
+per-sub-agent DB sessions.  A throwaway SQLite database is created per run.
+
+    python -m app.engine.bench --scenario parallel --sessions 8
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+from typing import AsyncIterator
+
+from ..config import update_runtime_overrides
+from ..db.database import get_database, reset_database
+from ..db.migrations import init_db
+from ..db.models import Session as SessionModel
+from ..db.utils import transaction_scope
+from ..events.emitter import EventEmitter
+from .orchestrator import EngineOrchestrator
+
+
+def orchestrator_driver(base_url: str, database_url: str | None = None):
+    """Return an ``ic.bench`` session driver backed by ``EngineOrchestrator``."""
+    from ic.bench.runner import BENCH_MODEL
+
+    if database_url is None:
+        db_dir = Path(tempfile.mkdtemp(prefix="ic-bench-db-"))
+        database_url = f"sqlite:///{db_dir / 'bench.db'}"
+    update_runtime_overrides({
+        "database_url": database_url,
+        "default_base_url": base_url,
+        "default_key": "bench",
+        "openai_api_key": "bench",
+        "model": BENCH_MODEL,
+    })
+    reset_database()
+    database = get_database()
+    init_db(database)
+
+    async def _run(index: int, workspace: Path, prompts: list[str]) -> AsyncIterator[None]:
+        session_id = uuid.uuid4().hex
+        with transaction_scope(database) as db:
+            db.add(SessionModel(id=session_id, title=f"bench-{index}"))
+
+        db = database.session()
+        try:
+            session = db.get(SessionModel, session_id)
+            for prompt in prompts:
+                orchestrator = EngineOrchestrator(
+                    db, session, EventEmitter(session_id=session_id),
+                )
+                last = None
+                async for response in orchestrator.stream_responses(
+                    user_message=prompt, output_dir=str(workspace),
+                ):
+                    last = response
+                if last is None or last.action == "error":
+                    raise RuntimeError(last.message if last else "no response")
+                yield
+        finally:
+            db.close()
+
+    return _run
+
+
+if __name__ == "__main__":
+    from ic.bench.__main__ import main
+
+    sys.exit(main(make_driver=orchestrator_driver, prog="python -m app.engine.bench"))
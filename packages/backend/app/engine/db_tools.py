@@ -50,6 +50,16 @@ def _slug_from_filename(file_path: str) -> str:
     return slug[:40] or "page"
 
 
+def _reset_session(db_session: Any) -> None:
+    # Sessions are shared across sub-agents; never leave one mid-transaction.
+    if db_session is None:
+        return
+    try:
+        db_session.rollback()
+    except Exception:
+        logger.debug("Rollback after failed persistence failed", exc_info=True)
+
+
 def _title_from_slug(slug: str) -> str:
     return slug.replace("-", " ").title()
 
@@ -66,31 +76,35 @@ def persist_html_page(
 
     This is the single source of truth for HTML→DB persistence, used by
     both ``DBWriteFile``, ``DBEditFile``, and the workspace-sync logic.
+    The write runs through ``run_write``, on the SQLite writer when enabled.
     """
     if not db_session or not session_id:
         return
+    from ..db.utils import run_write
     from ..services.page import PageService
     from ..services.page_version import PageVersionService
 
     slug = _slug_from_filename(file_path)
     title = _title_from_slug(slug)
 
-    page_svc = PageService(db_session, event_emitter=emitter)
-    version_svc = PageVersionService(db_session, event_emitter=emitter)
-
-    page = page_svc.get_by_slug(session_id, slug)
-    if page is None:
-        pages = page_svc.list_by_session(session_id)
-        order = len(pages)
-        page = page_svc.create(
-            session_id=session_id,
-            title=title,
-            slug=slug,
-            order_index=order,
-        )
+    def write(db: Any) -> None:
+        page_svc = PageService(db, event_emitter=emitter)
+        version_svc = PageVersionService(db, event_emitter=emitter)
+
+        page = page_svc.get_by_slug(session_id, slug)
+        if page is None:
+            pages = page_svc.list_by_session(session_id)
+            order = len(pages)
+            page = page_svc.create(
+                session_id=session_id,
+                title=title,
+                slug=slug,
+                order_index=order,
+            )
+
+        version_svc.create_version(page.id, html=content, description=description)
 
-    version_svc.create_version(page.id, html=content, description=description)
-    db_session.commit()
+    run_write(write, session=db_session)
 
 
 class DBWriteFile(WriteFile):
@@ -129,6 +143,7 @@ class DBWriteFile(WriteFile):
                 self._persist_html_page(file_path, content)
         except Exception:
             logger.exception("DB persistence failed for %s", file_path)
+            _reset_session(self._db)
 
         return result
 
@@ -206,6 +221,7 @@ class DBEditFile(EditFile):
                     self._persist_html_page(file_path, updated_content)
         except Exception:
             logger.exception("DB persistence failed for edit of %s", file_path)
+            _reset_session(self._db)
 
         return result
 
@@ -281,6 +297,7 @@ class DBMultiEditFile(MultiEditFile):
                     self._persist_html_page(file_path, updated_content)
         except Exception:
             logger.exception("DB persistence failed for multi_edit of %s", file_path)
+            _reset_session(self._db)
 
         return result
 
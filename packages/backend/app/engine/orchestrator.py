@@ -18,6 +18,7 @@ from sqlalchemy.orm import Session as DbSession
 from ..schemas.orchestrator_response import OrchestratorResponse
 from ..config import get_settings
 from ..db.models import Session as SessionModel
+from ..db.utils import TurnSessions
 from ..events.emitter import EventEmitter
 from ..events.models import DoneEvent, ErrorEvent
 from ..services.message import MessageService
@@ -53,7 +54,7 @@ class EngineOrchestrator:
         )
         self._engine = None
         self.thread_id: str | None = None
-        self._sub_agent_sessions: list[DbSession] = []
+        self._sub_agent_sessions = TurnSessions(limit=self.settings.db_turn_max_sessions)
         self._deferred_buffer = DeferredPersistenceBuffer()
 
     @property
@@ -67,12 +68,9 @@ class EngineOrchestrator:
     def _create_sub_agent_tools(self, sub_engine: Any) -> list:
         """Tool factory for sub-agents: returns DB-backed WriteFile/EditFile.
 
-        Each sub-agent gets its own DbSession for concurrency safety.
+        Sub-agents share the turn's bounded set of sessions (see TurnSessions).
         """
-        from ..db.database import get_database
-
-        sub_db = get_database().session()
-        self._sub_agent_sessions.append(sub_db)
+        sub_db = self._sub_agent_sessions.acquire()
 
         ws = Path(sub_engine.workspace) if sub_engine.workspace else None
         return [
@@ -415,11 +413,10 @@ class EngineOrchestrator:
             # an empty message to avoid _stream_message_payload re-chunking.
             if text:
                 try:
-                    MessageService(self.db).add_message(
+                    MessageService(self.db).record_message(
                         self.session.id, "assistant", text,
                         thread_id=self.thread_id,
                     )
-                    self.db.commit()
                 except Exception:
                     logger.exception("Failed to persist engine assistant message")
 
@@ -482,13 +479,7 @@ class EngineOrchestrator:
             )
         finally:
             engine_registry.unregister(self.session.id)
-            # Close sub-agent DB sessions
-            for sub_db in self._sub_agent_sessions:
-                try:
-                    sub_db.close()
-                except Exception:
-                    pass
-            self._sub_agent_sessions.clear()
+            self._sub_agent_sessions.close()
 
     def _resolve_workspace(self, output_dir: str) -> str:
         """Get or create a workspace directory for this session."""
@@ -375,6 +375,10 @@ def refine_waiting_event(payload: Optional[Dict[str, Any]] = None) -> WorkflowEv
     return workflow_event(EventType.REFINE_WAITING, payload)
 
 
+def build_queued_event(*, position: int, slots: Optional[int] = None) -> WorkflowEvent:
+    return workflow_event(EventType.BUILD_QUEUED, {"position": position, "slots": slots})
+
+
 def build_start_event(payload: Optional[Dict[str, Any]] = None) -> WorkflowEvent:
     return workflow_event(EventType.BUILD_START, payload)
 
@@ -52,6 +52,7 @@ class EventType(str, Enum):
     REFINE_START = "refine_start"
     REFINE_COMPLETE = "refine_complete"
     REFINE_WAITING = "refine_waiting"
+    BUILD_QUEUED = "build_queued"
     BUILD_START = "build_start"
     BUILD_PROGRESS = "build_progress"
     BUILD_COMPLETE = "build_complete"
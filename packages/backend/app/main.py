@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import threading
 from contextlib import asynccontextmanager
 from pathlib import Path
 
@@ -31,12 +33,19 @@ from .api import (
 )
 from .config import get_settings
 from .db.data_migration_v04 import migrate_existing_sessions
-from .db.migrations import init_db
+from .db.migrations import backfill_v12_html_blobs, backfill_v13_snapshot_page_refs, init_db
 from .db.database import get_database
+from .renderer.builder import ReactSSGBuilder
+from .renderer.dependency_cache import start_warm_up
+from .renderer.build_worker import shutdown_build_workers
+from .renderer.postprocess import shutdown_pool as shutdown_shell_pool
 from .services.app_data_store import close_app_data_store, initialize_app_data_store
+from .services.cleanup import CleanupPolicy, CleanupWorker
 
 logger = logging.getLogger(__name__)
 
+_WARM_UP_SHUTDOWN_WAIT = 5.0
+
 
 def _resolve_cors_options() -> tuple[list[str], bool, list[str], list[str]]:
     settings = get_settings()
@@ -57,6 +66,11 @@ def _resolve_cors_options() -> tuple[list[str], bool, list[str], list[str]]:
     )
 
 
+def _backfill_html_blobs(database) -> None:
+    backfill_v12_html_blobs(database)
+    backfill_v13_snapshot_page_refs(database)
+
+
 @asynccontextmanager
 async def _lifespan(_: FastAPI):
     database = get_database()
@@ -64,11 +78,48 @@ async def _lifespan(_: FastAPI):
     settings = get_settings()
     if settings.migrate_v04_on_startup:
         migrate_existing_sessions(database)
+    if settings.html_blob_backfill_on_startup:
+        # Online: unmoved rows stay readable from the inline column meanwhile.
+        threading.Thread(
+            target=_backfill_html_blobs,
+            args=(database,),
+            name="html-blob-backfill",
+            daemon=True,
+        ).start()
+    cleanup_worker = None
+    if settings.cleanup_interval_seconds > 0:
+        cleanup_worker = CleanupWorker(
+            database.session,
+            CleanupPolicy(
+                chunk_size=settings.cleanup_chunk_size,
+                time_budget_seconds=settings.cleanup_time_budget_seconds,
+                pause_seconds=settings.cleanup_pause_seconds,
+            ),
+            settings.cleanup_interval_seconds,
+        )
+        cleanup_worker.start()
     await initialize_app_data_store()
+    # Prepare the build template's node_modules in the background so the
+    # first build attaches it instead of running npm install.
+    warm_up = start_warm_up(ReactSSGBuilder.TEMPLATE_PATH)
     try:
         yield
     finally:
+        if not warm_up.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(warm_up), timeout=_WARM_UP_SHUTDOWN_WAIT)
+            except asyncio.TimeoutError:
+                # Detached: the daemon thread dies with the process and the
+                # half-built staging dir is collected by the next gc().
+                logger.info("Leaving node_modules cache warm-up detached at shutdown")
+        if cleanup_worker is not None:
+            cleanup_worker.stop(timeout=settings.cleanup_time_budget_seconds + 1.0)
         await close_app_data_store()
+        await database.dispose_async()
+        database.stop_writer(timeout=5.0)
+        database.stop_replicas(timeout=5.0)
+        shutdown_shell_pool()
+        await shutdown_build_workers()
 
 
 def create_app() -> FastAPI:
@@ -151,6 +202,24 @@ def create_app() -> FastAPI:
 
         return {"status": overall, "checks": checks}
 
+    @app.get("/health/db")
+    def health_db() -> dict:
+        """Connection pool occupancy and checkout waits; size the pool from these."""
+        settings = get_settings()
+        database = get_database()
+        return {
+            "pools": database.pool_status(),
+            "replicas": database.replica_status(),
+            "config": {
+                "pool_size": settings.db_pool_size,
+                "max_overflow": settings.db_pool_max_overflow,
+                "pool_timeout": settings.db_pool_timeout,
+                "pool_recycle": settings.db_pool_recycle,
+                "pool_pre_ping": settings.db_pool_pre_ping,
+                "turn_max_sessions": settings.db_turn_max_sessions,
+            },
+        }
+
     return app
 
 
@@ -1,13 +1,22 @@
 """Renderer utilities for React SSG builds."""
 
+from .build_scheduler import BuildPriority, BuildScheduler
 from .builder import BuildError, ReactSSGBuilder
+from .conversion_cache import ConversionCache
+from .dependency_cache import DependencyCache
 from .file_generator import SchemaFileGenerator
 from .html_to_react import ConvertedFile, HtmlToReactConverter, PageHtml
+from .incremental import BuildWorkspace
 from .tsx_writer import TsxFileWriter
 
 __all__ = [
     "BuildError",
+    "BuildPriority",
+    "BuildScheduler",
+    "BuildWorkspace",
+    "ConversionCache",
     "ConvertedFile",
+    "DependencyCache",
     "HtmlToReactConverter",
     "PageHtml",
     "ReactSSGBuilder",
@@ -0,0 +1,236 @@
+"""Process-wide scheduler for React SSG builds.
+
+Each build runs ``npm``/Vite in a work dir and is heavy on CPU, memory and
+disk, so only a fixed number of builds run at once ("slots").  Requests
+beyond that wait in a priority queue: interactive builds (a user pressed
+"build") go ahead of background rebuilds, and requests of the same priority
+run in arrival order.
+
+A session has at most one queued build.  Requesting another while one is
+queued replaces it (the newest inputs win) without losing its place, and a
+session never runs two builds at once: a request made while its build is
+running waits until that build finishes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import enum
+import itertools
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from threading import Event
+from typing import Awaitable, Callable
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+BuildRunner = Callable[[Event], Awaitable[None]]
+PositionCallback = Callable[[int], None]
+
+
+class BuildPriority(str, enum.Enum):
+    INTERACTIVE = "interactive"
+    BACKGROUND = "background"
+
+    @property
+    def rank(self) -> int:
+        return 0 if self is BuildPriority.INTERACTIVE else 1
+
+
+@dataclass
+class BuildTicket:
+    """One requested build, queued or running."""
+
+    session_id: str
+    run: BuildRunner
+    priority: BuildPriority
+    order: int
+    on_position: PositionCallback | None = None
+    cancel_event: Event = field(default_factory=Event)
+    task: asyncio.Task | None = None
+    position: int = 0  # last reported queue position, 0 once running
+
+    def sort_key(self) -> tuple[int, int]:
+        return (self.priority.rank, self.order)
+
+
+def default_build_slots(memory_per_slot_mb: int) -> int:
+    """Half the CPUs, capped by how many builds fit in physical memory."""
+    slots = max(1, (os.cpu_count() or 1) // 2)
+    memory = _physical_memory_bytes()
+    if memory and memory_per_slot_mb > 0:
+        slots = min(slots, max(1, memory // (memory_per_slot_mb * 1024 * 1024)))
+    return slots
+
+
+def _physical_memory_bytes() -> int | None:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+class BuildScheduler:
+    """Runs at most ``slots`` builds at a time from a priority queue.
+
+    All methods must be called from the event loop the builds run on.
+    """
+
+    def __init__(self, slots: int) -> None:
+        self.slots = max(1, slots)
+        self._queue: list[BuildTicket] = []
+        self._running: dict[str, BuildTicket] = {}
+        self._order = itertools.count()
+
+    def submit(
+        self,
+        session_id: str,
+        run: BuildRunner,
+        *,
+        priority: BuildPriority = BuildPriority.INTERACTIVE,
+        on_position: PositionCallback | None = None,
+    ) -> BuildTicket:
+        """Queue a build for ``session_id``; ``run`` receives its cancel event.
+
+        A build already queued for the session is replaced by this one; it
+        keeps the earlier place in line and the higher of the two priorities.
+        """
+        previous = self._queued(session_id)
+        if previous is not None:
+            self._queue.remove(previous)
+            order = previous.order
+            if previous.priority.rank < priority.rank:
+                priority = previous.priority
+            logger.info("Coalesced queued build for session %s", session_id)
+        else:
+            order = next(self._order)
+        ticket = BuildTicket(
+            session_id=session_id,
+            run=run,
+            priority=priority,
+            order=order,
+            on_position=on_position,
+        )
+        self._queue.append(ticket)
+        self._queue.sort(key=BuildTicket.sort_key)
+        self._dispatch()
+        return ticket
+
+    def cancel(self, session_id: str) -> bool:
+        """Cancel the session's queued and running builds; True if any existed."""
+        found = False
+        queued = self._queued(session_id)
+        if queued is not None:
+            self._queue.remove(queued)
+            queued.cancel_event.set()
+            found = True
+        running = self._running.get(session_id)
+        if running is not None:
+            running.cancel_event.set()
+            if running.task is not None and not running.task.done():
+                running.task.cancel()
+            found = True
+        if queued is not None:
+            self._report_positions()
+        return found
+
+    def position(self, session_id: str) -> int | None:
+        """1-based place in the queue, 0 while running, ``None`` if neither."""
+        for position, ticket in enumerate(self._queue, start=1):
+            if ticket.session_id == session_id:
+                return position
+        if session_id in self._running:
+            return 0
+        return None
+
+    def is_queued(self, session_id: str) -> bool:
+        return self._queued(session_id) is not None
+
+    def is_running(self, session_id: str) -> bool:
+        return session_id in self._running
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    # -- internals -----------------------------------------------------
+
+    def _queued(self, session_id: str) -> BuildTicket | None:
+        for ticket in self._queue:
+            if ticket.session_id == session_id:
+                return ticket
+        return None
+
+    def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        for ticket in list(self._queue):
+            if len(self._running) >= self.slots:
+                break
+            if ticket.session_id in self._running:
+                continue  # one build per session; waits for the running one
+            self._queue.remove(ticket)
+            self._running[ticket.session_id] = ticket
+            ticket.position = 0
+            ticket.task = loop.create_task(self._execute(ticket))
+        self._report_positions()
+
+    async def _execute(self, ticket: BuildTicket) -> None:
+        try:
+            await ticket.run(ticket.cancel_event)
+        except asyncio.CancelledError:
+            logger.info("Build for session %s cancelled", ticket.session_id)
+        except Exception:
+            logger.exception("Build for session %s failed", ticket.session_id)
+        finally:
+            if self._running.get(ticket.session_id) is ticket:
+                del self._running[ticket.session_id]
+            self._dispatch()
+
+    def _report_positions(self) -> None:
+        for position, ticket in enumerate(self._queue, start=1):
+            if ticket.position == position:
+                continue
+            ticket.position = position
+            if ticket.on_position is None:
+                continue
+            try:
+                ticket.on_position(position)
+            except Exception:
+                logger.exception("Failed to report queue position for %s", ticket.session_id)
+
+
+# ---------------------------------------------------------------------------
+# Shared instance
+# ---------------------------------------------------------------------------
+
+_build_scheduler: BuildScheduler | None = None
+_build_scheduler_lock = threading.Lock()
+
+
+def get_build_scheduler() -> BuildScheduler:
+    """Process-wide scheduler sized from settings (``BUILD_SLOTS``, 0 = auto)."""
+    global _build_scheduler
+    with _build_scheduler_lock:
+        if _build_scheduler is None:
+            settings = get_settings()
+            slots = settings.build_slots or default_build_slots(settings.build_slot_memory_mb)
+            logger.info("Build scheduler running %d slot(s)", slots)
+            _build_scheduler = BuildScheduler(slots)
+        return _build_scheduler
+
+
+__all__ = [
+    "BuildPriority",
+    "BuildScheduler",
+    "BuildTicket",
+    "default_build_slots",
+    "get_build_scheduler",
+]
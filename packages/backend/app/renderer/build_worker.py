@@ -0,0 +1,398 @@
+"""Persistent Node build workers.
+
+``npm run build:client`` and ``npm run prerender`` each pay for Node start-up
+and for loading Vite, its plugins, Tailwind and tsx before doing any work.
+A build worker (``scripts/build-worker.mjs`` in the template) keeps those
+loaded and runs jobs sent as JSON lines on its stdin; see that script for the
+protocol.
+
+Workers are pooled by the ``node_modules`` they resolve from (and the
+``NODE_OPTIONS`` they were started with), so sessions sharing a dependency
+cache entry share warm workers.  Nothing else about the session that started
+a worker sticks to it: every job carries its own root, cwd and environment.
+Each worker runs one job at a time.  Workers are replaced after ``max_builds`` jobs or once their
+RSS passes ``max_rss_mb`` (every prerender loads the session's sources as
+fresh modules, which Node never unloads), when a health-check ping fails, and
+after a job is cancelled or times out.
+
+Failures to start or talk to a worker raise :class:`WorkerUnavailable`;
+callers fall back to running the npm scripts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from threading import Event
+from typing import Any, AsyncIterator, Mapping, Sequence
+
+from ..config import get_settings
+from .process import (
+    CommandCancelled,
+    CommandResult,
+    CommandTimeout,
+    LineCallback,
+    _signal,
+    terminate,
+    wait_for_event,
+)
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = Path("scripts") / "build-worker.mjs"
+# Vite's own log lines (and minified error output) can be long.
+_LINE_LIMIT = 1024 * 1024
+STARTUP_TIMEOUT_SECONDS = 30.0
+PING_TIMEOUT_SECONDS = 5.0
+# Idle workers are pinged before reuse once they have sat this long.
+HEALTH_CHECK_SECONDS = 60.0
+
+
+class WorkerUnavailable(Exception):
+    pass
+
+
+class BuildWorker:
+    """One long-lived Node build worker process."""
+
+    def __init__(
+        self,
+        command: Sequence[str],
+        *,
+        cwd: Path,
+        env: Mapping[str, str] | None = None,
+        max_builds: int = 50,
+        max_rss_mb: int = 1024,
+    ) -> None:
+        self.command = list(command)
+        self.cwd = Path(cwd)
+        self.env = dict(env) if env is not None else None
+        self.max_builds = max_builds
+        self.max_rss_mb = max_rss_mb
+        self.builds = 0
+        self.rss = 0
+        self.last_used = time.monotonic()
+        self._process: asyncio.subprocess.Process | None = None
+        self._ids = itertools.count(1)
+        self._on_line: LineCallback | None = None
+        self._stderr_task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    @property
+    def exhausted(self) -> bool:
+        """True once the worker should be recycled rather than reused."""
+        if self.max_builds > 0 and self.builds >= self.max_builds:
+            return True
+        return self.max_rss_mb > 0 and self.rss > self.max_rss_mb * 1024 * 1024
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                *self.command,
+                cwd=str(self.cwd),
+                env=self.env,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=os.name == "posix",
+                limit=_LINE_LIMIT,
+            )
+        except OSError as exc:
+            raise WorkerUnavailable(f"could not start build worker: {exc}") from exc
+        self._stderr_task = asyncio.ensure_future(self._drain_stderr())
+        try:
+            await asyncio.wait_for(self._read_until(None, "ready"), STARTUP_TIMEOUT_SECONDS)
+        except (asyncio.TimeoutError, WorkerUnavailable) as exc:
+            await self.close()
+            raise WorkerUnavailable(f"build worker did not start: {str(exc) or 'timed out'}") from None
+        logger.info("Build worker %d started for %s", self._process.pid, self.cwd)
+
+    async def run(
+        self,
+        op: str,
+        root: Path,
+        *,
+        only: Sequence[str] | None = None,
+        env: Mapping[str, str] | None = None,
+        timeout: float | None = None,
+        cancel_event: Event | None = None,
+        on_line: LineCallback | None = None,
+    ) -> CommandResult:
+        """Run one job; output lines go to ``on_line`` as with ``run_command``.
+
+        The job runs in ``root`` with ``env`` as its environment (the
+        worker's own when omitted), whichever session started the worker.
+        A failed job returns a non-zero ``returncode`` with the error as
+        ``stderr``.  Cancellation and timeouts kill the worker and raise
+        :class:`CommandCancelled` / :class:`CommandTimeout`.
+        """
+        stdout: list[str] = []
+        stderr: list[str] = []
+
+        def collect(stream: str, line: str) -> None:
+            (stdout if stream == "stdout" else stderr).append(line + "\n")
+            if on_line is not None:
+                try:
+                    on_line(stream, line)
+                except Exception:
+                    logger.debug("Build worker output callback failed", exc_info=True)
+
+        request: dict[str, Any] = {
+            "id": next(self._ids),
+            "op": op,
+            "root": str(root),
+            "cwd": str(root),
+        }
+        if only:
+            request["only"] = list(only)
+        if env is not None:
+            request["env"] = dict(env)
+        self._on_line = collect
+        try:
+            result = await self._request(request, timeout=timeout, cancel_event=cancel_event)
+        finally:
+            self._on_line = None
+        self.builds += 1
+        if result.get("ok"):
+            return CommandResult(0, "".join(stdout), "".join(stderr))
+        stderr.append(str(result.get("error") or "Build worker job failed") + "\n")
+        return CommandResult(1, "".join(stdout), "".join(stderr))
+
+    async def ping(self, timeout: float = PING_TIMEOUT_SECONDS) -> bool:
+        if not self.alive:
+            return False
+        try:
+            result = await self._request({"id": next(self._ids), "op": "ping"}, timeout=timeout)
+        except (CommandTimeout, WorkerUnavailable):
+            await self.close()
+            return False
+        return bool(result.get("ok"))
+
+    async def close(self) -> None:
+        process = self._process
+        if process is not None and process.returncode is None:
+            if process.stdin is not None:
+                process.stdin.close()
+            try:
+                await asyncio.wait_for(process.wait(), 2.0)
+            except asyncio.TimeoutError:
+                await terminate(process)
+        if self._stderr_task is not None:
+            self._stderr_task.cancel()
+            self._stderr_task = None
+
+    def kill(self) -> None:
+        """Stop the worker without awaiting it (e.g. its loop is gone)."""
+        if self.alive:
+            assert self._process is not None
+            _signal(self._process, force=True)
+
+    async def _request(
+        self,
+        request: dict[str, Any],
+        *,
+        timeout: float | None = None,
+        cancel_event: Event | None = None,
+    ) -> dict[str, Any]:
+        process = self._process
+        if process is None or process.stdin is None or not self.alive:
+            raise WorkerUnavailable("build worker is not running")
+        try:
+            process.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+            await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as exc:
+            raise WorkerUnavailable(f"build worker closed its input: {exc}") from None
+
+        reply = asyncio.ensure_future(self._read_until(request["id"], "result"))
+        waiters = {reply}
+        cancel_watch = None
+        if cancel_event is not None:
+            cancel_watch = asyncio.ensure_future(wait_for_event(cancel_event))
+            waiters.add(cancel_watch)
+        try:
+            done, _ = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        except BaseException:
+            reply.cancel()
+            await terminate(process)
+            raise
+        finally:
+            if cancel_watch is not None:
+                cancel_watch.cancel()
+        if reply not in done:
+            # The job may still be running; only a fresh worker is safe.
+            reply.cancel()
+            await terminate(process)
+            if cancel_watch is not None and cancel_watch in done:
+                raise CommandCancelled()
+            raise CommandTimeout(timeout or 0.0)
+        result = reply.result()
+        self.rss = int(result.get("rss") or self.rss)
+        self.last_used = time.monotonic()
+        return result
+
+    async def _read_until(self, request_id: int | None, kind: str) -> dict[str, Any]:
+        assert self._process is not None and self._process.stdout is not None
+        stream = self._process.stdout
+        while True:
+            raw = await stream.readline()
+            if not raw:
+                raise WorkerUnavailable("build worker exited")
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                message = {"type": "log", "stream": "stdout", "line": raw.decode("utf-8", "replace")}
+            if not isinstance(message, dict):
+                continue
+            if message.get("type") == "log":
+                if self._on_line is not None:
+                    self._on_line(
+                        str(message.get("stream") or "stdout"),
+                        str(message.get("line") or "").rstrip("\r\n"),
+                    )
+                continue
+            if message.get("type") == kind and message.get("id") == request_id:
+                return message
+
+    async def _drain_stderr(self) -> None:
+        # Output Node writes outside console.* (e.g. crashes); never let the
+        # pipe fill up.
+        assert self._process is not None and self._process.stderr is not None
+        while True:
+            raw = await self._process.stderr.readline()
+            if not raw:
+                return
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            if self._on_line is not None:
+                self._on_line("stderr", line)
+            else:
+                logger.debug("build worker: %s", line)
+
+
+class BuildWorkerPool:
+    """Idle build workers keyed by event loop, ``node_modules`` and ``NODE_OPTIONS``."""
+
+    def __init__(self, *, max_builds: int = 50, max_rss_mb: int = 1024) -> None:
+        self.max_builds = max_builds
+        self.max_rss_mb = max_rss_mb
+        self._idle: dict[tuple[int, str, str], list[BuildWorker]] = {}
+        self._lock = threading.Lock()
+
+    @asynccontextmanager
+    async def acquire(
+        self, work_dir: Path, *, env: Mapping[str, str] | None = None
+    ) -> AsyncIterator[BuildWorker]:
+        """Lend a healthy worker for ``work_dir``; it is pooled again afterwards.
+
+        ``env`` only starts a new worker; pass it to :meth:`BuildWorker.run`
+        too so reused workers run the job with it.
+        """
+        key = self._key(work_dir, env)
+        worker = await self._checkout(key)
+        if worker is None:
+            worker = BuildWorker(
+                ["node", str(Path(work_dir) / WORKER_SCRIPT)],
+                cwd=work_dir,
+                env=env,
+                max_builds=self.max_builds,
+                max_rss_mb=self.max_rss_mb,
+            )
+            await worker.start()
+        try:
+            yield worker
+        finally:
+            if worker.alive and not worker.exhausted:
+                with self._lock:
+                    self._idle.setdefault(key, []).append(worker)
+            else:
+                if worker.alive:
+                    logger.info(
+                        "Recycling build worker after %d builds (%.0f MB RSS)",
+                        worker.builds,
+                        worker.rss / (1024 * 1024),
+                    )
+                await worker.close()
+
+    async def close(self) -> None:
+        with self._lock:
+            workers = [worker for idle in self._idle.values() for worker in idle]
+            self._idle.clear()
+        loop = asyncio.get_running_loop()
+        for worker in workers:
+            if worker._loop is loop:
+                await worker.close()
+            else:
+                # Started on another (possibly closed) event loop.
+                worker.kill()
+
+    async def _checkout(self, key: tuple[int, str, str]) -> BuildWorker | None:
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                worker = idle.pop() if idle else None
+            if worker is None:
+                return None
+            if not worker.alive:
+                continue
+            if time.monotonic() - worker.last_used < HEALTH_CHECK_SECONDS or await worker.ping():
+                return worker
+            logger.info("Build worker failed its health check; replacing it")
+
+    @staticmethod
+    def _key(work_dir: Path, env: Mapping[str, str] | None) -> tuple[int, str, str]:
+        # asyncio subprocesses belong to the loop that started them, and
+        # NODE_OPTIONS (e.g. the heap cap) only applies at start-up.
+        loop = id(asyncio.get_running_loop())
+        node_options = (env if env is not None else os.environ).get("NODE_OPTIONS", "")
+        return loop, os.path.realpath(Path(work_dir) / "node_modules"), node_options
+
+
+# ---------------------------------------------------------------------------
+# Shared instance
+# ---------------------------------------------------------------------------
+
+_build_worker_pool: BuildWorkerPool | None = None
+_build_worker_pool_lock = threading.Lock()
+
+
+def get_build_worker_pool() -> BuildWorkerPool | None:
+    """Process-wide pool built from settings, or ``None`` when disabled."""
+    global _build_worker_pool
+    settings = get_settings()
+    if not settings.build_worker_enabled:
+        return None
+    with _build_worker_pool_lock:
+        if _build_worker_pool is None:
+            _build_worker_pool = BuildWorkerPool(
+                max_builds=settings.build_worker_max_builds,
+                max_rss_mb=settings.build_worker_max_rss_mb,
+            )
+        return _build_worker_pool
+
+
+async def shutdown_build_workers() -> None:
+    global _build_worker_pool
+    with _build_worker_pool_lock:
+        pool, _build_worker_pool = _build_worker_pool, None
+    if pool is not None:
+        await pool.close()
+
+
+__all__ = [
+    "BuildWorker",
+    "BuildWorkerPool",
+    "WorkerUnavailable",
+    "get_build_worker_pool",
+    "shutdown_build_workers",
+]
@@ -2,22 +2,60 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import shutil
-import subprocess
+import os
+import re
 import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from threading import Event
-from typing import Any
+from typing import Any, Awaitable, Callable
 
-from ..services.mobile_shell import ensure_mobile_shell
+from ..config import get_settings
+from .build_worker import BuildWorkerPool, WorkerUnavailable, get_build_worker_pool
+from .dependency_cache import DependencyCache, get_dependency_cache, install_command
 from .file_generator import SchemaFileGenerator
 from .html_to_react import ConvertedFile, HtmlToReactConverter, PageHtml
+from .incremental import BuildWorkspace, digest, page_html_path, restore_pages
+from .postprocess import apply_mobile_shell
+from .precompress import MANIFEST_NAME, dump_manifest, precompress_dist
+from .process import CommandCancelled, CommandResult, CommandTimeout, run_command
+from .releases import BlobStore, release_store
 from .tsx_writer import TsxFileWriter
 
 logger = logging.getLogger(__name__)
 
+# Output hashes of shelled pages; beside dist so it is never published.
+MOBILE_SHELL_MANIFEST = "mobile-shell.json"
+
+_ANSI_RE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+# Vite, the prerender script and npm lines worth surfacing as progress.
+_PROGRESS_PATTERNS = (
+    (re.compile(r"^vite v\S+ building"), "Bundling with Vite"),
+    (re.compile(r"^transforming"), "Transforming modules"),
+    (re.compile(r"^(\d+) modules transformed"), "Transformed {0} modules"),
+    (re.compile(r"^rendering chunks"), "Rendering chunks"),
+    (re.compile(r"^computing gzip size"), "Computing bundle sizes"),
+    (re.compile(r"^built in (\S+)"), "Bundle built in {0}"),
+    (re.compile(r"^Prerendered (\S+) \((\d+)/(\d+)\)"), "Prerendered {0} ({1}/{2})"),
+    (re.compile(r"^(?:added|changed) (\d+) packages?"), "Installed {0} packages"),
+)
+_STAGE_LABELS = {
+    "npm_install": "Installing dependencies",
+    "npm_build": "Building project",
+    "prerender": "Prerendering pages",
+}
+
+
+def progress_message(line: str) -> str | None:
+    """Short progress text for a line of build output, if it marks progress."""
+    text = _ANSI_RE.sub("", line).strip().lstrip("✓ ").strip()
+    for pattern, template in _PROGRESS_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return template.format(*match.groups())
+    return None
+
 
 class BuildError(RuntimeError):
     def __init__(
@@ -69,19 +107,33 @@ class ReactSSGBuilder:
         base_dir: Path | None = None,
         event_emitter: Any | None = None,
         cancel_event: Event | None = None,
+        dependency_cache: DependencyCache | None = None,
+        blob_store: BlobStore | None = None,
+        build_workers: BuildWorkerPool | None = None,
     ) -> None:
         if not session_id:
             raise ValueError("session_id is required")
         self.session_id = session_id
         self.event_emitter = event_emitter
         self._cancel_event = cancel_event
+        self._dependency_cache = (
+            dependency_cache if dependency_cache is not None else get_dependency_cache()
+        )
+        self._build_workers = build_workers if build_workers is not None else get_build_worker_pool()
         base = Path(base_dir) if base_dir is not None else Path("~/.instant-coffee/sessions").expanduser()
         self.base_dir = base
         self.session_dir = (base / session_id).resolve()
         self.session_dir.mkdir(parents=True, exist_ok=True)
         self.work_dir = (self.session_dir / "build").resolve()
-        self.dist_dir = (self.session_dir / "dist").resolve()
+        # A symlink to the active release; see releases.py.
+        self.dist_dir = self.session_dir / "dist"
         self.log_path = self.session_dir / "build.log"
+        # The work dir persists between builds; see incremental.py.
+        self._workspace = BuildWorkspace(self.work_dir, self.TEMPLATE_PATH)
+        self._state = self._workspace.load_state()
+        self._template_files: set[Path] = set()
+        self._generated: set[Path] = set()
+        self._releases = release_store(self.session_dir, blob_store)
 
     async def build(
         self,
@@ -92,8 +144,7 @@ class ReactSSGBuilder:
     ) -> dict[str, Any]:
         self._emit_start()
         try:
-            result = await asyncio.to_thread(
-                self._build_sync,
+            result = await self._build_from_schemas_async(
                 page_schemas,
                 component_registry,
                 style_tokens,
@@ -136,9 +187,9 @@ class ReactSSGBuilder:
         self._log("Build started (HTML-to-React path)")
         self._check_cancelled("init")
 
-        # 1. Copy template
-        self._emit_progress("Copying template", 10)
-        await asyncio.to_thread(self._copy_template)
+        # 1. Sync template into the persistent work dir
+        self._emit_progress("Syncing template", 10)
+        await asyncio.to_thread(self._sync_template)
 
         # 2. AI conversion
         self._emit_progress("Converting HTML to React", 15)
@@ -160,34 +211,26 @@ class ReactSSGBuilder:
 
         # 4. npm install
         self._emit_progress("Installing dependencies", 55)
-        await asyncio.to_thread(
-            self._run_command,
-            ["npm", "ci"] if (self.work_dir / "package-lock.json").exists() else ["npm", "install"],
-            stage="npm_install",
-        )
+        await self._install_dependencies()
         self._emit_progress("Dependencies installed", 65)
 
         # 5. npm build (with retry on failure)
         self._emit_progress("Building project", 70)
-        build_result = await self._npm_build_with_retry(
+        built = await self._npm_build_with_retry(
             pages, converted_files, product_doc_content, page_dicts
         )
-        if build_result is not None:
-            converted_files = build_result
-
-        build_dist = self.work_dir / "dist"
-        if not build_dist.exists():
-            raise BuildError("Build output not found", stage="npm_build")
         self._emit_progress("Build succeeded", 80)
 
-        # 6. Publish dist
-        self._emit_progress("Publishing build artifacts", 90)
-        await asyncio.to_thread(self._publish_dist, build_dist)
+        if built:
+            # 6. Mobile shell
+            self._emit_progress("Applying mobile shell", 90)
+            self._check_cancelled("mobile_shell")
+            await asyncio.to_thread(self._apply_mobile_shell, self.work_dir / "dist")
 
-        # 7. Mobile shell
-        self._emit_progress("Applying mobile shell", 95)
-        self._check_cancelled("mobile_shell")
-        await asyncio.to_thread(self._apply_mobile_shell)
+            # 7. Publish dist
+            self._emit_progress("Publishing build artifacts", 95)
+            await asyncio.to_thread(self._publish_dist, self.work_dir / "dist")
+            self._workspace.save_state(self._state)
 
         # 8. Complete
         html_pages = sorted(
@@ -203,10 +246,14 @@ class ReactSSGBuilder:
             pages=html_pages,
         ).__dict__
 
-    def _copy_template(self) -> None:
-        if self.work_dir.exists():
-            shutil.rmtree(self.work_dir)
-        shutil.copytree(self.TEMPLATE_PATH, self.work_dir)
+    def _sync_template(self) -> None:
+        """Bring the persistent work dir up to date with the template.
+
+        Files the generators wrote last build are skipped; they are either
+        regenerated or restored in :meth:`_compile`.
+        """
+        self._template_files = self._workspace.sync_template(skip=self._state.generated)
+        self._generated = set()
 
     def _write_converted_files(
         self,
@@ -216,12 +263,78 @@ class ReactSSGBuilder:
         writer = TsxFileWriter(self.work_dir)
         writer.write_files(files)
         writer.write_entry_points(page_dicts)
+        self._generated.update(writer.written)
         self._log(f"Wrote {len(files)} converted files + entry points")
 
     def _publish_dist(self, build_dist: Path) -> None:
-        if self.dist_dir.exists():
-            shutil.rmtree(self.dist_dir)
-        shutil.move(str(build_dist), str(self.dist_dir))
+        """Precompress ``build_dist`` and publish it as the active release."""
+        manifest = precompress_dist(build_dist, write_manifest=False)
+        encoded = sum(1 for entry in manifest["files"].values() if entry["encodings"])
+        self._log(f"Precompressed {encoded} of {len(manifest['files'])} dist files")
+        started = time.monotonic()
+        release_id = self._releases.publish(
+            build_dist, extras={MANIFEST_NAME: dump_manifest(manifest)}
+        )
+        self._state.release = release_id
+        self._log(f"Published release {release_id} in {time.monotonic() - started:.2f}s")
+
+    async def _compile(self, pages: list[dict[str, Any]]) -> bool:
+        """Bundle and prerender the work dir into ``work_dir/dist``.
+
+        Returns False when the build inputs match the last successful build
+        and its published dist is reused as-is.  Otherwise only routes whose
+        prerender entry changed are prerendered, unless the client bundle
+        changed too (every page embeds its asset hashes).  Nothing is reused
+        once a different release has been activated over that build's.  The new state is
+        staged on ``self._state`` and saved once the dist is published.
+        """
+        state = self._state
+        removed = await asyncio.to_thread(
+            self._workspace.finish_generation, state, self._template_files, self._generated
+        )
+        if removed:
+            self._log(f"Removed {len(removed)} stale files from the work dir")
+        inputs = await asyncio.to_thread(self._workspace.inputs_digest)
+        published = bool(state.release) and state.release == self._releases.active()
+        if not published and state.release:
+            self._log(f"Release {state.release} is no longer active; rebuilding every route")
+        if published and inputs == state.inputs and (self.dist_dir / "index.html").is_file():
+            self._log("Build inputs unchanged; reusing previous dist")
+            return False
+
+        await self._run_node_step("client", ["npm", "run", "build:client"], stage="npm_build")
+        build_dist = self.work_dir / "dist"
+        if not build_dist.exists():
+            raise BuildError("Build output not found", stage="npm_build")
+
+        client = self._workspace.client_digest(build_dist)
+        page_digests = {self._slug(page): digest(page) for page in pages} or {"index": ""}
+        reused: list[str] = []
+        if published and client and client == state.client:
+            reused = [
+                slug
+                for slug, value in page_digests.items()
+                if state.pages.get(slug) == value
+                and (self.dist_dir / page_html_path(slug)).is_file()
+            ]
+        affected = [slug for slug in page_digests if slug not in reused]
+        if affected:
+            only = affected if reused else None
+            command = ["npm", "run", "prerender"]
+            if only:
+                command += ["--", "--only", ",".join(only)]
+            await self._run_node_step("prerender", command, stage="prerender", only=only)
+        # After the prerender: it reads Vite's dist/index.html as its base.
+        await asyncio.to_thread(restore_pages, self.dist_dir, build_dist, reused)
+        self._log(f"Prerendered {len(affected)} route(s), reused {len(reused)}")
+
+        state.inputs, state.client, state.pages = inputs, client, page_digests
+        return True
+
+    @staticmethod
+    def _slug(page: dict[str, Any]) -> str:
+        cleaned = str(page.get("slug") or "").strip("/").removesuffix(".html")
+        return cleaned or "index"
 
     async def _npm_build_with_retry(
         self,
@@ -230,14 +343,14 @@ class ReactSSGBuilder:
         product_doc_content: str | None,
         page_dicts: list[dict],
         max_retries: int = 2,
-    ) -> list[ConvertedFile] | None:
-        """Run npm build; on failure, ask AI to fix and retry."""
+    ) -> bool:
+        """Run npm build; on failure, ask AI to fix and retry.
+
+        Returns False when the previous dist was reused unchanged.
+        """
         for attempt in range(max_retries + 1):
             try:
-                await asyncio.to_thread(
-                    self._run_command, ["npm", "run", "build"], stage="npm_build"
-                )
-                return None  # success, no new files
+                return await self._compile(page_dicts)
             except BuildError as exc:
                 if attempt >= max_retries:
                     raise
@@ -256,9 +369,9 @@ class ReactSSGBuilder:
                 await asyncio.to_thread(
                     self._write_converted_files, converted_files, page_dicts
                 )
-        return converted_files
+        return True
 
-    def _build_sync(
+    async def _build_from_schemas_async(
         self,
         page_schemas: list[dict[str, Any]],
         component_registry: dict[str, Any],
@@ -272,39 +385,27 @@ class ReactSSGBuilder:
         self._log("Build started")
         self._check_cancelled("init")
 
-        self._emit_progress("Copying template", 10)
-        if self.work_dir.exists():
-            shutil.rmtree(self.work_dir)
-        shutil.copytree(self.TEMPLATE_PATH, self.work_dir)
+        self._emit_progress("Syncing template", 10)
+        await asyncio.to_thread(self._sync_template)
 
         self._emit_progress("Writing schema files", 25)
         self._check_cancelled("schema")
-        generator = SchemaFileGenerator(
-            self.work_dir,
-            session_id=self.session_id,
-            assets_base_dir=self.base_dir,
+        await asyncio.to_thread(
+            self._write_schema_files, page_schemas, component_registry, style_tokens, assets
         )
-        generator.generate(page_schemas, component_registry, style_tokens, assets)
 
         self._emit_progress("Installing dependencies", 45)
-        install_cmd = ["npm", "ci"] if (self.work_dir / "package-lock.json").exists() else ["npm", "install"]
-        self._run_command(install_cmd, stage="npm_install")
+        await self._install_dependencies()
 
         self._emit_progress("Building project", 70)
-        self._run_command(["npm", "run", "build"], stage="npm_build")
-
-        build_dist = self.work_dir / "dist"
-        if not build_dist.exists():
-            raise BuildError("Build output not found", stage="npm_build")
-
-        self._emit_progress("Publishing build artifacts", 85)
-        if self.dist_dir.exists():
-            shutil.rmtree(self.dist_dir)
-        shutil.move(str(build_dist), str(self.dist_dir))
+        if await self._compile(page_schemas):
+            self._emit_progress("Applying mobile shell", 85)
+            self._check_cancelled("mobile_shell")
+            await asyncio.to_thread(self._apply_mobile_shell, self.work_dir / "dist")
 
-        self._emit_progress("Applying mobile shell", 92)
-        self._check_cancelled("mobile_shell")
-        self._apply_mobile_shell()
+            self._emit_progress("Publishing build artifacts", 92)
+            await asyncio.to_thread(self._publish_dist, self.work_dir / "dist")
+            self._workspace.save_state(self._state)
 
         pages = sorted(
             str(path.relative_to(self.dist_dir))
@@ -319,44 +420,161 @@ class ReactSSGBuilder:
             pages=pages,
         ).__dict__
 
-    def _run_command(self, command: list[str], *, stage: str) -> None:
+    def _write_schema_files(
+        self,
+        page_schemas: list[dict[str, Any]],
+        component_registry: dict[str, Any],
+        style_tokens: dict[str, Any],
+        assets: Any,
+    ) -> None:
+        generator = SchemaFileGenerator(
+            self.work_dir,
+            session_id=self.session_id,
+            assets_base_dir=self.base_dir,
+        )
+        generator.generate(page_schemas, component_registry, style_tokens, assets)
+        self._generated.update(generator.written)
+
+    async def _install_dependencies(self) -> None:
+        """Attach the shared node_modules cache, falling back to a local install."""
+        self._check_cancelled("npm_install")
+        cache = self._dependency_cache
+        if cache is not None:
+            loop = asyncio.get_running_loop()
+
+            def installer(path: Path) -> None:
+                # attach() runs on a worker thread; the install itself runs
+                # on the loop like every other build command.
+                asyncio.run_coroutine_threadsafe(
+                    self._run_command(install_command(path), stage="npm_install", cwd=path),
+                    loop,
+                ).result()
+
+            started = time.monotonic()
+            try:
+                mode = await asyncio.to_thread(cache.attach, self.work_dir, installer=installer)
+            except BuildCancelled:
+                raise
+            except Exception as exc:
+                self._log(f"Dependency cache unavailable ({exc}); installing locally")
+                logger.warning("node_modules cache attach failed", exc_info=True)
+            else:
+                self._log(
+                    f"Attached cached node_modules via {mode} "
+                    f"in {time.monotonic() - started:.2f}s"
+                )
+                return
+        await self._run_command(install_command(self.work_dir), stage="npm_install")
+
+    async def _run_node_step(
+        self,
+        op: str,
+        command: list[str],
+        *,
+        stage: str,
+        only: list[str] | None = None,
+    ) -> None:
+        """Run a Vite/prerender step on a warm build worker, else via npm."""
+        if self._build_workers is not None:
+            try:
+                await self._run_on_worker(op, stage=stage, only=only)
+                return
+            except WorkerUnavailable as exc:
+                self._log(f"Build worker unavailable ({exc}); falling back to npm")
+                logger.warning("Build worker unavailable for %s: %s", self.session_id, exc)
+        await self._run_command(command, stage=stage)
+
+    async def _run_on_worker(self, op: str, *, stage: str, only: list[str] | None) -> None:
         self._check_cancelled(stage)
-        self._log(f"$ {' '.join(command)}")
-        process = subprocess.Popen(
-            command,
-            cwd=self.work_dir,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
+        display = f"build worker: {op}" + (f" --only {','.join(only)}" if only else "")
+        self._log(f"$ {display}")
+        started = time.monotonic()
+        env = self._command_env()
+        async with self._build_workers.acquire(self.work_dir, env=env) as worker:
+            result = await self._guard(
+                display,
+                stage,
+                worker.run(
+                    op,
+                    self.work_dir,
+                    only=only,
+                    env=env,
+                    timeout=self._stage_timeout(stage),
+                    cancel_event=self._cancel_event,
+                    on_line=self._line_handler(stage),
+                ),
+            )
+        self._check_result(display, stage, result)
+        self._log(f"{display} finished in {time.monotonic() - started:.2f}s")
+
+    async def _run_command(self, command: list[str], *, stage: str, cwd: Path | None = None) -> None:
+        """Run one build command, streaming its output to the log and progress events."""
+        self._check_cancelled(stage)
+        display = " ".join(command)
+        self._log(f"$ {display}")
+        result = await self._guard(
+            display,
+            stage,
+            run_command(
+                command,
+                cwd=cwd or self.work_dir,
+                env=self._command_env(),
+                timeout=self._stage_timeout(stage),
+                cancel_event=self._cancel_event,
+                on_line=self._line_handler(stage),
+            ),
         )
-        while True:
-            if self._cancel_event and self._cancel_event.is_set():
-                process.terminate()
-                try:
-                    process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    process.kill()
-                    process.wait(timeout=5)
-                self._log("Build cancelled")
-                raise BuildCancelled("Build cancelled", stage=stage)
-            return_code = process.poll()
-            if return_code is not None:
-                break
-            time.sleep(0.1)
-        stdout, stderr = process.communicate()
-        if stdout:
-            self._log(stdout)
-        if stderr:
-            self._log(stderr)
-        if return_code != 0:
-            message = f"{' '.join(command)} failed"
+        self._check_result(display, stage, result)
+
+    def _line_handler(self, stage: str) -> Callable[[str, str], None]:
+        def on_line(_stream: str, line: str) -> None:
+            self._log(line)
+            message = progress_message(line)
+            if message:
+                self._emit_detail(_STAGE_LABELS.get(stage, stage), message)
+
+        return on_line
+
+    async def _guard(self, display: str, stage: str, running: Awaitable[CommandResult]) -> CommandResult:
+        """Await a running step, mapping cancellation and timeouts to build errors."""
+        try:
+            return await running
+        except CommandCancelled:
+            self._log("Build cancelled")
+            raise BuildCancelled("Build cancelled", stage=stage) from None
+        except CommandTimeout as exc:
+            self._log(f"{display} {exc}")
+            raise BuildError(f"{display} {exc}", stage=stage) from None
+
+    @staticmethod
+    def _check_result(display: str, stage: str, result: CommandResult) -> None:
+        if result.returncode != 0:
             raise BuildError(
-                message,
+                f"{display} failed",
                 stage=stage,
-                stdout=stdout,
-                stderr=stderr,
+                stdout=result.stdout,
+                stderr=result.stderr,
             )
 
+    @staticmethod
+    def _stage_timeout(stage: str) -> float | None:
+        timeouts = get_settings().build_stage_timeouts
+        value = timeouts.get(stage) if isinstance(timeouts, dict) else None
+        try:
+            return float(value) if value else None
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _command_env() -> dict[str, str]:
+        """Child environment with Node's heap capped to one build slot's memory."""
+        env = dict(os.environ)
+        limit = get_settings().build_slot_memory_mb
+        node_options = env.get("NODE_OPTIONS", "")
+        if limit > 0 and "--max-old-space-size" not in node_options:
+            env["NODE_OPTIONS"] = f"{node_options} --max-old-space-size={limit}".strip()
+        return env
+
     def _reset_log(self) -> None:
         try:
             self.log_path.write_text("", encoding="utf-8")
@@ -378,17 +596,11 @@ class ReactSSGBuilder:
         if self._cancel_event and self._cancel_event.is_set():
             raise BuildCancelled("Build cancelled", stage=stage)
 
-    def _apply_mobile_shell(self) -> None:
-        for path in self.dist_dir.rglob("*.html"):
-            if not path.is_file():
-                continue
-            try:
-                html = path.read_text(encoding="utf-8")
-                patched = ensure_mobile_shell(html)
-                if patched != html:
-                    path.write_text(patched, encoding="utf-8")
-            except OSError:
-                logger.warning("Failed to post-process %s", path)
+    def _apply_mobile_shell(self, dist_dir: Path) -> None:
+        report = apply_mobile_shell(dist_dir, self.session_dir / MOBILE_SHELL_MANIFEST)
+        for timing in report.processed:
+            self._log(f"  {timing.path}: {timing.seconds * 1000:.1f}ms")
+        self._log(report.summary())
 
     def _emit_start(self) -> None:
         if not self.event_emitter:
@@ -416,6 +628,16 @@ class ReactSSGBuilder:
         except Exception:
             logger.debug("Failed to emit build progress event")
 
+    def _emit_detail(self, step: str, message: str) -> None:
+        if not self.event_emitter:
+            return
+        try:
+            from ..events.models import build_progress_event
+
+            self.event_emitter.emit(build_progress_event(step=step, message=message))
+        except Exception:
+            logger.debug("Failed to emit build progress event")
+
     def _emit_done(self, result: dict[str, Any]) -> None:
         if not self.event_emitter:
             return
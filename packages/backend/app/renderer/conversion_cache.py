@@ -0,0 +1,126 @@
+"""On-disk cache of HTML-to-React conversion results.
+
+Entries are small JSON files named by a content key.  The converter stores
+the shared layout pieces (components, tailwind config) under one key and
+each converted page under its own key, so a rebuild only sends pages whose
+HTML (or shared context) changed to the API.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_BETWEEN_TAGS_RE = re.compile(r">\s+<")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_html(html: str) -> str:
+    """Whitespace- and comment-insensitive form of ``html`` used for keys."""
+    html = _COMMENT_RE.sub("", html)
+    html = _BETWEEN_TAGS_RE.sub("><", html)
+    return _WHITESPACE_RE.sub(" ", html).strip()
+
+
+def cache_key(*parts: str) -> str:
+    hasher = hashlib.sha256()
+    for part in parts:
+        hasher.update(part.encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+class ConversionCache:
+    """Key -> JSON payload (converted files), persisted with LRU trimming."""
+
+    def __init__(self, cache_dir: Path, *, max_entries: int = 2000) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # last use, for trimming
+        except OSError:
+            pass
+        self.hits += 1
+        return data
+
+    def put(self, key: str, data: Any) -> None:
+        payload = json.dumps(data, ensure_ascii=False)
+        path = self._path(key)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+            tmp.write_text(payload, encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            logger.warning("Failed to write conversion cache entry %s", path, exc_info=True)
+            return
+        self._trim()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _trim(self) -> None:
+        with self._lock:
+            try:
+                entries = [(p.stat().st_mtime, p) for p in self.cache_dir.glob("*.json")]
+            except OSError:
+                return
+            excess = len(entries) - self.max_entries
+            if excess <= 0:
+                return
+            for _, path in sorted(entries)[:excess]:
+                path.unlink(missing_ok=True)
+
+
+# ---------------------------------------------------------------------------
+# Shared instance
+# ---------------------------------------------------------------------------
+
+_conversion_cache: ConversionCache | None = None
+_conversion_cache_lock = threading.Lock()
+
+
+def get_conversion_cache() -> ConversionCache | None:
+    """Process-wide cache built from settings, or ``None`` when disabled."""
+    global _conversion_cache
+    settings = get_settings()
+    if not settings.conversion_cache_enabled:
+        return None
+    with _conversion_cache_lock:
+        if _conversion_cache is None:
+            cache_dir = settings.conversion_cache_dir or "~/.instant-coffee/cache/html-to-react"
+            _conversion_cache = ConversionCache(
+                Path(cache_dir).expanduser(),
+                max_entries=settings.conversion_cache_max_entries,
+            )
+        return _conversion_cache
+
+
+__all__ = [
+    "ConversionCache",
+    "cache_key",
+    "get_conversion_cache",
+    "normalize_html",
+]
@@ -0,0 +1,557 @@
+"""Shared ``node_modules`` cache for React SSG builds.
+
+Every build used to copy the template into a fresh work dir and run
+``npm install`` there.  Instead, one prepared ``node_modules`` is kept per
+dependency manifest and attached to each work dir.
+
+Layout under ``cache_dir``::
+
+    <key>/package.json          manifest the entry was installed from
+    <key>/package-lock.json     lockfile (copied or generated by npm)
+    <key>/node_modules/         installed dependencies
+    <key>/cache-meta.json       metadata; its mtime is the last-use time
+    .<key>.lock                 flock() guarding preparation of <key>
+    .refs/<key>/<id>            work dirs <key> was attached to (for gc)
+
+``key`` hashes ``package.json``, the lockfile (if any), the platform and the
+Node version, so native binaries (esbuild, rollup) never leak across
+runtimes.  Entries are installed into a staging dir and renamed into place,
+validated offline against the manifest before reuse, and garbage collected
+by age and count.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+LOCKFILES = ("package-lock.json", "npm-shrinkwrap.json")
+ATTACH_MODES = ("symlink", "reflink", "hardlink", "copy")
+META_FILE = "cache-meta.json"
+# Written into attached (non-symlink) node_modules: "<key>\n<mode>".
+ATTACH_MARKER = ".instant-coffee-cache-key"
+REFS_DIR = ".refs"
+WARM_UP_TIMEOUT_SECONDS = 300.0
+
+_FALLBACKS = {
+    "symlink": ("symlink", "copy"),
+    "reflink": ("reflink", "hardlink", "copy"),
+    "hardlink": ("hardlink", "copy"),
+    "copy": ("copy",),
+}
+
+Installer = Callable[[Path], None]
+
+
+class DependencyCacheError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class CacheEntryInfo:
+    key: str
+    path: Path
+    last_used: float
+
+
+@lru_cache(maxsize=1)
+def node_version() -> str:
+    try:
+        result = subprocess.run(
+            ["node", "--version"], capture_output=True, text=True, timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return result.stdout.strip()
+
+
+def install_command(project_dir: Path) -> list[str]:
+    if any((project_dir / name).exists() for name in LOCKFILES):
+        return ["npm", "ci"]
+    return ["npm", "install"]
+
+
+def npm_install(project_dir: Path, *, offline: bool = False, timeout: float = 900.0) -> None:
+    """Default installer: prefer npm's local cache and skip audit/fund lookups.
+
+    ``offline=True`` never touches the network and fails fast when npm's
+    local cache cannot satisfy the manifest.
+    """
+    command = install_command(project_dir) + [
+        "--offline" if offline else "--prefer-offline", "--no-audit", "--no-fund",
+    ]
+    try:
+        result = subprocess.run(
+            command, cwd=project_dir, capture_output=True, text=True, timeout=timeout,
+        )
+    except (OSError, subprocess.SubprocessError) as exc:
+        raise DependencyCacheError(f"{' '.join(command)} failed: {exc}") from exc
+    if result.returncode != 0:
+        raise DependencyCacheError(f"{' '.join(command)} failed: {result.stderr.strip()[-2000:]}")
+
+
+# ---------------------------------------------------------------------------
+# Attach strategies
+# ---------------------------------------------------------------------------
+
+
+def _remove(path: Path) -> None:
+    if path.is_symlink() or path.is_file():
+        path.unlink()
+    elif path.exists():
+        shutil.rmtree(path)
+
+
+def _attach_symlink(source: Path, target: Path) -> None:
+    target.symlink_to(source, target_is_directory=True)
+
+
+def _attach_reflink(source: Path, target: Path) -> None:
+    if sys.platform.startswith("linux"):
+        command = ["cp", "-a", "--reflink=always", str(source), str(target)]
+    elif sys.platform == "darwin":
+        command = ["cp", "-c", "-R", str(source), str(target)]
+    else:
+        raise OSError("reflink copies are not supported on this platform")
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise OSError(result.stderr.strip() or "reflink copy failed")
+
+
+def _attach_hardlink(source: Path, target: Path) -> None:
+    """Mirror the tree with hard-linked files; symlinks (e.g. ``.bin``) are recreated."""
+    for root, dirs, files in os.walk(source):
+        rel = os.path.relpath(root, source)
+        out = target if rel == "." else target / rel
+        out.mkdir(parents=True, exist_ok=True)
+        for name in dirs:
+            path = os.path.join(root, name)
+            if os.path.islink(path):
+                os.symlink(os.readlink(path), out / name)
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.islink(path):
+                os.symlink(os.readlink(path), out / name)
+            else:
+                os.link(path, out / name)
+
+
+def _attach_copy(source: Path, target: Path) -> None:
+    shutil.copytree(source, target, symlinks=True)
+
+
+_ATTACHERS: dict[str, Callable[[Path, Path], None]] = {
+    "symlink": _attach_symlink,
+    "reflink": _attach_reflink,
+    "hardlink": _attach_hardlink,
+    "copy": _attach_copy,
+}
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+
+class DependencyCache:
+    def __init__(
+        self,
+        cache_dir: Path,
+        *,
+        mode: str = "symlink",
+        max_entries: int = 3,
+        max_age_days: float = 14.0,
+        min_idle_seconds: float = 3600.0,
+    ) -> None:
+        if mode not in ATTACH_MODES:
+            raise ValueError(f"mode must be one of {', '.join(ATTACH_MODES)}")
+        self.cache_dir = Path(cache_dir)
+        self.mode = mode
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_days * 86400
+        self.min_idle_seconds = min_idle_seconds
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    # -- keys ---------------------------------------------------------------
+
+    def cache_key(self, project_dir: Path) -> str:
+        manifest = Path(project_dir) / "package.json"
+        if not manifest.exists():
+            raise DependencyCacheError(f"package.json not found in {project_dir}")
+        digest = hashlib.sha256()
+        digest.update(b"package.json\0" + manifest.read_bytes())
+        for name in LOCKFILES:
+            lockfile = Path(project_dir) / name
+            if lockfile.exists():
+                digest.update(f"\0{name}\0".encode() + lockfile.read_bytes())
+        digest.update(f"\0{sys.platform}-{platform.machine()}-{node_version()}".encode())
+        return digest.hexdigest()[:24]
+
+    def entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    @contextmanager
+    def _key_lock(self, key: str, *, blocking: bool = True) -> Iterator[bool]:
+        with self._locks_guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        if not lock.acquire(blocking=blocking):
+            yield False
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with (self.cache_dir / f".{key}.lock").open("a+") as handle:
+                if fcntl is not None:
+                    flags = fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB)
+                    try:
+                        fcntl.flock(handle, flags)
+                    except BlockingIOError:
+                        yield False
+                        return
+                try:
+                    yield True
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(handle, fcntl.LOCK_UN)
+        finally:
+            lock.release()
+
+    # -- validation ---------------------------------------------------------
+
+    @staticmethod
+    def validate(node_modules: Path, manifest_dir: Path) -> list[str]:
+        """Offline check that ``node_modules`` satisfies the manifest (and lockfile)."""
+        problems: list[str] = []
+        if not node_modules.is_dir():
+            return [f"{node_modules} is missing"]
+        try:
+            manifest = json.loads((manifest_dir / "package.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            return [f"unreadable package.json: {exc}"]
+        locked: dict[str, dict] = {}
+        for name in LOCKFILES:
+            try:
+                locked = json.loads((manifest_dir / name).read_text(encoding="utf-8")).get("packages") or {}
+                break
+            except (OSError, ValueError):
+                continue
+        names = {
+            **(manifest.get("dependencies") or {}),
+            **(manifest.get("devDependencies") or {}),
+        }
+        for name in sorted(names):
+            pkg_json = node_modules / name / "package.json"
+            try:
+                installed = json.loads(pkg_json.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                problems.append(f"{name} is not installed")
+                continue
+            expected = (locked.get(f"node_modules/{name}") or {}).get("version")
+            if expected and installed.get("version") != expected:
+                problems.append(f"{name}@{installed.get('version')} != locked {expected}")
+        return problems
+
+    def _is_ready(self, entry: Path) -> bool:
+        return (entry / META_FILE).exists() and (entry / "node_modules").is_dir()
+
+    # -- preparation --------------------------------------------------------
+
+    def ensure(self, project_dir: Path, installer: Installer | None = None) -> Path:
+        """Return the entry dir for ``project_dir``'s manifest, installing it once."""
+        project_dir = Path(project_dir)
+        key = self.cache_key(project_dir)
+        entry = self.entry_dir(key)
+        with self._key_lock(key):
+            if self._is_ready(entry):
+                problems = self.validate(entry / "node_modules", entry)
+                if not problems:
+                    self._touch(entry)
+                    return entry
+                logger.warning("Discarding invalid node_modules cache %s: %s", key, "; ".join(problems))
+                _remove(entry)
+
+            staging = self.cache_dir / f".{key}.tmp-{os.getpid()}-{threading.get_ident()}"
+            _remove(staging)
+            staging.mkdir(parents=True)
+            try:
+                for name in ("package.json", *LOCKFILES):
+                    if (project_dir / name).exists():
+                        shutil.copy2(project_dir / name, staging / name)
+                started = time.monotonic()
+                (installer or npm_install)(staging)
+                problems = self.validate(staging / "node_modules", staging)
+                if problems:
+                    raise DependencyCacheError(
+                        "installed dependencies failed validation: " + "; ".join(problems)
+                    )
+                (staging / META_FILE).write_text(
+                    json.dumps({
+                        "key": key,
+                        "created_at": time.time(),
+                        "node_version": node_version(),
+                        "install_seconds": round(time.monotonic() - started, 2),
+                    }),
+                    encoding="utf-8",
+                )
+                _remove(entry)
+                os.replace(staging, entry)
+            except BaseException:
+                _remove(staging)
+                raise
+            logger.info("Prepared node_modules cache %s", key)
+            return entry
+
+    def attach(self, project_dir: Path, installer: Installer | None = None) -> str:
+        """Attach cached ``node_modules`` to ``project_dir``; returns the mode used.
+
+        A work dir that already carries this key's ``node_modules`` (a
+        persistent work dir on its next build) is left as it is.
+        """
+        project_dir = Path(project_dir)
+        entry = self.ensure(project_dir, installer)
+        source = entry / "node_modules"
+        target = project_dir / "node_modules"
+        attached = self._attachment(target)
+        if attached is not None and attached[0] == entry.name:
+            self._reference(entry.name, project_dir)
+            self._touch(entry)
+            return attached[1]
+        last_error: OSError | None = None
+        for mode in _FALLBACKS[self.mode]:
+            _remove(target)
+            try:
+                _ATTACHERS[mode](source, target)
+                if mode != "symlink":
+                    (target / ATTACH_MARKER).write_text(f"{entry.name}\n{mode}", encoding="utf-8")
+            except OSError as exc:
+                last_error = exc
+                logger.debug("node_modules %s attach failed: %s", mode, exc)
+                continue
+            self._reference(entry.name, project_dir)
+            self._touch(entry)
+            return mode
+        _remove(target)
+        raise DependencyCacheError(f"could not attach node_modules: {last_error}")
+
+    def attached_key(self, node_modules: Path) -> str | None:
+        """Key of the entry ``node_modules`` was attached from, if any."""
+        attached = self._attachment(node_modules)
+        return attached[0] if attached is not None else None
+
+    def _attachment(self, node_modules: Path) -> tuple[str, str] | None:
+        if node_modules.is_symlink():
+            resolved = Path(os.path.realpath(node_modules))
+            if resolved.name == "node_modules" and resolved.parent.parent == Path(
+                os.path.realpath(self.cache_dir)
+            ):
+                return resolved.parent.name, "symlink"
+            return None
+        try:
+            key, _, mode = (node_modules / ATTACH_MARKER).read_text(encoding="utf-8").partition("\n")
+        except OSError:
+            return None
+        return (key, mode) if key and mode else None
+
+    def _refs_dir(self, key: str) -> Path:
+        return self.cache_dir / REFS_DIR / key
+
+    def _reference(self, key: str, project_dir: Path) -> None:
+        path = str(project_dir.resolve())
+        ref = self._refs_dir(key) / hashlib.sha256(path.encode()).hexdigest()[:16]
+        try:
+            ref.parent.mkdir(parents=True, exist_ok=True)
+            ref.write_text(path, encoding="utf-8")
+        except OSError:
+            logger.debug("Could not record node_modules reference %s", ref, exc_info=True)
+
+    def referenced(self, key: str) -> bool:
+        """Whether a live work dir's node_modules still comes from ``key``.
+
+        References whose work dir was deleted or re-attached elsewhere are
+        pruned on the way.
+        """
+        refs = self._refs_dir(key)
+        if not refs.is_dir():
+            return False
+        live = False
+        for ref in refs.iterdir():
+            try:
+                project_dir = Path(ref.read_text(encoding="utf-8"))
+            except OSError:
+                continue
+            if self.attached_key(project_dir / "node_modules") == key:
+                live = True
+            else:
+                ref.unlink(missing_ok=True)
+        return live
+
+    def warm_up(self, project_dir: Path, installer: Installer | None = None) -> str:
+        """Prepare (or validate) the entry for ``project_dir`` and collect stale keys."""
+        key = self.cache_key(project_dir)
+        self.ensure(project_dir, installer)
+        removed = self.gc(keep={key})
+        if removed:
+            logger.info("Removed %d stale node_modules cache entries", len(removed))
+        return key
+
+    # -- bookkeeping --------------------------------------------------------
+
+    @staticmethod
+    def _touch(entry: Path) -> None:
+        try:
+            os.utime(entry / META_FILE)
+        except OSError:
+            pass
+
+    def entries(self) -> list[CacheEntryInfo]:
+        if not self.cache_dir.exists():
+            return []
+        infos = []
+        for path in self.cache_dir.iterdir():
+            meta = path / META_FILE
+            if path.name.startswith(".") or not meta.exists():
+                continue
+            infos.append(CacheEntryInfo(key=path.name, path=path, last_used=meta.stat().st_mtime))
+        return sorted(infos, key=lambda info: info.last_used, reverse=True)
+
+    def gc(self, keep: set[str] | frozenset[str] = frozenset()) -> list[str]:
+        """Drop entries beyond ``max_entries`` or older than ``max_age_days``.
+
+        Entries in ``keep``, used within ``min_idle_seconds``, attached to a
+        live work dir or currently being prepared are never removed.
+        """
+        now = time.time()
+        removed: list[str] = []
+        kept = 0
+        for info in self.entries():
+            idle = now - info.last_used
+            if info.key in keep or idle < self.min_idle_seconds or self.referenced(info.key):
+                kept += 1
+                continue
+            if kept < self.max_entries and idle <= self.max_age_seconds:
+                kept += 1
+                continue
+            with self._key_lock(info.key, blocking=False) as acquired:
+                if not acquired:
+                    kept += 1
+                    continue
+                _remove(info.path)
+                _remove(self._refs_dir(info.key))
+            (self.cache_dir / f".{info.key}.lock").unlink(missing_ok=True)
+            removed.append(info.key)
+
+        # Staging dirs left behind by crashed installs.
+        for path in self.cache_dir.glob(".*.tmp-*") if self.cache_dir.exists() else ():
+            try:
+                if now - path.stat().st_mtime > max(self.min_idle_seconds, 3600):
+                    _remove(path)
+            except OSError:
+                pass
+        return removed
+
+
+# ---------------------------------------------------------------------------
+# Shared instance
+# ---------------------------------------------------------------------------
+
+_dependency_cache: DependencyCache | None = None
+_dependency_cache_lock = threading.Lock()
+
+
+def get_dependency_cache() -> DependencyCache | None:
+    """Process-wide cache built from settings, or ``None`` when disabled."""
+    global _dependency_cache
+    settings = get_settings()
+    if not settings.node_modules_cache_enabled:
+        return None
+    with _dependency_cache_lock:
+        if _dependency_cache is None:
+            cache_dir = settings.node_modules_cache_dir or "~/.instant-coffee/cache/node_modules"
+            mode = settings.node_modules_cache_mode
+            if mode not in ATTACH_MODES:
+                logger.warning("Unknown NODE_MODULES_CACHE_MODE %r; using symlink", mode)
+                mode = "symlink"
+            _dependency_cache = DependencyCache(
+                Path(cache_dir).expanduser(),
+                mode=mode,
+                max_entries=settings.node_modules_cache_max_entries,
+                max_age_days=settings.node_modules_cache_max_age_days,
+            )
+        return _dependency_cache
+
+
+def warm_up_dependency_cache(template_dir: Path) -> str | None:
+    """Startup hook: prepare the template's dependencies before the first build.
+
+    Runs npm offline with a bounded timeout, so startup never waits on the
+    registry; if npm's local cache is cold the first build installs online.
+    """
+    cache = get_dependency_cache()
+    if cache is None or shutil.which("npm") is None:
+        return None
+    try:
+        return cache.warm_up(
+            template_dir,
+            installer=lambda path: npm_install(path, offline=True, timeout=WARM_UP_TIMEOUT_SECONDS),
+        )
+    except Exception as exc:
+        logger.info("node_modules cache warm-up skipped: %s", exc)
+        return None
+
+
+def start_warm_up(template_dir: Path) -> asyncio.Future:
+    """Run :func:`warm_up_dependency_cache` on a daemon thread.
+
+    The returned future resolves with the cache key (or ``None``).  The
+    thread is a daemon so an unfinished warm-up never blocks shutdown; the
+    npm child it may be running is bounded by ``WARM_UP_TIMEOUT_SECONDS``.
+    """
+    loop = asyncio.get_running_loop()
+    future: asyncio.Future = loop.create_future()
+
+    def _resolve(key: str | None) -> None:
+        if not future.done():
+            future.set_result(key)
+
+    def _run() -> None:
+        key = warm_up_dependency_cache(template_dir)
+        try:
+            loop.call_soon_threadsafe(_resolve, key)
+        except RuntimeError:
+            pass  # loop already closed
+
+    threading.Thread(target=_run, name="node-modules-warm-up", daemon=True).start()
+    return future
+
+
+__all__ = [
+    "ATTACH_MODES",
+    "DependencyCache",
+    "DependencyCacheError",
+    "get_dependency_cache",
+    "start_warm_up",
+    "warm_up_dependency_cache",
+]
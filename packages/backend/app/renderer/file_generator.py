@@ -7,6 +7,7 @@ from typing import Any, Iterable
 
 from ..schemas.asset import AssetRegistry, AssetRef
 from ..services.asset_registry import AssetRegistryService
+from .incremental import write_if_changed
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,8 @@ class SchemaFileGenerator:
         self.data_dir = self.project_root / "src" / "data"
         self.pages_dir = self.project_root / "src" / "pages"
         self.public_assets_dir = self.project_root / "public" / "assets"
+        # Every file generate() produced, changed or not.
+        self.written: list[Path] = []
 
     def generate(
         self,
@@ -52,21 +55,26 @@ class SchemaFileGenerator:
 
     def _write_page_components(self, page_schemas: Iterable[dict[str, Any]]) -> None:
         self.pages_dir.mkdir(parents=True, exist_ok=True)
-        self._clear_generated_pages()
 
+        pages: dict[Path, str] = {}
         for schema in page_schemas:
             slug = self._normalize_slug((schema or {}).get("slug"))
             filename = self._safe_filename(slug)
             target = self.pages_dir / f"{filename}.tsx"
             if filename == "index":
                 target = self.pages_dir / "index.tsx"
-            target.write_text(self._page_component_source(slug), encoding="utf-8")
+            pages[target] = self._page_component_source(slug)
 
-    def _clear_generated_pages(self) -> None:
+        self._clear_generated_pages(keep=set(pages))
+        for target, source in pages.items():
+            self._write(target, source)
+
+    def _clear_generated_pages(self, keep: Iterable[Path] = ()) -> None:
+        keep = set(keep)
         if not self.pages_dir.exists():
             return
         for path in sorted(self.pages_dir.rglob("*.tsx")):
-            if path.name == "_template.tsx":
+            if path.name == "_template.tsx" or path in keep:
                 continue
             try:
                 path.unlink()
@@ -239,7 +247,7 @@ class SchemaFileGenerator:
                 return
             target = self.public_assets_dir / filename
             try:
-                target.write_bytes(source.read_bytes())
+                self._write(target, source.read_bytes())
             except OSError:
                 logger.warning("Failed to copy asset %s", source)
                 return
@@ -341,10 +349,12 @@ class SchemaFileGenerator:
         return cleaned or "index"
 
     def _write_json(self, path: Path, payload: Any) -> None:
-        path.write_text(
-            json.dumps(payload, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
+        self._write(path, json.dumps(payload, ensure_ascii=False, indent=2))
+
+    def _write(self, path: Path, data: str | bytes) -> None:
+        # Unchanged files keep their mtime so incremental builds can reuse work.
+        self.written.append(path)
+        write_if_changed(path, data)
 
 
 __all__ = ["SchemaFileGenerator"]
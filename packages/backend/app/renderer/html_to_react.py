@@ -2,17 +2,29 @@
 
 Calls Claude to convert raw HTML pages into React TSX components,
 extracting shared components and unifying design tokens.
+
+Conversion is a small shared pass (components, tailwind config) followed
+by one request per page, run concurrently.  Results are cached per page
+(see ``conversion_cache``): the shared pieces under a key derived from the
+pages' header/nav/footer markup, each page under a key derived from its
+normalized HTML, the product doc and the shared files it builds on.  Only pages without a
+cache hit go to the API.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import posixpath
 import re
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
+from typing import Any, AsyncIterator
 
 import httpx
 
 from ..config import get_settings
+from .conversion_cache import ConversionCache, cache_key, get_conversion_cache, normalize_html
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +91,27 @@ module.exports = { ... }
 """
 
 
+SHARED_ONLY_INSTRUCTIONS = """\
+Extract only what the pages share: output the shared components under \
+src/components/ and tailwind.config.js with the unified design tokens. Do \
+NOT output any files under src/pages/; pages are converted separately."""
+
+PAGES_ONLY_INSTRUCTIONS = """\
+The shared components and tailwind.config.js above already exist. Convert \
+only the HTML pages listed, importing the existing shared components instead \
+of regenerating them. Output one src/pages/<slug>.tsx file per page, plus a \
+new file under src/components/ only if a page needs a component that does \
+not exist yet."""
+
+# Bumps automatically whenever the prompts change, invalidating cached output.
+PROMPT_VERSION = cache_key(SYSTEM_PROMPT, SHARED_ONLY_INSTRUCTIONS, PAGES_ONLY_INSTRUCTIONS)[:16]
+
+_PAGES_DIR = "src/pages/"
+
+_LAYOUT_RE = re.compile(r"<(header|nav|footer)\b.*?</\1\s*>", re.DOTALL | re.IGNORECASE)
+_RELATIVE_IMPORT_RE = re.compile(r"""(\bfrom\s*|\bimport\s*\(?\s*)(['"])(\.{1,2}/[^'"]+)\2""")
+
+
 def _build_user_prompt(
     pages: list[PageHtml],
     product_doc_content: str | None = None,
@@ -126,6 +159,166 @@ def _prepare_pages(pages: list[PageHtml]) -> list[PageHtml]:
     return [PageHtml(slug=p.slug, title=p.title, html=_truncate_styles(p.html)) for p in pages]
 
 
+def _build_shared_prompt(
+    pages: list[PageHtml],
+    product_doc_content: str | None = None,
+) -> str:
+    prompt = _build_user_prompt(pages, product_doc_content)
+    return f"{prompt}\n\n{SHARED_ONLY_INSTRUCTIONS}"
+
+
+def _build_pages_prompt(
+    pages: list[PageHtml],
+    shared: list[ConvertedFile],
+    product_doc_content: str | None = None,
+) -> str:
+    parts: list[str] = []
+    if product_doc_content:
+        parts += ["## Product Doc", product_doc_content, ""]
+    parts += ["## Existing Shared Files", ""]
+    for f in shared:
+        parts += [f"--- FILE: {f.path} ---", f.content, ""]
+    parts += ["## HTML Pages", ""]
+    for page in pages:
+        parts += [f"### {page.slug} ({page.title})", "```html", page.html, "```", ""]
+    parts.append(PAGES_ONLY_INSTRUCTIONS)
+    return "\n".join(parts)
+
+
+def layout_fingerprint(pages: list[PageHtml]) -> str:
+    """Normalized header/nav/footer markup shared by the pages."""
+    pieces = {
+        normalize_html(match.group(0))
+        for page in pages
+        for match in _LAYOUT_RE.finditer(page.html)
+    }
+    return "\n".join(sorted(pieces))
+
+
+def page_file_path(slug: str) -> str:
+    return f"src/pages/{slug}.tsx"
+
+
+def _name_page_file(files: list[ConvertedFile], slug: str) -> list[ConvertedFile]:
+    """Give a single-page response's page file the path the entry points import."""
+    page_files = [f for f in files if f.path.startswith(_PAGES_DIR)]
+    expected = page_file_path(slug)
+    if len(page_files) != 1 or page_files[0].path == expected:
+        return files
+    return [ConvertedFile(path=expected, content=f.content) if f is page_files[0] else f for f in files]
+
+
+def _errors_section(errors: str) -> str:
+    return (
+        "## Previous Build Errors\n"
+        "The previous conversion produced code that failed to compile. "
+        f"Fix the following errors:\n\n```\n{errors}\n```"
+    )
+
+
+def _build_shared_fix_prompt(
+    shared: list[ConvertedFile],
+    broken: list[ConvertedFile],
+    errors: str,
+) -> str:
+    parts = ["## Shared Files", ""]
+    for f in shared:
+        parts += [f"--- FILE: {f.path} ---", f.content, ""]
+    parts.append(_errors_section(errors))
+    parts.append("")
+    listed = ", ".join(f.path for f in broken)
+    parts.append(f"Output only these files, with the errors fixed: {listed}")
+    return "\n".join(parts)
+
+
+def _named_files(files: list[ConvertedFile], errors: str) -> set[str]:
+    """Paths of ``files`` that the build output mentions.
+
+    Full relative paths are matched first; bare file names only when no
+    path matched, and only names that belong to a single file.
+    """
+    named = {f.path for f in files if f.path in errors}
+    if named:
+        return named
+    by_name: dict[str, list[str]] = {}
+    for f in files:
+        by_name.setdefault(f.path.rsplit("/", 1)[-1], []).append(f.path)
+    return {
+        paths[0]
+        for name, paths in by_name.items()
+        if len(paths) == 1 and re.search(rf"(?<![\w.-]){re.escape(name)}(?![\w-])", errors)
+    }
+
+
+def _merge_outputs(
+    base: list[ConvertedFile],
+    outputs: list[tuple[str, list[ConvertedFile]]],
+) -> list[ConvertedFile]:
+    """``base`` files, then each page's ``(slug, files)``, one file per path.
+
+    A page may emit a component that the shared pass or another page already
+    emitted under the same path.  Identical copies collapse; a different one
+    is kept as ``<name>__<slug>`` with that page's imports pointed at it, so
+    neither page is built against the other's component.  A page's own page
+    file replaces any earlier version in place.
+    """
+    merged: dict[str, ConvertedFile] = {}
+    for f in base:
+        merged.setdefault(f.path, f)
+    for slug, files in outputs:
+        own = page_file_path(slug)
+        renames = {
+            f.path: _namespaced_path(f.path, slug)
+            for f in files
+            if f.path != own and f.path in merged and merged[f.path].content != f.content
+        }
+        if renames:
+            logger.warning(
+                "HTML-to-React: page %s emitted conflicting %s; kept as %s",
+                slug, ", ".join(sorted(renames)), ", ".join(sorted(renames.values())),
+            )
+        for f in files:
+            path = renames.get(f.path, f.path)
+            merged[path] = ConvertedFile(path=path, content=_retarget_imports(f, renames))
+    return list(merged.values())
+
+
+def _namespaced_path(path: str, slug: str) -> str:
+    stem, ext = posixpath.splitext(path)
+    return f"{stem}__{re.sub(r'[^A-Za-z0-9_-]', '_', slug)}{ext}"
+
+
+def _retarget_imports(file: ConvertedFile, renames: dict[str, str]) -> str:
+    """Point ``file``'s relative imports of renamed modules at their new paths."""
+    if not renames:
+        return file.content
+    base = posixpath.dirname(file.path)
+    targets = {posixpath.splitext(old)[0]: posixpath.splitext(new)[0] for old, new in renames.items()}
+
+    def _replace(match: re.Match) -> str:
+        resolved = posixpath.normpath(posixpath.join(base, match.group(3)))
+        target = targets.get(resolved) or targets.get(posixpath.splitext(resolved)[0])
+        if target is None:
+            return match.group(0)
+        spec = posixpath.relpath(target, base)
+        if not spec.startswith("."):
+            spec = f"./{spec}"
+        return f"{match.group(1)}{match.group(2)}{spec}{match.group(2)}"
+
+    return _RELATIVE_IMPORT_RE.sub(_replace, file.content)
+
+
+def _to_payload(files: list[ConvertedFile]) -> list[dict[str, str]]:
+    return [{"path": f.path, "content": f.content} for f in files]
+
+
+def _from_payload(data: object) -> list[ConvertedFile] | None:
+    try:
+        return [ConvertedFile(path=item["path"], content=item["content"]) for item in data]
+    except (KeyError, TypeError):
+        return None
+
+
 def parse_converted_files(text: str) -> list[ConvertedFile]:
     """Parse AI response into ConvertedFile list using file separators."""
     # Strip markdown code fences if the model wrapped the output
@@ -164,12 +357,19 @@ class HtmlToReactConverter:
         base_url: str | None = None,
         api_version: str | None = None,
         model: str | None = None,
+        cache: ConversionCache | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        concurrency: int | None = None,
     ) -> None:
         settings = get_settings()
         self._api_key = api_key or settings.anthropic_api_key
         self._base_url = base_url or settings.anthropic_base_url
         self._api_version = api_version or settings.anthropic_api_version
         self._model = model or self.DEFAULT_MODEL
+        self._cache = cache if cache is not None else get_conversion_cache()
+        self._transport = transport
+        self._concurrency = max(1, concurrency or settings.html_to_react_concurrency)
+        self._client: httpx.AsyncClient | None = None
         if not self._api_key:
             raise ValueError("Anthropic API key is required for HTML-to-React conversion")
 
@@ -178,15 +378,154 @@ class HtmlToReactConverter:
         pages: list[PageHtml],
         product_doc_content: str | None = None,
     ) -> list[ConvertedFile]:
-        """Call Claude to convert HTML pages to React components."""
+        """Convert HTML pages to React components.
+
+        A small shared pass produces the shared components and tailwind
+        config, then every page is converted in its own request, at most
+        ``concurrency`` at a time over one keep-alive client.  Results are
+        merged in a fixed order: shared files, then pages in input order.
+        """
         if not pages:
             raise ValueError("At least one HTML page is required")
 
         prepared = _prepare_pages(pages)
-        user_prompt = _build_user_prompt(prepared, product_doc_content)
+        async with self._session():
+            shared = await self._shared_files(pages, prepared, product_doc_content)
+            shared_digest = self._files_digest(shared)
+            semaphore = asyncio.Semaphore(self._concurrency)
+            async with asyncio.TaskGroup() as group:
+                tasks = [
+                    group.create_task(
+                        self._page_files(
+                            page, prepared_page, shared, shared_digest,
+                            product_doc_content, semaphore,
+                        )
+                    )
+                    for page, prepared_page in zip(pages, prepared)
+                ]
+        outcomes = [task.result() for task in tasks]
+        logger.info(
+            "HTML-to-React: %d of %d pages served from cache",
+            sum(hit for _, hit in outcomes),
+            len(pages),
+        )
+        return _merge_outputs(
+            shared, [(page.slug, files) for page, (files, _) in zip(pages, outcomes)]
+        )
+
+    async def _shared_files(
+        self,
+        pages: list[PageHtml],
+        prepared: list[PageHtml],
+        product_doc_content: str | None,
+    ) -> list[ConvertedFile]:
+        cache = self._cache
+        key = self._shared_key(pages, product_doc_content)
+        if cache is not None:
+            cached = _from_payload(cache.get(key))
+            if cached is not None:
+                return cached
+        files = await self._request_files(_build_shared_prompt(prepared, product_doc_content))
+        shared = [f for f in files if not f.path.startswith(_PAGES_DIR)]
+        if cache is not None:
+            cache.put(key, _to_payload(shared))
+        return shared
+
+    async def _page_files(
+        self,
+        page: PageHtml,
+        prepared: PageHtml,
+        shared: list[ConvertedFile],
+        shared_digest: str,
+        product_doc_content: str | None,
+        semaphore: asyncio.Semaphore,
+    ) -> tuple[list[ConvertedFile], bool]:
+        """Files for one page and whether they came from the cache."""
+        cache = self._cache
+        key = self._page_key(page, shared_digest, product_doc_content)
+        if cache is not None:
+            cached = _from_payload(cache.get(key))
+            if cached is not None:
+                return cached, True
+        async with semaphore:
+            files = await self._request_files(
+                _build_pages_prompt([prepared], shared, product_doc_content)
+            )
+        shared_paths = {f.path for f in shared}
+        files = _name_page_file([f for f in files if f.path not in shared_paths], page.slug)
+        if cache is not None and any(f.path == page_file_path(page.slug) for f in files):
+            cache.put(key, _to_payload(files))
+        return files, False
+
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[None]:
+        """Share one keep-alive client across every request of a conversion."""
+        if self._client is not None:
+            yield
+            return
+        limits = httpx.Limits(
+            max_connections=self._concurrency,
+            max_keepalive_connections=self._concurrency,
+        )
+        async with self._make_client(limits=limits) as client:
+            self._client = client
+            try:
+                yield
+            finally:
+                self._client = None
+
+    def _make_client(self, **kwargs: Any) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self._base_url,
+            timeout=httpx.Timeout(180.0, connect=30.0),
+            transport=self._transport,
+            **kwargs,
+        )
+
+    def _shared_key(self, pages: list[PageHtml], product_doc_content: str | None) -> str:
+        return cache_key(
+            "shared", PROMPT_VERSION, self._model, product_doc_content or "",
+            layout_fingerprint(pages),
+        )
+
+    def _page_key(
+        self, page: PageHtml, shared_digest: str, product_doc_content: str | None,
+    ) -> str:
+        # The page prompt carries the product doc, so it is part of the key
+        # even though it usually also changes the shared files' digest.
+        return cache_key(
+            "page", PROMPT_VERSION, self._model, page.slug, page.title,
+            normalize_html(page.html), shared_digest, product_doc_content or "",
+        )
 
-        import asyncio
+    @staticmethod
+    def _files_digest(files: list[ConvertedFile]) -> str:
+        return cache_key(*(f"{f.path}\n{f.content}" for f in sorted(files, key=lambda f: f.path)))
 
+    def _store(
+        self,
+        files: list[ConvertedFile],
+        pages: list[PageHtml],
+        product_doc_content: str | None,
+    ) -> list[ConvertedFile]:
+        """Cache a full-site result per page; returns the shared (non-page) files."""
+        by_path = {page_file_path(page.slug): page for page in pages}
+        page_files = {f.path: f for f in files if f.path in by_path}
+        shared = [f for f in files if f.path not in by_path]
+        shared_digest = self._files_digest(shared)
+        for path, page in by_path.items():
+            converted = page_files.get(path)
+            if converted is None:
+                logger.debug("No converted file for page %s; not caching it", page.slug)
+                continue
+            self._cache.put(
+                self._page_key(page, shared_digest, product_doc_content),
+                _to_payload([converted]),
+            )
+        return shared
+
+    async def _request_files(self, user_prompt: str) -> list[ConvertedFile]:
+        """Call the API (with retries) and parse the returned files."""
         last_error: Exception | None = None
         for attempt in range(self.MAX_RETRIES + 1):
             try:
@@ -217,25 +556,78 @@ class HtmlToReactConverter:
         build_errors: str,
         product_doc_content: str | None = None,
     ) -> list[ConvertedFile]:
-        """Retry conversion with build error feedback."""
-        prepared = _prepare_pages(pages)
-        base_prompt = _build_user_prompt(prepared, product_doc_content)
-
-        error_prompt = (
-            f"{base_prompt}\n\n"
-            f"## Previous Build Errors\n"
-            f"The previous conversion produced code that failed to compile. "
-            f"Fix the following errors:\n\n"
-            f"```\n{build_errors[:3000]}\n```\n\n"
-            f"Generate all files again with the errors fixed."
+        """Fix the files the build errors name, keeping everything else.
+
+        Named shared files are fixed in one small request, then every named
+        page in its own request against the fixed shared files, concurrently
+        as in :meth:`convert`.  When the errors name no known file, every
+        page is retried that way.  The fixed files replace their previous
+        versions in place and in the cache.
+        """
+        errors = build_errors[:3000]
+        by_slug = {page.slug: prepared for page, prepared in zip(pages, _prepare_pages(pages))}
+        page_paths = {page_file_path(page.slug) for page in pages}
+        named = _named_files(previous_files, build_errors)
+        shared = [f for f in previous_files if f.path not in page_paths]
+        broken_shared = [f for f in shared if f.path in named]
+        broken_pages = [page for page in pages if page_file_path(page.slug) in named]
+        if not named:
+            broken_pages = list(pages)
+        previous = {f.path: f for f in previous_files}
+
+        async with self._session():
+            fixed_shared: dict[str, ConvertedFile] = {}
+            if broken_shared:
+                wanted = {f.path for f in broken_shared}
+                response = await self._request_files(_build_shared_fix_prompt(shared, broken_shared, errors))
+                fixed_shared = {f.path: f for f in response if f.path in wanted}
+                shared = [fixed_shared.get(f.path, f) for f in shared]
+            semaphore = asyncio.Semaphore(self._concurrency)
+            async with asyncio.TaskGroup() as group:
+                tasks = [
+                    group.create_task(
+                        self._fix_page(
+                            page, by_slug[page.slug], shared,
+                            previous.get(page_file_path(page.slug)),
+                            errors, product_doc_content, semaphore,
+                        )
+                    )
+                    for page in broken_pages
+                ]
+        logger.info(
+            "HTML-to-React fix: %d shared file(s), %d of %d page(s) resent",
+            len(broken_shared), len(broken_pages), len(pages),
         )
 
-        response_text = await self._call_api(error_prompt)
-        files = parse_converted_files(response_text)
-        if not files:
-            raise ValueError("AI returned no files in retry response")
+        files = _merge_outputs(
+            [fixed_shared.get(f.path, f) for f in previous_files],
+            [(page.slug, task.result()) for page, task in zip(broken_pages, tasks)],
+        )
+        if self._cache is not None:
+            # The fixed output replaces whatever was cached for these pages.
+            shared = self._store(files, pages, product_doc_content)
+            self._cache.put(self._shared_key(pages, product_doc_content), _to_payload(shared))
         return files
 
+    async def _fix_page(
+        self,
+        page: PageHtml,
+        prepared: PageHtml,
+        shared: list[ConvertedFile],
+        previous: ConvertedFile | None,
+        errors: str,
+        product_doc_content: str | None,
+        semaphore: asyncio.Semaphore,
+    ) -> list[ConvertedFile]:
+        prompt = _build_pages_prompt([prepared], shared, product_doc_content)
+        if previous is not None:
+            prompt += f"\n\n## Previous Output\n--- FILE: {previous.path} ---\n{previous.content}"
+        prompt += f"\n\n{_errors_section(errors)}\n\nOutput {page_file_path(page.slug)} with the errors fixed."
+        async with semaphore:
+            files = await self._request_files(prompt)
+        shared_paths = {f.path for f in shared}
+        return _name_page_file([f for f in files if f.path not in shared_paths], page.slug)
+
     async def _call_api(self, user_prompt: str) -> str:
         """Make a single API call to Claude."""
         headers = {
@@ -251,15 +643,13 @@ class HtmlToReactConverter:
             "messages": [{"role": "user", "content": user_prompt}],
         }
 
-        timeout = httpx.Timeout(180.0, connect=30.0)
-        async with httpx.AsyncClient(
-            base_url=self._base_url, timeout=timeout
-        ) as client:
-            response = await client.post(
-                "/v1/messages", json=payload, headers=headers
-            )
-            response.raise_for_status()
-            data = response.json()
+        if self._client is not None:
+            response = await self._client.post("/v1/messages", json=payload, headers=headers)
+        else:
+            async with self._make_client() as client:
+                response = await client.post("/v1/messages", json=payload, headers=headers)
+        response.raise_for_status()
+        data = response.json()
 
         content_blocks = data.get("content", [])
         if not content_blocks:
@@ -0,0 +1,205 @@
+"""Persistent per-session build workspace for incremental React SSG builds.
+
+The work dir is kept between builds.  Template and generated files are only
+rewritten when their content changes, so unchanged files keep their mtimes
+and Vite's cache (``.vite-cache``) stays valid.  A small state file records
+what the last successful build consumed, which lets the builder skip the
+bundle step entirely when nothing changed and prerender only the routes
+that did.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = ".ic-build-state.json"
+VITE_CACHE_DIR = ".vite-cache"
+# Never part of the build inputs, never synced from the template.
+_SKIP_NAMES = {"node_modules", "dist", VITE_CACHE_DIR, STATE_FILE}
+# Vite 5 writes its client manifest here when ``build.manifest`` is on.
+_CLIENT_MANIFEST = Path(".vite") / "manifest.json"
+
+
+def write_if_changed(path: Path, data: str | bytes) -> bool:
+    """Write ``data`` unless ``path`` already holds it; returns True if written."""
+    raw = data.encode("utf-8") if isinstance(data, str) else data
+    try:
+        if path.stat().st_size == len(raw) and path.read_bytes() == raw:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(raw)
+    os.replace(tmp, path)
+    return True
+
+
+def digest(payload: Any) -> str:
+    """Stable content hash for JSON-serialisable data."""
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+@dataclass
+class BuildState:
+    """What the last successful build of a work dir consumed."""
+
+    inputs: str = ""  # digest of every build input file
+    client: str = ""  # digest of the Vite client manifest
+    pages: dict[str, str] = field(default_factory=dict)  # slug -> prerender entry digest
+    files: list[str] = field(default_factory=list)  # managed files, relative to the root
+    generated: list[str] = field(default_factory=list)  # subset written by generators
+    release: str = ""  # release published from this build; stale once another is activated
+
+
+class BuildWorkspace:
+    """A persistent work dir synced from a template with content-hash writes."""
+
+    def __init__(self, root: Path, template: Path) -> None:
+        self.root = Path(root)
+        self.template = Path(template)
+        self.state_path = self.root / STATE_FILE
+
+    # -- state ---------------------------------------------------------
+
+    def load_state(self) -> BuildState:
+        try:
+            data = json.loads(self.state_path.read_text(encoding="utf-8"))
+            return BuildState(**data)
+        except (OSError, ValueError, TypeError):
+            return BuildState()
+
+    def save_state(self, state: BuildState) -> None:
+        write_if_changed(self.state_path, json.dumps(asdict(state), indent=2, sort_keys=True))
+
+    # -- files ---------------------------------------------------------
+
+    def sync_template(self, skip: Iterable[str | Path] = ()) -> set[Path]:
+        """Copy changed template files into the work dir; returns all of them.
+
+        Files in ``skip`` (what the generators wrote last time) are left
+        alone so regenerating identical content does not touch them.
+        """
+        skipped = {Path(path) for path in skip}
+        synced: set[Path] = set()
+        written = 0
+        for source in self._walk(self.template):
+            relative = source.relative_to(self.template)
+            synced.add(relative)
+            if relative in skipped:
+                continue
+            if write_if_changed(self.root / relative, source.read_bytes()):
+                written += 1
+        logger.debug("Template sync: %d of %d files changed", written, len(synced))
+        return synced
+
+    def finish_generation(
+        self,
+        state: BuildState,
+        template_files: set[Path],
+        generated: Iterable[Path],
+    ) -> list[Path]:
+        """Reconcile the work dir after the generators ran.
+
+        Template files skipped by :meth:`sync_template` but not regenerated
+        are restored, and files a previous build produced that this one did
+        not are deleted.  Returns the removed paths.
+        """
+        produced = {self._relative(path) for path in generated}
+        for name in state.generated:
+            relative = Path(name)
+            if relative in template_files and relative not in produced:
+                write_if_changed(self.root / relative, (self.template / relative).read_bytes())
+
+        current = template_files | produced
+        removed: list[Path] = []
+        for name in state.files:
+            relative = Path(name)
+            if relative in current:
+                continue
+            target = self.root / relative
+            try:
+                target.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError:
+                logger.warning("Failed to remove stale build file %s", target)
+                continue
+            removed.append(relative)
+            self._remove_empty_parents(target.parent)
+        state.files = sorted(str(path) for path in current)
+        state.generated = sorted(str(path) for path in produced)
+        self.save_state(state)
+        return removed
+
+    def inputs_digest(self) -> str:
+        """Hash of every file that feeds ``vite build`` and the prerender."""
+        hasher = hashlib.sha256()
+        for path in sorted(self._walk(self.root)):
+            hasher.update(str(path.relative_to(self.root)).encode("utf-8"))
+            hasher.update(b"\0")
+            hasher.update(hashlib.sha256(path.read_bytes()).digest())
+        return hasher.hexdigest()
+
+    def client_digest(self, dist: Path) -> str:
+        """Hash of the Vite client manifest; empty when Vite wrote none."""
+        try:
+            return hashlib.sha256((Path(dist) / _CLIENT_MANIFEST).read_bytes()).hexdigest()
+        except OSError:
+            return ""
+
+    def _walk(self, base: Path) -> Iterable[Path]:
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames[:] = [name for name in dirnames if name not in _SKIP_NAMES]
+            for name in filenames:
+                if name in _SKIP_NAMES or (name.startswith(".") and name.endswith(".tmp")):
+                    continue
+                yield Path(dirpath) / name
+
+    def _relative(self, path: Path) -> Path:
+        path = Path(path)
+        return path.relative_to(self.root) if path.is_absolute() else path
+
+    def _remove_empty_parents(self, directory: Path) -> None:
+        while directory != self.root and self.root in directory.parents:
+            try:
+                directory.rmdir()
+            except OSError:
+                return
+            directory = directory.parent
+
+
+def restore_pages(previous_dist: Path, dist: Path, pages: Iterable[str]) -> None:
+    """Copy prerendered HTML for ``pages`` from a published dist into a new one."""
+    for slug in pages:
+        relative = page_html_path(slug)
+        target = Path(dist) / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(Path(previous_dist) / relative, target)
+
+
+def page_html_path(slug: str) -> Path:
+    """Where ``scripts/prerender.ts`` writes a page, relative to dist."""
+    return Path("index.html") if slug == "index" else Path("pages") / slug / "index.html"
+
+
+__all__ = [
+    "BuildState",
+    "BuildWorkspace",
+    "STATE_FILE",
+    "VITE_CACHE_DIR",
+    "digest",
+    "page_html_path",
+    "restore_pages",
+    "write_if_changed",
+]
@@ -0,0 +1,180 @@
+"""Mobile-shell post-processing of a published dist.
+
+Every prerendered page gets the mobile shell (viewport meta, ``#app.page``
+container, shell CSS).  Pages are rewritten with the streaming
+:func:`rewrite_mobile_shell`, spread over a process pool when there are
+enough of them, and a small manifest of output hashes lets pages that were
+already processed (e.g. reused by an incremental build) skip the rewrite.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from ..services.mobile_shell import rewrite_mobile_shell
+from .incremental import write_if_changed
+
+logger = logging.getLogger(__name__)
+
+# Below this many pages a pool costs more to feed than it saves.
+POOL_MIN_FILES = 8
+
+
+@dataclass(frozen=True)
+class ShellTiming:
+    path: str
+    seconds: float
+    changed: bool
+
+
+@dataclass
+class ShellReport:
+    processed: list[ShellTiming] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        text = (
+            f"Mobile shell: {len(self.processed)} processed, {len(self.skipped)} unchanged, "
+            f"{len(self.failed)} failed in {self.seconds * 1000:.0f}ms"
+        )
+        if self.processed:
+            slowest = max(self.processed, key=lambda timing: timing.seconds)
+            text += f" (slowest {slowest.path} {slowest.seconds * 1000:.1f}ms)"
+        return text
+
+
+def shell_file(path: str) -> tuple[str, float, bool]:
+    """Apply the shell to one file; returns its new hash, timing and whether it changed.
+
+    Module-level so it can run in a pool worker.
+    """
+    started = time.perf_counter()
+    target = Path(path)
+    html = target.read_text(encoding="utf-8")
+    patched = rewrite_mobile_shell(html)
+    changed = patched != html
+    if changed:
+        write_if_changed(target, patched)
+    return _hash(patched.encode("utf-8")), time.perf_counter() - started, changed
+
+
+def apply_mobile_shell(dist_dir: Path, manifest_path: Path, *, workers: int | None = None) -> ShellReport:
+    """Shell every HTML file under ``dist_dir``, skipping already-shelled ones.
+
+    ``manifest_path`` maps dist-relative paths to the hash of the shelled
+    output; it must live outside ``dist_dir`` so it is never published.
+    """
+    started = time.perf_counter()
+    report = ShellReport()
+    manifest = _load_manifest(manifest_path)
+    pending: list[Path] = []
+    hashes: dict[str, str] = {}
+    for path in sorted(dist_dir.rglob("*.html")):
+        if not path.is_file():
+            continue
+        relative = path.relative_to(dist_dir).as_posix()
+        try:
+            current = _hash(path.read_bytes())
+        except OSError:
+            report.failed.append(relative)
+            continue
+        if manifest.get(relative) == current:
+            hashes[relative] = current
+            report.skipped.append(relative)
+        else:
+            pending.append(path)
+
+    for path, outcome in _run(pending, workers):
+        relative = path.relative_to(dist_dir).as_posix()
+        if isinstance(outcome, BaseException):
+            logger.warning("Failed to post-process %s: %s", path, outcome)
+            report.failed.append(relative)
+            continue
+        digest, seconds, changed = outcome
+        hashes[relative] = digest
+        report.processed.append(ShellTiming(relative, seconds, changed))
+
+    write_if_changed(manifest_path, json.dumps(hashes, indent=2, sort_keys=True))
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def _run(paths: list[Path], workers: int | None):
+    if len(paths) < POOL_MIN_FILES or workers == 1:
+        for path in paths:
+            try:
+                yield path, shell_file(str(path))
+            except Exception as exc:
+                yield path, exc
+        return
+    pool = _get_pool(workers)
+    futures = [(path, pool.submit(shell_file, str(path))) for path in paths]
+    for path, future in futures:
+        try:
+            yield path, future.result()
+        except Exception as exc:
+            yield path, exc
+
+
+def _hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _load_manifest(path: Path) -> dict[str, str]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+# ---------------------------------------------------------------------------
+# Shared pool
+# ---------------------------------------------------------------------------
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int | None) -> ProcessPoolExecutor:
+    """Long-lived pool so worker start-up is paid once per process.
+
+    Workers are spawned rather than forked: the server is multithreaded.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers or max(1, min(8, os.cpu_count() or 1)),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+__all__ = [
+    "POOL_MIN_FILES",
+    "ShellReport",
+    "ShellTiming",
+    "apply_mobile_shell",
+    "shell_file",
+    "shutdown_pool",
+]
@@ -0,0 +1,130 @@
+"""Precompressed siblings and a content manifest for a published dist.
+
+At publish time every text asset gets ``.gz`` (and, when the optional
+``brotli`` package is installed, ``.br``) siblings, and a manifest beside
+the dist records each file's content hash and available encodings.  The
+preview route uses the manifest for strong ETags and to pick a variant
+without touching the disk for negotiation.
+
+Manifest layout (``dist-manifest.json`` next to ``dist/``)::
+
+    {"version": 1, "files": {"assets/index-3f2a.js": {"hash": "...", "size": 1234,
+                                                       "encodings": {"br": 310, "gzip": 402}}}}
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None  # type: ignore[assignment]
+
+from .incremental import write_if_changed
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "dist-manifest.json"
+MANIFEST_VERSION = 1
+# Encoding -> sibling suffix, in server preference order.
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+COMPRESSIBLE_SUFFIXES = {
+    ".css",
+    ".html",
+    ".js",
+    ".json",
+    ".map",
+    ".mjs",
+    ".svg",
+    ".txt",
+    ".webmanifest",
+    ".xml",
+}
+# Below this a compressed body barely beats the response headers.
+MIN_COMPRESS_BYTES = 512
+# Brotli 11 is several times slower for a few percent; builds run often.
+BROTLI_QUALITY = 9
+
+
+def manifest_path(dist_dir: Path) -> Path:
+    return Path(dist_dir).parent / MANIFEST_NAME
+
+
+def precompress_dist(dist_dir: Path, *, write_manifest: bool = True) -> dict[str, Any]:
+    """Write encoded siblings for ``dist_dir`` and return its manifest.
+
+    With ``write_manifest`` the manifest is also saved at
+    :func:`manifest_path`; otherwise the caller places it (see releases.py).
+    """
+    started = time.perf_counter()
+    dist_dir = Path(dist_dir)
+    files: dict[str, dict[str, Any]] = {}
+    encoded_bytes = 0
+    for path in sorted(dist_dir.rglob("*")):
+        if not path.is_file() or path.suffix in (".br", ".gz"):
+            continue
+        data = path.read_bytes()
+        entry: dict[str, Any] = {
+            "hash": hashlib.sha256(data).hexdigest(),
+            "size": len(data),
+            "encodings": {},
+        }
+        if path.suffix.lower() in COMPRESSIBLE_SUFFIXES and len(data) >= MIN_COMPRESS_BYTES:
+            for encoding, payload in _encode(data).items():
+                if len(payload) >= len(data):
+                    continue
+                write_if_changed(path.with_name(path.name + ENCODINGS[encoding]), payload)
+                entry["encodings"][encoding] = len(payload)
+                encoded_bytes += len(payload)
+        files[path.relative_to(dist_dir).as_posix()] = entry
+
+    manifest = {"version": MANIFEST_VERSION, "files": files}
+    if write_manifest:
+        write_if_changed(manifest_path(dist_dir), dump_manifest(manifest))
+    logger.info(
+        "Precompressed %d files (%d encoded bytes) in %.2fs",
+        len(files),
+        encoded_bytes,
+        time.perf_counter() - started,
+    )
+    return manifest
+
+
+def dump_manifest(manifest: dict[str, Any]) -> str:
+    return json.dumps(manifest, indent=2, sort_keys=True)
+
+
+def load_manifest(dist_dir: Path) -> dict[str, dict[str, Any]]:
+    """``files`` section of the dist manifest, or ``{}`` when absent/stale."""
+    try:
+        data = json.loads(manifest_path(dist_dir).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    files = data.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def _encode(data: bytes) -> dict[str, bytes]:
+    encoded = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoded["br"] = brotli.compress(data, quality=BROTLI_QUALITY)
+    return encoded
+
+
+__all__ = [
+    "ENCODINGS",
+    "MANIFEST_NAME",
+    "dump_manifest",
+    "load_manifest",
+    "manifest_path",
+    "precompress_dist",
+]
@@ -0,0 +1,171 @@
+"""Async child processes for build steps.
+
+Commands run through ``asyncio.create_subprocess_exec`` in their own process
+group, so npm, Vite and the esbuild/rollup workers they spawn can be killed
+together.  Output is read line by line while the command runs and handed to
+a callback, which lets the builder stream logs and progress instead of
+collecting everything at exit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import signal
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Event
+from typing import Callable, Mapping, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Process groups (and killpg) are POSIX-only.
+_POSIX = os.name == "posix"
+# Minified bundles make for long error lines.
+_LINE_LIMIT = 1024 * 1024
+_CANCEL_POLL_SECONDS = 0.1
+
+LineCallback = Callable[[str, str], None]
+
+
+class CommandCancelled(Exception):
+    pass
+
+
+class CommandTimeout(Exception):
+    def __init__(self, timeout: float) -> None:
+        super().__init__(f"timed out after {timeout:g}s")
+        self.timeout = timeout
+
+
+@dataclass(frozen=True)
+class CommandResult:
+    returncode: int
+    stdout: str
+    stderr: str
+
+
+async def run_command(
+    command: Sequence[str],
+    *,
+    cwd: Path,
+    env: Mapping[str, str] | None = None,
+    timeout: float | None = None,
+    cancel_event: Event | None = None,
+    on_line: LineCallback | None = None,
+    kill_grace: float = 2.0,
+) -> CommandResult:
+    """Run ``command`` to completion, streaming each output line to ``on_line``.
+
+    ``on_line`` receives ``("stdout" | "stderr", line)``.  The process group
+    is terminated when ``cancel_event`` is set (:class:`CommandCancelled`),
+    when ``timeout`` seconds pass (:class:`CommandTimeout`) or when the
+    awaiting task is itself cancelled.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        cwd=str(cwd),
+        env=dict(env) if env is not None else None,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=_POSIX,
+        limit=_LINE_LIMIT,
+    )
+    stdout: list[str] = []
+    stderr: list[str] = []
+
+    async def complete() -> int:
+        await asyncio.gather(
+            _pump(process.stdout, "stdout", stdout, on_line),
+            _pump(process.stderr, "stderr", stderr, on_line),
+        )
+        return await process.wait()
+
+    completion = asyncio.ensure_future(complete())
+    waiters = {completion}
+    cancel_watch = None
+    if cancel_event is not None:
+        cancel_watch = asyncio.ensure_future(wait_for_event(cancel_event))
+        waiters.add(cancel_watch)
+    try:
+        done, _ = await asyncio.wait(
+            waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+    except BaseException:
+        completion.cancel()
+        await terminate(process, kill_grace)
+        raise
+    finally:
+        if cancel_watch is not None:
+            cancel_watch.cancel()
+
+    if completion not in done:
+        completion.cancel()
+        await terminate(process, kill_grace)
+        if cancel_watch is not None and cancel_watch in done:
+            raise CommandCancelled()
+        raise CommandTimeout(timeout or 0.0)
+    return CommandResult(completion.result(), "".join(stdout), "".join(stderr))
+
+
+async def terminate(process: asyncio.subprocess.Process, grace: float = 2.0) -> None:
+    """SIGTERM the process group, then SIGKILL it after ``grace`` seconds."""
+    if process.returncode is not None:
+        return
+    _signal(process, force=False)
+    try:
+        await asyncio.wait_for(process.wait(), grace)
+    except asyncio.TimeoutError:
+        _signal(process, force=True)
+        await process.wait()
+
+
+def _signal(process: asyncio.subprocess.Process, *, force: bool) -> None:
+    try:
+        if _POSIX:
+            os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+        elif force:
+            process.kill()
+        else:
+            process.terminate()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def _pump(
+    stream: asyncio.StreamReader | None,
+    name: str,
+    sink: list[str],
+    on_line: LineCallback | None,
+) -> None:
+    if stream is None:
+        return
+    while True:
+        raw = await stream.readline()
+        if not raw:
+            return
+        line = raw.decode("utf-8", errors="replace")
+        sink.append(line)
+        if on_line is None:
+            continue
+        try:
+            on_line(name, line.rstrip("\r\n"))
+        except Exception:
+            logger.debug("Command output callback failed", exc_info=True)
+
+
+async def wait_for_event(event: Event) -> None:
+    # threading.Event: set from request handlers and worker threads alike.
+    while not event.is_set():
+        await asyncio.sleep(_CANCEL_POLL_SECONDS)
+
+
+__all__ = [
+    "CommandCancelled",
+    "CommandResult",
+    "CommandTimeout",
+    "run_command",
+    "terminate",
+    "wait_for_event",
+]
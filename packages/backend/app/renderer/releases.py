@@ -0,0 +1,282 @@
+"""Content-addressed storage for published dists.
+
+Built files are stored once, by SHA-256, in a blob store shared by every
+session.  A published dist is a *release*: a directory tree of hardlinks to
+blobs plus a ``release.json`` recording each file's hash.  The session's
+``dist`` path is a symlink to the active release, so publishing and rolling
+back are a single atomic symlink swap.
+
+Layout::
+
+    <blobs>/<aa>/<sha256>                  read-only file content
+    <session>/releases/<id>/dist/...       hardlinks into the blob store
+    <session>/releases/<id>/release.json   {"id", "created_at", "files": {path: sha256}}
+    <session>/dist -> releases/<id>/dist
+
+A blob's hardlink count is its reference count: once no release links it
+(``st_nlink == 1``) the blob can be collected.  Releases are pruned to the
+newest ``retention`` per session (never the active one).
+"""
+
+from __future__ import annotations
+
+import errno
+import hashlib
+import json
+import logging
+import os
+import shutil
+import stat
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+RELEASES_DIR = "releases"
+RELEASE_FILE = "release.json"
+# Garbage collection walks the whole store; at most once per interval.
+GC_INTERVAL_SECONDS = 600.0
+_GC_MARKER = ".last-gc"
+_READ_ONLY = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+
+
+class BlobStore:
+    """Shared, deduplicated file store keyed by SHA-256."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def link(self, source: Path, target: Path) -> tuple[str, bool]:
+        """Move ``source`` into the store and hardlink it at ``target``.
+
+        Returns the content hash and whether ``target`` shares the blob
+        (False when the store is on another filesystem and a copy was made).
+        ``source`` is removed either way.
+        """
+        digest = _file_digest(source)
+        blob = self.path(digest)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        for _ in range(3):
+            try:
+                os.link(blob, target)
+            except FileNotFoundError:
+                # Not stored yet, or collected between check and link.
+                self._store(source, digest)
+                continue
+            except OSError as exc:
+                if exc.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+                    raise
+                shutil.copy2(source, target)
+                source.unlink()
+                return digest, False
+            source.unlink()
+            return digest, True
+        raise OSError(f"Could not store blob {digest}")
+
+    def gc(self, *, force: bool = False) -> int:
+        """Delete blobs no release links to; returns how many were removed."""
+        marker = self.root / _GC_MARKER
+        if not force:
+            try:
+                if time.time() - marker.stat().st_mtime < GC_INTERVAL_SECONDS:
+                    return 0
+            except OSError:
+                pass
+        removed = 0
+        for blob in self._blobs():
+            try:
+                if blob.stat().st_nlink <= 1:
+                    blob.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            marker.touch()
+        except OSError:
+            pass
+        if removed:
+            logger.info("Blob store gc removed %d unreferenced blobs", removed)
+        return removed
+
+    def _store(self, source: Path, digest: str) -> None:
+        blob = self.path(digest)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp = blob.with_name(f".{digest}.{uuid.uuid4().hex}.tmp")
+        try:
+            # Zero-copy when the work dir shares the store's filesystem; the
+            # source keeps the blob referenced until ``target`` links it.
+            os.link(source, tmp)
+        except OSError:
+            shutil.copy2(source, tmp)
+        os.chmod(tmp, _READ_ONLY)
+        os.replace(tmp, blob)
+
+    def _blobs(self) -> Iterator[Path]:
+        if not self.root.is_dir():
+            return
+        for bucket in self.root.iterdir():
+            if bucket.is_dir() and len(bucket.name) == 2:
+                yield from (path for path in bucket.iterdir() if not path.name.startswith("."))
+
+
+@dataclass(frozen=True)
+class Release:
+    id: str
+    created_at: str
+    files: int
+    active: bool
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "created_at": self.created_at,
+            "files": self.files,
+            "active": self.active,
+        }
+
+
+class ReleaseStore:
+    """A session's published releases and its active ``dist`` symlink."""
+
+    def __init__(self, session_dir: Path, blobs: BlobStore, *, retention: int = 5) -> None:
+        self.session_dir = Path(session_dir)
+        self.blobs = blobs
+        self.retention = max(1, retention)
+        self.releases_dir = self.session_dir / RELEASES_DIR
+        self.dist_link = self.session_dir / "dist"
+
+    def publish(self, build_dist: Path, *, extras: dict[str, str] | None = None) -> str:
+        """Store ``build_dist`` as a new release, activate it and prune old ones.
+
+        ``build_dist`` is consumed: its files move into the blob store.
+        ``extras`` are small metadata files written beside the release's
+        ``dist`` (e.g. the precompression manifest).
+        """
+        release_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        release_dir = self.releases_dir / release_id
+        dist = release_dir / "dist"
+        files: dict[str, str] = {}
+        shared = 0
+        for source in sorted(Path(build_dist).rglob("*")):
+            if source.is_dir():
+                continue
+            relative = source.relative_to(build_dist).as_posix()
+            digest, linked = self.blobs.link(source, dist / relative)
+            files[relative] = digest
+            shared += linked
+        dist.mkdir(parents=True, exist_ok=True)
+        record = {
+            "id": release_id,
+            "created_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "files": files,
+        }
+        for name, content in (extras or {}).items():
+            (release_dir / name).write_text(content, encoding="utf-8")
+        (release_dir / RELEASE_FILE).write_text(
+            json.dumps(record, indent=2, sort_keys=True), encoding="utf-8"
+        )
+        shutil.rmtree(build_dist, ignore_errors=True)
+        self.activate(release_id)
+        logger.info(
+            "Published release %s for %s: %d files, %d linked from the blob store",
+            release_id,
+            self.session_dir.name,
+            len(files),
+            shared,
+        )
+        self.prune()
+        self.blobs.gc()
+        return release_id
+
+    def activate(self, release_id: str) -> None:
+        """Point ``dist`` at ``release_id`` with one atomic rename."""
+        if release_id not in self._ids() or not (self.releases_dir / release_id / "dist").is_dir():
+            raise FileNotFoundError(f"Release {release_id} not found")
+        if self.dist_link.is_dir() and not self.dist_link.is_symlink():
+            # A dist published before releases existed.
+            shutil.rmtree(self.dist_link)
+        tmp = self.session_dir / f".dist-{uuid.uuid4().hex}"
+        os.symlink(Path(RELEASES_DIR) / release_id / "dist", tmp, target_is_directory=True)
+        os.replace(tmp, self.dist_link)
+
+    def active(self) -> str | None:
+        try:
+            target = Path(os.readlink(self.dist_link))
+        except OSError:
+            return None
+        return target.parent.name if target.name == "dist" else None
+
+    def releases(self) -> list[Release]:
+        active = self.active()
+        releases: list[Release] = []
+        for release_id in self._ids():
+            record = self._record(release_id)
+            releases.append(
+                Release(
+                    id=release_id,
+                    created_at=str(record.get("created_at") or ""),
+                    files=len(record.get("files") or {}),
+                    active=release_id == active,
+                )
+            )
+        return releases
+
+    def prune(self) -> list[str]:
+        """Remove releases beyond the newest ``retention``, keeping the active one."""
+        active = self.active()
+        stale = [release_id for release_id in self._ids()[: -self.retention] if release_id != active]
+        for release_id in stale:
+            shutil.rmtree(self.releases_dir / release_id, ignore_errors=True)
+        return stale
+
+    def _ids(self) -> list[str]:
+        if not self.releases_dir.is_dir():
+            return []
+        return sorted(path.name for path in self.releases_dir.iterdir() if path.is_dir())
+
+    def _record(self, release_id: str) -> dict[str, Any]:
+        try:
+            path = self.releases_dir / release_id / RELEASE_FILE
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+
+def release_store(session_dir: Path, blob_store: BlobStore | None = None) -> ReleaseStore:
+    """Release store for a session dir, with the blob store from settings.
+
+    By default blobs live beside the sessions dir (``~/.instant-coffee/blobs``)
+    so hardlinks stay on one filesystem.
+    """
+    settings = get_settings()
+    if blob_store is None:
+        root = settings.dist_blob_store_dir or Path(session_dir).parent.parent / "blobs"
+        blob_store = BlobStore(Path(root).expanduser())
+    return ReleaseStore(session_dir, blob_store, retention=settings.dist_release_retention)
+
+
+def _file_digest(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+__all__ = [
+    "BlobStore",
+    "Release",
+    "ReleaseStore",
+    "release_store",
+]
@@ -0,0 +1,134 @@
+// Long-lived build worker: keeps Vite, its plugins and tsx loaded between
+// builds so each job skips Node start-up and module initialisation.
+//
+// Protocol: one JSON object per line.  Requests arrive on stdin, responses
+// and log lines leave on stdout; nothing else may write to stdout.
+//
+//   -> {"id": 1, "op": "client", "root": "/abs/work/dir", "cwd": "/abs/work/dir", "env": {...}}
+//   -> {"id": 2, "op": "prerender", "root": "/abs/work/dir", "only": ["about"]}
+//   -> {"id": 3, "op": "ping"}
+//   <- {"id": 1, "type": "log", "stream": "stdout", "line": "..."}
+//   <- {"id": 1, "type": "result", "ok": true, "rss": 123456789}
+//   <- {"id": 2, "type": "result", "ok": false, "error": "...", "rss": 123456789}
+//
+// Jobs run one at a time: Tailwind resolves content globs against the cwd,
+// so the worker chdirs into each job's cwd (its root when omitted).  A job's
+// "env" replaces process.env while it runs; the worker may have been started
+// for another session, so nothing about that session may leak into the job.
+import path from 'node:path'
+import readline from 'node:readline'
+import { format } from 'node:util'
+import { pathToFileURL } from 'node:url'
+import { build } from 'vite'
+import { tsImport } from 'tsx/esm/api'
+
+const stdoutWrite = process.stdout.write.bind(process.stdout)
+let currentId = null
+
+function send(message) {
+  stdoutWrite(JSON.stringify(message) + '\n')
+}
+
+function redirect(stream) {
+  return (...args) => {
+    for (const line of format(...args).split('\n')) {
+      send({ id: currentId, type: 'log', stream, line })
+    }
+  }
+}
+
+console.log = redirect('stdout')
+console.info = redirect('stdout')
+console.warn = redirect('stderr')
+console.error = redirect('stderr')
+// Anything else writing to stdout (e.g. progress bars) becomes a log line.
+process.stdout.write = (chunk, ...rest) => {
+  const text = typeof chunk === 'string' ? chunk : Buffer.from(chunk).toString('utf-8')
+  for (const line of text.split('\n')) {
+    if (line) send({ id: currentId, type: 'log', stream: 'stdout', line })
+  }
+  const callback = rest.find((value) => typeof value === 'function')
+  if (callback) callback()
+  return true
+}
+
+async function buildClient(root) {
+  await build({
+    root,
+    configFile: path.join(root, 'vite.config.ts'),
+    mode: 'production',
+    logLevel: 'info',
+    clearScreen: false,
+  })
+}
+
+async function prerenderPages(root, only) {
+  // tsImport loads the work dir's sources in a fresh module namespace, so
+  // every job sees its own App; the worker is recycled as these accumulate.
+  const script = pathToFileURL(path.join(root, 'scripts', 'prerender.ts')).href
+  const module = await tsImport(script, import.meta.url)
+  module.prerender({ rootDir: root, only: only && only.length ? only : null })
+}
+
+function replaceEnv(env) {
+  for (const key of Object.keys(process.env)) {
+    if (!(key in env)) delete process.env[key]
+  }
+  Object.assign(process.env, env)
+}
+
+async function runJob(request, job) {
+  // Every job chdirs, so the cwd is not restored (the last one may be gone).
+  const startEnv = { ...process.env }
+  process.chdir(request.cwd || request.root)
+  if (request.env) replaceEnv(request.env)
+  try {
+    return await job()
+  } finally {
+    replaceEnv(startEnv)
+  }
+}
+
+async function handle(request) {
+  switch (request.op) {
+    case 'ping':
+      return
+    case 'client':
+      return runJob(request, () => buildClient(request.root))
+    case 'prerender':
+      return runJob(request, () => prerenderPages(request.root, request.only))
+    default:
+      throw new Error(`Unknown op: ${request.op}`)
+  }
+}
+
+let queue = Promise.resolve()
+
+readline.createInterface({ input: process.stdin }).on('line', (line) => {
+  if (!line.trim()) return
+  queue = queue.then(async () => {
+    let request
+    try {
+      request = JSON.parse(line)
+    } catch {
+      send({ id: null, type: 'result', ok: false, error: 'Invalid request' })
+      return
+    }
+    currentId = request.id ?? null
+    try {
+      await handle(request)
+      send({ id: currentId, type: 'result', ok: true, rss: process.memoryUsage().rss })
+    } catch (error) {
+      const message = error instanceof Error ? error.stack || error.message : String(error)
+      send({ id: currentId, type: 'result', ok: false, error: message, rss: process.memoryUsage().rss })
+    } finally {
+      currentId = null
+    }
+  })
+})
+
+process.stdin.on('end', () => {
+  queue.then(() => process.exit(0))
+})
+
+send({ id: null, type: 'ready', pid: process.pid })
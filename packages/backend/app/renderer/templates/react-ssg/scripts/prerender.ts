@@ -7,9 +7,7 @@ import App, { type AppProps } from '../src/App'
 import type { PageSchema, HeadMeta } from '../src/lib/schema-renderer'
 
 const __dirname = path.dirname(fileURLToPath(import.meta.url))
-const rootDir = path.resolve(__dirname, '..')
-const distDir = path.join(rootDir, 'dist')
-const dataDir = path.join(rootDir, 'src', 'data')
+const defaultRootDir = path.resolve(__dirname, '..')
 
 const fallbackSchema: PageSchema = {
   slug: 'index',
@@ -115,53 +113,80 @@ interface PrerenderManifest {
   pages: ManifestPage[]
 }
 
-const manifestPath = path.join(dataDir, 'prerender-manifest.json')
-const manifest = readJson<PrerenderManifest | null>(manifestPath, null)
-
-const schemas = readJson<PageSchema[]>(path.join(dataDir, 'schemas.json'), [fallbackSchema])
-const tokens = readJson<Record<string, any>>(path.join(dataDir, 'tokens.json'), {})
-const assets = readJson<Record<string, any>>(path.join(dataDir, 'assets.json'), {})
-
-if (!fs.existsSync(distDir)) {
-  throw new Error('dist directory not found. Run `vite build` before prerender.')
+export interface PrerenderOptions {
+  rootDir?: string
+  // Routes to render; the rest of dist is left as it is.
+  only?: string[] | null
 }
 
-const baseHtml = fs.readFileSync(path.join(distDir, 'index.html'), 'utf-8')
-
-// Prefer manifest (HTML-to-React path) over schemas (legacy path)
-let pageList: Array<{ slug: string; title: string; head?: HeadMeta; layout?: string; components?: any[] }>
-if (manifest && Array.isArray(manifest.pages) && manifest.pages.length) {
-  pageList = manifest.pages.map((p) => ({
-    slug: p.slug,
-    title: p.title,
-    layout: 'default' as const,
-    components: [],
-  }))
-} else {
-  pageList = Array.isArray(schemas) && schemas.length ? schemas : [fallbackSchema]
-}
+export function prerender({ rootDir = defaultRootDir, only = null }: PrerenderOptions = {}) {
+  const distDir = path.join(rootDir, 'dist')
+  const dataDir = path.join(rootDir, 'src', 'data')
+  const manifest = readJson<PrerenderManifest | null>(path.join(dataDir, 'prerender-manifest.json'), null)
 
-pageList.forEach((page) => {
-  const slug = normalizeSlug(page.slug)
-  const appHtml = renderPageHtml({
-    pageSlug: slug,
-    schemas: pageList,
-    tokens,
-    assets,
-  })
+  const schemas = readJson<PageSchema[]>(path.join(dataDir, 'schemas.json'), [fallbackSchema])
+  const tokens = readJson<Record<string, any>>(path.join(dataDir, 'tokens.json'), {})
+  const assets = readJson<Record<string, any>>(path.join(dataDir, 'assets.json'), {})
+
+  if (!fs.existsSync(distDir)) {
+    throw new Error('dist directory not found. Run `vite build` before prerender.')
+  }
 
-  const headTags = buildHeadTags(page.title, page.head)
-  let html = injectHead(baseHtml, page.title, headTags)
-  html = injectAppHtml(html, appHtml)
-  html = rewriteAssetPaths(html, slug)
+  const baseHtml = fs.readFileSync(path.join(distDir, 'index.html'), 'utf-8')
+
+  // Prefer manifest (HTML-to-React path) over schemas (legacy path)
+  let pageList: Array<{ slug: string; title: string; head?: HeadMeta; layout?: string; components?: any[] }>
+  if (manifest && Array.isArray(manifest.pages) && manifest.pages.length) {
+    pageList = manifest.pages.map((p) => ({
+      slug: p.slug,
+      title: p.title,
+      layout: 'default' as const,
+      components: [],
+    }))
+  } else {
+    pageList = Array.isArray(schemas) && schemas.length ? schemas : [fallbackSchema]
+  }
 
-  const outputPath =
-    slug === 'index'
-      ? path.join(distDir, 'index.html')
-      : path.join(distDir, 'pages', slug, 'index.html')
+  const selected = only ? new Set(only.map((slug) => normalizeSlug(slug))) : null
+  let rendered = 0
+  const total = selected
+    ? pageList.filter((page) => selected.has(normalizeSlug(page.slug))).length
+    : pageList.length
+  pageList.forEach((page) => {
+    const slug = normalizeSlug(page.slug)
+    if (selected && !selected.has(slug)) return
+    rendered += 1
+    const appHtml = renderPageHtml({
+      pageSlug: slug,
+      schemas: pageList,
+      tokens,
+      assets,
+    })
+
+    const headTags = buildHeadTags(page.title, page.head)
+    let html = injectHead(baseHtml, page.title, headTags)
+    html = injectAppHtml(html, appHtml)
+    html = rewriteAssetPaths(html, slug)
+
+    const outputPath =
+      slug === 'index'
+        ? path.join(distDir, 'index.html')
+        : path.join(distDir, 'pages', slug, 'index.html')
+
+    ensureDir(outputPath)
+    fs.writeFileSync(outputPath, html, 'utf-8')
+    console.log(`Prerendered ${slug} (${rendered}/${total})`)
+  })
 
-  ensureDir(outputPath)
-  fs.writeFileSync(outputPath, html, 'utf-8')
-})
+  console.log(`Prerendered ${rendered} of ${pageList.length} page(s).`)
+  return { rendered, total: pageList.length }
+}
 
-console.log(`Prerendered ${pageList.length} page(s).`)
+// Run directly (`npm run prerender`); the build worker imports prerender().
+if (process.argv[1] && fs.realpathSync(process.argv[1]) === fileURLToPath(import.meta.url)) {
+  // `--only a,b` prerenders just those routes (incremental builds reuse the rest).
+  const onlyIndex = process.argv.indexOf('--only')
+  const only =
+    onlyIndex >= 0 && process.argv[onlyIndex + 1] ? process.argv[onlyIndex + 1].split(',') : null
+  prerender({ only })
+}
@@ -4,6 +4,9 @@ import path from 'node:path'
 
 export default defineConfig({
   plugins: [react()],
+  // Keep Vite's cache in the persistent work dir: node_modules is shared
+  // across sessions (and may be a read-only cache entry).
+  cacheDir: '.vite-cache',
   resolve: {
     alias: {
       '@': path.resolve(__dirname, 'src'),
@@ -7,6 +7,7 @@ import logging
 from pathlib import Path
 
 from .html_to_react import ConvertedFile
+from .incremental import write_if_changed
 
 logger = logging.getLogger(__name__)
 
@@ -16,14 +17,15 @@ class TsxFileWriter:
 
     def __init__(self, project_root: Path) -> None:
         self.root = Path(project_root)
+        # Every file this writer produced, changed or not.
+        self.written: list[Path] = []
 
     def write_files(self, files: list[ConvertedFile]) -> None:
         """Write all converted files into the workspace."""
         for f in files:
             target = self.root / f.path
-            target.parent.mkdir(parents=True, exist_ok=True)
-            target.write_text(f.content, encoding="utf-8")
-            logger.debug("Wrote %s", target)
+            if self._write(target, f.content):
+                logger.debug("Wrote %s", target)
 
     def write_entry_points(self, pages: list[dict]) -> None:
         """Generate App.tsx routing and prerender manifest.
@@ -81,8 +83,7 @@ export default function App({{ pageSlug = 'index' }}: AppProps) {{
 }}
 """
         target = self.root / "src" / "App.tsx"
-        target.parent.mkdir(parents=True, exist_ok=True)
-        target.write_text(app_tsx, encoding="utf-8")
+        self._write(target, app_tsx)
         logger.debug("Wrote App.tsx with %d routes", len(routes))
 
     def _write_prerender_manifest(self, pages: list[dict]) -> None:
@@ -97,15 +98,15 @@ export default function App({{ pageSlug = 'index' }}: AppProps) {{
                 for page in pages
             ]
         }
-        data_dir = self.root / "src" / "data"
-        data_dir.mkdir(parents=True, exist_ok=True)
-        target = data_dir / "prerender-manifest.json"
-        target.write_text(
-            json.dumps(manifest, indent=2, ensure_ascii=False),
-            encoding="utf-8",
-        )
+        target = self.root / "src" / "data" / "prerender-manifest.json"
+        self._write(target, json.dumps(manifest, indent=2, ensure_ascii=False))
         logger.debug("Wrote prerender-manifest.json with %d pages", len(pages))
 
+    def _write(self, target: Path, content: str) -> bool:
+        """Write only if the content changed, so unchanged files keep their mtime."""
+        self.written.append(target)
+        return write_if_changed(target, content)
+
     @staticmethod
     def _slug_to_component(slug: str) -> str:
         """Convert a slug like 'about-us' to 'AboutUsPage'."""
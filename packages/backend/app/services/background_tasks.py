@@ -48,8 +48,8 @@ class BackgroundTaskInfo:
             pid=task.pid,
             exit_code=task.exit_code,
             created_at=task.created_at.isoformat(),
-            output_lines=len(task.output_buffer),
-            output_preview=task.output_buffer[-20:],
+            output_lines=task.output.total_lines,
+            output_preview=task.output.tail(20),
         )
 
 
@@ -107,12 +107,14 @@ class BackgroundTaskService:
         if not task:
             return {"error": "Task not found"}
 
-        output_lines = task.get_output(since)
+        chunk = task.read_output(since)
         return {
             "task_id": task_id,
             "status": task.status.value,
-            "output": "\n".join(output_lines),
-            "output_lines": len(output_lines),
+            "output": "\n".join(chunk.lines),
+            "output_lines": len(chunk.lines),
+            "cursor": chunk.cursor,
+            "dropped": chunk.dropped,
         }
 
 
@@ -1,20 +1,54 @@
 """Data cleanup service for removing old sessions and associated data.
 
 Provides configurable retention policies to prevent unbounded database growth.
+
+Deletes are set-based: each step removes at most ``chunk_size`` rows with a
+single ``DELETE ... WHERE id IN (...)`` and commits, so no transaction holds
+the write lock for long and nothing is loaded into the ORM.  A session's
+child rows are deleted explicitly, children before parents, because SQLite
+does not enforce ``ON DELETE CASCADE`` here.  With a time budget a run stops
+between chunks and the next run carries on where it left off; a chunk of
+sessions, once started, is always finished so no project is left half
+deleted.
 """
 
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timedelta, timezone
+import threading
+import time
+from datetime import timedelta
+from typing import Callable, Optional
 
-from sqlalchemy import func
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.orm import Session as DbSession
 
-from ..db.models import Message, Session as SessionModel, Version
+from ..db.models import (
+    Message,
+    Page,
+    PageVersion,
+    ProductDoc,
+    ProductDocHistory,
+    ProjectMemory,
+    ProjectSnapshot,
+    ProjectSnapshotDoc,
+    ProjectSnapshotPage,
+    Session as SessionModel,
+    SessionEvent,
+    SessionEventSequence,
+    SessionRun,
+    Thread,
+    TokenUsage,
+    TokenUsageRollup,
+    Version,
+)
+from ..utils.datetime import utcnow
+from .html_store import HtmlBlobStore
 
 logger = logging.getLogger(__name__)
 
+ProgressCallback = Callable[[str, int], None]
+
 
 class CleanupPolicy:
     """Configurable data retention policy."""
@@ -25,106 +59,297 @@ class CleanupPolicy:
         max_sessions: int = 500,
         max_messages_per_session: int = 1000,
         dry_run: bool = False,
+        chunk_size: int = 500,
+        time_budget_seconds: Optional[float] = None,
+        pause_seconds: float = 0.0,
     ):
         self.max_session_age_days = max_session_age_days
         self.max_sessions = max_sessions
         self.max_messages_per_session = max_messages_per_session
         self.dry_run = dry_run
+        # Rows per DELETE (and per transaction).
+        self.chunk_size = max(1, chunk_size)
+        # Wall-clock limit for one run; None runs to completion.
+        self.time_budget_seconds = time_budget_seconds
+        # Sleep between chunks so request traffic can take the write lock.
+        self.pause_seconds = pause_seconds
 
 
 class CleanupService:
     """Removes stale data according to retention policies."""
 
-    def __init__(self, db: DbSession, policy: CleanupPolicy | None = None):
+    def __init__(
+        self,
+        db: DbSession,
+        policy: CleanupPolicy | None = None,
+        *,
+        progress: Optional[ProgressCallback] = None,
+    ):
         self.db = db
         self.policy = policy or CleanupPolicy()
+        self._progress = progress
+        self._deadline: Optional[float] = None
+        # True when the last run stopped on its time budget with work left.
+        self.budget_exhausted = False
 
     def cleanup_old_sessions(self) -> int:
         """Delete sessions older than max_session_age_days. Returns count deleted."""
-        cutoff = datetime.now(timezone.utc) - timedelta(days=self.policy.max_session_age_days)
-        old_sessions = (
-            self.db.query(SessionModel)
-            .filter(SessionModel.updated_at < cutoff)
-            .all()
-        )
-        if not old_sessions:
-            return 0
-
-        count = len(old_sessions)
+        cutoff = utcnow() - timedelta(days=self.policy.max_session_age_days)
+        condition = SessionModel.updated_at < cutoff
         if self.policy.dry_run:
-            logger.info("Dry run: would delete %d old sessions", count)
+            count = self._count(SessionModel.id, condition)
+            if count:
+                logger.info("Dry run: would delete %d old sessions", count)
             return count
 
-        for session in old_sessions:
-            self.db.delete(session)
-        self.db.commit()
-        logger.info("Deleted %d sessions older than %d days", count, self.policy.max_session_age_days)
+        count = self._delete_sessions(condition, limit=None, step="old_sessions")
+        if count:
+            logger.info("Deleted %d sessions older than %d days", count, self.policy.max_session_age_days)
         return count
 
     def cleanup_excess_sessions(self) -> int:
         """Keep only the most recent max_sessions. Returns count deleted."""
-        total = self.db.query(func.count(SessionModel.id)).scalar() or 0
+        total = self._count(SessionModel.id)
         if total <= self.policy.max_sessions:
             return 0
 
         excess = total - self.policy.max_sessions
-        oldest = (
-            self.db.query(SessionModel)
-            .order_by(SessionModel.updated_at.asc())
-            .limit(excess)
-            .all()
-        )
-        if not oldest:
-            return 0
-
-        count = len(oldest)
         if self.policy.dry_run:
-            logger.info("Dry run: would delete %d excess sessions", count)
-            return count
+            logger.info("Dry run: would delete %d excess sessions", excess)
+            return excess
 
-        for session in oldest:
-            self.db.delete(session)
-        self.db.commit()
-        logger.info("Deleted %d excess sessions (limit: %d)", count, self.policy.max_sessions)
+        count = self._delete_sessions(None, limit=excess, step="excess_sessions")
+        if count:
+            logger.info("Deleted %d excess sessions (limit: %d)", count, self.policy.max_sessions)
         return count
 
     def cleanup_excess_messages(self) -> int:
         """Trim messages per session to max_messages_per_session. Returns count deleted."""
         total_deleted = 0
-        sessions_with_excess = (
-            self.db.query(Message.session_id, func.count(Message.id).label("cnt"))
+        sessions_with_excess = self.db.execute(
+            select(Message.session_id, func.count(Message.id).label("cnt"))
             .group_by(Message.session_id)
             .having(func.count(Message.id) > self.policy.max_messages_per_session)
-            .all()
-        )
+        ).all()
+        self._end_transaction()
 
         for session_id, msg_count in sessions_with_excess:
+            if self._out_of_time():
+                break
             excess = msg_count - self.policy.max_messages_per_session
-            oldest_msgs = (
-                self.db.query(Message)
-                .filter(Message.session_id == session_id)
-                .order_by(Message.created_at.asc())
-                .limit(excess)
-                .all()
-            )
             if self.policy.dry_run:
-                total_deleted += len(oldest_msgs)
+                total_deleted += excess
                 continue
-            for msg in oldest_msgs:
-                self.db.delete(msg)
-            total_deleted += len(oldest_msgs)
+            oldest = (
+                select(Message.id)
+                .where(Message.session_id == session_id)
+                .order_by(Message.timestamp.asc(), Message.id.asc())
+            )
+            deleted = self._delete_chunked(Message, oldest, limit=excess, step="excess_messages")
+            total_deleted += deleted
+            if deleted < excess:
+                break
 
         if total_deleted > 0 and not self.policy.dry_run:
-            self.db.commit()
             logger.info("Deleted %d excess messages across sessions", total_deleted)
         return total_deleted
 
     def run_all(self) -> dict[str, int]:
         """Run all cleanup policies. Returns summary of deletions."""
-        results = {
-            "old_sessions": self.cleanup_old_sessions(),
-            "excess_sessions": self.cleanup_excess_sessions(),
-            "excess_messages": self.cleanup_excess_messages(),
-        }
-        logger.info("Cleanup complete: %s", results)
+        self.budget_exhausted = False
+        budget = self.policy.time_budget_seconds
+        self._deadline = time.monotonic() + budget if budget is not None else None
+        try:
+            results = {
+                "old_sessions": self.cleanup_old_sessions(),
+                "excess_sessions": self.cleanup_excess_sessions(),
+                "excess_messages": self.cleanup_excess_messages(),
+            }
+        finally:
+            self._deadline = None
+        if self.budget_exhausted:
+            logger.info("Cleanup stopped on its %.1fs budget: %s", budget, results)
+        else:
+            logger.info("Cleanup complete: %s", results)
         return results
+
+    # ---- Session deletion
+
+    def _delete_sessions(self, condition, *, limit: Optional[int], step: str) -> int:
+        """Delete matching sessions, oldest first, ``chunk_size`` sessions at a time."""
+        deleted = 0
+        while limit is None or deleted < limit:
+            if self._out_of_time():
+                break
+            batch = self.policy.chunk_size if limit is None else min(self.policy.chunk_size, limit - deleted)
+            query = select(SessionModel.id).order_by(SessionModel.updated_at.asc(), SessionModel.id.asc())
+            if condition is not None:
+                query = query.where(condition)
+            session_ids = list(self.db.execute(query.limit(batch)).scalars())
+            self._end_transaction()
+            if not session_ids:
+                break
+            self._delete_session_children(session_ids)
+            count = self._execute(delete(SessionModel).where(SessionModel.id.in_(session_ids)))
+            deleted += count
+            self._report(step, deleted)
+            if count < len(session_ids):
+                # Recreated or deleted underneath us; re-select next time.
+                break
+        return deleted
+
+    def _delete_session_children(self, session_ids: list[str]) -> None:
+        """Delete every row hanging off ``session_ids``, ignoring the time budget."""
+        snapshot_ids = select(ProjectSnapshot.id).where(ProjectSnapshot.session_id.in_(session_ids))
+        page_ids = select(Page.id).where(Page.session_id.in_(session_ids))
+        doc_ids = select(ProductDoc.id).where(ProductDoc.session_id.in_(session_ids))
+
+        released_hashes: set[str] = set()
+        steps = [
+            (ProjectSnapshotPage, ProjectSnapshotPage.snapshot_id.in_(snapshot_ids), True),
+            (ProjectSnapshotDoc, ProjectSnapshotDoc.snapshot_id.in_(snapshot_ids), False),
+            (ProjectSnapshot, ProjectSnapshot.session_id.in_(session_ids), False),
+            (PageVersion, PageVersion.page_id.in_(page_ids), True),
+            (Page, Page.session_id.in_(session_ids), False),
+            (ProductDocHistory, ProductDocHistory.product_doc_id.in_(doc_ids), False),
+            (ProductDoc, ProductDoc.session_id.in_(session_ids), False),
+            (Message, Message.session_id.in_(session_ids), False),
+            (Thread, Thread.session_id.in_(session_ids), False),
+            (Version, Version.session_id.in_(session_ids), True),
+            (TokenUsage, TokenUsage.session_id.in_(session_ids), False),
+            (TokenUsageRollup, TokenUsageRollup.session_id.in_(session_ids), False),
+            (SessionEvent, SessionEvent.session_id.in_(session_ids), False),
+            (SessionEventSequence, SessionEventSequence.session_id.in_(session_ids), False),
+            (SessionRun, SessionRun.session_id.in_(session_ids), False),
+            (ProjectMemory, ProjectMemory.session_id.in_(session_ids), False),
+        ]
+        try:
+            for model, condition, holds_html in steps:
+                if model is PageVersion:
+                    # pages.current_version_id points back at page_versions.
+                    self._execute(
+                        update(Page)
+                        .where(Page.session_id.in_(session_ids))
+                        .where(Page.current_version_id.isnot(None))
+                        .values(current_version_id=None)
+                    )
+                key = model.__mapper__.primary_key[0]
+                if holds_html:
+                    released_hashes.update(
+                        self.db.execute(
+                            select(model.html_hash).where(condition).where(model.html_hash.isnot(None))
+                        ).scalars()
+                    )
+                    self._end_transaction()
+                self._delete_chunked(
+                    model,
+                    select(key).where(condition),
+                    limit=None,
+                    step=model.__tablename__,
+                    budgeted=False,
+                )
+        finally:
+            # Blobs whose references are already gone, even if a step failed.
+            if released_hashes:
+                HtmlBlobStore(self.db).release(released_hashes)
+                self.db.commit()
+
+    # ---- Chunked primitives
+
+    def _delete_chunked(
+        self, model, id_query, *, limit: Optional[int], step: str, budgeted: bool = True
+    ) -> int:
+        """``DELETE ... WHERE pk IN (id_query LIMIT chunk)`` until done, out of time or at ``limit``.
+
+        ``budgeted=False`` runs to completion regardless of the time budget.
+        """
+        key = model.__mapper__.primary_key[0]
+        deleted = 0
+        while limit is None or deleted < limit:
+            batch = self.policy.chunk_size if limit is None else min(self.policy.chunk_size, limit - deleted)
+            ids = list(self.db.execute(id_query.limit(batch)).scalars())
+            if not ids:
+                self._end_transaction()
+                break
+            deleted += self._execute(delete(model).where(key.in_(ids)))
+            self._report(step, deleted)
+            if len(ids) < batch or (budgeted and self._out_of_time()):
+                break
+        return deleted
+
+    def _execute(self, statement) -> int:
+        """Run one write statement in its own short transaction."""
+        try:
+            result = self.db.execute(statement, execution_options={"synchronize_session": False})
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        if self.policy.pause_seconds > 0:
+            time.sleep(self.policy.pause_seconds)
+        return max(result.rowcount or 0, 0)
+
+    def _count(self, column, condition=None) -> int:
+        query = select(func.count(column))
+        if condition is not None:
+            query = query.where(condition)
+        count = self.db.execute(query).scalar() or 0
+        self._end_transaction()
+        return int(count)
+
+    def _end_transaction(self) -> None:
+        # Reads open a transaction too; don't keep a snapshot pinned between chunks.
+        self.db.commit()
+
+    def _out_of_time(self) -> bool:
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            self.budget_exhausted = True
+        return self.budget_exhausted
+
+    def _report(self, step: str, deleted: int) -> None:
+        logger.debug("Cleanup %s: %d rows deleted", step, deleted)
+        if self._progress is not None:
+            self._progress(step, deleted)
+
+
+# ---- Background worker
+
+
+class CleanupWorker:
+    """Runs :meth:`CleanupService.run_all` every ``interval_seconds`` on a daemon thread."""
+
+    def __init__(self, session_factory: Callable[[], DbSession], policy: CleanupPolicy, interval_seconds: float) -> None:
+        self._session_factory = session_factory
+        self._policy = policy
+        self._interval = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="data-cleanup", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self) -> dict[str, int]:
+        db = self._session_factory()
+        try:
+            return CleanupService(db, self._policy).run_all()
+        finally:
+            db.close()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                self.run_once()
+            except Exception:
+                logger.warning("Background cleanup failed", exc_info=True)
+
+
+__all__ = ["CleanupPolicy", "CleanupService", "CleanupWorker"]
@@ -7,9 +7,9 @@ from enum import Enum
 from contextlib import contextmanager
 from threading import Lock
 import time
-from typing import Any, Iterator, Literal, Optional
+from typing import TYPE_CHECKING, Any, Iterator, Literal, Optional
 
-from sqlalchemy import func, inspect
+from sqlalchemy import func, inspect, select
 from sqlalchemy.orm import Session as DbSession
 from sqlalchemy.exc import IntegrityError, OperationalError
 
@@ -23,6 +23,9 @@ from ..events.types import EXCLUDED_EVENT_TYPES, RUN_SCOPED_EVENT_TYPES, STRUCTU
 from ..config import get_settings
 from ..db.database import get_database
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
 logger = logging.getLogger(__name__)
 
 
@@ -246,10 +249,7 @@ class EventStoreService:
     def get_events(
         self, session_id: str, since_seq: Optional[int] = None, limit: int = 1000
     ) -> list[SessionEvent]:
-        query = self.db.query(SessionEvent).filter(SessionEvent.session_id == session_id)
-        if since_seq is not None:
-            query = query.filter(SessionEvent.seq > since_seq)
-        return query.order_by(SessionEvent.seq.asc()).limit(limit).all()
+        return list(self.db.scalars(_events_statement(session_id, None, since_seq, limit)))
 
     def get_events_by_run(
         self,
@@ -258,13 +258,7 @@ class EventStoreService:
         since_seq: Optional[int] = None,
         limit: int = 1000,
     ) -> list[SessionEvent]:
-        query = self.db.query(SessionEvent).filter(
-            SessionEvent.session_id == session_id,
-            SessionEvent.run_id == run_id,
-        )
-        if since_seq is not None:
-            query = query.filter(SessionEvent.seq > since_seq)
-        return query.order_by(SessionEvent.seq.asc()).limit(limit).all()
+        return list(self.db.scalars(_events_statement(session_id, run_id, since_seq, limit)))
 
     async def store_and_emit(
         self,
@@ -302,22 +296,32 @@ class EventStoreService:
         payload.pop("timestamp", None)
         payload.pop("session_id", None)
         session_id = event.session_id
+        if not session_id:
+            return
+
+        def store(db: DbSession) -> None:
+            source = self._infer_source(str(event_type), payload)
+            self.store_event(
+                session_id,
+                str(event_type),
+                payload,
+                source.value,
+                created_at=event.timestamp,
+                db=db,
+            )
+
+        writer = self._database.writer if self._database is not None else None
+        if writer is not None:
+            # The single writer serialises event inserts, so there is no lock to retry on.
+            writer.run(store)
+            return
         delays = (0.0,) + self._sqlite_retry_delays
         for attempt, delay in enumerate(delays, start=1):
             try:
                 if delay:
                     time.sleep(delay)
                 with self._writer_session() as db:
-                    if session_id:
-                        source = self._infer_source(str(event_type), payload)
-                        self.store_event(
-                            session_id,
-                            str(event_type),
-                            payload,
-                            source.value,
-                            created_at=event.timestamp,
-                            db=db,
-                        )
+                    store(db)
                 return
             except OperationalError as exc:
                 if self._is_sqlite_locked(exc):
@@ -329,4 +333,37 @@ class EventStoreService:
                 raise
 
 
-__all__ = ["EventStoreService"]
+class AsyncEventStoreService:
+    """Event reads for SSE replay and polling on an ``AsyncSession``.
+
+    Writes stay on :class:`EventStoreService`, which owns sequence allocation.
+    """
+
+    def __init__(self, db: "AsyncSession") -> None:
+        self.db = db
+
+    async def get_events(
+        self, session_id: str, since_seq: Optional[int] = None, limit: int = 1000
+    ) -> list[SessionEvent]:
+        return list(await self.db.scalars(_events_statement(session_id, None, since_seq, limit)))
+
+    async def get_events_by_run(
+        self,
+        session_id: str,
+        run_id: str,
+        since_seq: Optional[int] = None,
+        limit: int = 1000,
+    ) -> list[SessionEvent]:
+        return list(await self.db.scalars(_events_statement(session_id, run_id, since_seq, limit)))
+
+
+def _events_statement(session_id: str, run_id: Optional[str], since_seq: Optional[int], limit: int):
+    statement = select(SessionEvent).where(SessionEvent.session_id == session_id)
+    if run_id is not None:
+        statement = statement.where(SessionEvent.run_id == run_id)
+    if since_seq is not None:
+        statement = statement.where(SessionEvent.seq > since_seq)
+    return statement.order_by(SessionEvent.seq.asc()).limit(limit)
+
+
+__all__ = ["AsyncEventStoreService", "EventStoreService"]
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Iterable, Optional
+
+from sqlalchemy import select, union
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session as DbSession
+
+from ..db import html_codec
+from ..db.models import HtmlBlob, PageVersion, ProjectSnapshotPage, Version
+
+# Decoding a blob decodes its bases first; cap the chain.
+MAX_DELTA_DEPTH = 8
+
+
+def html_digest(html: str) -> str:
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+class HtmlBlobStore:
+    """Deduplicated, compressed page HTML.
+
+    Page versions, session versions and snapshot pages reference blobs by
+    hash, so identical HTML is stored once.  New content is encoded against
+    ``base`` (usually the previous version of the same page) when that is
+    smaller; see ``db/html_codec.py``.  Blobs are deleted by :meth:`release`
+    once nothing references them.
+    """
+
+    def __init__(self, db: DbSession) -> None:
+        self.db = db
+
+    def put(self, html: str, *, base_hash: Optional[str] = None) -> HtmlBlob:
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        existing = self.db.get(HtmlBlob, digest)
+        if existing is not None:
+            return existing
+
+        base = self.db.get(HtmlBlob, base_hash) if base_hash else None
+        if base is not None and base.depth >= MAX_DELTA_DEPTH:
+            base = None
+        codec, payload = html_codec.encode(data, base.raw() if base is not None else None)
+        delta = codec in (html_codec.ZSTD_DELTA, html_codec.ZLIB_DELTA)
+        blob = HtmlBlob(
+            hash=digest,
+            codec=codec,
+            base_hash=base.hash if delta else None,
+            depth=base.depth + 1 if delta else 0,
+            size=len(data),
+            data=payload,
+        )
+        blob._raw = data
+        try:
+            # Another writer may store the same content concurrently.
+            with self.db.begin_nested():
+                self.db.add(blob)
+        except IntegrityError:
+            existing = self.db.get(HtmlBlob, digest)
+            if existing is None:
+                raise
+            return existing
+        return blob
+
+    def get(self, digest: str) -> Optional[str]:
+        blob = self.db.get(HtmlBlob, digest)
+        return blob.text if blob is not None else None
+
+    def release(self, hashes: Iterable[Optional[str]]) -> int:
+        """Delete the given blobs if unreferenced, then their unreferenced bases."""
+        pending = {digest for digest in hashes if digest}
+        removed = 0
+        while pending:
+            rows = (
+                self.db.query(HtmlBlob.hash, HtmlBlob.base_hash)
+                .filter(HtmlBlob.hash.in_(pending))
+                .all()
+            )
+            referenced = self._referenced({digest for digest, _ in rows})
+            orphans = [(digest, base) for digest, base in rows if digest not in referenced]
+            if not orphans:
+                break
+            self.db.query(HtmlBlob).filter(
+                HtmlBlob.hash.in_([digest for digest, _ in orphans])
+            ).delete(synchronize_session=False)
+            removed += len(orphans)
+            pending = {base for _, base in orphans if base}
+        self.db.flush()
+        return removed
+
+    def _referenced(self, candidates: set[str]) -> set[str]:
+        if not candidates:
+            return set()
+        query = union(
+            select(PageVersion.html_hash).where(PageVersion.html_hash.in_(candidates)),
+            select(Version.html_hash).where(Version.html_hash.in_(candidates)),
+            select(ProjectSnapshotPage.html_hash).where(ProjectSnapshotPage.html_hash.in_(candidates)),
+            select(HtmlBlob.base_hash).where(HtmlBlob.base_hash.in_(candidates)),
+        )
+        return {row[0] for row in self.db.execute(query)}
+
+
+__all__ = ["HtmlBlobStore", "MAX_DELTA_DEPTH", "html_digest"]
@@ -1,13 +1,33 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from collections import OrderedDict
+from threading import Lock
+from typing import TYPE_CHECKING, List, NamedTuple, Optional, Tuple
 
-from sqlalchemy.orm import Session as DbSession
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session as DbSession, defer
 
-from ..db.models import Message
+from ..db.models import Message, Session, Thread
+from ..db.utils import run_write
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# Chat requests read the same tail of a thread on every turn.
+RECENT_WINDOW = 50
+_RECENT_CACHE_SIZE = 128
+
+
+class RecentMessage(NamedTuple):
+    role: str
+    content: str
 
 
 class MessageService:
+    # (database, session_id, thread_id) -> (stamp, window); see recent_messages.
+    _recent_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+    _recent_lock = Lock()
+
     def __init__(self, db: DbSession) -> None:
         self.db = db
 
@@ -31,8 +51,29 @@ class MessageService:
         )
         self.db.add(record)
         self.db.flush()
+        self._invalidate(session_id)
         return record
 
+    def record_message(
+        self,
+        session_id: str,
+        role: str,
+        content: str,
+        thread_id: Optional[str] = None,
+        metadata: Optional[dict] = None,
+    ) -> Message:
+        """``add_message`` committed through ``run_write`` (the SQLite writer when enabled).
+
+        Commits this service's session first; with the write queue on, the
+        returned row is detached.
+        """
+        return run_write(
+            lambda db: MessageService(db).add_message(
+                session_id, role, content, thread_id=thread_id, metadata=metadata
+            ),
+            session=self.db,
+        )
+
     def get_messages(
         self,
         session_id: str,
@@ -41,26 +82,56 @@ class MessageService:
         limit: int = 50,
         offset: int = 0,
         latest: bool = True,
+        before: Optional[int] = None,
+        after: Optional[int] = None,
+        defer_large: bool = False,
     ) -> List[Message]:
-        query = self.db.query(Message).filter(
-            Message.session_id == session_id
-        )
-        if thread_id is not None:
-            query = query.filter(Message.thread_id == thread_id)
-        if latest:
-            messages = (
-                query.order_by(Message.timestamp.desc())
-                .offset(offset)
-                .limit(limit)
-                .all()
-            )
-            return list(reversed(messages))
-        return (
-            query.order_by(Message.timestamp.asc())
-            .offset(offset)
-            .limit(limit)
-            .all()
+        """Messages in chronological order.
+
+        ``before``/``after`` are message ids: the page holds the ``limit``
+        messages immediately older/newer than that message, found through the
+        ``(session_id, thread_id, timestamp, id)`` index rather than by
+        skipping ``offset`` rows.  ``defer_large`` leaves ``content`` and
+        ``metadata`` unloaded until accessed.
+        """
+        position = None
+        if before is not None or after is not None:
+            position = self._position(before if before is not None else after)
+            if position is None:
+                return []
+        statement, reverse = _page_statement(
+            session_id,
+            thread_id=thread_id,
+            limit=limit,
+            offset=offset,
+            latest=latest,
+            position=position,
+            older=before is not None,
+            defer_large=defer_large,
         )
+        messages = list(self.db.scalars(statement))
+        return list(reversed(messages)) if reverse else messages
+
+    def recent_messages(
+        self,
+        session_id: str,
+        *,
+        thread_id: Optional[str] = None,
+        limit: int = RECENT_WINDOW,
+    ) -> List[RecentMessage]:
+        """The last ``limit`` messages as (role, content), cached per thread.
+
+        The cached window is checked against the thread's (or session's)
+        message counter and last activity, which the database keeps current,
+        so writes from other processes or bulk deletes are never served stale.
+        """
+        stamp = self._stamp(session_id, thread_id)
+        key = _cache_key(self.db.get_bind().url, session_id, thread_id)
+        cached = self._cached_window(key, stamp, limit)
+        if cached is not None:
+            return cached
+        rows = self.db.execute(_window_statement(session_id, thread_id, limit)).all()
+        return self._store_window(key, stamp, rows, limit)
 
     def clear_messages(
         self,
@@ -72,7 +143,191 @@ class MessageService:
         )
         if thread_id is not None:
             query = query.filter(Message.thread_id == thread_id)
-        return query.delete(synchronize_session=False)
+        deleted = query.delete(synchronize_session=False)
+        self._invalidate(session_id)
+        return deleted
+
+    def _position(self, message_id: int) -> Optional[Tuple]:
+        row = self.db.execute(_position_statement(message_id)).first()
+        return tuple(row) if row is not None else None
+
+    def _stamp(self, session_id: str, thread_id: Optional[str]) -> tuple:
+        return _as_stamp(self.db.execute(_stamp_statement(session_id, thread_id)).first())
+
+    @classmethod
+    def _cached_window(cls, key: tuple, stamp: tuple, limit: int) -> Optional[List[RecentMessage]]:
+        with cls._recent_lock:
+            cached = cls._recent_cache.get(key)
+            if cached is not None and cached[0] == stamp and len(cached[1]) >= min(limit, stamp[0]):
+                cls._recent_cache.move_to_end(key)
+                return list(cached[1][-limit:]) if limit else []
+        return None
+
+    @classmethod
+    def _store_window(cls, key: tuple, stamp: tuple, rows, limit: int) -> List[RecentMessage]:
+        window = tuple(RecentMessage(role, content) for role, content in reversed(rows))
+        with cls._recent_lock:
+            cls._recent_cache[key] = (stamp, window)
+            cls._recent_cache.move_to_end(key)
+            while len(cls._recent_cache) > _RECENT_CACHE_SIZE:
+                cls._recent_cache.popitem(last=False)
+        return list(window[-limit:]) if limit else []
+
+    @classmethod
+    def _invalidate(cls, session_id: str) -> None:
+        with cls._recent_lock:
+            for key in [key for key in cls._recent_cache if key[1] == session_id]:
+                del cls._recent_cache[key]
+
+
+class AsyncMessageService:
+    """Read/append path of :class:`MessageService` on an ``AsyncSession``.
+
+    Shares its statements and the recent-window cache with the sync service.
+    """
+
+    def __init__(self, db: "AsyncSession") -> None:
+        self.db = db
+
+    async def add_message(
+        self,
+        session_id: str,
+        role: str,
+        content: str,
+        thread_id: Optional[str] = None,
+        metadata: Optional[dict] = None,
+    ) -> Message:
+        normalized = role.strip().lower()
+        if normalized not in {"user", "assistant"}:
+            raise ValueError("Invalid role")
+        record = Message(
+            session_id=session_id,
+            thread_id=thread_id,
+            role=normalized,
+            content=content,
+            metadata_=metadata,
+        )
+        self.db.add(record)
+        await self.db.flush()
+        MessageService._invalidate(session_id)
+        return record
+
+    async def get_messages(
+        self,
+        session_id: str,
+        *,
+        thread_id: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        latest: bool = True,
+        before: Optional[int] = None,
+        after: Optional[int] = None,
+    ) -> List[Message]:
+        """See :meth:`MessageService.get_messages`."""
+        position = None
+        if before is not None or after is not None:
+            row = (await self.db.execute(_position_statement(before if before is not None else after))).first()
+            if row is None:
+                return []
+            position = tuple(row)
+        statement, reverse = _page_statement(
+            session_id,
+            thread_id=thread_id,
+            limit=limit,
+            offset=offset,
+            latest=latest,
+            position=position,
+            older=before is not None,
+            defer_large=False,
+        )
+        messages = list(await self.db.scalars(statement))
+        return list(reversed(messages)) if reverse else messages
+
+    async def recent_messages(
+        self,
+        session_id: str,
+        *,
+        thread_id: Optional[str] = None,
+        limit: int = RECENT_WINDOW,
+    ) -> List[RecentMessage]:
+        """See :meth:`MessageService.recent_messages`."""
+        stamp = _as_stamp((await self.db.execute(_stamp_statement(session_id, thread_id))).first())
+        key = _cache_key(self.db.bind.url, session_id, thread_id)
+        cached = MessageService._cached_window(key, stamp, limit)
+        if cached is not None:
+            return cached
+        rows = (await self.db.execute(_window_statement(session_id, thread_id, limit))).all()
+        return MessageService._store_window(key, stamp, rows, limit)
+
+
+def _page_statement(
+    session_id: str,
+    *,
+    thread_id: Optional[str],
+    limit: int,
+    offset: int,
+    latest: bool,
+    position: Optional[Tuple],
+    older: bool,
+    defer_large: bool,
+):
+    """The page query and whether its rows come back newest first."""
+    statement = select(Message).where(Message.session_id == session_id)
+    if thread_id is not None:
+        statement = statement.where(Message.thread_id == thread_id)
+    if defer_large:
+        statement = statement.options(defer(Message.content), defer(Message.metadata_))
+    if position is not None:
+        statement = statement.where(_older_than(*position) if older else _newer_than(*position))
+        latest = older
+    elif offset:
+        statement = statement.offset(offset)
+    if latest:
+        order = (Message.timestamp.desc(), Message.id.desc())
+    else:
+        order = (Message.timestamp.asc(), Message.id.asc())
+    return statement.order_by(*order).limit(limit), latest
+
+
+def _window_statement(session_id: str, thread_id: Optional[str], limit: int):
+    statement = select(Message.role, Message.content).where(Message.session_id == session_id)
+    if thread_id is not None:
+        statement = statement.where(Message.thread_id == thread_id)
+    return statement.order_by(Message.timestamp.desc(), Message.id.desc()).limit(max(limit, RECENT_WINDOW))
+
+
+def _position_statement(message_id: int):
+    return select(Message.timestamp, Message.id).where(Message.id == message_id)
+
+
+def _stamp_statement(session_id: str, thread_id: Optional[str]):
+    owner = Thread if thread_id is not None else Session
+    return select(owner.message_count, owner.last_activity_at).where(
+        owner.id == (thread_id if thread_id is not None else session_id)
+    )
+
+
+def _as_stamp(row) -> tuple:
+    return (int(row[0] or 0), row[1]) if row is not None else (0, None)
+
+
+def _cache_key(url, session_id: str, thread_id: Optional[str]) -> tuple:
+    # Sync and async engines on one database share cache entries.
+    return (str(url.set(drivername=url.get_backend_name())), session_id, thread_id)
+
+
+def _older_than(timestamp, message_id: int):
+    return or_(
+        Message.timestamp < timestamp,
+        and_(Message.timestamp == timestamp, Message.id < message_id),
+    )
+
+
+def _newer_than(timestamp, message_id: int):
+    return or_(
+        Message.timestamp > timestamp,
+        and_(Message.timestamp == timestamp, Message.id > message_id),
+    )
 
 
-__all__ = ["MessageService"]
+__all__ = ["AsyncMessageService", "MessageService", "RecentMessage", "RECENT_WINDOW"]
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from html import escape
+from html.parser import HTMLParser
 import re
 from typing import Callable, Iterable
 
@@ -68,6 +70,115 @@ def ensure_mobile_shell(html: str) -> str:
     return str(soup)
 
 
+def rewrite_mobile_shell(html: str) -> str:
+    """Streaming form of :func:`ensure_mobile_shell` for well-formed documents.
+
+    The document is scanned once for the few tags the shell cares about and
+    only those spans are rewritten; everything else is kept byte for byte.
+    Documents without an explicit ``<head>`` and ``<body>`` go through
+    :func:`ensure_mobile_shell`.
+    """
+    scanner = _ShellScanner(html or "")
+    try:
+        scanner.feed(html or "")
+        scanner.close()
+    except Exception:
+        return ensure_mobile_shell(html)
+    if not scanner.complete():
+        return ensure_mobile_shell(html)
+
+    edits: list[tuple[int, int, str]] = []
+    viewport_tag = f'<meta name="viewport" content="{VIEWPORT_CONTENT}">'
+    if scanner.viewport is None:
+        edits.append((scanner.head_open, scanner.head_open, viewport_tag))
+    elif scanner.viewport_content != VIEWPORT_CONTENT:
+        start, end, attrs = scanner.viewport
+        edits.append((start, end, _start_tag("meta", attrs, content=VIEWPORT_CONTENT)))
+
+    if scanner.app is None:
+        edits.append((scanner.body_open, scanner.body_open, '<div id="app" class="page">'))
+        edits.append((scanner.body_close, scanner.body_close, "</div>"))
+    else:
+        start, end, tag, attrs = scanner.app
+        classes = (dict(attrs).get("class") or "").split()
+        if "page" not in classes:
+            edits.append((start, end, _start_tag(tag, attrs, **{"class": " ".join(classes + ["page"])})))
+
+    if scanner.style is None:
+        edits.append(
+            (
+                scanner.head_close,
+                scanner.head_close,
+                f'<style id="{MOBILE_SHELL_STYLE_ID}">{MOBILE_SHELL_CSS}</style>',
+            )
+        )
+    else:
+        start, end = scanner.style
+        if html[start:end] != MOBILE_SHELL_CSS:
+            edits.append((start, end, MOBILE_SHELL_CSS))
+
+    for start, end, text in sorted(edits, key=lambda edit: (edit[0], edit[1]), reverse=True):
+        html = html[:start] + text + html[end:]
+    return html
+
+
+class _ShellScanner(HTMLParser):
+    """Records source offsets of the tags :func:`rewrite_mobile_shell` edits."""
+
+    def __init__(self, source: str) -> None:
+        super().__init__(convert_charrefs=True)
+        self._line_starts = [0] + [match.end() for match in re.finditer("\n", source)]
+        self.head_open: int | None = None
+        self.head_close: int | None = None
+        self.body_open: int | None = None
+        self.body_close: int | None = None
+        self.viewport: tuple[int, int, list] | None = None
+        self.viewport_content: str | None = None
+        self.app: tuple[int, int, str, list] | None = None
+        self.style: tuple[int, int] | None = None
+        self._style_start: int | None = None
+
+    def complete(self) -> bool:
+        return None not in (self.head_open, self.head_close, self.body_open, self.body_close)
+
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        return self._line_starts[line - 1] + column
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        start = self._offset()
+        end = start + len(self.get_starttag_text() or "")
+        values = dict(attrs)
+        if tag == "head" and self.head_open is None:
+            self.head_open = end
+        elif tag == "body" and self.body_open is None:
+            self.body_open = end
+        elif tag == "meta" and values.get("name") == "viewport" and self.viewport is None:
+            self.viewport = (start, end, attrs)
+            self.viewport_content = values.get("content")
+        elif tag == "style" and values.get("id") == MOBILE_SHELL_STYLE_ID and self.style is None:
+            self._style_start = end
+        if values.get("id") == "app" and self.app is None:
+            self.app = (start, end, tag, attrs)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "head" and self.head_close is None:
+            self.head_close = self._offset()
+        elif tag == "body":
+            self.body_close = self._offset()
+        elif tag == "style" and self._style_start is not None and self.style is None:
+            self.style = (self._style_start, self._offset())
+
+
+def _start_tag(tag: str, attrs: list, **overrides: str) -> str:
+    values = {name: value for name, value in attrs}
+    values.update(overrides)
+    parts = [tag]
+    for name, value in values.items():
+        parts.append(name if value is None else f'{name}="{escape(value, quote=True)}"')
+    return f"<{' '.join(parts)}>"
+
+
 def validate_mobile_shell(html: str) -> dict:
     soup = BeautifulSoup(html or "", "html.parser")
     results = []
@@ -253,5 +364,6 @@ __all__ = [
     "VIEWPORT_CONTENT",
     "check_touch_targets",
     "ensure_mobile_shell",
+    "rewrite_mobile_shell",
     "validate_mobile_shell",
 ]
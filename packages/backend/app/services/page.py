@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import re
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session as DbSession
 
 from ..utils.datetime import utcnow
@@ -11,6 +12,9 @@ from ..events.emitter import EventEmitter
 from ..events.models import PageCreatedEvent
 from ..schemas.page import PageCreate
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
 _SLUG_PATTERN = re.compile(r"^[a-z0-9-]+$")
 
 
@@ -33,23 +37,13 @@ class PageService:
         self._event_emitter = event_emitter
 
     def list_by_session(self, session_id: str) -> List[Page]:
-        return (
-            self.db.query(Page)
-            .filter(Page.session_id == session_id)
-            .order_by(Page.order_index.asc(), Page.created_at.asc())
-            .all()
-        )
+        return list(self.db.scalars(_pages_statement(session_id)))
 
     def get_by_id(self, page_id: str) -> Optional[Page]:
         return self.db.get(Page, page_id)
 
     def get_by_slug(self, session_id: str, slug: str) -> Optional[Page]:
-        return (
-            self.db.query(Page)
-            .filter(Page.session_id == session_id)
-            .filter(Page.slug == slug)
-            .first()
-        )
+        return self.db.scalars(_slug_statement(session_id, slug)).first()
 
     def create(
         self,
@@ -185,4 +179,32 @@ class PageService:
         return True
 
 
-__all__ = ["PageService"]
+class AsyncPageService:
+    """Read path of :class:`PageService` on an ``AsyncSession``."""
+
+    def __init__(self, db: "AsyncSession") -> None:
+        self.db = db
+
+    async def list_by_session(self, session_id: str) -> List[Page]:
+        return list(await self.db.scalars(_pages_statement(session_id)))
+
+    async def get_by_id(self, page_id: str) -> Optional[Page]:
+        return await self.db.get(Page, page_id)
+
+    async def get_by_slug(self, session_id: str, slug: str) -> Optional[Page]:
+        return (await self.db.scalars(_slug_statement(session_id, slug))).first()
+
+
+def _pages_statement(session_id: str):
+    return (
+        select(Page)
+        .where(Page.session_id == session_id)
+        .order_by(Page.order_index.asc(), Page.created_at.asc())
+    )
+
+
+def _slug_statement(session_id: str, slug: str):
+    return select(Page).where(Page.session_id == session_id, Page.slug == slug).limit(1)
+
+
+__all__ = ["AsyncPageService", "PageService"]
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
-from sqlalchemy import case, func
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session as DbSession
 
 from ..utils.datetime import utcnow
@@ -10,6 +10,10 @@ from ..db.models import Page, PageVersion, VersionSource
 from ..events.emitter import EventEmitter
 from ..events.models import PagePreviewReadyEvent, PageVersionCreatedEvent
 from ..utils.html import inline_css, strip_prompt_artifacts
+from .html_store import HtmlBlobStore
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class PageVersionNotFoundError(Exception):
@@ -35,10 +39,7 @@ class PageVersionService:
         return self.get_versions(page_id, include_released=include_released)
 
     def get_versions(self, page_id: str, *, include_released: bool = False) -> List[PageVersion]:
-        query = self.db.query(PageVersion).filter(PageVersion.page_id == page_id)
-        if not include_released:
-            query = query.filter(PageVersion.is_released.is_(False))
-        return query.order_by(PageVersion.version.desc()).all()
+        return list(self.db.scalars(_versions_statement(page_id, include_released)))
 
     def get_current(self, page_id: str) -> Optional[PageVersion]:
         page = self.db.get(Page, page_id)
@@ -78,10 +79,21 @@ class PageVersionService:
             except ValueError as exc:
                 raise ValueError("Invalid version source") from exc
 
+        # Encoded against the current version: successive edits share most bytes.
+        base_hash = None
+        if page.current_version_id is not None:
+            base_hash = (
+                self.db.query(PageVersion.html_hash)
+                .filter(PageVersion.id == page.current_version_id)
+                .scalar()
+            )
+        blob = HtmlBlobStore(self.db).put(html or "", base_hash=base_hash)
+
         record = PageVersion(
             page_id=page_id,
             version=next_version,
-            html=html or "",
+            html_hash=blob.hash,
+            html_blob=blob,
             description=description,
             source=resolved_source,
             fallback_used=bool(fallback_used),
@@ -240,15 +252,18 @@ class PageVersionService:
         )
         if keep_ids:
             releasable_query = releasable_query.filter(PageVersion.id.notin_(keep_ids))
+        released_hashes = self._html_hashes(releasable_query)
         release_count = releasable_query.update(
             {
                 PageVersion.is_released: True,
                 PageVersion.released_at: func.coalesce(PageVersion.released_at, now),
                 PageVersion.payload_pruned_at: func.coalesce(PageVersion.payload_pruned_at, now),
-                PageVersion.html: None,
+                PageVersion.html_text: None,
+                PageVersion.html_hash: None,
             },
-            synchronize_session=False,
-        ).rowcount
+            # Loaded versions must not keep pointing at blobs released below.
+            synchronize_session="fetch",
+        )
         if release_count and release_count > 0:
             updated_count += release_count
 
@@ -258,20 +273,32 @@ class PageVersionService:
             .filter(PageVersion.is_released.is_(True))
             .filter(PageVersion.payload_pruned_at.is_(None))
         )
+        released_hashes.update(self._html_hashes(released_to_prune))
         prune_count = released_to_prune.update(
             {
                 PageVersion.payload_pruned_at: now,
                 PageVersion.released_at: func.coalesce(PageVersion.released_at, now),
-                PageVersion.html: None,
+                PageVersion.html_text: None,
+                PageVersion.html_hash: None,
             },
-            synchronize_session=False,
-        ).rowcount
+            synchronize_session="fetch",
+        )
         if prune_count and prune_count > 0:
             updated_count += prune_count
 
+        HtmlBlobStore(self.db).release(released_hashes)
         self.db.flush()
         return updated_count
 
+    @staticmethod
+    def _html_hashes(query) -> set[str]:
+        return {
+            digest
+            for (digest,) in query.with_entities(PageVersion.html_hash)
+            .filter(PageVersion.html_hash.isnot(None))
+            .all()
+        }
+
     def build_preview(
         self,
         page_id: str,
@@ -377,7 +404,38 @@ class PageVersionService:
         }
 
 
+class AsyncPageVersionService:
+    """Read path of :class:`PageVersionService` on an ``AsyncSession``."""
+
+    def __init__(self, db: "AsyncSession") -> None:
+        self.db = db
+
+    async def get_versions(self, page_id: str, *, include_released: bool = False) -> List[PageVersion]:
+        return list(await self.db.scalars(_versions_statement(page_id, include_released)))
+
+    async def get_current(self, page_id: str) -> Optional[PageVersion]:
+        page = await self.db.get(Page, page_id)
+        if page is None or page.current_version_id is None:
+            return None
+        return await self.db.get(PageVersion, page.current_version_id)
+
+    async def get_by_id(self, version_id: int) -> Optional[PageVersion]:
+        return await self.db.get(PageVersion, version_id)
+
+    async def get_html(self, version: PageVersion) -> Optional[str]:
+        # Blob content (and its delta base) loads lazily; run it on the sync side.
+        return await self.db.run_sync(lambda _: version.html)
+
+
+def _versions_statement(page_id: str, include_released: bool):
+    statement = select(PageVersion).where(PageVersion.page_id == page_id)
+    if not include_released:
+        statement = statement.where(PageVersion.is_released.is_(False))
+    return statement.order_by(PageVersion.version.desc())
+
+
 __all__ = [
+    "AsyncPageVersionService",
     "PageVersionService",
     "PageVersionNotFoundError",
     "PageVersionReleasedError",
@@ -4,7 +4,7 @@ from copy import deepcopy
 from dataclasses import dataclass
 from typing import List, Optional
 
-from sqlalchemy import func
+from sqlalchemy import func, insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session as DbSession
 
@@ -21,6 +21,7 @@ from ..db.models import (
 )
 from ..events.models import SnapshotCreatedEvent
 from ..services.event_store import EventStoreService
+from ..services.html_store import HtmlBlobStore
 from ..services.product_doc import ProductDocService
 from ..events.emitter import EventEmitter
 
@@ -41,7 +42,7 @@ class SnapshotPagePayload:
     slug: str
     title: str
     order_index: int
-    rendered_html: str
+    html_hash: Optional[str]
 
 
 class ProjectSnapshotService:
@@ -150,7 +151,8 @@ class ProjectSnapshotService:
 
                 page_version = self._create_page_version(
                     page_id=page.id,
-                    html=snap_page.rendered_html or "",
+                    html_hash=snap_page.html_hash,
+                    html=snap_page.rendered_html_text or "",
                     source=VersionSource.ROLLBACK,
                 )
                 page.current_version_id = page_version.id
@@ -212,7 +214,7 @@ class ProjectSnapshotService:
         pinned_keep = [snap for snap in snapshots if snap.is_pinned][:2]
         keep_ids = {snap.id for snap in auto_keep + pinned_keep}
 
-        released_count = 0
+        released: list[str] = []
         now = utcnow()
         for snapshot in snapshots:
             if snapshot.id in keep_ids:
@@ -226,11 +228,28 @@ class ProjectSnapshotService:
                 snapshot.doc.structured = None
                 snapshot.doc.global_style = None
                 snapshot.doc.design_direction = None
-            for page in snapshot.pages:
-                page.rendered_html = None
             self.db.add(snapshot)
-            released_count += 1
-        return released_count
+            released.append(snapshot.id)
+        if released:
+            self._release_page_content(released)
+        return len(released)
+
+    def _release_page_content(self, snapshot_ids: List[str]) -> None:
+        pages = self.db.query(ProjectSnapshotPage).filter(
+            ProjectSnapshotPage.snapshot_id.in_(snapshot_ids)
+        )
+        hashes = {
+            digest
+            for (digest,) in pages.with_entities(ProjectSnapshotPage.html_hash)
+            .filter(ProjectSnapshotPage.html_hash.isnot(None))
+            .all()
+        }
+        pages.update(
+            {ProjectSnapshotPage.html_hash: None, ProjectSnapshotPage.rendered_html_text: None},
+            synchronize_session="fetch",
+        )
+        # Content no page version or other snapshot still uses.
+        HtmlBlobStore(self.db).release(hashes)
 
     def _normalize_source(self, source: VersionSource | str) -> VersionSource:
         if isinstance(source, VersionSource):
@@ -270,58 +289,71 @@ class ProjectSnapshotService:
         )
 
     def _build_page_payloads(self, pages: List[Page]) -> List[SnapshotPagePayload]:
-        html_by_page = self._resolve_page_html(pages)
-        payloads: List[SnapshotPagePayload] = []
-        for page in pages:
-            payloads.append(
-                SnapshotPagePayload(
-                    page_id=page.id,
-                    slug=page.slug,
-                    title=page.title,
-                    order_index=page.order_index,
-                    rendered_html=html_by_page.get(page.id, ""),
-                )
-            )
-        return payloads
-
-    def _resolve_page_html(self, pages: List[Page]) -> dict:
-        html_by_page: dict[str, str] = {}
-        current_ids = [page.current_version_id for page in pages if page.current_version_id]
-        if current_ids:
-            versions = (
-                self.db.query(PageVersion)
-                .filter(PageVersion.id.in_(current_ids))
-                .all()
+        hash_by_page = self._resolve_page_content(pages)
+        return [
+            SnapshotPagePayload(
+                page_id=page.id,
+                slug=page.slug,
+                title=page.title,
+                order_index=page.order_index,
+                html_hash=hash_by_page.get(page.id),
             )
-            versions_by_id = {version.id: version for version in versions}
-            for page in pages:
-                if page.current_version_id in versions_by_id:
-                    html_by_page[page.id] = versions_by_id[page.current_version_id].html or ""
-
-        missing_page_ids = [page.id for page in pages if page.id not in html_by_page]
-        if missing_page_ids:
-            subquery = (
-                self.db.query(
-                    PageVersion.page_id,
-                    func.max(PageVersion.version).label("max_version"),
-                )
-                .filter(PageVersion.page_id.in_(missing_page_ids))
-                .group_by(PageVersion.page_id)
-                .subquery()
+            for page in pages
+        ]
+
+    def _resolve_page_content(self, pages: List[Page]) -> dict[str, str]:
+        """Content hash of each page's current (else latest) version.
+
+        One query for all pages.  Versions still holding inline HTML (not yet
+        backfilled) are moved into the blob store here, so the snapshot can
+        reference them too.
+        """
+        if not pages:
+            return {}
+        page_ids = [page.id for page in pages]
+        current_ids = {page.current_version_id for page in pages if page.current_version_id}
+        latest = (
+            self.db.query(
+                PageVersion.page_id,
+                func.max(PageVersion.version).label("max_version"),
             )
-            latest_versions = (
-                self.db.query(PageVersion)
-                .join(
-                    subquery,
-                    (PageVersion.page_id == subquery.c.page_id)
-                    & (PageVersion.version == subquery.c.max_version),
-                )
-                .all()
+            .filter(PageVersion.page_id.in_(page_ids))
+            .group_by(PageVersion.page_id)
+            .subquery()
+        )
+        candidates = (
+            self.db.query(PageVersion.id, PageVersion.page_id, PageVersion.html_hash)
+            .outerjoin(
+                latest,
+                (PageVersion.page_id == latest.c.page_id)
+                & (PageVersion.version == latest.c.max_version),
             )
-            for version in latest_versions:
-                html_by_page[version.page_id] = version.html or ""
-
-        return html_by_page
+            .filter(PageVersion.page_id.in_(page_ids))
+            .filter(PageVersion.id.in_(current_ids) | latest.c.page_id.isnot(None))
+            .all()
+        )
+        current: dict[str, tuple[int, Optional[str]]] = {}
+        fallback: dict[str, tuple[int, Optional[str]]] = {}
+        for version_id, page_id, html_hash in candidates:
+            target = current if version_id in current_ids else fallback
+            target[page_id] = (version_id, html_hash)
+
+        hash_by_page: dict[str, str] = {}
+        store: Optional[HtmlBlobStore] = None
+        for page in pages:
+            version_id, html_hash = current.get(page.id) or fallback.get(page.id) or (None, None)
+            if version_id is None:
+                continue
+            if html_hash is None:
+                version = self.db.get(PageVersion, version_id)
+                if version is None or version.html_text is None:
+                    continue
+                store = store or HtmlBlobStore(self.db)
+                blob = store.put(version.html_text)
+                version.html_hash, version.html_blob, version.html_text = blob.hash, blob, None
+                html_hash = blob.hash
+            hash_by_page[page.id] = html_hash
+        return hash_by_page
 
     def _create_snapshot_record(
         self,
@@ -362,18 +394,24 @@ class ProjectSnapshotService:
         self.db.add(doc)
 
         page_payloads = self._build_page_payloads(pages)
-        for payload in page_payloads:
-            self.db.add(
-                ProjectSnapshotPage(
-                    snapshot_id=snapshot.id,
-                    page_id=payload.page_id,
-                    slug=payload.slug,
-                    title=payload.title,
-                    order_index=payload.order_index,
-                    rendered_html=payload.rendered_html,
-                )
-            )
         self.db.flush()
+        if page_payloads:
+            # One executemany of references; no page HTML is copied.
+            self.db.execute(
+                insert(ProjectSnapshotPage),
+                [
+                    {
+                        "snapshot_id": snapshot.id,
+                        "page_id": payload.page_id,
+                        "slug": payload.slug,
+                        "title": payload.title,
+                        "order_index": payload.order_index,
+                        "html_hash": payload.html_hash,
+                    }
+                    for payload in page_payloads
+                ],
+            )
+            self.db.expire(snapshot, ["pages"])
         self._record_snapshot_created(snapshot)
         return snapshot
 
@@ -404,6 +442,7 @@ class ProjectSnapshotService:
         self,
         *,
         page_id: str,
+        html_hash: Optional[str],
         html: str,
         source: VersionSource,
     ) -> PageVersion:
@@ -413,12 +452,12 @@ class ProjectSnapshotService:
             .scalar()
         )
         next_version = 1 if next_version is None else int(next_version) + 1
-        record = PageVersion(
-            page_id=page_id,
-            version=next_version,
-            html=html,
-            source=source,
-        )
+        record = PageVersion(page_id=page_id, version=next_version, source=source)
+        if html_hash is not None:
+            # The snapshot's content blob, byte for byte.
+            record.html_hash = html_hash
+        else:
+            record.html = html
         self.db.add(record)
         self.db.flush()
         return record
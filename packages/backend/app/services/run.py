@@ -2,14 +2,18 @@ from __future__ import annotations
 
 import uuid
 from threading import Lock
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session as DbSession
 
 from ..utils.datetime import utcnow
 from ..db.models import Session as SessionModel
 from ..db.models import SessionRun
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
 
 class RunNotFoundError(ValueError):
     pass
@@ -87,23 +91,10 @@ class RunService:
         return run
 
     def list_runs(self, session_id: str) -> list[SessionRun]:
-        return (
-            self.db.query(SessionRun)
-            .filter(SessionRun.session_id == session_id)
-            .order_by(SessionRun.created_at.desc())
-            .all()
-        )
+        return list(self.db.scalars(_runs_statement(session_id)))
 
     def get_latest_waiting_run(self, session_id: str) -> Optional[SessionRun]:
-        return (
-            self.db.query(SessionRun)
-            .filter(
-                SessionRun.session_id == session_id,
-                SessionRun.status == "waiting_input",
-            )
-            .order_by(SessionRun.updated_at.desc(), SessionRun.created_at.desc())
-            .first()
-        )
+        return self.db.scalars(_waiting_run_statement(session_id)).first()
 
     def resolve_resume_run(
         self,
@@ -211,7 +202,47 @@ class RunService:
             return run_id in cls._cancelled_runs
 
 
+class AsyncRunService:
+    """Read path of :class:`RunService` on an ``AsyncSession``."""
+
+    def __init__(self, db: "AsyncSession") -> None:
+        self.db = db
+
+    async def get_run(self, run_id: str) -> SessionRun:
+        run = await self.db.get(SessionRun, run_id)
+        if run is None:
+            raise RunNotFoundError("Run not found")
+        return run
+
+    async def list_runs(self, session_id: str) -> list[SessionRun]:
+        return list(await self.db.scalars(_runs_statement(session_id)))
+
+    async def get_latest_waiting_run(self, session_id: str) -> Optional[SessionRun]:
+        return (await self.db.scalars(_waiting_run_statement(session_id))).first()
+
+
+def _runs_statement(session_id: str):
+    return (
+        select(SessionRun)
+        .where(SessionRun.session_id == session_id)
+        .order_by(SessionRun.created_at.desc())
+    )
+
+
+def _waiting_run_statement(session_id: str):
+    return (
+        select(SessionRun)
+        .where(
+            SessionRun.session_id == session_id,
+            SessionRun.status == "waiting_input",
+        )
+        .order_by(SessionRun.updated_at.desc(), SessionRun.created_at.desc())
+        .limit(1)
+    )
+
+
 __all__ = [
+    "AsyncRunService",
     "RunService",
     "RunNotFoundError",
     "RunStateConflictError",
@@ -1,13 +1,35 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import base64
+import json
+import weakref
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Optional, Tuple
 from uuid import uuid4
 
-from sqlalchemy import func
+from sqlalchemy import and_, column, func, inspect, literal_column, or_, select, table
 from sqlalchemy.orm import Session as DbSession
 
 from ..utils.datetime import utcnow
-from ..db.models import Message, Session
+from ..db.models import Session
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# Trigram FTS5 index of session titles on SQLite; see migrate_v15_session_search.
+SESSION_SEARCH_TABLE = "sessions_fts"
+_session_search = table(SESSION_SEARCH_TABLE, column("session_id"), column("title"))
+# FTS5 trigrams only match terms of three or more characters.
+_MIN_FTS_TERM = 3
+_fts_available: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+SORT_COLUMNS = ("updated_at", "created_at", "title", "last_activity_at")
+# Empty until a session sees activity; always set for the others.
+_NULLABLE_SORTS = {"last_activity_at"}
+
+
+class InvalidCursor(ValueError):
+    pass
 
 
 class SessionService:
@@ -47,13 +69,39 @@ class SessionService:
             .all()
         )
 
-    def count_messages(self, session_id: str) -> int:
-        return (
-            self.db.query(func.count(Message.id))
-            .filter(Message.session_id == session_id)
-            .scalar()
-            or 0
+    def page_sessions(
+        self,
+        *,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        search: Optional[str] = None,
+        sort: str = "updated_at",
+        order: str = "desc",
+    ) -> Tuple[List[Session], Optional[str]]:
+        """One page of the session list and the cursor for the next one.
+
+        Ordered by ``(sort, id)``; with ``cursor`` the page starts after the
+        row it encodes (keyset), so deep pages cost the same as the first.
+        """
+        statement, sort_col = _page_statement(
+            self.search_condition(search), limit=limit, offset=offset, cursor=cursor, sort=sort, order=order
         )
+        return _next_page(list(self.db.scalars(statement)), limit, sort_col)
+
+    def count_sessions(self, search: Optional[str] = None) -> int:
+        return self.db.scalar(_count_statement(self.search_condition(search)))
+
+    def search_condition(self, search: Optional[str]):
+        """Title substring filter, index-backed where the database supports it."""
+        term = (search or "").strip()
+        if not term:
+            return None
+        return _title_filter(term, len(term) >= _MIN_FTS_TERM and self._has_search_table())
+
+    def count_messages(self, session_id: str) -> int:
+        count = self.db.query(Session.message_count).filter(Session.id == session_id).scalar()
+        return int(count or 0)
 
     def delete_session(self, session_id: str) -> bool:
         record = self.db.get(Session, session_id)
@@ -62,5 +110,149 @@ class SessionService:
         self.db.delete(record)
         return True
 
+    def _has_search_table(self) -> bool:
+        engine = self.db.get_bind().engine
+        if engine.dialect.name != "sqlite":
+            return False
+        available = _fts_available.get(engine)
+        if available is None:
+            available = inspect(engine).has_table(SESSION_SEARCH_TABLE)
+            _fts_available[engine] = available
+        return available
+
+
+class AsyncSessionService:
+    """Read path of :class:`SessionService` on an ``AsyncSession``."""
+
+    def __init__(self, db: "AsyncSession") -> None:
+        self.db = db
+
+    async def get_session(self, session_id: str) -> Optional[Session]:
+        return await self.db.get(Session, session_id)
+
+    async def page_sessions(
+        self,
+        *,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        search: Optional[str] = None,
+        sort: str = "updated_at",
+        order: str = "desc",
+    ) -> Tuple[List[Session], Optional[str]]:
+        """See :meth:`SessionService.page_sessions`."""
+        statement, sort_col = _page_statement(
+            await self.search_condition(search), limit=limit, offset=offset, cursor=cursor, sort=sort, order=order
+        )
+        return _next_page(list(await self.db.scalars(statement)), limit, sort_col)
+
+    async def count_sessions(self, search: Optional[str] = None) -> int:
+        return await self.db.scalar(_count_statement(await self.search_condition(search)))
+
+    async def search_condition(self, search: Optional[str]):
+        term = (search or "").strip()
+        if not term:
+            return None
+        return _title_filter(term, len(term) >= _MIN_FTS_TERM and await self._has_search_table())
+
+    async def count_messages(self, session_id: str) -> int:
+        count = await self.db.scalar(select(Session.message_count).where(Session.id == session_id))
+        return int(count or 0)
+
+    async def _has_search_table(self) -> bool:
+        engine = self.db.bind.sync_engine
+        if engine.dialect.name != "sqlite":
+            return False
+        available = _fts_available.get(engine)
+        if available is None:
+            connection = await self.db.connection()
+            available = await connection.run_sync(
+                lambda sync_connection: inspect(sync_connection).has_table(SESSION_SEARCH_TABLE)
+            )
+            _fts_available[engine] = available
+        return available
+
+
+def _title_filter(term: str, use_fts: bool):
+    if use_fts:
+        phrase = '"' + term.replace('"', '""') + '"'
+        return Session.id.in_(
+            select(_session_search.c.session_id).where(
+                literal_column(SESSION_SEARCH_TABLE).op("MATCH")(phrase)
+            )
+        )
+    # Postgres serves this from the pg_trgm index.
+    return Session.title.ilike(f"%{term}%")
+
+
+def _page_statement(condition, *, limit: int, offset: int, cursor: Optional[str], sort: str, order: str):
+    sort_col = getattr(Session, sort if sort in SORT_COLUMNS else "updated_at")
+    descending = order == "desc"
+    statement = select(Session)
+    if condition is not None:
+        statement = statement.where(condition)
+    if cursor:
+        value, last_id = _decode_cursor(cursor, sort_col)
+        statement = statement.where(_after(sort_col, value, last_id, descending))
+    elif offset:
+        statement = statement.offset(offset)
+    if descending:
+        primary = sort_col.desc()
+        statement = statement.order_by(
+            primary.nulls_last() if sort_col.key in _NULLABLE_SORTS else primary, Session.id.desc()
+        )
+    else:
+        primary = sort_col.asc()
+        statement = statement.order_by(
+            primary.nulls_first() if sort_col.key in _NULLABLE_SORTS else primary, Session.id.asc()
+        )
+    # One extra row tells whether another page follows.
+    return statement.limit(limit + 1), sort_col
+
+
+def _next_page(rows: List[Session], limit: int, sort_col) -> Tuple[List[Session], Optional[str]]:
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, _encode_cursor(getattr(rows[-1], sort_col.key), rows[-1].id)
+
+
+def _count_statement(condition):
+    statement = select(func.count(Session.id))
+    if condition is not None:
+        statement = statement.where(condition)
+    return statement
+
+
+def _after(sort_col, value, last_id: str, descending: bool):
+    if value is None:
+        # NULLs sort first ascending and last descending (see page_sessions).
+        if descending:
+            return and_(sort_col.is_(None), Session.id < last_id)
+        return or_(sort_col.isnot(None), and_(sort_col.is_(None), Session.id > last_id))
+    if descending:
+        return or_(sort_col < value, and_(sort_col == value, Session.id < last_id))
+    return or_(sort_col > value, and_(sort_col == value, Session.id > last_id))
+
+
+def _encode_cursor(value, session_id: str) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, session_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort_col) -> Tuple[object, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, session_id = json.loads(raw)
+        if value is not None and sort_col.key != "title":
+            value = datetime.fromisoformat(value)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+    if not isinstance(session_id, str):
+        raise InvalidCursor("Invalid cursor")
+    return value, session_id
+
 
-__all__ = ["SessionService"]
+__all__ = ["AsyncSessionService", "InvalidCursor", "SESSION_SEARCH_TABLE", "SessionService"]
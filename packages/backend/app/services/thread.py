@@ -64,11 +64,8 @@ class ThreadService:
         return True
 
     def get_message_count(self, thread_id: str) -> int:
-        return (
-            self.db.query(Message)
-            .filter(Message.thread_id == thread_id)
-            .count()
-        )
+        count = self.db.query(Thread.message_count).filter(Thread.id == thread_id).scalar()
+        return int(count or 0)
 
     def update_title(self, thread_id: str, title: str) -> Optional[Thread]:
         thread = self.db.get(Thread, thread_id)
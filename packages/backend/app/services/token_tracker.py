@@ -1,12 +1,26 @@
 from __future__ import annotations
 
-from sqlalchemy import func
+from typing import Iterable
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session as DbSession
 
-from ..db.models import TokenUsage
+from ..db.models import TokenUsage, TokenUsageRollup
+from ..utils.datetime import utcnow
+
+_ROLLUP_KEY = ("session_id", "agent_type", "model", "day")
+_ROLLUP_TOTALS = ("request_count", "input_tokens", "output_tokens", "total_tokens", "cost_usd")
 
 
 class TokenTrackerService:
+    """Records token usage and reports cost.
+
+    Every usage row is also added to its ``token_usage_rollups`` bucket in
+    the same transaction; summaries read only the rollups.
+    """
+
     def __init__(self, db: DbSession) -> None:
         self.db = db
 
@@ -21,8 +35,10 @@ class TokenTrackerService:
         cost_usd: float,
     ) -> TokenUsage:
         total_tokens = input_tokens + output_tokens
+        timestamp = utcnow()
         record = TokenUsage(
             session_id=session_id,
+            timestamp=timestamp,
             agent_type=agent_type,
             model=model,
             input_tokens=input_tokens,
@@ -32,49 +48,103 @@ class TokenTrackerService:
         )
         self.db.add(record)
         self.db.flush()
+        self._add_to_rollup(
+            {
+                "session_id": session_id,
+                "agent_type": agent_type,
+                "model": model,
+                "day": timestamp.date(),
+                "request_count": 1,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": total_tokens,
+                "cost_usd": cost_usd,
+            }
+        )
         return record
 
     def summarize_session(self, session_id: str) -> dict:
-        totals_row = (
-            self.db.query(
-                func.coalesce(func.sum(TokenUsage.input_tokens), 0),
-                func.coalesce(func.sum(TokenUsage.output_tokens), 0),
-                func.coalesce(func.sum(TokenUsage.total_tokens), 0),
-                func.coalesce(func.sum(TokenUsage.cost_usd), 0.0),
-            )
-            .filter(TokenUsage.session_id == session_id)
-            .one()
-        )
-        total = {
-            "input_tokens": int(totals_row[0] or 0),
-            "output_tokens": int(totals_row[1] or 0),
-            "total_tokens": int(totals_row[2] or 0),
-            "cost_usd": float(totals_row[3] or 0.0),
-        }
-
-        by_agent: dict[str, dict] = {}
         rows = (
-            self.db.query(
-                TokenUsage.agent_type,
-                func.coalesce(func.sum(TokenUsage.input_tokens), 0),
-                func.coalesce(func.sum(TokenUsage.output_tokens), 0),
-                func.coalesce(func.sum(TokenUsage.total_tokens), 0),
-                func.coalesce(func.sum(TokenUsage.cost_usd), 0.0),
-            )
-            .filter(TokenUsage.session_id == session_id)
-            .group_by(TokenUsage.agent_type)
+            self.db.query(TokenUsageRollup.agent_type, *self._sums())
+            .filter(TokenUsageRollup.session_id == session_id)
+            .group_by(TokenUsageRollup.agent_type)
             .all()
         )
-        for agent_type, input_tokens, output_tokens, total_tokens, cost_usd in rows:
+        total = self._totals(None)
+        by_agent: dict[str, dict] = {}
+        for agent_type, *sums in rows:
             agent = agent_type or "unknown"
-            by_agent[agent] = {
-                "input_tokens": int(input_tokens or 0),
-                "output_tokens": int(output_tokens or 0),
-                "total_tokens": int(total_tokens or 0),
-                "cost_usd": float(cost_usd or 0.0),
-            }
+            by_agent[agent] = self._totals(sums)
+            for key, value in by_agent[agent].items():
+                total[key] += value
 
         return {"total": total, "by_agent": by_agent}
 
+    def summarize_sessions(self, session_ids: Iterable[str]) -> dict[str, dict]:
+        """Totals for many sessions in one query; sessions without usage get zeros."""
+        ids = list(dict.fromkeys(session_ids))
+        summaries = {session_id: self._totals(None) for session_id in ids}
+        if not ids:
+            return summaries
+        rows = (
+            self.db.query(TokenUsageRollup.session_id, *self._sums())
+            .filter(TokenUsageRollup.session_id.in_(ids))
+            .group_by(TokenUsageRollup.session_id)
+            .all()
+        )
+        for session_id, *sums in rows:
+            summaries[session_id] = self._totals(sums)
+        return summaries
+
+    def _add_to_rollup(self, values: dict) -> None:
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+            statement = insert(TokenUsageRollup).values(**values)
+            statement = statement.on_conflict_do_update(
+                index_elements=list(_ROLLUP_KEY),
+                set_={
+                    column: getattr(TokenUsageRollup, column) + statement.excluded[column]
+                    for column in _ROLLUP_TOTALS
+                },
+            )
+            self.db.execute(statement)
+            return
+
+        # No portable upsert: add to the bucket, create it if it isn't there.
+        updated = self.db.execute(
+            update(TokenUsageRollup)
+            .where(*(getattr(TokenUsageRollup, column) == values[column] for column in _ROLLUP_KEY))
+            .values(
+                {
+                    column: getattr(TokenUsageRollup, column) + values[column]
+                    for column in _ROLLUP_TOTALS
+                }
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not updated:
+            self.db.add(TokenUsageRollup(**values))
+            self.db.flush()
+
+    @staticmethod
+    def _sums() -> list:
+        return [
+            func.coalesce(func.sum(TokenUsageRollup.input_tokens), 0),
+            func.coalesce(func.sum(TokenUsageRollup.output_tokens), 0),
+            func.coalesce(func.sum(TokenUsageRollup.total_tokens), 0),
+            func.coalesce(func.sum(TokenUsageRollup.cost_usd), 0.0),
+        ]
+
+    @staticmethod
+    def _totals(sums) -> dict:
+        input_tokens, output_tokens, total_tokens, cost_usd = sums or (0, 0, 0, 0.0)
+        return {
+            "input_tokens": int(input_tokens or 0),
+            "output_tokens": int(output_tokens or 0),
+            "total_tokens": int(total_tokens or 0),
+            "cost_usd": float(cost_usd or 0.0),
+        }
+
 
 __all__ = ["TokenTrackerService"]
@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session as DbSession
 
 from ..utils.datetime import utcnow
 from ..db.models import Session, Version
+from .html_store import HtmlBlobStore
 
 
 class VersionService:
@@ -24,12 +25,22 @@ class VersionService:
             .filter(Version.session_id == session_id)
             .scalar()
         )
+        base_hash = None
+        if next_version is not None:
+            base_hash = (
+                self.db.query(Version.html_hash)
+                .filter(Version.session_id == session_id)
+                .filter(Version.version == next_version)
+                .scalar()
+            )
         next_version = 0 if next_version is None else int(next_version) + 1
+        blob = HtmlBlobStore(self.db).put(html, base_hash=base_hash)
 
         record = Version(
             session_id=session_id,
             version=next_version,
-            html=html,
+            html_hash=blob.hash,
+            html_blob=blob,
             description=description,
         )
         session.current_version = next_version
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import refresh_settings
+from app.db.database import Database, async_url, reset_database
+from app.db.migrations import init_db
+from app.db.models import SessionEvent, SessionEventSource
+from app.db.utils import async_transaction_scope, get_async_db, get_db
+from app.services.event_store import AsyncEventStoreService
+from app.services.message import AsyncMessageService, MessageService
+from app.services.page import AsyncPageService, PageService
+from app.services.page_version import AsyncPageVersionService, PageVersionService
+from app.services.run import AsyncRunService, RunNotFoundError, RunService
+from app.services.session import AsyncSessionService, SessionService
+from app.services.thread import ThreadService
+
+
+def test_async_url_swaps_driver() -> None:
+    assert async_url("sqlite:////tmp/app.db") == "sqlite+aiosqlite:////tmp/app.db"
+    assert async_url("postgresql://u:p@host/db") == "postgresql+asyncpg://u:p@host/db"
+    assert async_url("postgresql+psycopg2://host/db") == "postgresql+asyncpg://host/db"
+    with pytest.raises(ValueError):
+        async_url("mysql://host/db")
+
+
+def test_async_services_match_sync_reads(tmp_path) -> None:
+    database = Database(f"sqlite:///{tmp_path / 'async.db'}")
+    init_db(database)
+    with get_db(database) as session:
+        sessions = SessionService(session)
+        session_id = sessions.create_session("Coffee shop").id
+        sessions.create_session("Bakery")
+        thread_id = ThreadService(session).create_thread(session_id).id
+        for n in range(5):
+            MessageService(session).add_message(session_id, "user", f"m{n}", thread_id=thread_id)
+        page = PageService(session).create(session_id=session_id, title="Home", slug="home")
+        PageVersionService(session).create(page.id, "<p>home</p>")
+        run_id = RunService(session).create_run(session_id=session_id, message="go").id
+        session.commit()
+
+        sync_sessions = [row.id for row in sessions.page_sessions(search="coffee")[0]]
+        sync_messages = [row.content for row in MessageService(session).get_messages(session_id, limit=3)]
+
+    async def read() -> None:
+        async with get_async_db(database) as db:
+            rows, cursor = await AsyncSessionService(db).page_sessions(search="coffee")
+            assert [row.id for row in rows] == sync_sessions and cursor is None
+            assert await AsyncSessionService(db).count_sessions() == 2
+            assert await AsyncSessionService(db).count_messages(session_id) == 5
+
+            messages = AsyncMessageService(db)
+            page_rows = await messages.get_messages(session_id, limit=3)
+            assert [row.content for row in page_rows] == sync_messages
+            older = await messages.get_messages(session_id, limit=3, before=page_rows[0].id)
+            assert [row.content for row in older] == ["m0", "m1"]
+            window = await messages.recent_messages(session_id, thread_id=thread_id, limit=2)
+            assert [row.content for row in window] == ["m3", "m4"]
+
+            pages = await AsyncPageService(db).list_by_session(session_id)
+            assert [row.slug for row in pages] == ["home"]
+            versions = AsyncPageVersionService(db)
+            current = await versions.get_current(pages[0].id)
+            assert await versions.get_html(current) == "<p>home</p>"
+
+            runs = AsyncRunService(db)
+            assert (await runs.get_run(run_id)).session_id == session_id
+            with pytest.raises(RunNotFoundError):
+                await runs.get_run("missing")
+
+        async with async_transaction_scope(database) as db:
+            await AsyncMessageService(db).add_message(session_id, "assistant", "async", thread_id=thread_id)
+        async with get_async_db(database) as db:
+            window = await AsyncMessageService(db).recent_messages(session_id, thread_id=thread_id)
+            assert window[-1].content == "async"
+        await database.dispose_async()
+
+    asyncio.run(read())
+
+    with get_db(database) as session:
+        assert SessionService(session).count_messages(session_id) == 6
+
+
+def test_event_endpoints_read_through_async_session(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'async_api.db'}")
+    monkeypatch.setenv("DEFAULT_BASE_URL", "http://localhost")
+    monkeypatch.setenv("DEFAULT_KEY", "test-key")
+    refresh_settings()
+    reset_database()
+    init_db()
+    from app.main import create_app
+
+    with get_db() as session:
+        session_id = SessionService(session).create_session("Events").id
+        for n in range(3):
+            session.add(
+                SessionEvent(
+                    session_id=session_id,
+                    seq=n + 1,
+                    type="run_started",
+                    payload={"n": n},
+                    source=SessionEventSource.SESSION,
+                )
+            )
+        session.commit()
+
+    client = TestClient(create_app())
+    body = client.get(f"/api/sessions/{session_id}/events", params={"since_seq": 1}).json()
+    assert [event["payload"]["n"] for event in body["events"]] == [1, 2]
+    assert client.get("/api/sessions/missing/events").status_code == 404
+    assert client.get(f"/api/sessions/{session_id}/pages").json()["total"] == 0
+
+    async def read() -> list[int]:
+        async with get_async_db() as db:
+            return [event.seq for event in await AsyncEventStoreService(db).get_events(session_id)]
+
+    assert asyncio.run(read()) == [1, 2, 3]
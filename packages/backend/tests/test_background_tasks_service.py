@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+from ic.tools.shell.background import BackgroundTask, TaskStatus
+
+from app.services.background_tasks import BackgroundTaskService
+
+
+def _service(task: BackgroundTask) -> BackgroundTaskService:
+    service = BackgroundTaskService(db=None)
+    service.set_task_manager(SimpleNamespace(get={task.id: task}.get))
+    return service
+
+
+def test_get_task_output_uses_absolute_cursor() -> None:
+    task = BackgroundTask(id="t1", command="npm run dev", workspace=None, status=TaskStatus.RUNNING)
+    for i in range(3):
+        task.add_output(f"line {i}")
+    service = _service(task)
+
+    first = service.get_task_output("s1", "t1")
+    assert first["output"] == "line 0\nline 1\nline 2"
+    assert first["cursor"] == 3
+    assert first["dropped"] == 0
+
+    task.add_output("line 3")
+    second = service.get_task_output("s1", "t1", since=first["cursor"])
+    assert second["output"] == "line 3"
+    assert second["output_lines"] == 1
+    assert second["cursor"] == 4
+
+    idle = service.get_task_output("s1", "t1", since=second["cursor"])
+    assert idle["output"] == "" and idle["cursor"] == 4
+
+
+def test_get_task_output_reports_dropped_lines() -> None:
+    # Room for roughly two 6-byte lines: older ones are evicted.
+    task = BackgroundTask(id="t2", command="tail -f log", workspace=None, max_buffer_bytes=12)
+    for i in range(5):
+        task.add_output(f"line {i}")
+    service = _service(task)
+
+    result = service.get_task_output("s1", "t2", since=1)
+
+    assert result["cursor"] == 5
+    assert result["dropped"] == 2
+    assert result["output"] == "line 3\nline 4"
+    assert service.get_task_output("s1", "missing") == {"error": "Task not found"}
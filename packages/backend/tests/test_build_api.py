@@ -0,0 +1,74 @@
+import asyncio
+import uuid
+
+import app.api.build as build_api
+from app.config import refresh_settings
+from app.db.database import reset_database
+from app.db.migrations import init_db
+from app.db.models import Session as SessionModel, SessionEvent
+from app.db.utils import get_db
+from app.renderer.build_scheduler import BuildPriority, BuildScheduler
+from app.schemas.session_metadata import BuildStatus
+from app.services.page import PageService
+from app.services.page_version import PageVersionService
+
+
+def _seed_session(session_id: str) -> None:
+    with get_db() as session:
+        session.add(SessionModel(id=session_id, title="Build Session"))
+        session.flush()
+        page = PageService(session).create(session_id=session_id, title="Index", slug="index")
+        PageVersionService(session).create(page.id, "<html>v1</html>")
+        session.commit()
+
+
+def test_queued_build_reports_pending_until_dispatched(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'build_api.db'}")
+    refresh_settings()
+    reset_database()
+    init_db()
+    first, second = uuid.uuid4().hex, uuid.uuid4().hex
+    _seed_session(first)
+    _seed_session(second)
+
+    scheduler = BuildScheduler(slots=1)
+    gates: dict[str, asyncio.Event] = {}
+    started: list[str] = []
+
+    async def fake_build(*, session_id, payload, cancel_event) -> None:
+        started.append(session_id)
+        await gates[session_id].wait()
+
+    monkeypatch.setattr(build_api, "get_build_scheduler", lambda: scheduler)
+    monkeypatch.setattr(build_api, "_run_build_task", fake_build)
+
+    async def run() -> None:
+        gates[first], gates[second] = asyncio.Event(), asyncio.Event()
+        with get_db() as db:
+            running = await build_api.trigger_build(first, priority=BuildPriority.INTERACTIVE, db=db)
+        with get_db() as db:
+            queued = await build_api.trigger_build(second, priority=BuildPriority.INTERACTIVE, db=db)
+        assert running.status == BuildStatus.BUILDING
+        assert queued.status == BuildStatus.PENDING and queued.queued_at is not None
+        assert queued.started_at is None
+        with get_db() as db:
+            stored = await build_api.get_build_status(second, db=db)
+        assert stored.status == BuildStatus.PENDING
+
+        with get_db() as db:
+            cancelled = await build_api.cancel_build(second, db=db)
+        assert cancelled.status == BuildStatus.FAILED and cancelled.error == "Build cancelled"
+
+        gates[first].set()
+        await asyncio.sleep(0.05)
+        assert started == [first]
+
+    asyncio.run(run())
+    with get_db() as db:
+        rows = db.query(SessionEvent).filter(SessionEvent.session_id == second)
+        types = [row.type for row in rows.order_by(SessionEvent.seq)]
+    assert types == ["build_queued", "build_failed"]
+
+    monkeypatch.undo()
+    refresh_settings()
+    reset_database()
@@ -0,0 +1,129 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from threading import Event
+
+import pytest
+
+from app.renderer.builder import BuildCancelled, BuildError, ReactSSGBuilder, progress_message
+from app.renderer.dependency_cache import DependencyCache
+from app.renderer.process import CommandCancelled, CommandTimeout, run_command
+
+
+def _python(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+def test_run_command_streams_lines_while_running(tmp_path: Path) -> None:
+    seen: list[tuple[str, str, float]] = []
+    code = (
+        "import sys, time\n"
+        "print('transforming...', flush=True)\n"
+        "time.sleep(0.5)\n"
+        "print('oops', file=sys.stderr, flush=True)\n"
+        "print('done', flush=True)\n"
+    )
+    started = time.monotonic()
+    result = asyncio.run(
+        run_command(
+            _python(code),
+            cwd=tmp_path,
+            on_line=lambda stream, line: seen.append((stream, line, time.monotonic() - started)),
+        )
+    )
+
+    assert result.returncode == 0
+    assert result.stdout == "transforming...\ndone\n"
+    assert result.stderr == "oops\n"
+    assert [(stream, line) for stream, line, _ in seen] == [
+        ("stdout", "transforming..."),
+        ("stderr", "oops"),
+        ("stdout", "done"),
+    ]
+    assert seen[0][2] < 0.4  # delivered before the command finished
+
+
+@pytest.mark.skipif(os.name != "posix", reason="process groups are POSIX-only")
+def test_cancel_kills_the_whole_process_group(tmp_path: Path) -> None:
+    pid_file = tmp_path / "child.pid"
+    code = (
+        "import subprocess, sys, time\n"
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+        f"open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+        "time.sleep(60)\n"
+    )
+    cancel = Event()
+
+    async def run() -> None:
+        task = asyncio.ensure_future(run_command(_python(code), cwd=tmp_path, cancel_event=cancel))
+        while not pid_file.exists() or not pid_file.read_text():
+            await asyncio.sleep(0.05)
+        cancel.set()
+        started = time.monotonic()
+        with pytest.raises(CommandCancelled):
+            await task
+        assert time.monotonic() - started < 2
+
+    asyncio.run(run())
+    child = int(pid_file.read_text())
+    for _ in range(50):
+        try:
+            os.kill(child, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.05)
+    else:
+        pytest.fail("grandchild survived cancellation")
+
+
+def test_run_command_timeout(tmp_path: Path) -> None:
+    with pytest.raises(CommandTimeout):
+        asyncio.run(run_command(_python("import time; time.sleep(30)"), cwd=tmp_path, timeout=0.3))
+
+
+def test_progress_message_parses_vite_and_prerender_output() -> None:
+    assert progress_message("\x1b[32m✓\x1b[39m 42 modules transformed.") == "Transformed 42 modules"
+    assert progress_message("✓ built in 1.23s") == "Bundle built in 1.23s"
+    assert progress_message("Prerendered about (2/3)") == "Prerendered about (2/3)"
+    assert progress_message("dist/assets/index-abc.js  12.30 kB") is None
+
+
+def test_builder_reports_progress_and_stage_errors(tmp_path: Path, monkeypatch) -> None:
+    class Recorder:
+        def __init__(self) -> None:
+            self.events = []
+
+        def emit(self, event) -> None:
+            self.events.append(event)
+
+    builder = ReactSSGBuilder(
+        "s1",
+        base_dir=tmp_path / "sessions",
+        event_emitter=Recorder(),
+        dependency_cache=DependencyCache(tmp_path / "deps"),
+    )
+    builder.work_dir.mkdir(parents=True)
+
+    code = "print('vite v5.4.11 building for production...'); print('✓ 3 modules transformed.')"
+    asyncio.run(builder._run_command(_python(code), stage="npm_build"))
+    messages = [event.payload.get("message") for event in builder.event_emitter.events]
+    assert messages == ["Bundling with Vite", "Transformed 3 modules"]
+    assert "3 modules transformed" in builder.log_path.read_text(encoding="utf-8")
+
+    with pytest.raises(BuildError) as failed:
+        asyncio.run(builder._run_command(_python("import sys; sys.exit('boom')"), stage="npm_build"))
+    assert failed.value.stage == "npm_build" and "boom" in failed.value.stderr
+
+    monkeypatch.setattr(
+        "app.renderer.builder.get_settings",
+        lambda: type("S", (), {"build_stage_timeouts": {"prerender": 0.2}, "build_slot_memory_mb": 0})(),
+    )
+    with pytest.raises(BuildError, match="timed out"):
+        asyncio.run(builder._run_command(_python("import time; time.sleep(30)"), stage="prerender"))
+
+    builder._cancel_event = Event()
+    builder._cancel_event.set()
+    with pytest.raises(BuildCancelled):
+        asyncio.run(builder._run_command(_python("print('x')"), stage="prerender"))
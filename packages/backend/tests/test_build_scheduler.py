@@ -0,0 +1,125 @@
+import asyncio
+from threading import Event
+
+from app.renderer.build_scheduler import BuildPriority, BuildScheduler
+
+
+class _Builds:
+    """Fake build runners that block until released."""
+
+    def __init__(self) -> None:
+        self.started: list[str] = []
+        self.cancelled: list[str] = []
+        self.gates: dict[str, asyncio.Event] = {}
+        self.positions: dict[str, list[int]] = {}
+
+    def runner(self, name: str):
+        gate = self.gates.setdefault(name, asyncio.Event())
+
+        async def run(cancel_event: Event) -> None:
+            self.started.append(name)
+            try:
+                await gate.wait()
+            except asyncio.CancelledError:
+                self.cancelled.append(name)
+                raise
+
+        return run
+
+    def reporter(self, session_id: str):
+        return lambda position: self.positions.setdefault(session_id, []).append(position)
+
+    def release(self, name: str) -> None:
+        self.gates[name].set()
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_slots_priority_and_positions() -> None:
+    asyncio.run(_slots_priority_and_positions())
+
+
+async def _slots_priority_and_positions() -> None:
+    builds = _Builds()
+    scheduler = BuildScheduler(slots=1)
+
+    scheduler.submit("a", builds.runner("a1"), on_position=builds.reporter("a"))
+    scheduler.submit(
+        "b",
+        builds.runner("b1"),
+        priority=BuildPriority.BACKGROUND,
+        on_position=builds.reporter("b"),
+    )
+    scheduler.submit("c", builds.runner("c1"), on_position=builds.reporter("c"))
+    await _settle()
+
+    assert builds.started == ["a1"]
+    assert scheduler.position("a") == 0
+    assert scheduler.position("c") == 1  # interactive jumps the background build
+    assert scheduler.position("b") == 2
+    assert builds.positions == {"b": [1, 2], "c": [1]}
+
+    builds.release("a1")
+    await _settle()
+    assert builds.started == ["a1", "c1"]
+    assert builds.positions["b"] == [1, 2, 1]
+
+    builds.release("c1")
+    await _settle()
+    builds.release("b1")
+    await _settle()
+    assert builds.started == ["a1", "c1", "b1"]
+    assert scheduler.running == 0 and scheduler.queued == 0
+
+
+def test_repeated_requests_coalesce_and_wait_for_running_build() -> None:
+    asyncio.run(_repeated_requests_coalesce_and_wait_for_running_build())
+
+
+async def _repeated_requests_coalesce_and_wait_for_running_build() -> None:
+    builds = _Builds()
+    scheduler = BuildScheduler(slots=2)
+
+    scheduler.submit("a", builds.runner("a1"))
+    await _settle()
+    # The session is already building: later requests queue behind it and
+    # collapse into the newest one even though a slot is free.
+    scheduler.submit("a", builds.runner("a2"), priority=BuildPriority.BACKGROUND)
+    scheduler.submit("a", builds.runner("a3"), priority=BuildPriority.BACKGROUND)
+    await _settle()
+    assert builds.started == ["a1"]
+    assert scheduler.queued == 1
+
+    builds.release("a1")
+    await _settle()
+    assert builds.started == ["a1", "a3"]
+    builds.release("a3")
+    await _settle()
+    assert scheduler.position("a") is None
+
+
+def test_cancel_while_queued_and_running() -> None:
+    asyncio.run(_cancel_while_queued_and_running())
+
+
+async def _cancel_while_queued_and_running() -> None:
+    builds = _Builds()
+    scheduler = BuildScheduler(slots=1)
+
+    scheduler.submit("a", builds.runner("a1"))
+    queued = scheduler.submit("b", builds.runner("b1"))
+    await _settle()
+
+    assert scheduler.cancel("b") is True
+    assert queued.cancel_event.is_set()
+    assert scheduler.position("b") is None
+
+    assert scheduler.cancel("a") is True
+    await _settle()
+    assert builds.cancelled == ["a1"]
+    assert builds.started == ["a1"]
+    assert scheduler.running == 0
+    assert scheduler.cancel("a") is False
@@ -0,0 +1,142 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from app.renderer.build_worker import BuildWorker, BuildWorkerPool, WorkerUnavailable
+from app.renderer.builder import ReactSSGBuilder
+from app.renderer.process import CommandCancelled
+
+# Speaks the build-worker.mjs protocol: "client" logs and succeeds,
+# "prerender" fails, "hang" never answers.
+FAKE_WORKER = r"""
+import json, os, sys, time
+
+def send(message):
+    sys.stdout.write(json.dumps(message) + "\n")
+    sys.stdout.flush()
+
+send({"id": None, "type": "ready", "pid": os.getpid()})
+for line in sys.stdin:
+    request = json.loads(line)
+    if request["op"] == "hang":
+        time.sleep(60)
+    if request["op"] == "client":
+        send({"id": request["id"], "type": "log", "stream": "stdout", "line": "built in 5ms"})
+        send({"id": request["id"], "type": "log", "stream": "stdout", "line": "pid %d" % os.getpid()})
+    if request["op"] == "where":
+        mark = (request.get("env") or {}).get("SESSION_MARK")
+        send({"id": request["id"], "type": "log", "stream": "stdout", "line": "%s %s" % (request["cwd"], mark)})
+    ok = request["op"] != "prerender"
+    send({"id": request["id"], "type": "result", "ok": ok, "error": "boom", "rss": 10 * 1024 * 1024})
+"""
+
+
+def _install_fake(work_dir: Path, monkeypatch) -> None:
+    script = work_dir / "fake_worker.py"
+    script.write_text(FAKE_WORKER, encoding="utf-8")
+    original = BuildWorker.__init__
+
+    def init(self, command, **kwargs):
+        original(self, [sys.executable, str(script)], **kwargs)
+
+    monkeypatch.setattr(BuildWorker, "__init__", init)
+
+
+def test_pool_reuses_worker_and_recycles_after_max_builds(tmp_path: Path, monkeypatch) -> None:
+    _install_fake(tmp_path, monkeypatch)
+    pool = BuildWorkerPool(max_builds=2)
+
+    async def scenario() -> tuple[list[str], list[str], int]:
+        lines: list[str] = []
+        pids: list[str] = []
+        for _ in range(3):
+            async with pool.acquire(tmp_path) as worker:
+                result = await worker.run("client", tmp_path, on_line=lambda _s, line: lines.append(line))
+                assert result.returncode == 0
+                pids.append(result.stdout.splitlines()[-1])
+        async with pool.acquire(tmp_path) as worker:
+            failed = await worker.run("prerender", tmp_path, only=["about"])
+        await pool.close()
+        assert "boom" in failed.stderr
+        return lines, pids, failed.returncode
+
+    lines, pids, returncode = asyncio.run(scenario())
+
+    assert lines[:2] == ["built in 5ms", pids[0]]
+    assert pids[0] == pids[1] != pids[2]
+    assert returncode == 1
+
+
+def test_reused_worker_runs_each_job_in_its_own_work_dir(tmp_path: Path, monkeypatch) -> None:
+    _install_fake(tmp_path, monkeypatch)
+    pool = BuildWorkerPool()
+    first, second = tmp_path / "s1", tmp_path / "s2"
+
+    async def scenario() -> tuple[list[str], set[BuildWorker]]:
+        lines: list[str] = []
+        workers: set[BuildWorker] = set()
+        for work_dir, mark in ((first, "one"), (second, "two")):
+            env = {"SESSION_MARK": mark}
+            # Both sessions resolve the same dependency cache entry.
+            async with pool.acquire(tmp_path, env=env) as worker:
+                workers.add(worker)
+                await worker.run("where", work_dir, env=env, on_line=lambda _s, line: lines.append(line))
+        await pool.close()
+        return lines, workers
+
+    lines, workers = asyncio.run(scenario())
+
+    assert len(workers) == 1
+    assert lines == [f"{first} one", f"{second} two"]
+
+
+def test_cancelled_job_kills_worker(tmp_path: Path, monkeypatch) -> None:
+    _install_fake(tmp_path, monkeypatch)
+    pool = BuildWorkerPool()
+    cancel = threading.Event()
+
+    async def scenario() -> BuildWorker:
+        async with pool.acquire(tmp_path) as worker:
+            asyncio.get_running_loop().call_later(0.2, cancel.set)
+            with pytest.raises(CommandCancelled):
+                await worker.run("hang", tmp_path, cancel_event=cancel)
+        await pool.close()
+        return worker
+
+    worker = asyncio.run(scenario())
+
+    assert not worker.alive
+
+
+def test_worker_that_fails_to_start_is_unavailable(tmp_path: Path) -> None:
+    worker = BuildWorker([sys.executable, "-c", "pass"], cwd=tmp_path)
+
+    with pytest.raises(WorkerUnavailable):
+        asyncio.run(worker.start())
+
+
+def test_builder_falls_back_to_npm_when_worker_unavailable(tmp_path: Path, monkeypatch) -> None:
+    commands: list[list[str]] = []
+
+    async def fake_run_command(self, command, stage, cwd=None):
+        commands.append(command)
+
+    monkeypatch.setattr(ReactSSGBuilder, "_run_command", fake_run_command)
+    pool = BuildWorkerPool()
+    builder = ReactSSGBuilder("s1", base_dir=tmp_path / "sessions", build_workers=pool)
+    monkeypatch.setattr(BuildWorker, "__init__", _failing_init(BuildWorker.__init__))
+
+    asyncio.run(builder._run_node_step("client", ["npm", "run", "build:client"], stage="npm_build"))
+
+    assert commands == [["npm", "run", "build:client"]]
+    assert "falling back to npm" in builder.log_path.read_text(encoding="utf-8")
+
+
+def _failing_init(original):
+    def init(self, command, **kwargs):
+        original(self, [sys.executable, "-c", "raise SystemExit(1)"], **kwargs)
+
+    return init
@@ -0,0 +1,164 @@
+import uuid
+from datetime import timedelta
+
+from app.db.database import Database
+from app.db.migrations import init_db
+from app.db.models import (
+    HtmlBlob,
+    Message,
+    Page,
+    PageVersion,
+    ProductDoc,
+    ProjectSnapshot,
+    ProjectSnapshotPage,
+    Session as SessionModel,
+    SessionEvent,
+    SessionEventSequence,
+    SessionEventSource,
+    Thread,
+    VersionSource,
+)
+from app.db.utils import get_db, transaction_scope
+from app.services.cleanup import CleanupPolicy, CleanupService
+from app.services.page import PageService
+from app.services.page_version import PageVersionService
+from app.services.product_doc import ProductDocService
+from app.services.project_snapshot import ProjectSnapshotService
+from app.utils.datetime import utcnow
+
+
+def _seed_session(database: Database, *, age_days: int = 0, messages: int = 3) -> str:
+    session_id = uuid.uuid4().hex
+    with get_db(database) as session:
+        session.add(SessionModel(id=session_id, title="Cleanup Session"))
+        thread = Thread(session_id=session_id)
+        session.add(thread)
+        session.flush()
+        for n in range(messages):
+            session.add(Message(session_id=session_id, thread_id=thread.id, role="user", content=f"m{n}"))
+        for seq in range(1, 4):
+            session.add(
+                SessionEvent(session_id=session_id, seq=seq, type="run_started", source=SessionEventSource.SESSION)
+            )
+        session.add(SessionEventSequence(session_id=session_id, next_seq=4))
+        ProductDocService(session).create(session_id=session_id, content="doc", structured={})
+        page = PageService(session).create(session_id=session_id, title="Home", slug="home")
+        versions = PageVersionService(session)
+        for n in range(3):
+            versions.create(page.id, f"<html>{session_id} v{n}</html>")
+        ProjectSnapshotService(session).create_snapshot(session_id, VersionSource.MANUAL)
+        session.commit()
+        session.query(SessionModel).filter(SessionModel.id == session_id).update(
+            {SessionModel.updated_at: utcnow() - timedelta(days=age_days)}
+        )
+        session.commit()
+    return session_id
+
+
+def _rows(session, model, session_id: str) -> int:
+    if model is PageVersion:
+        return session.query(PageVersion).join(Page, PageVersion.page_id == Page.id).filter(
+            Page.session_id == session_id
+        ).count()
+    if model is ProjectSnapshotPage:
+        return session.query(ProjectSnapshotPage).join(ProjectSnapshot).filter(
+            ProjectSnapshot.session_id == session_id
+        ).count()
+    return session.query(model).filter(model.session_id == session_id).count()
+
+
+CHILDREN = [
+    Message,
+    Thread,
+    SessionEvent,
+    SessionEventSequence,
+    ProductDoc,
+    Page,
+    PageVersion,
+    ProjectSnapshot,
+    ProjectSnapshotPage,
+]
+
+
+def test_old_sessions_are_deleted_in_chunks_with_children(tmp_path) -> None:
+    database = Database(f"sqlite:///{tmp_path / 'cleanup.db'}")
+    init_db(database)
+    old_ids = [_seed_session(database, age_days=120) for _ in range(3)]
+    kept_id = _seed_session(database)
+
+    progress: list[tuple[str, int]] = []
+    with get_db(database) as session:
+        service = CleanupService(
+            session,
+            CleanupPolicy(chunk_size=2),
+            progress=lambda step, deleted: progress.append((step, deleted)),
+        )
+        results = service.run_all()
+        assert not session.in_transaction()
+
+    assert results == {"old_sessions": 3, "excess_sessions": 0, "excess_messages": 0}
+    assert not service.budget_exhausted
+    assert ("old_sessions", 2) in progress and ("old_sessions", 3) in progress
+    assert ("page_versions", 2) in progress
+
+    with get_db(database) as session:
+        assert [row.id for row in session.query(SessionModel)] == [kept_id]
+        for old_id in old_ids:
+            assert all(_rows(session, model, old_id) == 0 for model in CHILDREN)
+        assert all(_rows(session, model, kept_id) > 0 for model in CHILDREN)
+        # Only the surviving session's content is left in the blob store.
+        live = {row.html_hash for row in session.query(PageVersion) if row.html_hash}
+        bases = {blob.base_hash for blob in session.query(HtmlBlob) if blob.base_hash}
+        assert {blob.hash for blob in session.query(HtmlBlob)} == live | bases
+
+
+def test_time_budget_stops_between_chunks(tmp_path) -> None:
+    database = Database(f"sqlite:///{tmp_path / 'cleanup_budget.db'}")
+    init_db(database)
+    old_id = _seed_session(database, age_days=120)
+
+    with get_db(database) as session:
+        service = CleanupService(session, CleanupPolicy(time_budget_seconds=0))
+        assert service.run_all()["old_sessions"] == 0
+        assert service.budget_exhausted
+
+        service = CleanupService(session, CleanupPolicy(time_budget_seconds=30))
+        assert service.run_all()["old_sessions"] == 1
+        assert not service.budget_exhausted
+        assert session.get(SessionModel, old_id) is None
+
+
+def test_time_budget_never_leaves_a_session_half_deleted(tmp_path) -> None:
+    database = Database(f"sqlite:///{tmp_path / 'cleanup_atomic.db'}")
+    init_db(database)
+    first_id = _seed_session(database, age_days=121)
+    second_id = _seed_session(database, age_days=120)
+
+    with get_db(database) as session:
+        # The budget runs out while the first session's children are deleted.
+        policy = CleanupPolicy(chunk_size=1, time_budget_seconds=0.05, pause_seconds=0.02)
+        service = CleanupService(session, policy)
+        assert service.run_all()["old_sessions"] == 1
+        assert service.budget_exhausted
+
+    with get_db(database) as session:
+        assert session.get(SessionModel, first_id) is None
+        assert all(_rows(session, model, first_id) == 0 for model in CHILDREN)
+        assert session.get(SessionModel, second_id) is not None
+        assert all(_rows(session, model, second_id) > 0 for model in CHILDREN)
+
+
+def test_excess_messages_trim_oldest_first(tmp_path) -> None:
+    database = Database(f"sqlite:///{tmp_path / 'cleanup_messages.db'}")
+    init_db(database)
+    session_id = _seed_session(database, messages=7)
+
+    with get_db(database) as session:
+        dry = CleanupService(session, CleanupPolicy(max_messages_per_session=2, dry_run=True))
+        assert dry.cleanup_excess_messages() == 5
+        service = CleanupService(session, CleanupPolicy(max_messages_per_session=2, chunk_size=2))
+        assert service.cleanup_excess_messages() == 5
+
+    with transaction_scope(database) as session:
+        remaining = session.query(Message).filter(Message.session_id == session_id).order_by(Message.id).all()
+        assert [message.content for message in remaining] == ["m5", "m6"]
@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import exc, text
+
+from app.config import refresh_settings
+from app.db.database import Database, reset_database
+from app.db.migrations import init_db
+from app.db.pool import MeteredQueuePool
+from app.db.utils import TurnSessions
+
+
+def test_pool_settings_and_checkout_metrics(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("DB_POOL_SIZE", "1")
+    monkeypatch.setenv("DB_POOL_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "0.2")
+    refresh_settings()
+    database = Database(f"sqlite:///{tmp_path / 'pool.db'}")
+    monkeypatch.undo()
+    refresh_settings()
+
+    pool = database.engine.pool
+    assert isinstance(pool, MeteredQueuePool)
+    assert (pool.size(), pool.timeout()) == (1, 0.2)
+    # Pre-ping is skipped for SQLite files even though it is enabled.
+    assert pool._pre_ping is False
+
+    held = database.engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        database.engine.connect()
+
+    # A waiter is served as soon as the holder returns its connection.
+    threading.Timer(0.05, held.close).start()
+    with database.engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    status = database.pool_status()["sync"]
+    assert (status["checkouts"], status["timeouts"]) == (2, 1)
+    assert status["wait_max_ms"] >= 150
+    assert status["checked_out"] == 0 and status["size"] == 1
+    assert sum(status["wait_histogram"].values()) == 3
+
+    database.engine.dispose()
+    with database.engine.connect():
+        pass
+    assert database.pool_status()["sync"]["checkouts"] == 3
+
+
+def test_turn_sessions_are_bounded(tmp_path) -> None:
+    database = Database(f"sqlite:///{tmp_path / 'turn.db'}")
+    init_db(database)
+    sessions = TurnSessions(database, limit=2)
+
+    handed_out = [sessions.acquire() for _ in range(5)]
+    assert len(sessions) == 2
+    assert len({id(session) for session in handed_out}) == 2
+    assert handed_out[2] is handed_out[0] and handed_out[3] is handed_out[1]
+
+    for session in handed_out[:2]:
+        session.execute(text("SELECT 1"))
+    assert database.engine.pool.checkedout() == 2
+    sessions.close()
+    assert database.engine.pool.checkedout() == 0 and len(sessions) == 0
+
+
+def test_health_db_endpoint_reports_pools(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'pool_api.db'}")
+    monkeypatch.setenv("DEFAULT_BASE_URL", "http://localhost")
+    monkeypatch.setenv("DEFAULT_KEY", "test-key")
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    refresh_settings()
+    reset_database()
+    init_db()
+    from app.main import create_app
+
+    client = TestClient(create_app())
+    # Starts the async engine as well.
+    assert client.get("/api/sessions").status_code == 200
+    body = client.get("/health/db").json()
+
+    assert body["config"]["pool_size"] == 3
+    assert body["pools"]["sync"]["size"] == 3 and body["pools"]["sync"]["checkouts"] >= 1
+    assert body["pools"]["async"]["pool"] == "MeteredAsyncAdaptedQueuePool"
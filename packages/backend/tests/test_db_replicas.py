@@ -0,0 +1,155 @@
+import asyncio
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.config import refresh_settings
+from app.db.database import Database, get_database, reset_database
+from app.db.migrations import init_db
+from app.db.models import Message, Session as SessionModel
+from app.db.replicas import parse_lsn
+from app.db.utils import async_transaction_scope, get_db, get_read_db, is_replica_session
+
+
+def _replicated(tmp_path, monkeypatch, *replica_urls: str, sticky: str = "0.3") -> Database:
+    monkeypatch.setenv("DATABASE_REPLICA_URLS", ",".join(replica_urls))
+    monkeypatch.setenv("DB_REPLICA_STICKY_SECONDS", sticky)
+    refresh_settings()
+    database = Database(f"sqlite:///{tmp_path / 'primary.db'}")
+    monkeypatch.undo()
+    refresh_settings()
+    init_db(database)
+    return database
+
+
+def _replica_url(tmp_path, name: str = "replica.db") -> str:
+    url = f"sqlite:///{tmp_path / name}"
+    init_db(Database(url))
+    return url
+
+
+def _target(database: Database, key=None, **kwargs) -> str:
+    with get_read_db(database, key=key, **kwargs) as session:
+        return session.info.get("replica", "primary")
+
+
+def test_parse_lsn_orders_positions() -> None:
+    assert parse_lsn("0/16B3748") == 0x16B3748
+    assert parse_lsn("16/B374D848") > parse_lsn("15/FFFFFFFF")
+    assert parse_lsn(None) is None
+
+
+def test_reads_route_to_healthy_replicas_except_after_writes(tmp_path, monkeypatch) -> None:
+    replica_url = _replica_url(tmp_path)
+    database = _replicated(tmp_path, monkeypatch, replica_url)
+    replicas = database.replicas
+    replica = replicas.replicas[0].name
+
+    # Unprobed replicas are out of rotation.
+    assert _target(database) == "primary"
+    replicas.check()
+    assert _target(database) == replica
+
+    session_id = uuid.uuid4().hex
+    with get_db(database) as session:
+        session.add(SessionModel(id=session_id, title="Sticky"))
+        session.commit()
+        session.add(Message(session_id=session_id, role="user", content="hi"))
+        session.commit()
+
+    assert _target(database, session_id) == "primary"
+    assert _target(database) == "primary"
+    assert _target(database, "untouched") == replica
+    assert _target(database, session_id, consistent=False) == replica
+    time.sleep(0.35)
+    assert _target(database, session_id) == replica and _target(database) == replica
+
+    # Once the write's position is known, a replica that replayed past it may serve.
+    replicas.note_write([session_id], lsn=100)
+    replicas.replicas[0].replay_lsn = 99
+    assert _target(database, session_id) == "primary"
+    replicas.replicas[0].replay_lsn = 100
+    assert _target(database, session_id) == replica
+
+    # Bulk statements cannot name their chat session: every key turns sticky.
+    with get_db(database) as session:
+        session.query(Message).filter(Message.session_id == session_id).update({"content": "edited"})
+        session.commit()
+    assert _target(database, "untouched") == "primary"
+
+    status = database.replica_status()
+    assert status["routed"]["replica"] >= 5 and status["routed"]["primary"] >= 5
+    assert status["replicas"][0]["healthy"] is True
+    database.stop_replicas()
+
+
+def test_unreachable_replica_leaves_rotation(tmp_path, monkeypatch) -> None:
+    good = _replica_url(tmp_path)
+    bad = f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"
+    database = _replicated(tmp_path, monkeypatch, bad, good)
+    database.replicas.check()
+
+    down, up = database.replica_status()["replicas"]
+    assert down["healthy"] is False and "unable to open" in down["error"]
+    assert up["healthy"] is True
+    assert {_target(database) for _ in range(4)} == {up["name"]}
+    database.stop_replicas()
+
+
+def test_async_writes_are_tracked_and_async_reads_routed(tmp_path, monkeypatch) -> None:
+    database = _replicated(tmp_path, monkeypatch, _replica_url(tmp_path), sticky="30")
+    database.replicas.check()
+    session_id = uuid.uuid4().hex
+
+    async def run() -> tuple[bool, bool]:
+        async with async_transaction_scope(database) as db:
+            db.add(SessionModel(id=session_id, title="Async"))
+        written = database.async_read_session(session_id)
+        other = database.async_read_session("untouched")
+        try:
+            return is_replica_session(written), is_replica_session(other)
+        finally:
+            await written.close()
+            await other.close()
+            await database.dispose_async()
+
+    assert asyncio.run(run()) == (False, True)
+    database.stop_replicas()
+
+
+def test_list_endpoint_reads_replica_until_a_write(tmp_path, monkeypatch) -> None:
+    replica_url = _replica_url(tmp_path)
+    with get_db(Database(replica_url)) as session:
+        session.add(SessionModel(id=uuid.uuid4().hex, title="Only on replica"))
+        session.commit()
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'primary_api.db'}")
+    monkeypatch.setenv("DATABASE_REPLICA_URLS", replica_url)
+    monkeypatch.setenv("DB_REPLICA_STICKY_SECONDS", "30")
+    monkeypatch.setenv("DEFAULT_BASE_URL", "http://localhost")
+    monkeypatch.setenv("DEFAULT_KEY", "test-key")
+    refresh_settings()
+    reset_database()
+    init_db()
+    from app.main import create_app
+
+    client = TestClient(create_app())
+    database = get_database()
+    database.replicas.check()
+
+    titles = [row["title"] for row in client.get("/api/sessions").json()["sessions"]]
+    assert titles == ["Only on replica"]
+
+    # The new session is read back from the primary.
+    session_id = client.post("/api/sessions", json={"title": "Fresh"}).json()["id"]
+    titles = [row["title"] for row in client.get("/api/sessions").json()["sessions"]]
+    assert titles == ["Fresh"]
+    assert client.get(f"/api/sessions/{session_id}/messages").status_code == 200
+
+    body = client.get("/health/db").json()
+    assert body["replicas"]["replicas"][0]["healthy"] is True
+
+    database.stop_replicas()
+    monkeypatch.delenv("DATABASE_REPLICA_URLS")
+    refresh_settings()
+    reset_database()
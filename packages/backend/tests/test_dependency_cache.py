@@ -0,0 +1,208 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from app.renderer.builder import ReactSSGBuilder
+from app.renderer.dependency_cache import DependencyCache, DependencyCacheError
+
+MANIFEST = {
+    "name": "demo",
+    "dependencies": {"react": "^18.2.0"},
+    "devDependencies": {"vite": "^5.4.11"},
+}
+
+
+def _project(root: Path, manifest: dict | None = None, lock: dict | None = None) -> Path:
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "package.json").write_text(json.dumps(manifest or MANIFEST), encoding="utf-8")
+    if lock is not None:
+        (root / "package-lock.json").write_text(json.dumps(lock), encoding="utf-8")
+    return root
+
+
+class FakeNpm:
+    """Installs a fake node_modules that satisfies the manifest."""
+
+    def __init__(self, versions: dict[str, str] | None = None) -> None:
+        self.calls: list[Path] = []
+        self.versions = versions or {}
+        self._lock = threading.Lock()
+
+    def __call__(self, project_dir: Path) -> None:
+        with self._lock:
+            self.calls.append(project_dir)
+        time.sleep(0.05)
+        manifest = json.loads((project_dir / "package.json").read_text(encoding="utf-8"))
+        names = {**manifest.get("dependencies", {}), **manifest.get("devDependencies", {})}
+        for name in names:
+            pkg = project_dir / "node_modules" / name
+            pkg.mkdir(parents=True)
+            (pkg / "package.json").write_text(
+                json.dumps({"name": name, "version": self.versions.get(name, "1.0.0")}),
+                encoding="utf-8",
+            )
+            (pkg / "index.js").write_text("module.exports = 1\n", encoding="utf-8")
+        bin_dir = project_dir / "node_modules" / ".bin"
+        bin_dir.mkdir()
+        os.symlink("../vite/index.js", bin_dir / "vite")
+
+
+def test_attach_installs_once_and_reuses(tmp_path: Path) -> None:
+    cache = DependencyCache(tmp_path / "cache")
+    npm = FakeNpm()
+
+    first = _project(tmp_path / "w1")
+    second = _project(tmp_path / "w2")
+    assert cache.attach(first, installer=npm) == "symlink"
+    assert cache.attach(second, installer=npm) == "symlink"
+
+    assert len(npm.calls) == 1
+    assert (second / "node_modules").is_symlink()
+    assert (second / "node_modules" / "react" / "package.json").exists()
+
+
+def test_hardlink_mode_shares_inodes_and_keeps_bin_links(tmp_path: Path) -> None:
+    cache = DependencyCache(tmp_path / "cache", mode="hardlink")
+    work = _project(tmp_path / "work")
+
+    assert cache.attach(work, installer=FakeNpm()) == "hardlink"
+
+    entry = cache.entry_dir(cache.cache_key(work)) / "node_modules"
+    attached = work / "node_modules"
+    assert not attached.is_symlink()
+    assert (attached / "react" / "index.js").stat().st_ino == (entry / "react" / "index.js").stat().st_ino
+    assert os.readlink(attached / ".bin" / "vite") == "../vite/index.js"
+
+
+def test_concurrent_attach_is_single_flight(tmp_path: Path) -> None:
+    cache = DependencyCache(tmp_path / "cache")
+    npm = FakeNpm()
+    works = [_project(tmp_path / f"w{i}") for i in range(4)]
+
+    threads = [threading.Thread(target=cache.attach, args=(w,), kwargs={"installer": npm}) for w in works]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(npm.calls) == 1
+    assert all((w / "node_modules" / "vite").exists() for w in works)
+
+
+def test_key_tracks_manifest_and_lockfile(tmp_path: Path) -> None:
+    cache = DependencyCache(tmp_path / "cache")
+    base = cache.cache_key(_project(tmp_path / "a"))
+
+    assert cache.cache_key(_project(tmp_path / "b")) == base
+    changed = dict(MANIFEST, devDependencies={"vite": "^6.0.0"})
+    assert cache.cache_key(_project(tmp_path / "c", changed)) != base
+    assert cache.cache_key(_project(tmp_path / "d", lock={"packages": {}})) != base
+
+
+def test_entry_violating_lockfile_is_reinstalled(tmp_path: Path) -> None:
+    cache = DependencyCache(tmp_path / "cache")
+    lock = {"packages": {"node_modules/react": {"version": "18.3.1"}}}
+    work = _project(tmp_path / "work", lock=lock)
+
+    with pytest.raises(DependencyCacheError):
+        cache.ensure(work, installer=FakeNpm())
+    assert cache.entries() == []
+
+    good = FakeNpm(versions={"react": "18.3.1"})
+    cache.ensure(work, installer=good)
+    entry = cache.entry_dir(cache.cache_key(work))
+    # Corrupt the entry: the next ensure() validates offline and reinstalls.
+    (entry / "node_modules" / "react" / "package.json").unlink()
+    cache.ensure(work, installer=good)
+    assert len(good.calls) == 2
+
+
+def test_gc_drops_stale_entries_but_keeps_current(tmp_path: Path) -> None:
+    cache = DependencyCache(tmp_path / "cache", max_entries=1, min_idle_seconds=0)
+    npm = FakeNpm()
+    keys = []
+    for i in range(3):
+        manifest = dict(MANIFEST, name=f"demo-{i}")
+        work = _project(tmp_path / f"w{i}", manifest)
+        cache.ensure(work, installer=npm)
+        keys.append(cache.cache_key(work))
+        meta = cache.entry_dir(keys[-1]) / "cache-meta.json"
+        os.utime(meta, (time.time() - 100 * (3 - i), time.time() - 100 * (3 - i)))
+
+    removed = cache.gc(keep={keys[0]})
+
+    assert sorted(removed) == sorted([keys[1]])
+    assert {info.key for info in cache.entries()} == {keys[0], keys[2]}
+
+
+def test_builder_uses_cache_across_builds(tmp_path: Path, monkeypatch) -> None:
+    commands: list[tuple[str, Path]] = []
+    npm = FakeNpm()
+
+    async def fake_run_command(self, command, stage, cwd=None):
+        commands.append((stage, cwd or self.work_dir))
+        if stage == "npm_install":
+            npm(cwd or self.work_dir)
+        if stage == "npm_build":
+            dist = self.work_dir / "dist"
+            dist.mkdir(parents=True, exist_ok=True)
+            (dist / "index.html").write_text("<html>index</html>", encoding="utf-8")
+
+    monkeypatch.setattr(ReactSSGBuilder, "_run_command", fake_run_command)
+    cache = DependencyCache(tmp_path / "deps")
+
+    for session_id in ("s1", "s2"):
+        builder = ReactSSGBuilder(session_id, base_dir=tmp_path / "sessions", dependency_cache=cache)
+        asyncio.run(
+            builder.build(
+                page_schemas=[{"slug": "index", "title": "Home", "layout": "default", "components": []}],
+                component_registry={},
+                style_tokens={},
+                assets=None,
+            )
+        )
+        assert (builder.work_dir / "node_modules").is_symlink()
+
+    installs = [cwd for stage, cwd in commands if stage == "npm_install"]
+    assert len(installs) == 1
+    assert installs[0].parent == tmp_path / "deps"
+
+
+def test_reattach_of_current_key_is_a_no_op(tmp_path: Path) -> None:
+    cache = DependencyCache(tmp_path / "cache", mode="hardlink")
+    work = _project(tmp_path / "work")
+    npm = FakeNpm()
+
+    assert cache.attach(work, installer=npm) == "hardlink"
+    sentinel = work / "node_modules" / "react" / "built.txt"
+    sentinel.write_text("kept", encoding="utf-8")
+
+    # The next incremental build keeps the attached tree instead of rebuilding it.
+    assert cache.attach(work, installer=npm) == "hardlink"
+    assert sentinel.exists()
+
+    # A manifest change still re-attaches from the new entry.
+    (work / "package.json").write_text(json.dumps(dict(MANIFEST, name="other")), encoding="utf-8")
+    assert cache.attach(work, installer=npm) == "hardlink"
+    assert not sentinel.exists()
+    assert cache.attached_key(work / "node_modules") == cache.cache_key(work)
+
+
+def test_gc_keeps_entries_attached_to_live_work_dirs(tmp_path: Path) -> None:
+    cache = DependencyCache(tmp_path / "cache", max_entries=0, min_idle_seconds=0)
+    npm = FakeNpm()
+    live = _project(tmp_path / "live")
+    gone = _project(tmp_path / "gone", dict(MANIFEST, name="gone"))
+    cache.attach(live, installer=npm)
+    cache.attach(gone, installer=npm)
+    live_key, gone_key = cache.cache_key(live), cache.cache_key(gone)
+    (gone / "node_modules").unlink()
+
+    assert cache.gc() == [gone_key]
+    assert [info.key for info in cache.entries()] == [live_key]
+    assert (live / "node_modules" / "react" / "package.json").exists()
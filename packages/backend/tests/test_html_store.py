@@ -0,0 +1,112 @@
+import random
+import uuid
+
+from sqlalchemy import func, text
+
+from app.db.database import Database
+from app.db.migrations import backfill_v12_html_blobs, init_db
+from app.db.models import HtmlBlob, Page, PageVersion, Session as SessionModel, Version
+from app.db.utils import get_db, transaction_scope
+from app.services.html_store import MAX_DELTA_DEPTH, HtmlBlobStore, html_digest
+from app.services.page_version import PageVersionService
+from app.services.version import VersionService
+
+
+def _page_html(seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words = ["coffee", "latte", "order", "menu", "brew", "cup", "bean", "shop", "roast", "fresh"]
+    sections = [
+        f'<section id="s{i}" class="p-4 rounded-xl"><h2>Feature {i}</h2><p>'
+        + " ".join(rng.choice(words) + str(rng.randint(0, 999)) for _ in range(60))
+        + "</p></section>"
+        for i in range(110)
+    ]
+    return "<!DOCTYPE html><html><head><title>Shop</title></head><body>" + "".join(sections) + "</body></html>"
+
+
+def _setup(tmp_path) -> tuple[Database, str, str]:
+    database = Database(f"sqlite:///{tmp_path / 'html.db'}")
+    init_db(database)
+    session_id = uuid.uuid4().hex
+    page_id = uuid.uuid4().hex
+    with transaction_scope(database) as session:
+        session.add(SessionModel(id=session_id, title="Test Session"))
+        session.add(Page(id=page_id, session_id=session_id, title="Home", slug="index"))
+    return database, session_id, page_id
+
+
+def test_small_edits_store_deltas_and_read_back(tmp_path) -> None:
+    database, _, page_id = _setup(tmp_path)
+    html = _page_html()
+    edits = [html.replace("Feature 7<", f"Feature 7 (rev {n})<") for n in range(10)]
+
+    with get_db(database) as session:
+        store = HtmlBlobStore(session)
+        base_hash = None
+        for edit in edits:
+            base_hash = store.put(edit, base_hash=base_hash).hash
+        assert store.put(edits[3]).hash == html_digest(edits[3])
+        session.commit()
+
+    with get_db(database) as session:
+        stored = session.query(func.sum(func.length(HtmlBlob.data))).scalar()
+        assert session.query(HtmlBlob).count() == 10
+        assert max(blob.depth for blob in session.query(HtmlBlob)) == MAX_DELTA_DEPTH
+        assert HtmlBlobStore(session).get(html_digest(edits[9])) == edits[9]
+
+    assert stored * 10 < sum(len(edit) for edit in edits)
+
+    with get_db(database) as session:
+        PageVersionService(session).create_version(page_id, edits[0])
+        session.commit()
+
+    with get_db(database) as session:
+        current = PageVersionService(session).get_current(page_id)
+        assert current is not None and current.html == edits[0]
+        assert current.html_text is None
+
+
+def test_retention_releases_unreferenced_blobs(tmp_path) -> None:
+    database, _, page_id = _setup(tmp_path)
+
+    with get_db(database) as session:
+        service = PageVersionService(session)
+        for n in range(8):
+            service.create_version(page_id, _page_html(n))
+        session.commit()
+
+    with get_db(database) as session:
+        live = (
+            session.query(PageVersion)
+            .filter(PageVersion.is_released.is_(False))
+            .order_by(PageVersion.version)
+            .all()
+        )
+        released = session.query(PageVersion).filter(PageVersion.is_released.is_(True)).all()
+        assert len(live) == 5 and len(released) == 3
+        assert all(version.html is None for version in released)
+        assert [version.html for version in live] == [_page_html(n) for n in range(3, 8)]
+        # Only blobs still referenced by a version, or as another blob's base.
+        referenced = {version.html_hash for version in live}
+        bases = {blob.base_hash for blob in session.query(HtmlBlob) if blob.base_hash}
+        assert {blob.hash for blob in session.query(HtmlBlob)} == referenced | bases
+
+
+def test_backfill_moves_inline_html(tmp_path) -> None:
+    database, session_id, page_id = _setup(tmp_path)
+    with transaction_scope(database) as session:
+        session.add(PageVersion(page_id=page_id, version=1, html="<p>legacy</p>"))
+        session.add(Version(session_id=session_id, version=0, html="<p>session</p>"))
+
+    with get_db(database) as session:
+        assert session.execute(text("SELECT count(*) FROM html_blobs")).scalar() == 0
+        assert session.query(PageVersion).one().html == "<p>legacy</p>"
+
+    assert backfill_v12_html_blobs(database, batch_size=1) == 2
+    assert backfill_v12_html_blobs(database) == 0
+
+    with get_db(database) as session:
+        page_version = session.query(PageVersion).one()
+        assert page_version.html_text is None and page_version.html == "<p>legacy</p>"
+        version = VersionService(session).get_version(session_id, 0)
+        assert version is not None and version.html_text == "" and version.html == "<p>session</p>"
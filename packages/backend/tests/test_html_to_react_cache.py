@@ -0,0 +1,214 @@
+import asyncio
+import json
+import re
+import time
+
+import httpx
+
+from app.renderer.conversion_cache import ConversionCache
+from app.renderer.html_to_react import HtmlToReactConverter, PageHtml
+
+NAV = "<nav><a href='/'>Home</a></nav>"
+
+
+def _page(slug: str, body: str, nav: str = NAV) -> PageHtml:
+    return PageHtml(slug=slug, title=slug.title(), html=f"<html><body>{nav}<main>{body}</main></body></html>")
+
+
+class FakeClaude:
+    """Answers /v1/messages: shared files for the shared pass, one file per page otherwise."""
+
+    def __init__(self, delay: float = 0.0, fail_once: str | None = None) -> None:
+        self.prompts: list[str] = []
+        self.delay = delay
+        self.fail_once = fail_once
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        prompt = json.loads(request.content)["messages"][0]["content"]
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        slugs = self.slugs(prompt)
+        if self.fail_once in slugs and "## Existing Shared Files" in prompt:
+            self.fail_once = None
+            return httpx.Response(529, json={"error": "overloaded"})
+        if "## Existing Shared Files" in prompt:
+            files = [f"--- FILE: src/pages/{slug}.tsx ---\nexport default () => '{slug} v{len(self.prompts)}'" for slug in slugs]
+        else:
+            files = [
+                "--- FILE: src/components/Nav.tsx ---\nexport function Nav() { return null }",
+                "--- FILE: tailwind.config.js ---\nmodule.exports = {}",
+            ]
+        return httpx.Response(200, json={"content": [{"type": "text", "text": "\n".join(files)}]})
+
+    @staticmethod
+    def slugs(prompt: str) -> list[str]:
+        return re.findall(r"^### (\S+) \(", prompt, re.MULTILINE)
+
+    def page_requests(self) -> list[str]:
+        return [s for p in self.prompts if "## Existing Shared Files" in p for s in self.slugs(p)]
+
+
+def _converter(tmp_path, api: FakeClaude, concurrency: int = 4) -> HtmlToReactConverter:
+    converter = HtmlToReactConverter(
+        api_key="test",
+        base_url="http://claude.test",
+        cache=ConversionCache(tmp_path / "conversions"),
+        transport=httpx.MockTransport(api),
+        concurrency=concurrency,
+    )
+    converter.BASE_DELAY = 0.01
+    return converter
+
+
+def test_only_changed_pages_are_sent_to_the_api(tmp_path) -> None:
+    api = FakeClaude()
+    pages = [_page("index", "<h1>Hi</h1>"), _page("about", "<p>About</p>"), _page("menu", "<p>Menu</p>")]
+
+    first = asyncio.run(_converter(tmp_path, api).convert(pages))
+    assert len(api.prompts) == 4  # shared pass + one request per page
+    assert sorted(api.page_requests()) == ["about", "index", "menu"]
+    assert [f.path for f in first] == [
+        "src/components/Nav.tsx",
+        "tailwind.config.js",
+        "src/pages/index.tsx",
+        "src/pages/about.tsx",
+        "src/pages/menu.tsx",
+    ]
+
+    # Whitespace-only edits hit the cache; nothing is sent.
+    reformatted = [pages[0], _page("about", "<p>About</p>\n  <!-- note -->"), pages[2]]
+    second = asyncio.run(_converter(tmp_path, api).convert(reformatted))
+    assert len(api.prompts) == 4
+    assert second == first
+
+    # One page edited: only it goes to the API, with the cached shared files as context.
+    edited = [pages[0], _page("about", "<p>About us</p>"), pages[2]]
+    third = asyncio.run(_converter(tmp_path, api).convert(edited))
+    assert len(api.prompts) == 5
+    assert api.slugs(api.prompts[-1]) == ["about"]
+    assert "src/components/Nav.tsx" in api.prompts[-1]
+    assert [f.path for f in third] == [f.path for f in first]
+    about = next(f for f in third if f.path == "src/pages/about.tsx")
+    assert about.content.endswith("v5'")
+
+
+def test_shared_layout_change_reconverts_everything(tmp_path) -> None:
+    api = FakeClaude()
+    pages = [_page("index", "<h1>Hi</h1>"), _page("about", "<p>About</p>")]
+    asyncio.run(_converter(tmp_path, api).convert(pages))
+
+    new_nav = "<nav><a href='/'>Home</a><a href='/about'>About</a></nav>"
+    relaid = [_page("index", "<h1>Hi</h1>", new_nav), _page("about", "<p>About</p>", new_nav)]
+    asyncio.run(_converter(tmp_path, api).convert(relaid))
+
+    assert len(api.prompts) == 6
+    assert sorted(api.page_requests()) == ["about", "about", "index", "index"]
+
+
+def test_pages_convert_concurrently_with_per_page_retries(tmp_path) -> None:
+    api = FakeClaude(delay=0.2, fail_once="p3")
+    pages = [_page(f"p{i}", f"<p>{i}</p>") for i in range(6)]
+
+    started = time.perf_counter()
+    files = asyncio.run(_converter(tmp_path, api, concurrency=3).convert(pages))
+    elapsed = time.perf_counter() - started
+
+    assert api.max_in_flight == 3
+    # shared pass + two waves of pages (+ one retried page), not six sequential calls
+    assert elapsed < 6 * 0.2
+    assert api.page_requests().count("p3") == 2
+    assert [f.path for f in files][2:] == [f"src/pages/p{i}.tsx" for i in range(6)]
+
+
+def test_product_doc_change_alone_misses_the_page_cache(tmp_path) -> None:
+    api = FakeClaude()
+    pages = [_page("index", "<h1>Hi</h1>"), _page("about", "<p>About</p>")]
+    asyncio.run(_converter(tmp_path, api).convert(pages, product_doc_content="Doc v1"))
+    asyncio.run(_converter(tmp_path, api).convert(pages, product_doc_content="Doc v1"))
+    assert len(api.page_requests()) == 2
+
+    # The fake returns identical shared files, so only the doc differs in the page keys.
+    asyncio.run(_converter(tmp_path, api).convert(pages, product_doc_content="Doc v2"))
+    assert sorted(api.page_requests()) == ["about", "about", "index", "index"]
+    assert "Doc v2" in api.prompts[-1]
+
+
+def test_build_fix_resends_only_the_files_named_in_errors(tmp_path) -> None:
+    api = FakeClaude()
+    pages = [_page("index", "<h1>Hi</h1>"), _page("about", "<p>About</p>"), _page("menu", "<p>Menu</p>")]
+    files = asyncio.run(_converter(tmp_path, api).convert(pages))
+    sent = len(api.prompts)
+
+    errors = "/work/src/pages/about.tsx(3,1): error TS2304: Cannot find name 'x'."
+    fixed = asyncio.run(_converter(tmp_path, api).retry_with_errors(pages, files, errors))
+
+    assert len(api.prompts) == sent + 1
+    assert api.slugs(api.prompts[-1]) == ["about"]
+    assert "TS2304" in api.prompts[-1] and "## Previous Output" in api.prompts[-1]
+    assert [f.path for f in fixed] == [f.path for f in files]
+    changed = [f.path for f, old in zip(fixed, files) if f != old]
+    assert changed == ["src/pages/about.tsx"]
+
+    # The fix is what later conversions reuse.
+    again = asyncio.run(_converter(tmp_path, api).convert(pages))
+    assert len(api.prompts) == sent + 1 and again == fixed
+
+    # A shared file alone: one small request, no pages.
+    asyncio.run(_converter(tmp_path, api).retry_with_errors(pages, fixed, "Nav.tsx:1:8: unexpected token"))
+    assert len(api.prompts) == sent + 2
+    assert api.slugs(api.prompts[-1]) == []
+    assert "Output only these files, with the errors fixed: src/components/Nav.tsx" in api.prompts[-1]
+
+
+def test_build_fix_without_named_files_retries_each_page_separately(tmp_path) -> None:
+    api = FakeClaude()
+    pages = [_page("index", "<h1>Hi</h1>"), _page("about", "<p>About</p>")]
+    files = asyncio.run(_converter(tmp_path, api).convert(pages))
+    sent = len(api.prompts)
+
+    asyncio.run(_converter(tmp_path, api).retry_with_errors(pages, files, "vite: build failed"))
+
+    assert [api.slugs(prompt) for prompt in api.prompts[sent:]] in (
+        [["index"], ["about"]],
+        [["about"], ["index"]],
+    )
+
+
+def test_conflicting_page_components_are_namespaced(tmp_path, caplog) -> None:
+    api = FakeClaude()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        prompt = json.loads(request.content)["messages"][0]["content"]
+        slugs = api.slugs(prompt)
+        if "## Existing Shared Files" not in prompt:
+            return await api(request)
+        slug = slugs[0]
+        text = (
+            f"--- FILE: src/pages/{slug}.tsx ---\n"
+            f"import {{ Card }} from '../components/Card'\nexport default () => <Card />\n"
+            f"--- FILE: src/components/Card.tsx ---\nexport function Card() {{ return '{slug}' }}"
+        )
+        return httpx.Response(200, json={"content": [{"type": "text", "text": text}]})
+
+    converter = HtmlToReactConverter(
+        api_key="test",
+        base_url="http://claude.test",
+        cache=ConversionCache(tmp_path / "conversions"),
+        transport=httpx.MockTransport(handler),
+    )
+    pages = [_page("index", "<h1>Hi</h1>"), _page("about", "<p>About</p>")]
+    with caplog.at_level("WARNING"):
+        files = {f.path: f.content for f in asyncio.run(converter.convert(pages))}
+
+    assert files["src/components/Card.tsx"].endswith("'index' }")
+    assert files["src/components/Card__about.tsx"].endswith("'about' }")
+    assert "from '../components/Card'" in files["src/pages/index.tsx"]
+    assert "from '../components/Card__about'" in files["src/pages/about.tsx"]
+    assert "emitted conflicting src/components/Card.tsx" in caplog.text
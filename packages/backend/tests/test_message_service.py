@@ -0,0 +1,72 @@
+from sqlalchemy import inspect
+
+from app.db.database import Database
+from app.db.migrations import init_db
+from app.db.models import Message
+from app.db.utils import get_db
+from app.services.message import MessageService
+from app.services.session import SessionService
+from app.services.thread import ThreadService
+
+
+def _seed(tmp_path, count: int) -> tuple[Database, str, str]:
+    database = Database(f"sqlite:///{tmp_path / 'messages.db'}")
+    init_db(database)
+    with get_db(database) as session:
+        session_id = SessionService(session).create_session("Messages").id
+        thread_id = ThreadService(session).create_thread(session_id).id
+        service = MessageService(session)
+        for n in range(count):
+            service.add_message(session_id, "user" if n % 2 == 0 else "assistant", f"m{n}", thread_id=thread_id)
+        session.commit()
+    return database, session_id, thread_id
+
+
+def test_keyset_pages_walk_history_backwards(tmp_path) -> None:
+    database, session_id, thread_id = _seed(tmp_path, 23)
+
+    with get_db(database) as session:
+        service = MessageService(session)
+        pages = []
+        before = None
+        while True:
+            page = service.get_messages(session_id, thread_id=thread_id, limit=10, before=before)
+            if not page:
+                break
+            pages.append([message.content for message in page])
+            before = page[0].id
+        # ``before`` now names m0.
+        assert pages[0] == [f"m{n}" for n in range(13, 23)]
+        assert [content for page in reversed(pages) for content in page] == [f"m{n}" for n in range(23)]
+
+        newer = service.get_messages(session_id, thread_id=thread_id, limit=3, after=before)
+        assert [message.content for message in newer] == ["m1", "m2", "m3"]
+
+        lazy = service.get_messages(session_id, thread_id=thread_id, limit=1, defer_large=True)
+        assert "content" in inspect(lazy[0]).unloaded
+        assert lazy[0].content == "m22"
+
+    assert "idx_messages_session_thread_ts_id" in {
+        index["name"] for index in inspect(database.engine).get_indexes("messages")
+    }
+
+
+def test_recent_window_is_cached_and_invalidated(tmp_path) -> None:
+    database, session_id, thread_id = _seed(tmp_path, 60)
+
+    with get_db(database) as session:
+        service = MessageService(session)
+        window = service.recent_messages(session_id, thread_id=thread_id)
+        assert len(window) == 50 and window[-1].content == "m59"
+        assert service.recent_messages(session_id, thread_id=thread_id, limit=2) == window[-2:]
+
+        service.add_message(session_id, "user", "latest", thread_id=thread_id)
+        session.commit()
+        assert service.recent_messages(session_id, thread_id=thread_id)[-1].content == "latest"
+
+    # A write that bypasses the service still changes the thread's counters.
+    with get_db(database) as session:
+        session.query(Message).filter(Message.content == "latest").delete(synchronize_session=False)
+        session.commit()
+        window = MessageService(session).recent_messages(session_id, thread_id=thread_id)
+        assert window[-1].content == "m59"
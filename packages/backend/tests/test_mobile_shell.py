@@ -1,10 +1,14 @@
+from pathlib import Path
+
 from bs4 import BeautifulSoup
 
+from app.renderer import postprocess
 from app.services.mobile_shell import (
     MOBILE_SHELL_STYLE_ID,
     VIEWPORT_CONTENT,
     check_touch_targets,
     ensure_mobile_shell,
+    rewrite_mobile_shell,
     validate_mobile_shell,
 )
 
@@ -69,3 +73,59 @@ def test_check_touch_targets_inline_styles() -> None:
     html_missing = "<html><body><a>Link</a></body></html>"
     soup_missing = BeautifulSoup(html_missing, "html.parser")
     assert check_touch_targets(soup_missing) is False
+
+
+def test_rewrite_mobile_shell_edits_only_shell_tags() -> None:
+    html = (
+        "<!doctype html>\n<html lang=\"en\">\n<head>\n"
+        "<meta name=\"viewport\" content=\"width=1\" />\n<title>T</title>\n</head>\n"
+        "<body>\n<div id=\"app\" data-x=\"1\"><p>Hi &amp; bye</p></div>\n"
+        "<script type=\"module\" src=\"/assets/a.js\"></script>\n</body>\n</html>\n"
+    )
+    updated = rewrite_mobile_shell(html)
+
+    assert validate_mobile_shell(updated)["rules"][0]["passed"] is True
+    assert '<div id="app" data-x="1" class="page"><p>Hi &amp; bye</p></div>' in updated
+    assert '<script type="module" src="/assets/a.js"></script>' in updated
+    assert updated.count("<meta") == 1
+    assert rewrite_mobile_shell(updated) == updated
+
+
+def test_rewrite_mobile_shell_falls_back_without_head_and_body() -> None:
+    assert rewrite_mobile_shell("<div>Hi</div>") == ensure_mobile_shell("<div>Hi</div>")
+
+
+def test_apply_mobile_shell_skips_already_shelled_pages(tmp_path: Path, monkeypatch) -> None:
+    dist = tmp_path / "dist"
+    (dist / "pages" / "about").mkdir(parents=True)
+    page = "<html><head></head><body><div id=\"app\">{}</div></body></html>"
+    (dist / "index.html").write_text(page.format("home"), encoding="utf-8")
+    (dist / "pages" / "about" / "index.html").write_text(page.format("about"), encoding="utf-8")
+    manifest = tmp_path / "mobile-shell.json"
+
+    first = postprocess.apply_mobile_shell(dist, manifest)
+    assert sorted(t.path for t in first.processed) == ["index.html", "pages/about/index.html"]
+    assert all(t.changed for t in first.processed)
+
+    (dist / "index.html").write_text(page.format("home v2"), encoding="utf-8")
+    second = postprocess.apply_mobile_shell(dist, manifest)
+    assert [t.path for t in second.processed] == ["index.html"]
+    assert second.skipped == ["pages/about/index.html"]
+    assert "class=\"page\"" in (dist / "index.html").read_text(encoding="utf-8")
+
+
+def test_apply_mobile_shell_uses_pool_for_many_pages(tmp_path: Path) -> None:
+    dist = tmp_path / "dist"
+    for index in range(postprocess.POOL_MIN_FILES):
+        target = dist / "pages" / f"p{index}" / "index.html"
+        target.parent.mkdir(parents=True)
+        target.write_text("<html><head></head><body><main>x</main></body></html>", encoding="utf-8")
+
+    try:
+        report = postprocess.apply_mobile_shell(dist, tmp_path / "m.json", workers=2)
+    finally:
+        postprocess.shutdown_pool()
+
+    assert len(report.processed) == postprocess.POOL_MIN_FILES and not report.failed
+    for path in dist.rglob("*.html"):
+        assert validate_mobile_shell(path.read_text(encoding="utf-8"))["rules"][1]["passed"]
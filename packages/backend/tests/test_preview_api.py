@@ -0,0 +1,76 @@
+import gzip
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import preview
+from app.renderer.precompress import manifest_path, precompress_dist
+
+
+def _client(tmp_path: Path, monkeypatch) -> tuple[TestClient, Path]:
+    dist = tmp_path / "sessions" / "s1" / "dist"
+    (dist / "assets").mkdir(parents=True)
+    (dist / "index.html").write_text(
+        "<html><head></head><body>" + "<p>hello</p>" * 200 + "</body></html>", encoding="utf-8"
+    )
+    (dist / "assets" / "index-AbC123xY.js").write_text("console.log('x');\n" * 100, encoding="utf-8")
+    (dist / "logo.png").write_bytes(b"\x89PNG" + b"\0" * 2000)
+    precompress_dist(dist)
+
+    monkeypatch.setattr(preview, "_resolve_dist_dir", lambda session_id: dist.resolve())
+    app = FastAPI()
+    app.include_router(preview.router)
+    return TestClient(app), dist
+
+
+def test_precompress_writes_siblings_and_manifest(tmp_path: Path, monkeypatch) -> None:
+    _, dist = _client(tmp_path, monkeypatch)
+
+    assert gzip.decompress((dist / "index.html.gz").read_bytes()).startswith(b"<html>")
+    assert not (dist / "logo.png.gz").exists()
+    assert manifest_path(dist) == dist.parent / "dist-manifest.json"
+    assert not any(path.name == "dist-manifest.json" for path in dist.rglob("*"))
+
+
+def test_preview_negotiates_encoding_and_answers_conditional_requests(
+    tmp_path: Path, monkeypatch
+) -> None:
+    client, _ = _client(tmp_path, monkeypatch)
+
+    response = client.get("/preview/s1/index.html", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/html")
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["cache-control"] == "no-cache"
+    assert "<p>hello</p>" in response.text  # httpx decodes the gzip body
+    etag = response.headers["etag"]
+
+    cached = client.get(
+        "/preview/s1/index.html",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": etag},
+    )
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    plain = client.get(
+        "/preview/s1/index.html",
+        headers={"Accept-Encoding": "gzip;q=0, identity", "If-None-Match": etag},
+    )
+    assert plain.status_code == 200
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["etag"] != etag
+
+
+def test_preview_marks_hashed_assets_immutable(tmp_path: Path, monkeypatch) -> None:
+    client, _ = _client(tmp_path, monkeypatch)
+
+    asset = client.get("/preview/s1/assets/index-AbC123xY.js", headers={"Accept-Encoding": "br, gzip"})
+    assert asset.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert asset.headers["content-type"].startswith(("text/javascript", "application/javascript"))
+
+    image = client.get("/preview/s1/logo.png")
+    assert image.status_code == 200
+    assert image.headers["cache-control"] == "no-cache"
+    assert "vary" not in image.headers
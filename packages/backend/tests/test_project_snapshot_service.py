@@ -3,9 +3,12 @@ import uuid
 from app.db.database import Database
 from app.db.migrations import init_db
 from app.db.models import (
+    HtmlBlob,
+    Page,
     PageVersion,
     ProductDocHistory,
     ProjectSnapshot,
+    ProjectSnapshotPage,
     Session as SessionModel,
     VersionSource,
 )
@@ -200,3 +203,56 @@ def test_rollback_creates_new_versions(tmp_path) -> None:
         assert rollback_snapshot is not None
         assert rollback_snapshot.source == VersionSource.ROLLBACK
         assert rollback_snapshot.snapshot_number == base_snapshot_number + 1
+
+
+def test_snapshot_pages_reference_version_content(tmp_path) -> None:
+    database = Database(f"sqlite:///{tmp_path / 'snapshots_refs.db'}")
+    init_db(database)
+
+    session_id = uuid.uuid4().hex
+    _create_session(database, session_id)
+    ids = _seed_project(database, session_id)
+    home_html = "<html>home \u2615 v1</html>\r\n"
+
+    with get_db(database) as session:
+        PageVersionService(session).create(ids["home_id"], home_html)
+        blobs_before = session.query(HtmlBlob).count()
+        snapshot = ProjectSnapshotService(session).create_snapshot(session_id, source=VersionSource.AUTO)
+        snapshot_id = snapshot.id
+        # References only: no HTML copied, no new blobs.
+        assert session.query(HtmlBlob).count() == blobs_before
+        current = session.get(Page, ids["home_id"]).current_version
+        home_page = next(page for page in snapshot.pages if page.page_id == ids["home_id"])
+        assert home_page.html_hash == current.html_hash
+        assert home_page.rendered_html_text is None
+        # Enough newer versions that the snapshotted one is released.
+        for n in range(6):
+            PageVersionService(session).create(ids["home_id"], f"<html>home v{n + 2}</html>")
+        session.commit()
+
+    with get_db(database) as session:
+        service = ProjectSnapshotService(session)
+        service.rollback_to_snapshot(session_id, snapshot_id)
+        session.commit()
+
+    with get_db(database) as session:
+        restored = session.get(Page, ids["home_id"]).current_version
+        assert restored.html == home_html
+        assert restored.source == VersionSource.ROLLBACK
+        # Older snapshots release their references; unused content goes too.
+        service = ProjectSnapshotService(session)
+        for _ in range(6):
+            service.create_snapshot(session_id, source=VersionSource.AUTO)
+        session.commit()
+        referenced = {
+            digest
+            for (digest,) in session.query(PageVersion.html_hash).filter(PageVersion.html_hash.isnot(None))
+        }
+        bases = {blob.base_hash for blob in session.query(HtmlBlob) if blob.base_hash}
+        referenced |= {
+            digest
+            for (digest,) in session.query(ProjectSnapshotPage.html_hash).filter(
+                ProjectSnapshotPage.html_hash.isnot(None)
+            )
+        }
+        assert {blob.hash for blob in session.query(HtmlBlob)} == referenced | bases
@@ -0,0 +1,74 @@
+from pathlib import Path
+
+import pytest
+
+from app.renderer.releases import BlobStore, ReleaseStore
+
+
+def _dist(root: Path, files: dict[str, str]) -> Path:
+    for name, content in files.items():
+        target = root / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content, encoding="utf-8")
+    return root
+
+
+def test_publish_dedupes_across_sessions_and_rolls_back(tmp_path: Path) -> None:
+    blobs = BlobStore(tmp_path / "blobs")
+    vendor = "export const react = 1;\n" * 50
+    s1 = ReleaseStore(tmp_path / "sessions" / "s1", blobs)
+    s2 = ReleaseStore(tmp_path / "sessions" / "s2", blobs)
+
+    first = s1.publish(
+        _dist(tmp_path / "b1", {"index.html": "v1", "assets/vendor-a1b2c3d4.js": vendor}),
+        extras={"dist-manifest.json": "{}"},
+    )
+    s2.publish(_dist(tmp_path / "b2", {"index.html": "other", "assets/vendor-a1b2c3d4.js": vendor}))
+
+    vendor_blob = blobs.path(s1._record(first)["files"]["assets/vendor-a1b2c3d4.js"])
+    assert vendor_blob.stat().st_nlink == 3  # the blob and one link per session
+    assert (s1.dist_link / "index.html").read_text(encoding="utf-8") == "v1"
+    assert (s1.dist_link.resolve().parent / "dist-manifest.json").is_file()
+    assert not (tmp_path / "b1").exists()
+
+    second = s1.publish(_dist(tmp_path / "b3", {"index.html": "v2", "assets/vendor-a1b2c3d4.js": vendor}))
+    assert (s1.dist_link / "index.html").read_text(encoding="utf-8") == "v2"
+    assert [(r.id, r.active) for r in s1.releases()] == [(first, False), (second, True)]
+
+    s1.activate(first)
+    assert (s1.dist_link / "index.html").read_text(encoding="utf-8") == "v1"
+    with pytest.raises(FileNotFoundError):
+        s1.activate("../s2")
+
+
+def test_retention_and_reference_counted_gc(tmp_path: Path) -> None:
+    blobs = BlobStore(tmp_path / "blobs")
+    store = ReleaseStore(tmp_path / "sessions" / "s1", blobs, retention=2)
+
+    ids = [
+        store.publish(_dist(tmp_path / f"b{i}", {"index.html": f"page {i}", "app.js": "shared"}))
+        for i in range(3)
+    ]
+
+    assert [release.id for release in store.releases()] == ids[1:]
+    # "page 0" lost its only release; the shared bundle is still linked.
+    assert blobs.gc(force=True) == 1
+    assert blobs.gc(force=True) == 0
+    stored = {
+        path.read_text(encoding="utf-8")
+        for path in (tmp_path / "blobs").rglob("*")
+        if path.is_file() and not path.name.startswith(".")
+    }
+    assert stored == {"page 1", "page 2", "shared"}
+    assert (store.dist_link / "app.js").read_text(encoding="utf-8") == "shared"
+
+
+def test_activate_replaces_legacy_dist_dir(tmp_path: Path) -> None:
+    session = tmp_path / "sessions" / "s1"
+    _dist(session / "dist", {"index.html": "legacy"})
+    store = ReleaseStore(session, BlobStore(tmp_path / "blobs"))
+
+    store.publish(_dist(tmp_path / "b", {"index.html": "new"}))
+
+    assert store.dist_link.is_symlink()
+    assert (store.dist_link / "index.html").read_text(encoding="utf-8") == "new"
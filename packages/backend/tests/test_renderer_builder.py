@@ -2,7 +2,9 @@ import asyncio
 from pathlib import Path
 
 from app.renderer.builder import ReactSSGBuilder
+from app.renderer.dependency_cache import DependencyCache
 from app.renderer.file_generator import SchemaFileGenerator
+from app.renderer.releases import release_store
 
 
 def test_schema_file_generator_writes_json_and_pages(tmp_path: Path) -> None:
@@ -46,7 +48,7 @@ def test_react_ssg_builder_builds_with_mocked_npm(tmp_path: Path, monkeypatch) -
     session_id = "session-test"
     base_dir = tmp_path / "sessions"
 
-    def fake_run_command(self, command, stage):
+    async def fake_run_command(self, command, stage, cwd=None):
         if stage == "npm_build":
             dist_dir = self.work_dir / "dist"
             (dist_dir / "pages" / "about").mkdir(parents=True, exist_ok=True)
@@ -59,7 +61,11 @@ def test_react_ssg_builder_builds_with_mocked_npm(tmp_path: Path, monkeypatch) -
 
     monkeypatch.setattr(ReactSSGBuilder, "_run_command", fake_run_command)
 
-    builder = ReactSSGBuilder(session_id, base_dir=base_dir)
+    builder = ReactSSGBuilder(
+        session_id,
+        base_dir=base_dir,
+        dependency_cache=DependencyCache(tmp_path / "deps"),
+    )
     result = asyncio.run(
         builder.build(
             page_schemas=[{"slug": "index", "title": "Home", "layout": "default", "components": []}],
@@ -73,3 +79,112 @@ def test_react_ssg_builder_builds_with_mocked_npm(tmp_path: Path, monkeypatch) -
     assert builder.dist_dir.exists()
     assert (builder.dist_dir / "index.html").exists()
     assert "index.html" in result["pages"]
+
+
+def test_rebuild_is_incremental(tmp_path: Path, monkeypatch) -> None:
+    commands: list[list[str]] = []
+
+    async def fake_run_command(self, command, stage, cwd=None):
+        commands.append(command)
+        dist_dir = self.work_dir / "dist"
+        if stage == "npm_build":
+            (dist_dir / ".vite").mkdir(parents=True, exist_ok=True)
+            (dist_dir / ".vite" / "manifest.json").write_text('{"main": "app-1.js"}', encoding="utf-8")
+            (dist_dir / "index.html").write_text("<html>base</html>", encoding="utf-8")
+        if stage == "prerender":
+            only = command[command.index("--only") + 1].split(",") if "--only" in command else ["index", "about"]
+            for slug in only:
+                target = dist_dir / ("index.html" if slug == "index" else f"pages/{slug}/index.html")
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_text(f"<html>{slug} {len(commands)}</html>", encoding="utf-8")
+
+    monkeypatch.setattr(ReactSSGBuilder, "_run_command", fake_run_command)
+    schemas = [
+        {"slug": "index", "title": "Home", "layout": "default", "components": []},
+        {"slug": "about", "title": "About", "layout": "default", "components": []},
+    ]
+
+    def build(page_schemas):
+        commands.clear()
+        builder = ReactSSGBuilder(
+            "s1", base_dir=tmp_path / "sessions", dependency_cache=DependencyCache(tmp_path / "deps"),
+        )
+        asyncio.run(builder.build(page_schemas, component_registry={}, style_tokens={}, assets=None))
+        return builder, [c for c in commands if c[:2] == ["npm", "run"]]
+
+    builder, first = build(schemas)
+    template_file = builder.work_dir / "src" / "main.tsx"
+    page_file = builder.work_dir / "src" / "pages" / "about.tsx"
+    mtimes = (template_file.stat().st_mtime_ns, page_file.stat().st_mtime_ns)
+    assert first == [["npm", "run", "build:client"], ["npm", "run", "prerender"]]
+
+    # Unchanged inputs: nothing runs and the published dist is reused.
+    _, second = build(schemas)
+    assert second == []
+    assert (template_file.stat().st_mtime_ns, page_file.stat().st_mtime_ns) == mtimes
+
+    # One page edited, client bundle unchanged: only that route is prerendered.
+    index_html = (builder.dist_dir / "index.html").read_text(encoding="utf-8")
+    edited = [schemas[0], dict(schemas[1], title="About us")]
+    builder, third = build(edited)
+    assert third[-1] == ["npm", "run", "prerender", "--", "--only", "about"]
+    assert (builder.dist_dir / "index.html").read_text(encoding="utf-8") == index_html
+    assert page_file.stat().st_mtime_ns == mtimes[1]
+
+    # A removed page's component is pruned from the persistent work dir.
+    build(schemas[:1])
+    assert not page_file.exists()
+    assert template_file.exists()
+
+
+def test_rebuild_after_release_rollback(tmp_path: Path, monkeypatch) -> None:
+    commands: list[list[str]] = []
+
+    async def fake_run_command(self, command, stage, cwd=None):
+        commands.append(command)
+        dist_dir = self.work_dir / "dist"
+        if stage == "npm_build":
+            (dist_dir / ".vite").mkdir(parents=True, exist_ok=True)
+            (dist_dir / ".vite" / "manifest.json").write_text('{"main": "app-1.js"}', encoding="utf-8")
+            (dist_dir / "index.html").write_text("<html>base</html>", encoding="utf-8")
+        if stage == "prerender":
+            only = command[command.index("--only") + 1].split(",") if "--only" in command else ["index", "about"]
+            for slug in only:
+                target = dist_dir / ("index.html" if slug == "index" else f"pages/{slug}/index.html")
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_text(f"<html>{slug} build {len(builds)}</html>", encoding="utf-8")
+
+    monkeypatch.setattr(ReactSSGBuilder, "_run_command", fake_run_command)
+    schemas = [
+        {"slug": "index", "title": "Home", "layout": "default", "components": []},
+        {"slug": "about", "title": "About", "layout": "default", "components": []},
+    ]
+    builds: list[str] = []
+
+    def build(page_schemas):
+        commands.clear()
+        builds.append("")
+        builder = ReactSSGBuilder(
+            "s1", base_dir=tmp_path / "sessions", dependency_cache=DependencyCache(tmp_path / "deps"),
+        )
+        asyncio.run(builder.build(page_schemas, component_registry={}, style_tokens={}, assets=None))
+        return builder, [c for c in commands if c[:2] == ["npm", "run"]]
+
+    builder, _ = build(schemas)
+    releases = release_store(builder.session_dir)
+    first = releases.active()
+    edited = [schemas[0], dict(schemas[1], title="About us")]
+    build(edited)
+    assert releases.active() != first
+
+    # Rolled back: the work dir still describes the newer build, the dist does not.
+    releases.activate(first)
+    builder, rebuilt = build(edited)
+    assert rebuilt == [["npm", "run", "build:client"], ["npm", "run", "prerender"]]
+    assert releases.active() not in {first, None}
+    about = builder.dist_dir / "pages" / "about" / "index.html"
+    assert "about build 3" in about.read_text(encoding="utf-8")
+
+    # The freshly published release is trusted again.
+    _, unchanged = build(edited)
+    assert unchanged == []
@@ -0,0 +1,183 @@
+import uuid
+from datetime import timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.config import refresh_settings
+from app.db.database import Database, reset_database
+from app.db.migrations import init_db
+from app.db.models import Message, Session as SessionModel, Thread
+from app.db.utils import get_db, transaction_scope
+from app.services.cleanup import CleanupPolicy, CleanupService
+from app.services.message import MessageService
+from app.services.page import PageService
+from app.services.session import SessionService
+from app.services.thread import ThreadService
+from app.services.version import VersionService
+from app.utils.datetime import utcnow
+
+
+def _database(tmp_path) -> Database:
+    database = Database(f"sqlite:///{tmp_path / 'sessions.db'}")
+    init_db(database)
+    return database
+
+
+def test_counters_follow_inserts_and_deletes(tmp_path) -> None:
+    database = _database(tmp_path)
+    with get_db(database) as session:
+        record = SessionService(session).create_session("Counters")
+        session_id = record.id
+        thread = ThreadService(session).create_thread(session_id)
+        thread_id = thread.id
+        messages = MessageService(session)
+        for n in range(4):
+            messages.add_message(session_id, "user", f"m{n}", thread_id=thread_id)
+        messages.add_message(session_id, "assistant", "orphan")
+        VersionService(session).create_version(session_id, "<p>v0</p>")
+        PageService(session).create(session_id=session_id, title="Home", slug="home")
+        session.commit()
+
+    with get_db(database) as session:
+        record = session.get(SessionModel, session_id)
+        assert (record.message_count, record.version_count, record.page_count) == (5, 1, 1)
+        assert record.last_activity_at is not None
+        assert ThreadService(session).get_message_count(thread_id) == 4
+
+        # Moving messages between threads and bulk deletes are tracked too.
+        ThreadService(session).ensure_default_thread(session_id)
+        MessageService(session).clear_messages(session_id, thread_id=thread_id)
+        session.commit()
+        assert SessionService(session).count_messages(session_id) == 1
+        assert session.get(Thread, thread_id).message_count == 0
+
+        CleanupService(session, CleanupPolicy(max_messages_per_session=0)).cleanup_excess_messages()
+        session.expire_all()
+        assert session.get(SessionModel, session_id).message_count == 0
+
+
+def test_existing_rows_are_counted_when_columns_are_added(tmp_path) -> None:
+    database = _database(tmp_path)
+    session_id = uuid.uuid4().hex
+    with transaction_scope(database) as session:
+        session.add(SessionModel(id=session_id, title="Legacy"))
+        for n in range(3):
+            session.add(Message(session_id=session_id, role="user", content=f"m{n}"))
+
+    with database.engine.begin() as connection:
+        for trigger in ("insert", "delete", "session_id", "thread_id"):
+            connection.execute(text(f"DROP TRIGGER trg_messages_counters_{trigger}"))
+        connection.execute(text("ALTER TABLE sessions DROP COLUMN message_count"))
+    init_db(database)
+
+    with get_db(database) as session:
+        assert session.get(SessionModel, session_id).message_count == 3
+        MessageService(session).add_message(session_id, "user", "new")
+        session.commit()
+        session.expire_all()
+        assert session.get(SessionModel, session_id).message_count == 4
+
+
+def test_keyset_pages_and_title_search(tmp_path) -> None:
+    database = _database(tmp_path)
+    now = utcnow()
+    with transaction_scope(database) as session:
+        for n in range(7):
+            session.add(
+                SessionModel(
+                    id=f"s{n}",
+                    title="Coffee shop" if n % 2 else "Bakery",
+                    # Two sessions share every timestamp; id breaks the tie.
+                    updated_at=now - timedelta(minutes=n // 2),
+                )
+            )
+
+    with get_db(database) as session:
+        service = SessionService(session)
+        seen: list[str] = []
+        cursor = None
+        while True:
+            rows, cursor = service.page_sessions(limit=3, cursor=cursor)
+            seen.extend(row.id for row in rows)
+            if cursor is None:
+                break
+        assert seen == ["s1", "s0", "s3", "s2", "s5", "s4", "s6"]
+
+        rows, cursor = service.page_sessions(search="COFFEE", sort="title", order="asc")
+        assert [row.id for row in rows] == ["s1", "s3", "s5"] and cursor is None
+        assert service.count_sessions("ffee sh") == 3
+        assert service.count_sessions("ak") == 4
+
+        session.get(SessionModel, "s0").title = "Coffee cart"
+        session.commit()
+        assert service.count_sessions("coffee") == 4
+
+
+def test_title_search_index_is_keyed_by_session_rowid(tmp_path) -> None:
+    database = _database(tmp_path)
+    with transaction_scope(database) as session:
+        for n in range(3):
+            session.add(SessionModel(id=f"s{n}", title=f"Coffee {n}"))
+
+    # A database indexed before the rows were keyed by rowid.
+    with database.engine.begin() as connection:
+        connection.execute(text("DROP TRIGGER trg_sessions_search_delete"))
+        connection.execute(
+            text(
+                "CREATE TRIGGER trg_sessions_search_delete AFTER DELETE ON sessions BEGIN "
+                "DELETE FROM sessions_fts WHERE session_id = OLD.id; END"
+            )
+        )
+        connection.execute(text("DELETE FROM sessions_fts"))
+        connection.execute(text("INSERT INTO sessions_fts (session_id, title) SELECT id, title FROM sessions"))
+        connection.execute(text("UPDATE sessions_fts SET rowid = rowid + 100"))
+    init_db(database)
+
+    with database.engine.connect() as connection:
+        triggers = connection.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_sessions_search_%'")
+        ).scalars()
+        assert all("session_id =" not in sql for sql in triggers)
+        mismatched = connection.execute(
+            text(
+                "SELECT count(*) FROM sessions JOIN sessions_fts f ON f.session_id = sessions.id "
+                "WHERE f.rowid != sessions.rowid"
+            )
+        ).scalar()
+        assert mismatched == 0
+
+    with get_db(database) as session:
+        service = SessionService(session)
+        session.get(SessionModel, "s1").title = "Bakery"
+        session.delete(session.get(SessionModel, "s2"))
+        session.commit()
+        assert service.count_sessions("coffee") == 1
+        assert service.count_sessions("bakery") == 1
+
+
+def test_list_endpoint_returns_cursor_and_counts(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'sessions_api.db'}")
+    monkeypatch.setenv("DEFAULT_BASE_URL", "http://localhost")
+    monkeypatch.setenv("DEFAULT_KEY", "test-key")
+    refresh_settings()
+    reset_database()
+    init_db()
+    from app.main import create_app
+
+    with get_db() as session:
+        for n in range(3):
+            record = SessionService(session).create_session(f"Project {n}")
+            MessageService(session).add_message(record.id, "user", "hello")
+        session.commit()
+
+    client = TestClient(create_app())
+    first = client.get("/api/sessions", params={"limit": 2}).json()
+    assert first["total"] == 3 and len(first["sessions"]) == 2
+    assert all(row["message_count"] == 1 for row in first["sessions"])
+
+    second = client.get("/api/sessions", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+    assert "total" not in second and second["next_cursor"] is None
+    assert len({row["id"] for row in first["sessions"] + second["sessions"]}) == 3
+
+    assert client.get("/api/sessions", params={"cursor": "not-a-cursor"}).status_code == 400
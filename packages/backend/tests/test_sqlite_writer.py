@@ -0,0 +1,153 @@
+import threading
+import uuid
+
+import pytest
+
+from app.config import refresh_settings
+from app.db.database import Database, get_database, reset_database
+from app.db.migrations import init_db
+from app.db.models import Message, Page, PageVersion, Session as SessionModel, SessionEvent, SessionRun
+from app.db.utils import get_db, run_write
+from app.db.writer import SQLiteWriter
+from app.engine.db_tools import persist_html_page
+from app.events.models import ErrorEvent
+from app.services.event_store import EventStoreService
+from app.services.message import MessageService
+from app.services.run import RunService
+
+
+def _database(tmp_path) -> tuple[Database, str]:
+    database = Database(f"sqlite:///{tmp_path / 'writer.db'}")
+    init_db(database)
+    session_id = uuid.uuid4().hex
+    with get_db(database) as session:
+        session.add(SessionModel(id=session_id, title="Writer"))
+        session.commit()
+    return database, session_id
+
+
+def _add_message(session_id: str, content: str):
+    def unit(session) -> int:
+        message = Message(session_id=session_id, role="user", content=content)
+        session.add(message)
+        session.flush()
+        return message.id
+
+    return unit
+
+
+def test_units_run_in_order_batched_and_isolated(tmp_path) -> None:
+    database, session_id = _database(tmp_path)
+    writer = SQLiteWriter(database.url, batch_size=16, batch_window=0.05)
+
+    def boom(session) -> None:
+        session.add(Message(session_id=session_id, role="user", content="discarded"))
+        session.flush()
+        raise ValueError("boom")
+
+    futures = [writer.submit(_add_message(session_id, f"m{n}")) for n in range(10)]
+    failed = writer.submit(boom)
+    futures += [writer.submit(_add_message(session_id, f"m{n}")) for n in range(10, 20)]
+
+    ids = [future.result(timeout=10) for future in futures]
+    with pytest.raises(ValueError):
+        failed.result(timeout=10)
+    assert ids == sorted(ids)
+    assert writer.units == 20 and writer.batches < 5
+
+    with get_db(database) as session:
+        contents = [row.content for row in session.query(Message).order_by(Message.id)]
+    assert contents == [f"m{n}" for n in range(20)]
+    writer.stop(timeout=5)
+
+
+def test_unit_that_rolls_back_the_batch_fails_alone(tmp_path) -> None:
+    database, session_id = _database(tmp_path)
+    writer = SQLiteWriter(database.url, batch_size=16, batch_window=0.05)
+
+    def rollback_everything(session) -> None:
+        session.rollback()
+        raise RuntimeError("gave up")
+
+    first = writer.submit(_add_message(session_id, "replayed"))
+    bad = writer.submit(rollback_everything)
+    after = writer.submit(_add_message(session_id, "kept"))
+
+    assert first.result(timeout=10)
+    with pytest.raises(RuntimeError):
+        bad.result(timeout=10)
+    assert after.result(timeout=10)
+    assert writer.batches == 1 and writer.units == 2
+    writer.stop(timeout=5)
+
+    with get_db(database) as session:
+        assert [row.content for row in session.query(Message).order_by(Message.id)] == ["replayed", "kept"]
+
+
+def test_event_store_writes_go_through_the_writer(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'writer_events.db'}")
+    monkeypatch.setenv("SQLITE_WRITE_QUEUE", "1")
+    refresh_settings()
+    reset_database()
+    database = get_database()
+    init_db(database)
+    session_id = uuid.uuid4().hex
+    with get_db() as session:
+        session.add(SessionModel(id=session_id, title="Events"))
+        session.commit()
+
+    def emit(worker: int) -> None:
+        with get_db() as session:
+            store = EventStoreService(session)
+            for n in range(25):
+                store.record_event(ErrorEvent(session_id=session_id, message=f"{worker}-{n}"))
+
+    threads = [threading.Thread(target=emit, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert run_write(lambda session: session.query(SessionEvent).count()) == 200
+    with get_db() as session:
+        seqs = [row.seq for row in session.query(SessionEvent).order_by(SessionEvent.seq)]
+    assert seqs == list(range(1, 201))
+    assert database.writer.units >= 200
+
+    database.stop_writer(timeout=5)
+    monkeypatch.delenv("SQLITE_WRITE_QUEUE")
+    refresh_settings()
+    reset_database()
+
+
+def test_message_run_and_page_writes_go_through_the_writer(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'writer_requests.db'}")
+    monkeypatch.setenv("SQLITE_WRITE_QUEUE", "1")
+    refresh_settings()
+    reset_database()
+    database = get_database()
+    init_db(database)
+    session_id = uuid.uuid4().hex
+
+    with get_db() as session:
+        session.add(SessionModel(id=session_id, title="Requests"))
+        session.flush()
+        # Pending work on the request session is committed before the writer runs.
+        MessageService(session).record_message(session_id, "user", "hello")
+        run = run_write(
+            lambda db: RunService(db).create_run(session_id=session_id, message="hello"),
+            session=session,
+        )
+        persist_html_page(session, session_id, "index.html", "<html>v1</html>")
+
+    assert database.writer.units >= 3
+    with get_db() as session:
+        assert [row.content for row in session.query(Message)] == ["hello"]
+        assert session.get(SessionRun, run.id).status == "queued"
+        assert session.query(Page).filter(Page.session_id == session_id).count() == 1
+        assert session.query(PageVersion).count() == 1
+
+    database.stop_writer(timeout=5)
+    monkeypatch.delenv("SQLITE_WRITE_QUEUE")
+    refresh_settings()
+    reset_database()
@@ -0,0 +1,114 @@
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.config import refresh_settings
+from app.db.database import Database, reset_database
+from app.db.migrations import backfill_v14_token_usage_rollups, init_db
+from app.db.models import Session as SessionModel, TokenUsage, TokenUsageRollup
+from app.db.utils import get_db, transaction_scope
+from app.services.token_tracker import TokenTrackerService
+
+
+def _record(service: TokenTrackerService, session_id: str, agent_type: str, model: str, tokens: int) -> None:
+    service.record_usage(
+        session_id,
+        agent_type=agent_type,
+        model=model,
+        input_tokens=tokens,
+        output_tokens=tokens // 2,
+        cost_usd=tokens / 1000,
+    )
+
+
+def test_record_usage_maintains_rollups(tmp_path) -> None:
+    database = Database(f"sqlite:///{tmp_path / 'tokens.db'}")
+    init_db(database)
+    session_id = uuid.uuid4().hex
+    other_id = uuid.uuid4().hex
+    with transaction_scope(database) as session:
+        session.add(SessionModel(id=session_id, title="Tokens"))
+        session.add(SessionModel(id=other_id, title="Other"))
+
+    with get_db(database) as session:
+        service = TokenTrackerService(session)
+        for tokens in (100, 200, 300):
+            _record(service, session_id, "writer", "gpt-4o", tokens)
+        _record(service, session_id, "planner", "gpt-4o-mini", 40)
+        session.commit()
+
+    with get_db(database) as session:
+        service = TokenTrackerService(session)
+        assert session.query(TokenUsageRollup).count() == 2
+        writer = session.query(TokenUsageRollup).filter(TokenUsageRollup.agent_type == "writer").one()
+        assert writer.request_count == 3 and writer.input_tokens == 600
+
+        summary = service.summarize_session(session_id)
+        assert summary["total"]["input_tokens"] == 640
+        assert summary["total"]["total_tokens"] == 960
+        assert summary["by_agent"]["planner"]["output_tokens"] == 20
+        assert round(summary["total"]["cost_usd"], 4) == 0.64
+
+        totals = service.summarize_sessions([session_id, other_id])
+        assert totals[session_id] == summary["total"]
+        assert totals[other_id]["total_tokens"] == 0
+
+
+def test_backfill_rebuilds_rollups_from_usage(tmp_path) -> None:
+    database = Database(f"sqlite:///{tmp_path / 'tokens_backfill.db'}")
+    init_db(database)
+    session_id = uuid.uuid4().hex
+    with transaction_scope(database) as session:
+        session.add(SessionModel(id=session_id, title="Legacy"))
+        for tokens in (10, 20):
+            session.add(
+                TokenUsage(
+                    session_id=session_id,
+                    agent_type="writer",
+                    model="gpt-4o",
+                    input_tokens=tokens,
+                    output_tokens=0,
+                    total_tokens=tokens,
+                    cost_usd=0.5,
+                )
+            )
+
+    # Existing usage without rollups is picked up on startup.
+    init_db(database)
+    with get_db(database) as session:
+        assert session.query(TokenUsageRollup).count() == 1
+    assert backfill_v14_token_usage_rollups(database) == 1
+
+    with get_db(database) as session:
+        rollup = session.query(TokenUsageRollup).one()
+        assert (rollup.request_count, rollup.total_tokens, rollup.cost_usd) == (2, 30, 1.0)
+        assert TokenTrackerService(session).summarize_session(session_id)["total"]["input_tokens"] == 30
+
+
+def test_all_sessions_cost_endpoint(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'tokens_api.db'}")
+    monkeypatch.setenv("DEFAULT_BASE_URL", "http://localhost")
+    monkeypatch.setenv("DEFAULT_KEY", "test-key")
+    refresh_settings()
+    reset_database()
+    init_db()
+    from app.main import create_app
+
+    session_ids = [uuid.uuid4().hex for _ in range(3)]
+    with get_db() as session:
+        for session_id in session_ids:
+            session.add(SessionModel(id=session_id, title=session_id))
+        session.flush()
+        service = TokenTrackerService(session)
+        for n, session_id in enumerate(session_ids):
+            _record(service, session_id, "writer", "gpt-4o", 100 * (n + 1))
+        session.commit()
+
+    client = TestClient(create_app())
+    response = client.get("/api/sessions/cost")
+    assert response.status_code == 200
+    costs = {row["session_id"]: row["input_tokens"] for row in response.json()["sessions"]}
+    assert costs == {session_ids[0]: 100, session_ids[1]: 200, session_ids[2]: 300}
+
+    response = client.get("/api/sessions/cost", params={"session_ids": session_ids[1]})
+    assert [row["session_id"] for row in response.json()["sessions"]] == [session_ids[1]]
@@ -23,6 +23,7 @@ export const SessionSchema = z.object({
 export const SessionListSchema = z.object({
   sessions: z.array(SessionSchema),
   total: z.number().optional(),
+  next_cursor: z.string().nullable().optional(),
 })
 
 // ---- Message schemas ----
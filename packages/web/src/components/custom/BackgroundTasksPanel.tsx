@@ -6,6 +6,16 @@ import { Skeleton } from '@/components/ui/skeleton'
 import { Badge } from '@/components/ui/badge'
 import { useBackgroundTasks } from '@/hooks/useBackgroundTasks'
 
+const MAX_OUTPUT_CHARS = 64 * 1024
+
+/** Keep the last `max` characters, cut at a line boundary. */
+function trimToLines(text: string, max: number): string {
+  if (text.length <= max) return text
+  const tail = text.slice(-max)
+  const newline = tail.indexOf('\n')
+  return newline === -1 ? tail : tail.slice(newline + 1)
+}
+
 interface BackgroundTasksPanelProps {
   sessionId: string | undefined
   className?: string
@@ -15,35 +25,52 @@ export function BackgroundTasksPanel({ sessionId, className }: BackgroundTasksPa
   const { tasks, isLoading, refresh, stopTask, getTaskOutput } = useBackgroundTasks(sessionId)
   const [outputStates, setOutputStates] = React.useState<Record<string, { output: string; since: number }>>({})
 
+  const outputStatesRef = React.useRef(outputStates)
+  outputStatesRef.current = outputStates
+  const pollingRef = React.useRef(false)
+
   // Auto-refresh output for running tasks
   React.useEffect(() => {
     if (!sessionId) return
 
     const interval = setInterval(async () => {
       const runningTasks = tasks.filter(t => t.status === 'running')
-      if (runningTasks.length === 0) return
-
-      for (const task of runningTasks) {
-        try {
-          const since = outputStates[task.id]?.since || 0
-          const result = await getTaskOutput(task.id, since)
-          if (result && !result.error) {
-            setOutputStates(prev => ({
-              ...prev,
-              [task.id]: {
-                output: result.output,
-                since: result.output_lines || 0,
-              },
-            }))
+      // Skip this tick while the previous poll is still in flight.
+      if (runningTasks.length === 0 || pollingRef.current) return
+      pollingRef.current = true
+
+      try {
+        for (const task of runningTasks) {
+          try {
+            const since = outputStatesRef.current[task.id]?.since || 0
+            const result = await getTaskOutput(task.id, since)
+            if (result && !result.error) {
+              setOutputStates(prev => {
+                // Drop responses requested with a cursor that has since moved on.
+                if ((prev[task.id]?.since || 0) !== since) return prev
+                return {
+                  ...prev,
+                  [task.id]: {
+                    output: trimToLines(
+                      [prev[task.id]?.output, result.output].filter(Boolean).join('\n'),
+                      MAX_OUTPUT_CHARS,
+                    ),
+                    since: result.cursor ?? since + (result.output_lines || 0),
+                  },
+                }
+              })
+            }
+          } catch (e) {
+            console.error(`Failed to fetch output for task ${task.id}:`, e)
           }
-        } catch (e) {
-          console.error(`Failed to fetch output for task ${task.id}:`, e)
         }
+      } finally {
+        pollingRef.current = false
       }
     }, 1000) // Poll output every second
 
     return () => clearInterval(interval)
-  }, [sessionId, tasks, outputStates, getTaskOutput])
+  }, [sessionId, tasks, getTaskOutput])
 
   if (isLoading) {
     return (
@@ -342,6 +342,7 @@ export function createStreamDataHandler(deps: StreamHandlerDeps) {
         )
       }
       if (
+        payload.type === 'build_queued' ||
         payload.type === 'build_start' ||
         payload.type === 'build_progress' ||
         payload.type === 'build_complete' ||
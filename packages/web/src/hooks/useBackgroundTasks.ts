@@ -27,6 +27,9 @@ export interface BackgroundTaskOutputResponse {
   status?: string
   output: string
   output_lines: number
+  /** Absolute line cursor; pass back as `since` to fetch only newer output. */
+  cursor?: number
+  dropped?: number
   error?: string
 }
 
@@ -36,6 +36,12 @@ const normalizeBuildInfo = (payload: unknown): BuildState | null => {
         ? raw.distPath
         : undefined
   const error = typeof raw.error === 'string' ? raw.error : undefined
+  const queuedAt =
+    typeof raw.queued_at === 'string'
+      ? raw.queued_at
+      : typeof raw.queuedAt === 'string'
+        ? raw.queuedAt
+        : undefined
   const startedAt =
     typeof raw.started_at === 'string'
       ? raw.started_at
@@ -50,7 +56,7 @@ const normalizeBuildInfo = (payload: unknown): BuildState | null => {
         : undefined
   const status = normalizeStatus(raw.status)
   const resolvedStatus =
-    status === 'pending' && pages.length === 0 && !startedAt && !completedAt && !error
+    status === 'pending' && pages.length === 0 && !queuedAt && !startedAt && !completedAt && !error
       ? 'idle'
       : status
   return {
@@ -58,6 +64,7 @@ const normalizeBuildInfo = (payload: unknown): BuildState | null => {
     pages,
     distPath,
     error,
+    queuedAt,
     startedAt,
     completedAt,
   }
@@ -242,6 +249,24 @@ export function useBuildStatus(sessionId?: string): UseBuildStatusReturn {
               }
             : baseProgress
 
+        if (event.type === 'build_queued') {
+          const position = toNumber(getEventField(event, payload, 'position'))
+          return {
+            ...prev,
+            status: 'pending',
+            error: undefined,
+            completedAt: undefined,
+            progress: {
+              step: 'Queued',
+              message:
+                typeof position === 'number'
+                  ? `Waiting for a build slot (#${position} in queue)`
+                  : undefined,
+              percent: 0,
+            },
+          }
+        }
+
         if (event.type === 'build_start') {
           return {
             ...prev,
@@ -50,6 +50,7 @@ const normalizeSessionEvent = (event: SessionEvent): ExecutionEvent | null => {
 const dispatchBuildEvent = (event: ExecutionEvent) => {
   if (typeof window === 'undefined') return
   if (
+    event.type === 'build_queued' ||
     event.type === 'build_start' ||
     event.type === 'build_progress' ||
     event.type === 'build_complete' ||
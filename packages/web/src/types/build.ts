@@ -11,6 +11,7 @@ export interface BuildState {
   pages: string[]
   distPath?: string
   error?: string
+  queuedAt?: string
   startedAt?: string
   completedAt?: string
   progress?: BuildProgress
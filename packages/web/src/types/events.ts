@@ -49,6 +49,7 @@ export type EventType =
   | 'refine_start'
   | 'refine_complete'
   | 'refine_waiting'
+  | 'build_queued'
   | 'build_start'
   | 'build_progress'
   | 'build_complete'
@@ -199,6 +200,7 @@ export interface WorkflowEvent extends BaseEvent {
   | 'refine_start'
   | 'refine_complete'
   | 'refine_waiting'
+  | 'build_queued'
   | 'build_start'
   | 'build_progress'
   | 'build_complete'